@@ -0,0 +1,49 @@
+"""
+Benchmark: attribute access on VersionedModel instances.
+
+Times reads of a custom field, a Big 6 field and the `entity_id` field of a
+`VersionedModel` subclass, next to the same read on a plain dataclass.
+
+Usage:
+    python benchmarks/attribute_access.py [--reads 1000000]
+"""
+import argparse
+import timeit
+from dataclasses import dataclass, field
+
+from rococo.models import VersionedModel
+
+
+@dataclass(kw_only=True)
+class PlainRow:
+    name: str = None
+
+
+@dataclass(kw_only=True)
+class Row(VersionedModel):
+    name: str = None
+    tags: list = field(default=None, metadata={'field_type': 'm2m_list'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reads', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    namespace = {'plain': PlainRow(name="a"), 'row': Row(name="a", tags=[])}
+    cases = (
+        ('plain dataclass', 'plain.name'),
+        ('custom field', 'row.name'),
+        ('entity_id', 'row.entity_id'),
+        ('Big 6 field', 'row.version'),
+        ('m2m field', 'row.tags'),
+    )
+
+    print(f"{args.reads} reads, ns per read")
+    for label, statement in cases:
+        seconds = min(timeit.repeat(statement, globals=namespace, number=args.reads, repeat=5))
+        print(f"{label:18}{seconds / args.reads * 1e9:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: generic vs code-generated model converters.
+
+Compares `BaseModel.as_dict` / `BaseModel.from_dict` with the specialized
+functions generated for models that set `use_compiled_converters = True`,
+and `from_dict` row by row with batch loading through `from_rows`, checking
+that all of them produce the same output.
+
+Usage:
+    python benchmarks/model_converters.py [--records 100000]
+"""
+import argparse
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional
+from uuid import uuid4
+
+from rococo.models import VersionedModel
+
+
+class Tier(Enum):
+    FREE = "free"
+    PRO = "pro"
+
+
+@dataclass(kw_only=True)
+class Customer(VersionedModel):
+    first_name: str = None
+    last_name: str = None
+    email: str = field(default=None, metadata={'alias': 'email_address'})
+    phone: Optional[str] = None
+    tier: Optional[Tier] = None
+    signed_up_on: Optional[datetime] = None
+    organization_id: str = field(default=None, metadata={'field_type': 'entity_id'})
+    city: str = None
+    country: str = None
+    score: float = 0.0
+    visits: int = 0
+    is_verified: bool = False
+
+
+@dataclass(kw_only=True)
+class CompiledCustomer(Customer):
+    use_compiled_converters = True
+
+
+def _records(count):
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            'entity_id': uuid4().hex,
+            'version': uuid4().hex,
+            'previous_version': uuid4().hex,
+            'changed_by_id': uuid4().hex,
+            'changed_on': now,
+            'active': True,
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'email_address': f"user{i}@example.com",
+            'phone': None,
+            'tier': "pro" if i % 2 else "free",
+            'signed_up_on': now,
+            'organization_id': uuid4().hex,
+            'city': "Springfield",
+            'country': "US",
+            'score': i / 3,
+            'visits': i,
+            'is_verified': bool(i % 3),
+        }
+        for i in range(count)
+    ]
+
+
+def _time(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = _records(args.records)
+
+    generic_load, generic_models = _time(lambda: [Customer.from_dict(r) for r in records])
+    compiled_load, compiled_models = _time(lambda: [CompiledCustomer.from_dict(r) for r in records])
+
+    batch_load, batch_models = _time(lambda: Customer.from_rows(records))
+    assert [m.as_dict() for m in batch_models[:100]] == [m.as_dict() for m in generic_models[:100]], \
+        "from_rows output differs from from_dict"
+
+    generic_dump, generic_dicts = _time(
+        lambda: [m.as_dict(convert_datetime_to_iso_string=True) for m in generic_models])
+    compiled_dump, compiled_dicts = _time(
+        lambda: [m.as_dict(convert_datetime_to_iso_string=True) for m in compiled_models])
+
+    assert generic_dicts == compiled_dicts, "compiled as_dict output differs from the generic one"
+
+    print(f"{args.records} records")
+    print(f"{'':12}{'generic':>12}{'compiled':>12}{'speedup':>10}")
+    for label, generic, compiled in (
+        ('from_dict', generic_load, compiled_load),
+        ('as_dict', generic_dump, compiled_dump),
+    ):
+        print(f"{label:12}{generic:>11.3f}s{compiled:>11.3f}s{generic / compiled:>9.2f}x")
+    print(f"{'from_rows':12}{batch_load:>11.3f}s{'':>12}{generic_load / batch_load:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: memory per instance of regular vs compact (`__slots__`) models.
+
+Builds the same rows as regular `VersionedModel` instances and as
+`compact_model` instances and reports the memory retained per instance, as
+measured by `tracemalloc`.
+
+Usage:
+    python benchmarks/model_memory.py [--records 100000]
+"""
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from rococo.models import VersionedModel, compact_model
+
+
+@dataclass(kw_only=True)
+class ExportRow(VersionedModel):
+    first_name: str = None
+    last_name: str = None
+    email: str = None
+    city: str = None
+    country: str = None
+    score: float = 0.0
+    visits: int = 0
+    is_verified: bool = False
+
+
+@compact_model
+@dataclass(kw_only=True)
+class CompactExportRow(VersionedModel):
+    first_name: str = None
+    last_name: str = None
+    email: str = None
+    city: str = None
+    country: str = None
+    score: float = 0.0
+    visits: int = 0
+    is_verified: bool = False
+
+
+def _records(count):
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            'entity_id': uuid4().hex,
+            'version': uuid4().hex,
+            'previous_version': uuid4().hex,
+            'changed_by_id': uuid4().hex,
+            'changed_on': now,
+            'active': True,
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'email': f"user{i}@example.com",
+            'city': "Springfield",
+            'country': "US",
+            'score': i / 3,
+            'visits': i,
+            'is_verified': bool(i % 3),
+        }
+        for i in range(count)
+    ]
+
+
+def _retained_bytes(model_cls, records):
+    """
+    Memory retained by the instances built from `records` (field values are
+    shared), right after construction and after serializing every instance.
+
+    CPython only materializes an instance `__dict__` when it is accessed, which
+    `as_dict` does, so the second figure is the one seen by export jobs.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [model_cls(**record) for record in records]
+    built = tracemalloc.get_traced_memory()[0]
+    for instance in instances:
+        instance.as_dict()
+    gc.collect()
+    serialized = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built - before, serialized - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=100_000)
+    args = parser.parse_args()
+
+    # changed_on is parsed once, so both runs only measure the instances themselves
+    records = _records(args.records)
+    changed_on = datetime.fromisoformat(records[0]['changed_on'])
+    for record in records:
+        record['changed_on'] = changed_on
+
+    # Build metadata and caches outside of the measurement
+    ExportRow(**records[0])
+    CompactExportRow(**records[0])
+
+    regular = _retained_bytes(ExportRow, records)
+    compact = _retained_bytes(CompactExportRow, records)
+
+    print(f"{args.records} records, bytes per instance")
+    print(f"{'':12}{'built':>12}{'serialized':>12}")
+    for label, (built, serialized) in (('regular', regular), ('compact', compact)):
+        print(f"{label:12}{built / args.records:>12.0f}{serialized / args.records:>12.0f}")
+    print(f"compact instances use {1 - compact[1] / regular[1]:.0%} less memory once serialized")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: PostgreSQL saves with INSERT ... ON CONFLICT vs the UPDATE-then-INSERT CTE.
+
+Saves the same rows with `PostgreSQLAdapter.get_save_query` and
+`get_save_many_queries`, once keyed by the table's primary key (ON CONFLICT)
+and once without a known key (the CTE forms), half of the rows being new and
+half updates. Runs against a scratch table in the given database.
+
+Usage:
+    python benchmarks/postgres_upsert.py --host localhost --port 5432 --user postgres \
+        --password postgres --database rococo [--rows 5000] [--batch 500]
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import TableSchema
+
+TABLE = 'rococo_upsert_benchmark'
+
+
+def _rows(entity_ids, label):
+    return [{'entity_id': entity_id, 'label': f"{label}{i}", 'visits': i, 'active': True}
+            for i, entity_id in enumerate(entity_ids)]
+
+
+def _run(adapter, conflict_target, rows, batch):
+    """Times saving `rows` one per transaction, then in batches of `batch`."""
+    adapter._store_table_schemas({TABLE: TableSchema(
+        ('entity_id', 'label', 'visits', 'active'), primary_key=conflict_target or ())})
+
+    start = time.perf_counter()
+    for row in rows:
+        adapter.run_transaction([adapter.get_save_query(TABLE, row)])
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(rows), batch):
+        adapter.run_transaction(adapter.get_save_many_queries(TABLE, rows[offset:offset + batch]))
+    batched = time.perf_counter() - start
+    return single, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--database', default='postgres')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    adapter = PostgreSQLAdapter(args.host, args.port, args.user, args.password, args.database,
+                                connection_mode='persistent')
+    with adapter:
+        adapter.execute_query(f"DROP TABLE IF EXISTS {TABLE}")
+        adapter.execute_query(
+            f"CREATE TABLE {TABLE} (entity_id varchar(32) PRIMARY KEY, label varchar(64), "
+            f"visits integer, active boolean)")
+        try:
+            results = {}
+            for name, conflict_target in (('cte', None), ('on conflict', ('entity_id',))):
+                adapter.execute_query(f"TRUNCATE {TABLE}")
+                existing = [uuid4().hex for _ in range(args.rows // 2)]
+                adapter.run_transaction(adapter.get_save_many_queries(TABLE, _rows(existing, "old")))
+                rows = _rows(existing + [uuid4().hex for _ in range(args.rows - len(existing))], "new")
+                results[name] = _run(adapter, conflict_target, rows, args.batch)
+        finally:
+            adapter.execute_query(f"DROP TABLE IF EXISTS {TABLE}")
+    adapter.close()
+
+    print(f"{args.rows} rows, half new, batches of {args.batch}")
+    print(f"{'':12}{'cte':>12}{'on conflict':>14}{'speedup':>10}")
+    for index, label in enumerate(('save', 'save_many')):
+        cte, upsert = results['cte'][index], results['on conflict'][index]
+        print(f"{label:12}{cte:>11.3f}s{upsert:>13.3f}s{cte / upsert:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""Module for caching"""
+from .base import CacheBackend
+from .memory import MemoryCache
+from .redis import RedisCache
@@ -0,0 +1,31 @@
+"""Cache backend interface"""
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+
+class CacheBackend(ABC):
+    """
+    A key-value cache of bytes with optional expiry.
+
+    Entries may disappear at any time (expiry, eviction), so a cache is only
+    ever a copy of data kept elsewhere.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the value stored under `key`, None if there is none or it has expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """Stores `value` under `key`, expiring after `ttl` seconds if given."""
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        """Removes the given keys; missing keys are ignored."""
+        pass
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        """Returns the values of `keys`, in order, with None for missing keys."""
+        return [self.get(key) for key in keys]
@@ -0,0 +1,63 @@
+"""In-process LRU cache with expiry"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """
+    A thread-safe least-recently-used cache held in process memory.
+
+    Holds up to `max_entries` entries and evicts the least recently used one
+    beyond that. Entries are not shared with other processes, so writes made
+    by another process are only seen once the entries expire.
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: Optional[float] = None):
+        """
+        :param max_entries: maximum number of entries kept
+        :param default_ttl: expiry in seconds of entries set without a ttl; None to keep them until evicted
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: 'OrderedDict[str, Tuple[bytes, Optional[float]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
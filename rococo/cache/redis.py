@@ -0,0 +1,56 @@
+"""Redis cache backend"""
+from typing import Any, Iterable, List, Optional
+
+from .base import CacheBackend
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class RedisCache(CacheBackend):
+    """
+    A cache kept in Redis, or in any server speaking the Redis protocol, shared
+    by every process using it.
+
+    Takes a redis-py compatible client (`redis.Redis`, `fakeredis.FakeRedis`, ...),
+    or a URL to create a `redis.Redis` client from. Keys are prefixed with `prefix`.
+    """
+
+    def __init__(self, client: Any = None, url: str = None, prefix: str = "rococo:",
+                 default_ttl: Optional[float] = None):
+        """
+        :param client: redis-py compatible client
+        :param url: Redis URL (e.g. redis://localhost:6379/0), used if no client is given
+        :param prefix: prefix of all keys
+        :param default_ttl: expiry in seconds of entries set without a ttl; None to keep them
+        """
+        if client is None:
+            if url is None:
+                raise ValueError("RedisCache needs a client or a url")
+            if redis is None:
+                raise ImportError("redis is not installed; install rococo[cache]")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is None:
+            self.client.set(self.prefix + key, value)
+        else:
+            # Millisecond expiry, at least 1ms
+            self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        keys = [self.prefix + key for key in keys]
+        return list(self.client.mget(keys)) if keys else []
@@ -1,6 +1,10 @@
 """data module"""
 
 from .base import DbAdapter
+from .async_base import AsyncDbAdapter
+from .pool import ConnectionPool, PoolStats, PoolTimeoutError
+from .statement_cache import StatementCache, StatementCacheStats
+from .schema_catalog import SchemaCatalog, TableSchema
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,3 +34,15 @@ try:
 except ImportError:
     logger.info("SurrealDbAdapter not loaded - probably, missing dependencies")
     pass
+
+try:
+    from .async_postgresql import AsyncPostgreSQLAdapter
+except ImportError:
+    logger.info("AsyncPostgreSQLAdapter not loaded - probably, missing dependencies")
+    pass
+
+try:
+    from .async_mysql import AsyncMySqlAdapter
+except ImportError:
+    logger.info("AsyncMySqlAdapter not loaded - probably, missing dependencies")
+    pass
@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class AsyncDbAdapter(ABC):
+    """
+    Abstract base class for asyncio database adapters.
+
+    The methods of `DbAdapter`, awaited: an adapter is entered with `async with`
+    and its queries run on an asyncio-native driver, so a process can wait on
+    many queries at once without blocking a thread per query.
+    """
+
+    # Whether get_update_query() is implemented (used for partial-update saves)
+    supports_partial_updates = False
+    # Whether the multi-row queries of save_many() are implemented
+    supports_batch_save = False
+
+    @abstractmethod
+    async def __aenter__(self) -> 'AsyncDbAdapter':
+        """Async context manager entry point for preparing DB connection."""
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Async context manager exit point for closing DB connection."""
+        pass
+
+    @abstractmethod
+    async def run_transaction(self, operations_list: List[Any]):
+        """Execute a list of queries / operations as a transaction."""
+        pass
+
+    @abstractmethod
+    async def execute_query(self, sql: str, _vars: Any = None) -> Any:
+        """Executes a raw SQL query against the DB."""
+        pass
+
+    def parse_db_response(self, response: Any) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Parses the raw response from the database and returns structured data."""
+        if not response or not isinstance(response, list):
+            return []
+        return response
+
+    @abstractmethod
+    async def get_one(self, table: str, conditions: Dict[str, Any],
+                      sort: List[Tuple[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Fetches a single record from the specified table based on given conditions."""
+        pass
+
+    @abstractmethod
+    async def get_many(self, table: str, conditions: Dict[str, Any] = None, sort: List[Tuple[str, str]] = None,
+                       limit: int = 100) -> List[Dict[str, Any]]:
+        """Fetches multiple records from the specified table based on given conditions."""
+        pass
+
+    @abstractmethod
+    async def get_count(self, table: str, conditions: Dict[str, Any],
+                        options: Optional[Dict[str, Any]] = None) -> int:
+        """Returns record count from the specified table based on given conditions"""
+        pass
+
+    async def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """
+        Returns an estimate of the record count from the database's statistics, without
+        counting, or None if the database can't estimate it.
+        """
+        return None
+
+    @abstractmethod
+    async def get_move_entity_to_audit_table_query(self, table: str, entity_id: str):
+        """Returns query to move entity by entity_id to audit table."""
+        pass
+
+    @abstractmethod
+    async def get_save_query(self, table: str, data: Dict[str, Any]):
+        """Returns query to save a data record in the table."""
+        pass
+
+    async def get_update_query(self, table: str, data: Dict[str, Any]):
+        """
+        Returns query to update only the columns in `data` of the existing record
+        with `data['entity_id']`, or None if there is nothing to update.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support partial updates.")
+
+    async def get_move_entities_to_audit_table_query(self, table: str, entity_ids: List[str]):
+        """Returns query to move the entities with the given entity_ids to the audit table."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch saves.")
+
+    async def get_save_many_queries(self, table: str, data_list: List[Dict[str, Any]]) -> List[Any]:
+        """Returns queries saving all records of `data_list` in the table, a few rows per query."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch saves.")
+
+    @abstractmethod
+    async def hard_delete(self, table: str, entity_id: str) -> bool:
+        """Permanently deletes a record from the specified table by entity_id."""
+        pass
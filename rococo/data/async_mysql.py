@@ -0,0 +1,230 @@
+import inspect
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rococo.data.async_base import AsyncDbAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema, table_schemas_from_rows
+from rococo.data.mysql import MySqlAdapter
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+
+class AsyncMySqlAdapter(AsyncDbAdapter):
+    """
+    Asyncio MySQL adapter, on aiomysql.
+
+    Queries are built by `MySqlAdapter`, so both adapters send the same SQL;
+    this one only runs it on an aiomysql connection.
+    """
+
+    supports_partial_updates = True
+    supports_batch_save = True
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 connection_resolver: Optional[Callable] = None, connection_closer: Optional[Callable] = None,
+                 schema_catalog: Optional[SchemaCatalog] = None):
+        """
+        :param connection_resolver: coroutine function returning a connection, called with the connection arguments
+        :param connection_closer: function or coroutine function closing the adapter's connection, called with the adapter
+        :param schema_catalog: catalog of the discovered table schemas, the one of the process by default
+        """
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._database = database
+        # Each asyncio task entering the adapter gets its own connection
+        self._task_connection = ContextVar(f"rococo_mysql_connection_{id(self)}", default=None)
+        self._connection_resolver = connection_resolver
+        self._connection_closer = connection_closer
+        # Builds the queries; never connects
+        self._queries = MySqlAdapter(host, port, user, password, database, schema_catalog=schema_catalog)
+
+    @property
+    def _connection(self):
+        return self._task_connection.get()
+
+    @_connection.setter
+    def _connection(self, connection):
+        self._task_connection.set(connection)
+
+    async def __aenter__(self):
+        """Async context manager entry point for creating DB connection."""
+        self._connection = await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Async context manager exit point for closing DB connection."""
+        await self.close_connection()
+
+    async def close_connection(self):
+        """Closes the connection."""
+        if self._connection_closer:
+            result = self._connection_closer(self)
+            if inspect.isawaitable(result):
+                await result
+        elif self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def connect(self):
+        if self._connection_resolver is None:
+            if aiomysql is None:
+                raise ImportError("aiomysql is not installed; install rococo[data-mysql-async]")
+            return await aiomysql.connect(
+                host=self._host,
+                port=self._port,
+                user=self._user,
+                password=self._password,
+                db=self._database,
+                cursorclass=aiomysql.DictCursor
+            )
+        return await self._connection_resolver(
+            host=self._host,
+            port=self._port,
+            user=self._user,
+            password=self._password,
+            database=self._database
+        )
+
+    async def execute_query(self, sql, _vars=None):
+        """Executes a query against the DB."""
+        if not self._connection:
+            raise Exception("No connection is available.")
+        async with self._connection.cursor() as cursor:
+            await cursor.execute(sql, _vars or ())
+            return await cursor.fetchall()
+
+    async def run_transaction(self, queries_list):
+        """Executes a list of queries in a single transaction against the database."""
+        async with self._connection.cursor() as cursor:
+            for query in queries_list:
+                if type(query) is tuple:
+                    query, values = query
+                else:
+                    values = ()
+                await cursor.execute(query, values)
+        await self._connection.commit()
+
+    async def load_table_schemas(self, tables: Iterable[Any]) -> Dict[str, TableSchema]:
+        """Reads the schemas of `tables` (names or model classes) into the schema catalog (see DbAdapter.load_table_schemas)."""
+        tables = self._queries._table_names(tables)
+        if not tables:
+            return {}
+        column_rows, constraint_rows = [await self.execute_query(query, values) or []
+                                        for query, values in self._queries._table_schema_queries(tables)]
+        schemas = table_schemas_from_rows(tables, column_rows, constraint_rows)
+        self._queries._store_table_schemas(schemas)
+        return schemas
+
+    def invalidate_table_schemas(self, tables: Optional[Iterable[Any]] = None):
+        """Drops the cataloged schemas of `tables`, or of all the adapter's tables, e.g. after a migration."""
+        self._queries.invalidate_table_schemas(tables)
+
+    async def _load_table_schema(self, table_name: str):
+        """
+        Reads the schema of `table_name` into the catalog the query builder reads, once.
+
+        :raises ValueError: if the table has no columns (it does not exist)
+        """
+        if self._queries._cached_table_schema(table_name) is None:
+            schemas = await self.load_table_schemas([table_name])
+            self._queries._existing_table_schema(table_name, schemas[table_name])
+
+    async def _select(self, table: str, *args, exclude_columns: list = None, **kwargs) -> List[Dict[str, Any]]:
+        if exclude_columns:
+            await self._load_table_schema(table)
+        query, values = self._queries._build_select_query(
+            table, *args, exclude_columns=exclude_columns, **kwargs)
+        return list(self.parse_db_response(await self.execute_query(query, values)))
+
+    async def get_one(
+            self,
+            table: str,
+            conditions: Dict[str, Any],
+            sort: List[Tuple[str, str]] = None,
+            join_statements: list = None,
+            additional_fields: list = None,
+            active: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> Optional[Dict[str, Any]]:
+        rows = await self._select(
+            table, conditions, sort, 1, None, active, join_statements, additional_fields, columns,
+            exclude_columns=exclude_columns)
+        return rows[0] if rows else None
+
+    async def get_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            limit: int = None,
+            offset: int = None,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
+        return await self._select(
+            table, conditions, sort, limit, offset, active, join_statements, additional_fields, columns,
+            exclude_columns=exclude_columns)
+
+    async def get_count(
+        self,
+        table: str,
+        conditions: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Count rows in `table` matching `conditions` (see MySqlAdapter.get_count)."""
+        where_clause, params = self._queries._build_count_where(table, conditions)
+        rows = await self.execute_query(f"SELECT COUNT(*) AS `count` FROM `{table}` {where_clause}", tuple(params))
+        if rows and rows[0] is not None:
+            return int(rows[0].get('count', 0))
+        return 0
+
+    async def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """Estimate the rows in `table` matching `conditions` (see MySqlAdapter.get_count_estimate)."""
+        if not conditions:
+            rows = await self.execute_query(
+                "SELECT TABLE_ROWS AS `estimate` FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+            estimate = rows[0].get('estimate') if rows else None
+            return int(estimate) if estimate is not None else None
+
+        where_clause, params = self._queries._build_count_where(table, conditions)
+        rows = await self.execute_query(f"EXPLAIN SELECT 1 FROM `{table}` {where_clause}", tuple(params))
+        if not rows or rows[0].get('rows') is None:
+            return None
+        return int(rows[0]['rows'] * float(rows[0].get('filtered') or 100) / 100)
+
+    async def get_move_entity_to_audit_table_query(self, table, entity_id):
+        """Returns the query to move an entity to audit table."""
+        return self._queries.get_move_entity_to_audit_table_query(table, entity_id)
+
+    async def get_move_entities_to_audit_table_query(self, table, entity_ids):
+        """Returns the query to move many entities to audit table."""
+        return self._queries.get_move_entities_to_audit_table_query(table, entity_ids)
+
+    async def get_save_query(self, table_name, data):
+        """Returns a query to save an entity in database."""
+        return self._queries.get_save_query(table_name, data)
+
+    async def get_save_many_queries(self, table_name, data_list):
+        """Returns multi-row queries saving the entities of `data_list`, one query per set of columns."""
+        return self._queries.get_save_many_queries(table_name, data_list)
+
+    async def get_update_query(self, table_name, data):
+        """Returns a query to update the given columns of the entity with data['entity_id']."""
+        return self._queries.get_update_query(table_name, data)
+
+    async def hard_delete(self, table: str, entity_id: str) -> bool:
+        """Permanently deletes a record from the specified table by entity_id."""
+        async with self._connection.cursor() as cursor:
+            await cursor.execute(f"DELETE FROM {table} WHERE entity_id = %s", (entity_id.replace('-', ''),))
+        await self._connection.commit()
+        return True
@@ -0,0 +1,256 @@
+import inspect
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rococo.data.async_base import AsyncDbAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema, table_schemas_from_rows
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.serialization import json_dumps, json_loads
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+
+class AsyncPostgreSQLAdapter(AsyncDbAdapter):
+    """
+    Asyncio PostgreSQL adapter, on psycopg 3.
+
+    Queries are built by `PostgreSQLAdapter`, so both adapters send the same SQL;
+    this one only runs it on an `AsyncConnection`.
+    """
+
+    supports_partial_updates = True
+    supports_batch_save = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        connection_resolver: Optional[Callable] = None,
+        connection_closer: Optional[Callable] = None,
+        connect_kwargs: Optional[dict] = None,
+        schema: Optional[str] = None,
+        schema_catalog: Optional[SchemaCatalog] = None,
+    ):
+        """
+        :param connection_resolver: coroutine function returning a connection, called with the connection arguments
+        :param connection_closer: function or coroutine function closing the adapter's connection, called with the adapter
+        :param schema: schema whose tables are discovered, the connection's current schema by default
+        :param schema_catalog: catalog of the discovered table schemas, the one of the process by default
+        """
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._database = database
+        # Each asyncio task entering the adapter gets its own connection
+        self._task_connection = ContextVar(f"rococo_postgresql_connection_{id(self)}", default=None)
+        self._connect_kwargs = connect_kwargs or {}
+        self._connection_resolver = connection_resolver
+        self._connection_closer = connection_closer
+        # Builds the queries; never connects
+        self._queries = PostgreSQLAdapter(host, port, user, password, database, connect_kwargs=connect_kwargs,
+                                          schema=schema, schema_catalog=schema_catalog)
+
+    @property
+    def _connection(self):
+        return self._task_connection.get()
+
+    @_connection.setter
+    def _connection(self, connection):
+        self._task_connection.set(connection)
+
+    async def __aenter__(self):
+        """Async context manager entry point for creating DB connection."""
+        self._connection = await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Async context manager exit point for closing DB connection."""
+        await self.close_connection()
+
+    async def close_connection(self):
+        """Closes the connection."""
+        if self._connection_closer:
+            result = self._connection_closer(self)
+            if inspect.isawaitable(result):
+                await result
+        elif self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def connect(self):
+        if self._connection_resolver is None:
+            if psycopg is None:
+                raise ImportError("psycopg is not installed; install rococo[data-postgres-async]")
+            return await psycopg.AsyncConnection.connect(
+                host=self._host,
+                port=self._port,
+                user=self._user,
+                password=self._password,
+                dbname=self._database,
+                **self._connect_kwargs
+            )
+        return await self._connection_resolver(
+            host=self._host,
+            port=self._port,
+            user=self._user,
+            password=self._password,
+            database=self._database,
+            **self._connect_kwargs
+        )
+
+    async def execute_query(self, sql, _vars=None):
+        """Executes a query against the DB."""
+        if not self._connection:
+            raise Exception("No connection is available.")
+        async with self._connection.cursor() as cursor:
+            await cursor.execute(sql, _vars or ())
+            if cursor.description is None:
+                # For other queries (like CREATE, INSERT, UPDATE, DELETE), commit and return None
+                await self._connection.commit()
+                return None
+            column_names = [desc[0] for desc in cursor.description]
+            return [dict(zip(column_names, row)) for row in await cursor.fetchall()]
+
+    async def run_transaction(self, queries_list):
+        """Executes a list of queries in a single transaction against the database."""
+        async with self._connection.cursor() as cursor:
+            for query in queries_list:
+                if type(query) is tuple:
+                    query, values = query
+                else:
+                    values = ()
+                # Convert dicts to JSON strings
+                await cursor.execute(query, [json_dumps(value) if isinstance(value, dict) else value
+                                             for value in values])
+        await self._connection.commit()
+
+    async def load_table_schemas(self, tables: Iterable[Any]) -> Dict[str, TableSchema]:
+        """Reads the schemas of `tables` (names or model classes) into the schema catalog (see DbAdapter.load_table_schemas)."""
+        tables = self._queries._table_names(tables)
+        if not tables:
+            return {}
+        column_rows, constraint_rows = [await self.execute_query(query, values) or []
+                                        for query, values in self._queries._table_schema_queries(tables)]
+        schemas = table_schemas_from_rows(tables, column_rows, constraint_rows)
+        self._queries._store_table_schemas(schemas)
+        return schemas
+
+    def invalidate_table_schemas(self, tables: Optional[Iterable[Any]] = None):
+        """Drops the cataloged schemas of `tables`, or of all the adapter's tables, e.g. after a migration."""
+        self._queries.invalidate_table_schemas(tables)
+
+    async def _load_table_schema(self, table_name: str):
+        """
+        Reads the schema of `table_name` into the catalog the query builder reads, once.
+
+        :raises ValueError: if the table has no columns (it does not exist)
+        """
+        if self._queries._cached_table_schema(table_name) is None:
+            schemas = await self.load_table_schemas([table_name])
+            self._queries._existing_table_schema(table_name, schemas[table_name])
+
+    async def _select(self, table: str, *args, exclude_columns: list = None, **kwargs) -> List[Dict[str, Any]]:
+        if exclude_columns:
+            await self._load_table_schema(table)
+        query, values = self._queries._build_select_query(
+            table, *args, exclude_columns=exclude_columns, **kwargs)
+        rows = self.parse_db_response(await self.execute_query(query, values))
+        return [self._queries._deserialize_extra_fields(row) for row in rows]
+
+    async def get_one(
+            self,
+            table: str,
+            conditions: Dict[str, Any],
+            sort: List[Tuple[str, str]] = None,
+            join_statements: list = None,
+            additional_fields: list = None,
+            active: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> Optional[Dict[str, Any]]:
+        rows = await self._select(
+            table, conditions, sort, 1, None, active, join_statements, additional_fields, columns,
+            exclude_columns=exclude_columns)
+        return rows[0] if rows else None
+
+    async def get_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            limit: int = None,
+            offset: int = None,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
+        return await self._select(
+            table, conditions, sort, limit, offset, active, join_statements, additional_fields, columns,
+            exclude_columns=exclude_columns)
+
+    async def get_count(
+        self,
+        table: str,
+        conditions: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Count rows in `table` matching `conditions` (see PostgreSQLAdapter.get_count)."""
+        where_sql, params = self._queries._build_count_where(table, conditions)
+        rows = await self.execute_query(f'SELECT COUNT(*) AS count FROM "{table}" {where_sql}', tuple(params))
+        if rows:
+            return int(rows[0].get('count', 0) or 0)
+        return 0
+
+    async def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """Estimate the rows in `table` matching `conditions` (see PostgreSQLAdapter.get_count_estimate)."""
+        if not conditions:
+            rows = await self.execute_query(
+                "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+            estimate = rows[0].get('estimate') if rows else None
+            # reltuples is -1 until the table is first vacuumed or analyzed
+            return int(estimate) if estimate is not None and estimate >= 0 else None
+
+        where_sql, params = self._queries._build_count_where(table, conditions)
+        rows = await self.execute_query(
+            f'EXPLAIN (FORMAT JSON) SELECT 1 FROM "{table}" {where_sql}', tuple(params))
+        plan = next(iter(rows[0].values()))
+        if isinstance(plan, str):
+            plan = json_loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    async def get_move_entity_to_audit_table_query(self, table, entity_id):
+        """Returns the query to move an entity to audit table."""
+        return self._queries.get_move_entity_to_audit_table_query(table, entity_id)
+
+    async def get_move_entities_to_audit_table_query(self, table, entity_ids):
+        """Returns the query to move many entities to audit table."""
+        return self._queries.get_move_entities_to_audit_table_query(table, entity_ids)
+
+    async def get_save_query(self, table_name, data):
+        """Returns a query to update a row or insert a new one in PostgreSQL."""
+        await self._load_table_schema(table_name)
+        return self._queries.get_save_query(table_name, data)
+
+    async def get_save_many_queries(self, table_name, data_list):
+        """Returns queries updating the rows of `data_list` that exist and inserting the others."""
+        await self._load_table_schema(table_name)
+        return self._queries.get_save_many_queries(table_name, data_list)
+
+    async def get_update_query(self, table_name, data):
+        """Returns a query to update the given columns of the row with data['entity_id']."""
+        await self._load_table_schema(table_name)
+        return self._queries.get_update_query(table_name, data)
+
+    async def hard_delete(self, table: str, entity_id: str) -> bool:
+        """Permanently deletes a record from the specified table by entity_id."""
+        await self.execute_query(f"DELETE FROM {table} WHERE entity_id = %s", (entity_id.replace('-', ''),))
+        return True
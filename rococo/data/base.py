@@ -1,10 +1,32 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from rococo.data.schema_catalog import TableSchema, table_schemas_from_rows
+
+# 'per_call': every outermost `with adapter:` block opens a connection and closes it on exit
+# 'persistent': the connection is opened once and kept open between blocks
+CONNECTION_MODES = ('per_call', 'persistent')
 
 
 class DbAdapter(ABC):
     """Abstract base class for database adapters."""
 
+    # Whether get_update_query() is implemented (used for partial-update saves)
+    supports_partial_updates = False
+    # Whether the multi-row queries of save_many() are implemented
+    supports_batch_save = False
+    # One of CONNECTION_MODES (see _enter_context)
+    connection_mode = 'per_call'
+    # Seconds a persistent connection may sit idle before it is checked on reuse
+    health_check_interval = 30.0
+    _context_depth = 0
+    _idle_since = None
+    # Generated SQL reused by the SQL adapters (see rococo.data.statement_cache)
+    statement_cache = None
+    # Table schemas discovered by the SQL adapters (see rococo.data.schema_catalog)
+    schema_catalog = None
+
     @abstractmethod
     def __enter__(self) -> 'DbAdapter':
         """Context manager entry point for preparing DB connection."""
@@ -15,6 +37,171 @@ class DbAdapter(ABC):
         """Context manager exit point for closing DB connection."""
         pass
 
+    def _set_connection_lifecycle(self, connection_mode: str, health_check_interval: float):
+        if connection_mode not in CONNECTION_MODES:
+            raise ValueError(
+                f"Invalid connection mode '{connection_mode}'; expected one of {list(CONNECTION_MODES)}")
+        self.connection_mode = connection_mode
+        self.health_check_interval = health_check_interval
+
+    def _enter_context(self) -> bool:
+        """
+        Enters a `with adapter:` block, opening the connection when needed.
+
+        Blocks are re-entrant: nested blocks run on the connection of the outermost
+        one. A persistent connection is reused by later blocks, after a health check
+        if it sat idle for `health_check_interval` seconds; it is reopened when the
+        check fails. The connection state belongs to the adapter instance, so an
+        adapter must not be shared by threads.
+
+        Returns True for the outermost block.
+        """
+        self._context_depth += 1
+        if self._context_depth > 1:
+            return False
+        try:
+            if self.connection_mode != 'persistent' or not self._connection_is_open():
+                self._open_connection()
+            elif (self._idle_since is not None
+                  and time.monotonic() - self._idle_since >= self.health_check_interval
+                  and not self._check_connection()):
+                self._close_connection()
+                self._open_connection()
+        except BaseException:
+            self._context_depth -= 1
+            raise
+        return True
+
+    def _exit_context(self) -> bool:
+        """
+        Exits a `with adapter:` block. The outermost block closes the connection,
+        or releases it for the next block in persistent mode.
+
+        Returns True for the outermost block.
+        """
+        self._context_depth -= 1
+        if self._context_depth > 0:
+            return False
+        if self.connection_mode == 'persistent':
+            try:
+                self._release_connection()
+                self._idle_since = time.monotonic()
+            except Exception:
+                self._close_connection()
+        else:
+            self._close_connection()
+        return True
+
+    def _connection_is_open(self) -> bool:
+        """Whether the adapter holds a connection."""
+        return False
+
+    def _open_connection(self):
+        """Opens the adapter's connection."""
+        raise NotImplementedError
+
+    def _close_connection(self):
+        """Closes the adapter's connection."""
+        raise NotImplementedError
+
+    def _check_connection(self) -> bool:
+        """Whether the open connection still works; run before reusing an idle persistent connection."""
+        return True
+
+    def _release_connection(self):
+        """Ends the work of a block on a persistent connection, which stays open."""
+        pass
+
+    def close(self):
+        """Closes the connection a persistent adapter keeps open between blocks."""
+        if self._context_depth == 0 and self._connection_is_open():
+            self._close_connection()
+        self._idle_since = None
+
+    def _condition_values(self, value: Any) -> List[Any]:
+        """The values bound by the condition on `value`."""
+        raise NotImplementedError
+
+    def _conditions_values(self, conditions: Optional[Dict[str, Any]]) -> List[Any]:
+        return [item for value in (conditions or {}).values() for item in self._condition_values(value)]
+
+    def _cached_statement(self, key) -> Optional[str]:
+        """The cached SQL of the statement with `key`, if any."""
+        if self.statement_cache is None or key is None:
+            return None
+        return self.statement_cache.get(key)
+
+    def _store_statement(self, key, query: str):
+        if self.statement_cache is not None and key is not None:
+            self.statement_cache.put(key, query)
+
+    def _schema_catalog_key(self) -> Tuple[str, Optional[str]]:
+        """The DSN and schema the adapter's tables are cataloged under."""
+        raise NotImplementedError
+
+    def _table_schema_queries(self, tables: List[str]) -> List[Tuple[str, tuple]]:
+        """The column and constraint queries of `tables` (see rococo.data.schema_catalog.table_schemas_from_rows)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _table_names(tables: Iterable[Any]) -> List[str]:
+        """Table names, given as names or as model classes (named like the repositories name their tables)."""
+        # Imported here: rococo.repositories imports the adapters
+        from rococo.repositories.relation_loader import relation_table_name
+        return [table if isinstance(table, str) else relation_table_name(table) for table in tables]
+
+    def _cached_table_schema(self, table: str) -> Optional[TableSchema]:
+        dsn, schema = self._schema_catalog_key()
+        return self.schema_catalog.get(dsn, schema, table)
+
+    def _store_table_schemas(self, schemas: Dict[str, TableSchema]):
+        """Catalogs `schemas`, but those of tables not found, which may be created later."""
+        dsn, schema = self._schema_catalog_key()
+        for table, table_schema in schemas.items():
+            if table_schema.columns:
+                self.schema_catalog.put(dsn, schema, table, table_schema)
+
+    def _get_table_schema(self, table: str) -> TableSchema:
+        """
+        The schema of `table` from the catalog, read from the database on first use.
+
+        :raises ValueError: if the table has no columns (it does not exist)
+        """
+        table_schema = self._cached_table_schema(table)
+        if table_schema is None:
+            table_schema = self.load_table_schemas([table])[table]
+        return self._existing_table_schema(table, table_schema)
+
+    @staticmethod
+    def _existing_table_schema(table: str, table_schema: TableSchema) -> TableSchema:
+        if not table_schema.columns:
+            raise ValueError(f"Table '{table}' was not found in the database.")
+        return table_schema
+
+    def load_table_schemas(self, tables: Iterable[Any]) -> Dict[str, TableSchema]:
+        """
+        Reads the schemas of `tables` (names or model classes) into the schema
+        catalog with one query for the columns and one for the keys, e.g. at
+        startup. Run it within the adapter's context. Tables that are not found
+        have no columns and are not cataloged.
+        """
+        tables = self._table_names(tables)
+        if not tables:
+            return {}
+        column_rows, constraint_rows = [self.execute_query(query, values) or []
+                                        for query, values in self._table_schema_queries(tables)]
+        schemas = table_schemas_from_rows(tables, column_rows, constraint_rows)
+        self._store_table_schemas(schemas)
+        return schemas
+
+    def invalidate_table_schemas(self, tables: Optional[Iterable[Any]] = None):
+        """Drops the cataloged schemas of `tables`, or of all the adapter's tables, e.g. after a migration."""
+        if self.schema_catalog is None:
+            return
+        dsn, schema = self._schema_catalog_key()
+        # Also clears the statements built from the old columns
+        self.schema_catalog.invalidate(dsn, schema, self._table_names(tables) if tables is not None else None)
+
     @abstractmethod
     def run_transaction(self, operations_list: List[Any]):
         """Execute a list of queries / operations as a transaction."""
@@ -41,11 +228,34 @@ class DbAdapter(ABC):
         """Fetches multiple records from the specified table based on given conditions."""
         pass
 
+    def iter_many(self, table: str, conditions: Dict[str, Any] = None, sort: List[Tuple[str, str]] = None,
+                  batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the records matching the conditions in lists of up to `batch_size`
+        records, holding one batch in memory at a time.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming reads.")
+
+    def get_page(self, table: str, conditions: Dict[str, Any] = None, sort: List[Tuple[str, str]] = None,
+                 after: List[Any] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Fetches up to `limit` records ordered by `sort`, starting after the record whose
+        sort values are `after` (keyset pagination). The last sort key must be unique.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support keyset pagination.")
+
     @abstractmethod
     def get_count(self, table: str, conditions: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> int:
         """Returns record count from the specified table based on given conditions"""
         pass
 
+    def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """
+        Returns an estimate of the record count from the database's statistics, without
+        counting, or None if the database can't estimate it.
+        """
+        return None
+
     @abstractmethod
     def get_move_entity_to_audit_table_query(self, table, entity_id):
         """Returns query to move entity by entity_id to audit table."""
@@ -61,6 +271,21 @@ class DbAdapter(ABC):
         """Returns query to save a data record in the table."""
         pass
 
+    def get_update_query(self, table: str, data: Dict[str, Any]):
+        """
+        Returns query to update only the columns in `data` of the existing record
+        with `data['entity_id']`, or None if there is nothing to update.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support partial updates.")
+
+    def get_move_entities_to_audit_table_query(self, table: str, entity_ids: List[str]):
+        """Returns query to move the entities with the given entity_ids to the audit table."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch saves.")
+
+    def get_save_many_queries(self, table: str, data_list: List[Dict[str, Any]]) -> List[Any]:
+        """Returns queries saving all records of `data_list` in the table, a few rows per query."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch saves.")
+
     @abstractmethod
     def save(self, table: str, data: Dict[str, Any]) -> Union[Dict[str, Any], None]:
         """Saves or updates a record in the specified table."""
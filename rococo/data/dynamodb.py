@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 import os
 from pynamodb.models import Model
 from pynamodb.attributes import UnicodeAttribute, BooleanAttribute, NumberAttribute, JSONAttribute, UTCDateTimeAttribute, ListAttribute
@@ -126,6 +126,34 @@ class DynamoDbAdapter(DbAdapter):
         except Exception as e:
             raise RuntimeError(f"get_many failed: {e}")
 
+    def get_page(self, table: str, conditions: Dict[str, Any] = None, after: Dict[str, Any] = None, limit: int = 100, model_cls: Type[BaseModel] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Returns up to `limit` matching items and the key to resume from, None after the last item.
+        DynamoDB pages by key natively: `after` is the key returned with the previous page.
+        """
+        if model_cls is None:
+            raise ValueError("model_cls is required for DynamoDB get_page")
+
+        pynamo_model = self._generate_pynamo_model(table, model_cls)
+        try:
+            results = self._execute_query_or_scan(
+                pynamo_model, conditions, limit=limit, page_size=limit, last_evaluated_key=after)
+            items = [item.attribute_values for item in results]
+            return items, results.last_evaluated_key
+        except Exception as e:
+            raise RuntimeError(f"get_page failed: {e}")
+
+    def iter_many(self, table: str, conditions: Dict[str, Any] = None, sort: List[Tuple[str, str]] = None, batch_size: int = 1000, model_cls: Type[BaseModel] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yields the matching items page by page, resuming each query or scan from the last evaluated key."""
+        last_evaluated_key = None
+        while True:
+            batch, last_evaluated_key = self.get_page(
+                table, conditions, after=last_evaluated_key, limit=batch_size, model_cls=model_cls)
+            if batch:
+                yield batch
+            if last_evaluated_key is None:
+                break
+
     def get_count(self, table: str, conditions: Dict[str, Any], options: Optional[Dict[str, Any]] = None, model_cls: Type[BaseModel] = None) -> int:
         if model_cls is None:
             raise ValueError("model_cls is required for DynamoDB get_count")
@@ -156,6 +184,21 @@ class DynamoDbAdapter(DbAdapter):
         except Exception as e:
             raise RuntimeError(f"move_entity_to_audit_table failed: {e}")
 
+    def move_entities_to_audit_table(self, table_name: str, entity_ids: List[str], model_cls: Type[BaseModel] = None):
+        """Copies the current items of many entities to the audit table with batch reads and writes."""
+        if model_cls is None:
+            raise ValueError("model_cls is required for DynamoDB move_entities_to_audit_table")
+
+        pynamo_model = self._generate_pynamo_model(table_name, model_cls)
+        pynamo_audit_model = self._generate_pynamo_model(f"{table_name}_audit", model_cls, is_audit=True)
+
+        try:
+            with pynamo_audit_model.batch_write() as batch:
+                for item in pynamo_model.batch_get(entity_ids):
+                    batch.save(pynamo_audit_model(**item.attribute_values))
+        except Exception as e:
+            raise RuntimeError(f"move_entities_to_audit_table failed: {e}")
+
     def get_save_query(self, table: str, data: Dict[str, Any], model_cls: Type[BaseModel] = None):
         return lambda: self.save(table, data, model_cls)
 
@@ -168,6 +211,19 @@ class DynamoDbAdapter(DbAdapter):
         item.save()
         return item.attribute_values
 
+    def save_many(self, table: str, data_list: List[Dict[str, Any]], model_cls: Type[BaseModel] = None):
+        """Puts many items (inserting or replacing them) with batch writes."""
+        if model_cls is None:
+            raise ValueError("model_cls is required for DynamoDB save_many")
+
+        pynamo_model = self._generate_pynamo_model(table, model_cls)
+        try:
+            with pynamo_model.batch_write() as batch:
+                for data in data_list:
+                    batch.save(pynamo_model(**data))
+        except Exception as e:
+            raise RuntimeError(f"save_many failed: {e}")
+
     def upsert(self, table: str, data: Dict[str, Any], model_cls: Type[BaseModel] = None) -> Union[Dict[str, Any], None]:
         """
         Upsert (update or insert) an item in the specified DynamoDB table.
@@ -230,7 +286,8 @@ class DynamoDbAdapter(DbAdapter):
         except DoesNotExist:
             return False
 
-    def _execute_query_or_scan(self, model_cls: Type[Model], conditions: Dict[str, Any], limit: int = None, count_only: bool = False):
+    def _execute_query_or_scan(self, model_cls: Type[Model], conditions: Dict[str, Any], limit: int = None, count_only: bool = False,
+                               page_size: int = None, last_evaluated_key: Dict[str, Any] = None):
         """
         Helper to determine whether to use Query or Scan based on conditions.
         """
@@ -269,7 +326,8 @@ class DynamoDbAdapter(DbAdapter):
             if count_only:
                 return model_cls.count(hash_key_val, range_key_condition=range_key_condition, filter_condition=filter_condition)
             else:
-                return model_cls.query(hash_key_val, range_key_condition=range_key_condition, filter_condition=filter_condition, limit=limit)
+                return model_cls.query(hash_key_val, range_key_condition=range_key_condition, filter_condition=filter_condition, limit=limit,
+                                       page_size=page_size, last_evaluated_key=last_evaluated_key)
         else:
             # Scan path: Hash key is missing
             scan_condition = None
@@ -285,4 +343,4 @@ class DynamoDbAdapter(DbAdapter):
             if count_only:
                 return model_cls.count(filter_condition=scan_condition)
             else:
-                return model_cls.scan(scan_condition, limit=limit)
+                return model_cls.scan(scan_condition, limit=limit, page_size=page_size, last_evaluated_key=last_evaluated_key)
@@ -1,5 +1,5 @@
-from typing import Any, Dict, List, Optional, Tuple, Union
-from pymongo import MongoClient, ReturnDocument, errors
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from pymongo import MongoClient, ReplaceOne, ReturnDocument, errors
 from pymongo.database import Database
 from pymongo.collection import Collection
 from pymongo.client_session import ClientSession
@@ -23,8 +23,15 @@ class MongoDBAdapter(DbAdapter):
         self,
         mongo_uri: str,
         mongo_database: str,
+        connection_mode: str = 'per_call',
+        health_check_interval: float = 30.0,
         **client_options: Any
     ):
+        """
+        :param connection_mode: 'per_call' to ping the server on each outermost `with adapter:` block,
+            'persistent' to ping it only after the adapter sat idle for `health_check_interval` seconds
+        :param client_options: MongoClient options overriding the defaults
+        """
         # Default client options for robustness
         options = {
             'retryWrites': True,
@@ -39,6 +46,7 @@ class MongoDBAdapter(DbAdapter):
         self.db_name: str = mongo_database
         self.db: Database = None
         self._session: Optional[ClientSession] = None
+        self._set_connection_lifecycle(connection_mode, health_check_interval)
 
     def __enter__(self) -> 'MongoDBAdapter':
         """
@@ -49,32 +57,55 @@ class MongoDBAdapter(DbAdapter):
         causal-consistency session for transactions. If the ping command fails,
         a ConnectionError is raised.
 
+        Nested blocks reuse the session of the outermost one. In persistent mode
+        the ping only runs on the first block and after idle periods
+        (see DbAdapter._enter_context).
+
         Returns:
             MongoDBAdapter: The initialized adapter with a live connection.
         """
-        try:
-            self.client.admin.command('ping')
-        except errors.PyMongoError as e:
-            raise ConnectionError(f"MongoDB ping failed: {e}") from e
-
-        self.db = self.client.get_database(self.db_name)
-        # Start a causal-consistency session for transactions
-        self._session = self.client.start_session(causal_consistency=True)
+        if self._enter_context():
+            # Start a causal-consistency session for transactions
+            self._session = self.client.start_session(causal_consistency=True)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         """
-        Clean up the session and close the MongoClient on __exit__.
+        Clean up the session on __exit__ of the outermost block.
 
         If any exceptions occurred during the context, they are propagated.
         """
-        if self._session:
-            self._session.end_session()
-            self._session = None
+        self._exit_context()
         # self.client.close()
         # Keep MongoClient open; application teardown will close it
         # The MongoClient is thread‐safe and intended to be long‐lived; you shouldn’t open & close it per operation.
 
+    def _connection_is_open(self):
+        return self.db is not None
+
+    def _open_connection(self):
+        try:
+            self.client.admin.command('ping')
+        except errors.PyMongoError as e:
+            raise ConnectionError(f"MongoDB ping failed: {e}") from e
+        self.db = self.client.get_database(self.db_name)
+
+    def _close_connection(self):
+        self._release_connection()
+        self.db = None
+
+    def _check_connection(self):
+        try:
+            self.client.admin.command('ping')
+            return True
+        except errors.PyMongoError:
+            return False
+
+    def _release_connection(self):
+        if self._session:
+            self._session.end_session()
+            self._session = None
+
     def _get_collection(self, name: str, write: bool = False) -> Collection:
         """
         Get a MongoDB collection with specified read and write concerns.
@@ -155,7 +186,8 @@ class MongoDBAdapter(DbAdapter):
         table: str,
         conditions: Dict[str, Any],
         hint: Optional[str] = None,
-        sort: Optional[List[Tuple[str, int]]] = None
+        sort: Optional[List[Tuple[str, int]]] = None,
+        projection: Optional[Dict[str, int]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Retrieve a single document from the specified MongoDB collection based on given conditions.
@@ -169,6 +201,7 @@ class MongoDBAdapter(DbAdapter):
             conditions (Dict[str, Any]): A dictionary specifying the conditions to filter the documents.
             hint (Optional[str]): An optional index hint to optimize the query.
             sort (Optional[List[Tuple[str, int]]]): An optional list of tuples specifying the sort order.
+            projection (Optional[Dict[str, int]]): An optional projection, e.g. to leave out deferred fields.
 
         Returns:
             Optional[Dict[str, Any]]: The document that matches the conditions, or None if no document is found.
@@ -183,6 +216,8 @@ class MongoDBAdapter(DbAdapter):
                 kwargs['hint'] = hint
             if sort is not None:
                 kwargs['sort'] = sort
+            if projection is not None:
+                kwargs['projection'] = projection
             return coll.find_one(conditions, **kwargs)
         except errors.PyMongoError as e:
             raise RuntimeError(f"get_one failed: {e}") from e
@@ -195,6 +230,7 @@ class MongoDBAdapter(DbAdapter):
         sort: Optional[List[Tuple[str, int]]] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        projection: Optional[Dict[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Retrieve multiple documents from the specified MongoDB collection based on given conditions.
@@ -210,6 +246,7 @@ class MongoDBAdapter(DbAdapter):
             sort (Optional[List[Tuple[str, int]]]): An optional list of tuples specifying the sort order.
             limit (Optional[int]): The maximum number of documents to return. If None, no limit is applied.
             offset (Optional[int]): The number of documents to skip before returning results. If None, no offset is applied.
+            projection (Optional[Dict[str, int]]): An optional projection, e.g. to leave out deferred fields.
 
         Returns:
             List[Dict[str, Any]]: The list of documents that match the conditions.
@@ -219,8 +256,12 @@ class MongoDBAdapter(DbAdapter):
         """
         try:
             coll = self._get_collection(table)
-            cursor = coll.find(conditions or {}, **
-                               ({'hint': hint} if hint else {}))
+            kwargs: Dict[str, Any] = {}
+            if hint:
+                kwargs['hint'] = hint
+            if projection is not None:
+                kwargs['projection'] = projection
+            cursor = coll.find(conditions or {}, **kwargs)
             if sort:
                 cursor = cursor.sort(sort)
             if offset is not None and offset > 0:
@@ -231,6 +272,91 @@ class MongoDBAdapter(DbAdapter):
         except errors.PyMongoError as e:
             raise RuntimeError(f"get_many failed: {e}") from e
 
+    def _build_seek_condition(self, keys: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+        """Return the filter selecting the documents after `values` in the order of `keys`."""
+        clauses = []
+        for i, (field_name, direction) in enumerate(keys):
+            clause = {keys[j][0]: values[j] for j in range(i)}
+            clause[field_name] = {'$lt' if direction == -1 else '$gt': values[i]}
+            clauses.append(clause)
+        return {'$or': clauses} if len(clauses) > 1 else clauses[0]
+
+    def get_page(
+        self,
+        table: str,
+        conditions: Optional[Dict[str, Any]] = None,
+        hint: Optional[str] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        after: Optional[List[Any]] = None,
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve up to `limit` documents ordered by `sort`, starting after the document whose
+        sort values are `after` (keyset pagination, without `skip`).
+
+        Args:
+            table (str): The name of the collection from which to fetch the documents.
+            conditions (Optional[Dict[str, Any]]): An optional dictionary specifying the conditions to filter the documents.
+            hint (Optional[str]): An optional index hint to optimize the query.
+            sort (Optional[List[Tuple[str, int]]]): The sort order; its last field must be unique.
+            after (Optional[List[Any]]): The sort values of the last document of the previous page.
+            limit (int): The maximum number of documents to return.
+            projection (Optional[Dict[str, int]]): An optional projection, e.g. to leave out deferred fields.
+
+        Returns:
+            List[Dict[str, Any]]: The documents of the page.
+
+        Raises:
+            RuntimeError: If the query fails due to a PyMongoError.
+        """
+        if after is not None:
+            seek = self._build_seek_condition(sort, after)
+            conditions = {'$and': [conditions, seek]} if conditions else seek
+        return self.get_many(table, conditions, hint=hint, sort=sort, limit=limit, projection=projection)
+
+    def iter_many(
+        self,
+        table: str,
+        conditions: Optional[Dict[str, Any]] = None,
+        hint: Optional[str] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        batch_size: int = 1000,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the documents `get_many` would return in lists of up to `batch_size` documents.
+
+        The cursor fetches `batch_size` documents per round trip, so only one batch is held
+        in memory. The cursor is closed when the iteration ends or is abandoned.
+
+        Raises:
+            RuntimeError: If the query fails due to a PyMongoError.
+        """
+        try:
+            coll = self._get_collection(table)
+            kwargs: Dict[str, Any] = {'batch_size': batch_size}
+            if hint:
+                kwargs['hint'] = hint
+            if projection is not None:
+                kwargs['projection'] = projection
+            cursor = coll.find(conditions or {}, **kwargs)
+            if sort:
+                cursor = cursor.sort(sort)
+            try:
+                batch = []
+                for doc in cursor:
+                    batch.append(doc)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            finally:
+                cursor.close()
+        except errors.PyMongoError as e:
+            raise RuntimeError(f"iter_many failed: {e}") from e
+
     def get_count(
         self,
         table: str,
@@ -263,6 +389,27 @@ class MongoDBAdapter(DbAdapter):
         except errors.PyMongoError as e:
             raise RuntimeError(f"get_count failed: {e}") from e
 
+    def get_count_estimate(
+        self,
+        table: str,
+        conditions: Dict[str, Any]
+    ) -> Optional[int]:
+        """
+        Estimate the count of documents in the collection from its metadata.
+
+        `estimated_document_count` can't filter, so only the whole collection is
+        estimated; None is returned when there are conditions.
+
+        Raises:
+            RuntimeError: If the query fails due to a PyMongoError.
+        """
+        if conditions:
+            return None
+        try:
+            return self._get_collection(table).estimated_document_count()
+        except errors.PyMongoError as e:
+            raise RuntimeError(f"get_count_estimate failed: {e}") from e
+
     def move_entity_to_audit_table(
         self,
         table: str,
@@ -420,6 +567,87 @@ class MongoDBAdapter(DbAdapter):
         except errors.PyMongoError as e:
             raise RuntimeError(f"save failed: {e}") from e
 
+    def upsert_many(
+        self,
+        table: str,
+        documents: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Upsert many documents by entity_id with a single bulk write.
+
+        Args:
+            table (str): The name of the MongoDB collection.
+            documents (List[Dict[str, Any]]): The documents (each must include 'entity_id').
+
+        Raises:
+            RuntimeError: If any MongoDB operation fails.
+        """
+        try:
+            coll = self._get_collection(table, write=True)
+            requests = []
+            for data in documents:
+                doc = data.copy()
+                doc.pop('_id', None)
+                requests.append(ReplaceOne({"entity_id": data['entity_id']}, doc, upsert=True))
+            if requests:
+                coll.bulk_write(requests, ordered=False, session=self._session)
+        except errors.PyMongoError as e:
+            raise RuntimeError(f"upsert_many failed: {e}") from e
+
+    def save_many(
+        self,
+        table: str,
+        documents: List[Dict[str, Any]],
+        move_to_audit: bool = False
+    ) -> None:
+        """
+        Save (versioned) many documents, as `save` does for one, with a few bulk operations:
+        the current latest versions are fetched with one query, optionally copied to the
+        audit collection, marked as not latest, and the new versions are inserted together.
+
+        Args:
+            table (str): The name of the MongoDB collection.
+            documents (List[Dict[str, Any]]): The new versions (each must include 'entity_id').
+            move_to_audit (bool): Whether to copy the previous latest versions to the audit collection.
+
+        Raises:
+            RuntimeError: If any MongoDB operation fails.
+        """
+        if not documents:
+            return
+
+        try:
+            coll = self._get_collection(table, write=True)
+            entity_ids = [data['entity_id'] for data in documents]
+            prev_latest = list(coll.find(
+                {"entity_id": {"$in": entity_ids}, "latest": True},
+                session=self._session
+            ))
+
+            if prev_latest:
+                if move_to_audit:
+                    audit = self._get_collection(f"{table}_audit", write=True)
+                    audit.bulk_write(
+                        [ReplaceOne({'_id': doc['_id']}, doc, upsert=True) for doc in prev_latest],
+                        ordered=False,
+                        session=self._session
+                    )
+                coll.update_many(
+                    {"_id": {"$in": [doc['_id'] for doc in prev_latest]}},
+                    {"$set": {"latest": False}},
+                    session=self._session
+                )
+
+            new_docs = []
+            for data in documents:
+                doc = data.copy()
+                doc.pop('_id', None)
+                doc["latest"] = True
+                new_docs.append(doc)
+            coll.insert_many(new_docs, session=self._session)
+        except errors.PyMongoError as e:
+            raise RuntimeError(f"save_many failed: {e}") from e
+
     def delete(
         self,
         table: str,
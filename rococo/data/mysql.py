@@ -2,14 +2,48 @@ import time
 import pymysql
 import logging
 from uuid import UUID
-from typing import Any, Dict, List, Tuple, Union, Optional, Callable
+from typing import Any, Dict, Iterator, List, Tuple, Union, Optional, Callable
 from rococo.data.base import DbAdapter
+from rococo.data.schema_catalog import SchemaCatalog, schema_catalog as default_schema_catalog
+from rococo.data.statement_cache import statement_key
 
 
 class MySqlAdapter(DbAdapter):
     """MySQL adapter for interacting with MySQL."""
 
-    def __init__(self, host: str, port: int, user: str, password: str, database: str, connection_resolver: Optional[Callable] = None, connection_closer: Optional[Callable] = None):
+    supports_partial_updates = True
+    supports_batch_save = True
+    # Columns and keys of tables, for the schema catalog (see rococo.data.schema_catalog)
+    TABLE_COLUMNS_QUERY = """
+        SELECT table_name AS table_name, column_name AS column_name, data_type AS data_type
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name IN ({tables})
+        ORDER BY table_name, ordinal_position
+    """
+    TABLE_CONSTRAINTS_QUERY = """
+        SELECT tc.table_name AS table_name, tc.constraint_name AS constraint_name,
+               tc.constraint_type AS constraint_type, kcu.column_name AS column_name
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu
+          ON kcu.constraint_name = tc.constraint_name
+         AND kcu.table_schema = tc.table_schema
+         AND kcu.table_name = tc.table_name
+        WHERE tc.table_schema = DATABASE() AND tc.table_name IN ({tables})
+          AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+        ORDER BY tc.table_name, tc.constraint_type, tc.constraint_name, kcu.ordinal_position
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str, connection_resolver: Optional[Callable] = None, connection_closer: Optional[Callable] = None,
+                 connection_mode: str = 'per_call', health_check_interval: float = 30.0,
+                 statement_cache_size: int = 512, schema_catalog: Optional[SchemaCatalog] = None):
+        """
+        :param connection_mode: 'per_call' to connect for each outermost `with adapter:` block,
+            'persistent' to keep the connection open between blocks
+        :param health_check_interval: seconds a persistent connection may sit idle before it is checked on reuse
+        :param statement_cache_size: generated SQL statements kept for reuse by the adapters of the database
+            (see rococo.data.statement_cache); 0 to build every statement
+        :param schema_catalog: catalog of the discovered table schemas, the one of the process by default
+        """
         self._host = host
         self._port = port
         self._user = user
@@ -18,6 +52,10 @@ class MySqlAdapter(DbAdapter):
         self._cursor_class = pymysql.cursors.DictCursor
         self._connection = None
         self._cursor = None
+        self.schema_catalog = default_schema_catalog if schema_catalog is None else schema_catalog
+        # Shared with the other adapters of the database, like the table schemas
+        self.statement_cache = (self.schema_catalog.statement_cache(*self._schema_catalog_key(), statement_cache_size)
+                                if statement_cache_size else None)
 
         if connection_resolver is None:
             self._connection_resolver = pymysql.connect
@@ -25,31 +63,57 @@ class MySqlAdapter(DbAdapter):
             self._connection_resolver = connection_resolver
 
         self._connection_closer = connection_closer
+        self._set_connection_lifecycle(connection_mode, health_check_interval)
 
     def __enter__(self):
-        """Context manager entry point for creating DB connection."""
-        self._connection = self.connect
-        self._cursor = self._connection.cursor()
-
+        """Context manager entry point for creating DB connection (see DbAdapter._enter_context)."""
+        self._enter_context()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Context manager exit point for closing DB connection."""
+        self._exit_context()
+
+    def _connection_is_open(self):
+        return self._connection is not None
+
+    def _open_connection(self):
+        self._connection = self.connect
+        self._cursor = self._connection.cursor()
+
+    def _close_connection(self):
         self.close_connection()
 
+    def _check_connection(self):
+        try:
+            self._cursor.execute("SELECT 1")
+            self._cursor.fetchall()
+            self._connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _release_connection(self):
+        # End the read transaction, so the next block does not see a stale snapshot
+        self._connection.rollback()
+
     def close_connection(self):
         """Closes the connection and cursor."""
 
         if self._connection_closer:
             self._connection_closer(self)
         else:
-            if self._cursor is not None:
-                self._cursor.close()
-                self._cursor = None
-
-            if self._connection is not None:
-                self._connection.close()
-                self._connection = None
+            connection = self._detach_connection()
+            if connection is not None:
+                connection.close()
+
+    def _detach_connection(self):
+        """Closes the cursor and hands over the connection, which the adapter no longer holds."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        connection, self._connection = self._connection, None
+        return connection
 
     @property
     def connect(self):
@@ -89,10 +153,28 @@ class MySqlAdapter(DbAdapter):
             raise Exception(
                 f"Unsupported type {type(value)} for condition key: {key}, value: {value}")
 
+    def _condition_values(self, value):
+        """The values bound by the condition on `value` (see _build_condition_string)."""
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, bool):
+            return [1 if value else 0]
+        if isinstance(value, UUID):
+            return [str(value)]
+        if value is None:
+            return []
+        return [value]
+
     def get_move_entity_to_audit_table_query(self, table, entity_id):
         """Returns the query to move an entity to audit table."""
         return f"""INSERT INTO {table}_audit (SELECT * FROM {table} WHERE entity_id=%s)""", (str(entity_id).replace('-', ''),)
 
+    def get_move_entities_to_audit_table_query(self, table, entity_ids):
+        """Returns the query to move many entities to audit table."""
+        placeholders = ', '.join(['%s'] * len(entity_ids))
+        return (f"INSERT INTO {table}_audit (SELECT * FROM {table} WHERE entity_id IN ({placeholders}))",
+                tuple(str(entity_id).replace('-', '') for entity_id in entity_ids))
+
     def move_entity_to_audit_table(self, table, entity_id):
         """Executes the query to move an entity to audit table."""
         query, values = self.get_move_entity_to_audit_table_query(
@@ -131,6 +213,30 @@ class MySqlAdapter(DbAdapter):
 
         return response
 
+    def _schema_catalog_key(self) -> Tuple[str, Optional[str]]:
+        return f"mysql://{self._user}@{self._host}:{self._port}/{self._database}", self._database
+
+    def _table_schema_queries(self, tables: List[str]) -> List[Tuple[str, tuple]]:
+        placeholders = ', '.join(['%s'] * len(tables))
+        return [(self.TABLE_COLUMNS_QUERY.format(tables=placeholders), tuple(tables)),
+                (self.TABLE_CONSTRAINTS_QUERY.format(tables=placeholders), tuple(tables))]
+
+    def _get_table_columns(self, table_name: str) -> List[str]:
+        """
+        Get the list of column names for a table from the database schema.
+        Results are cached for the process in the schema catalog.
+        """
+        return list(self._get_table_schema(table_name).columns)
+
+    def _select_fields(self, table: str, columns: list = None, exclude_columns: list = None) -> List[str]:
+        """Returns the selected columns: `columns`, or all columns of `table` but `exclude_columns`."""
+        if columns:
+            return [f'{table}.`{column}`' for column in columns]
+        if exclude_columns:
+            return [f'{table}.`{column}`' for column in self._get_table_columns(table)
+                    if column not in exclude_columns]
+        return [f'{table}.*']
+
     def get_one(
             self,
             table: str,
@@ -138,35 +244,15 @@ class MySqlAdapter(DbAdapter):
             sort: List[Tuple[str, str]] = None,
             join_statements: list = None,
             additional_fields: list = None,
-            is_versioned: bool = True
+            is_versioned: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
     ) -> Optional[Dict[str, Any]]:
-        fields = [f'{table}.*']
-        if additional_fields:
-            fields += additional_fields
-
-        query = f"SELECT {', '.join(fields)} FROM {table}"
-        if join_statements:
-            for join_stmt in join_statements:
-                query += f"""\n{join_stmt}\n"""
-
-        condition_strs_values = []
-        if conditions:
-            condition_strs_values = [self._build_condition_string(
-                table, k, v) for k, v in conditions.items()]
-        if is_versioned:
-            condition_strs_values.append((f"{table}.active = %s", [1]))
-        if condition_strs_values:
-            query += f" WHERE {' AND '.join([condition_str for condition_str, condition_value in condition_strs_values])}"
-
-        if sort:
-            sort_strs = [f"{column} {direction}" for column, direction in sort]
-            query += f" ORDER BY {', '.join(sort_strs)}"
-        query += " LIMIT 1"
-
-        values = sum((condition_value for condition_str,
-                     condition_value in condition_strs_values), [])
+        query, values = self._build_select_query(
+            table, conditions, sort, 1, None, is_versioned, join_statements,
+            additional_fields, columns, exclude_columns)
         db_response = self.parse_db_response(
-            self.execute_query(query, tuple(values)))
+            self.execute_query(query, values))
 
         if not db_response:
             return None
@@ -175,7 +261,7 @@ class MySqlAdapter(DbAdapter):
         else:
             return db_response
 
-    def get_many(
+    def _build_select_query(
             self,
             table: str,
             conditions: Dict[str, Any] = None,
@@ -184,40 +270,78 @@ class MySqlAdapter(DbAdapter):
             offset: int = None,
             active: bool = True,
             join_statements: list = None,
-            additional_fields: list = None
-    ) -> List[Dict[str, Any]]:
-
-        fields = [f'{table}.*']
-        if additional_fields:
-            fields += additional_fields
-
-        query = f"SELECT {', '.join(fields)} FROM {table}"
-        if join_statements:
-            for join_stmt in join_statements:
-                query += f"""\n{join_stmt}\n"""
-
-        condition_strs_values = []
-        if conditions:
-            condition_strs_values = [self._build_condition_string(
-                table, k, v) for k, v in conditions.items()]
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None,
+            seek: Tuple[str, list] = None
+    ) -> Tuple[str, tuple]:
+        """
+        Returns the SELECT query of `get_many()` and its values, with an optional seek condition.
+        The SQL text is reused for queries of the same shape (see rococo.data.statement_cache).
+        """
+        key = statement_key(
+            'select', table, conditions, sort, limit is not None, offset is not None, active,
+            join_statements, additional_fields, columns, exclude_columns, seek[0] if seek else None)
+        query = self._cached_statement(key)
+        if query is None:
+            fields = self._select_fields(table, columns, exclude_columns)
+            if additional_fields:
+                fields += additional_fields
+
+            query = f"SELECT {', '.join(fields)} FROM {table}"
+            if join_statements:
+                for join_stmt in join_statements:
+                    query += f"""\n{join_stmt}\n"""
+
+            condition_strs = []
+            if conditions:
+                condition_strs = [self._build_condition_string(table, k, v)[0] for k, v in conditions.items()]
+            if active:
+                condition_strs.append(f"{table}.active = %s")
+            if seek:
+                condition_strs.append(seek[0])
+            if condition_strs:
+                query += f" WHERE {' AND '.join(condition_strs)}"
+
+            if sort:
+                sort_strs = [f"{column} {direction}" for column, direction in sort]
+                query += f" ORDER BY {', '.join(sort_strs)}"
+            if limit is not None:
+                query += " LIMIT %s"
+            if offset is not None:
+                query += " OFFSET %s"
+            self._store_statement(key, query)
+
+        values = self._conditions_values(conditions)
         if active:
-            condition_strs_values.append((f"{table}.active = %s", [1]))
-
-        if condition_strs_values:
-            query += f" WHERE {' AND '.join([condition_str for condition_str, condition_value in condition_strs_values])}"
-
-        if sort:
-            sort_strs = [f"{column} {direction}" for column, direction in sort]
-            query += f" ORDER BY {', '.join(sort_strs)}"
+            values.append(1)
+        if seek:
+            values.extend(seek[1])
         if limit is not None:
-            query += f" LIMIT {int(limit)}"
+            values.append(int(limit))
         if offset is not None:
-            query += f" OFFSET {int(offset)}"
+            values.append(int(offset))
+        return query, tuple(values)
+
+    def get_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            limit: int = None,
+            offset: int = None,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
 
-        values = sum((condition_value for condition_str,
-                     condition_value in condition_strs_values), [])
+        query, values = self._build_select_query(
+            table, conditions, sort, limit, offset, active, join_statements,
+            additional_fields, columns, exclude_columns)
         db_response = self.parse_db_response(
-            self.execute_query(query, tuple(values)))
+            self.execute_query(query, values))
         if not db_response:
             return []
         elif isinstance(db_response, dict):
@@ -225,6 +349,87 @@ class MySqlAdapter(DbAdapter):
         else:
             return db_response
 
+    def _build_seek_condition(self, table: str, keys: List[Tuple[str, str]], values: List[Any]) -> Tuple[str, list]:
+        """
+        Returns the condition selecting the rows after `values` in the order of `keys`.
+        Keys sorted in one direction compare as a row value, which can use a composite index.
+        """
+        columns = [column if '.' in column else f"{table}.{column}" for column, _ in keys]
+        operators = ['<' if direction.upper() == 'DESC' else '>' for _, direction in keys]
+        if len(columns) == 1:
+            return f"{columns[0]} {operators[0]} %s", list(values)
+        if len(set(operators)) == 1:
+            placeholders = ', '.join(['%s'] * len(columns))
+            return f"({', '.join(columns)}) {operators[0]} ({placeholders})", list(values)
+
+        clauses = []
+        clause_values = []
+        for i, column in enumerate(columns):
+            parts = [f"{columns[j]} = %s" for j in range(i)] + [f"{column} {operators[i]} %s"]
+            clauses.append(f"({' AND '.join(parts)})")
+            clause_values += list(values[:i + 1])
+        return f"({' OR '.join(clauses)})", clause_values
+
+    def get_page(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            after: List[Any] = None,
+            limit: int = 100,
+            active: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` rows ordered by `sort`, starting after the row whose sort
+        values are `after`. The last sort key must be unique (the repository adds entity_id).
+        """
+        seek = self._build_seek_condition(table, sort, after) if after is not None else None
+        query, values = self._build_select_query(
+            table, conditions, sort, limit, None, active, columns=columns,
+            exclude_columns=exclude_columns, seek=seek)
+        db_response = self.parse_db_response(self.execute_query(query, values))
+        if not db_response:
+            return []
+        if isinstance(db_response, dict):
+            db_response = [db_response]
+        return db_response
+
+    def iter_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            batch_size: int = 1000,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the rows `get_many()` would return in lists of up to `batch_size` rows.
+        The rows are read with an unbuffered (server-side) cursor, so only one batch is
+        held in memory. No other query can run on the connection until the iteration ends.
+        """
+        if not self._connection:
+            raise Exception("No connection is available.")
+        query, values = self._build_select_query(
+            table, conditions, sort, None, None, active, join_statements,
+            additional_fields, columns, exclude_columns)
+
+        cursor = self._connection.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            cursor.execute(query, values)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield list(rows)
+        finally:
+            cursor.close()
+
     def get_count(
         self,
         table: str,
@@ -235,19 +440,14 @@ class MySqlAdapter(DbAdapter):
         Count rows in `table` matching `conditions`.
         The 'options' parameter is included for interface compatibility.
         """
-        safe_table_name = f"`{table}`"
-        cond_clauses: List[str] = []
-        params: List[Any] = []
-
-        if conditions:
-            for key, val in conditions.items():
-                clause, vals_list = self._build_condition_string(
-                    table, key, val)
-                cond_clauses.append(clause)
-                params.extend(vals_list)
-
-        where_clause = f"WHERE {' AND '.join(cond_clauses)}" if cond_clauses else ""
-        sql = f"SELECT COUNT(*) AS `count` FROM {safe_table_name} {where_clause}"
+        key = statement_key('count', table, conditions)
+        sql = self._cached_statement(key)
+        if sql is None:
+            safe_table_name = f"`{table}`"
+            where_clause, _ = self._build_count_where(table, conditions)
+            sql = f"SELECT COUNT(*) AS `count` FROM {safe_table_name} {where_clause}"
+            self._store_statement(key, sql)
+        params = self._conditions_values(conditions)
 
         if options and 'hint' in options:
             self.logger.info(
@@ -259,16 +459,75 @@ class MySqlAdapter(DbAdapter):
             return int(rows[0].get('count', 0))
         return 0
 
+    def _build_count_where(self, table: str, conditions: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        cond_clauses: List[str] = []
+        params: List[Any] = []
+        if conditions:
+            for key, val in conditions.items():
+                clause, vals_list = self._build_condition_string(
+                    table, key, val)
+                cond_clauses.append(clause)
+                params.extend(vals_list)
+        where_clause = f"WHERE {' AND '.join(cond_clauses)}" if cond_clauses else ""
+        return where_clause, params
+
+    def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """
+        Estimate the rows in `table` matching `conditions` from table statistics:
+        information_schema.TABLES for the whole table, the EXPLAIN row estimate otherwise.
+        """
+        if not conditions:
+            rows = self.execute_query(
+                "SELECT TABLE_ROWS AS `estimate` FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+            estimate = rows[0].get('estimate') if rows else None
+            return int(estimate) if estimate is not None else None
+
+        where_clause, params = self._build_count_where(table, conditions)
+        rows = self.execute_query(f"EXPLAIN SELECT 1 FROM `{table}` {where_clause}", tuple(params))
+        if not rows or rows[0].get('rows') is None:
+            return None
+        # Rows examined, times the estimated percentage of them the conditions keep
+        return int(rows[0]['rows'] * float(rows[0].get('filtered') or 100) / 100)
+
     def get_save_query(self, table_name, data):
         """Returns a query to save an entity in database."""
-        columns = ', '.join([f'`{col}`' for col in data.keys()])
-        placeholders = ', '.join(['%s'] * len(data))
+        key = ('save', table_name, tuple(data))
+        query = self._cached_statement(key)
+        if query is None:
+            columns = ', '.join([f'`{col}`' for col in data.keys()])
+            placeholders = ', '.join(['%s'] * len(data))
+            query = f"REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
+            self._store_statement(key, query)
 
         values = tuple(data.values())
-        query = f"REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
-
         return query, values
 
+    def get_save_many_queries(self, table_name, data_list):
+        """Returns multi-row queries saving the entities of `data_list`, one query per set of columns."""
+        rows_by_columns = {}
+        for data in data_list:
+            rows_by_columns.setdefault(tuple(data), []).append(data)
+
+        queries = []
+        for columns, rows in rows_by_columns.items():
+            column_list = ', '.join([f'`{col}`' for col in columns])
+            row_placeholders = f"({', '.join(['%s'] * len(columns))})"
+            values = tuple(value for row in rows for value in row.values())
+            query = f"REPLACE INTO {table_name} ({column_list}) VALUES {', '.join([row_placeholders] * len(rows))}"
+            queries.append((query, values))
+        return queries
+
+    def get_update_query(self, table_name, data):
+        """Returns a query to update the given columns of the entity with data['entity_id']."""
+        columns = {key: value for key, value in data.items() if key != 'entity_id'}
+        if not columns:
+            return None
+
+        assignments = ', '.join([f'`{col}` = %s' for col in columns.keys()])
+        query = f"UPDATE {table_name} SET {assignments} WHERE `entity_id` = %s"
+        return query, tuple(columns.values()) + (data['entity_id'],)
+
     def _create_in_database(self, table_name, data, retry_count=0):
         try:
             query, values = self.get_save_query(table_name, data)
@@ -0,0 +1,293 @@
+"""
+Thread-safe connection pool for the adapters.
+
+A pool hands connections to adapters through their `connection_resolver` and
+`connection_closer` hooks:
+
+    pool = ConnectionPool(psycopg2.connect, max_size=10)
+    adapter = PostgreSQLAdapter(host, port, user, password, database,
+                                connection_resolver=pool.connection_resolver,
+                                connection_closer=pool.connection_closer)
+
+Connections are created by `creator`, called with the arguments the adapter
+passes to its resolver, so one pool serves one database.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+class PoolTimeoutError(TimeoutError):
+    """No connection was returned to a full pool within the checkout timeout."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Counts of a `ConnectionPool`."""
+    # Open connections, idle or checked out
+    size: int
+    idle: int
+    checked_out: int
+    # Threads waiting for a connection
+    waiting: int
+    # Connections opened since the pool was created
+    created: int
+    # Connections closed for their age, idleness or a failed ping or reset
+    recycled: int
+
+
+def ping_connection(connection: Any):
+    """Runs a trivial query on a DB-API or SurrealDB connection; raises if the connection is broken."""
+    if hasattr(connection, 'cursor'):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        connection.rollback()
+    else:
+        connection.query("RETURN 1")
+
+
+def reset_connection(connection: Any):
+    """Rolls back the open transaction of a connection returned to the pool."""
+    if hasattr(connection, 'rollback'):
+        connection.rollback()
+
+
+def close_connection(connection: Any):
+    connection.close()
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'returned_at')
+
+    def __init__(self, connection: Any, created_at: float):
+        self.connection = connection
+        self.created_at = created_at
+        self.returned_at = created_at
+
+
+class ConnectionPool:
+    """
+    Pool of database connections, safe to share between threads.
+
+    Idle connections are reused most recently returned first. Connections idle for
+    `idle_timeout` seconds are closed, down to `min_size`, and connections older than
+    `max_lifetime` seconds are closed instead of being reused. With `pre_ping`, idle
+    connections are checked with a trivial query when checked out, and replaced if
+    the check fails.
+    """
+
+    def __init__(
+        self,
+        creator: Callable[..., Any],
+        min_size: int = 0,
+        max_size: Optional[int] = 10,
+        idle_timeout: Optional[float] = 300.0,
+        max_lifetime: Optional[float] = 3600.0,
+        pre_ping: bool = True,
+        checkout_timeout: Optional[float] = 30.0,
+        ping: Callable[[Any], None] = ping_connection,
+        reset: Callable[[Any], None] = reset_connection,
+        close: Callable[[Any], None] = close_connection,
+    ):
+        """
+        :param creator: opens a connection, called with the connection arguments of the adapter
+        :param min_size: connections kept open when idle
+        :param max_size: most connections open at once, checkouts beyond it wait; None for no limit
+        :param idle_timeout: seconds after which an idle connection is closed; None to keep them
+        :param max_lifetime: seconds after which a connection is closed when returned or checked out; None to keep them
+        :param pre_ping: check idle connections with `ping` when checking them out
+        :param checkout_timeout: seconds to wait for a connection of a full pool; None to wait indefinitely
+        :param ping: raises if a connection is broken
+        :param reset: prepares a returned connection for reuse; the connection is closed if it raises
+        :param close: closes a connection
+        """
+        if min_size < 0 or (max_size is not None and (max_size < 1 or min_size > max_size)):
+            raise ValueError("ConnectionPool needs 0 <= min_size <= max_size and max_size >= 1")
+        self.creator = creator
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.checkout_timeout = checkout_timeout
+        self._ping = ping
+        self._reset = reset
+        self._close = close
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._checked_out = {}
+        self._size = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+        self._closed = False
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.max_lifetime is not None and now - entry.created_at >= self.max_lifetime
+
+    def _take_stale_locked(self, now: float) -> list:
+        """Removes the idle entries to close; the caller closes them outside the lock."""
+        stale = []
+        for entry in list(self._idle):
+            idle_expired = (self.idle_timeout is not None and now - entry.returned_at >= self.idle_timeout
+                            and self._size - len(stale) > self.min_size)
+            if idle_expired or self._expired(entry, now):
+                self._idle.remove(entry)
+                stale.append(entry)
+        self._size -= len(stale)
+        self._recycled += len(stale)
+        if stale:
+            self._condition.notify(len(stale))
+        return stale
+
+    def _discard(self, entry: _Entry, recycled: bool = True):
+        """Closes the connection of an entry that left the pool."""
+        with self._condition:
+            self._size -= 1
+            if recycled:
+                self._recycled += 1
+            self._condition.notify()
+        self._close_quietly(entry.connection)
+
+    def _close_quietly(self, connection: Any):
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+
+    def _create(self, **connect_kwargs) -> _Entry:
+        """Opens a connection for a slot already counted in the size."""
+        try:
+            connection = self.creator(**connect_kwargs)
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created += 1
+        return _Entry(connection, time.monotonic())
+
+    def checkout(self, **connect_kwargs) -> Any:
+        """
+        Returns an idle connection, or a new one while the pool is below `max_size`.
+        Waits for a connection to be returned when the pool is full.
+
+        :raises PoolTimeoutError: if no connection is available within `checkout_timeout`
+        """
+        deadline = None if self.checkout_timeout is None else time.monotonic() + self.checkout_timeout
+        while True:
+            stale = []
+            try:
+                with self._condition:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("The connection pool is closed.")
+                        stale.extend(self._take_stale_locked(time.monotonic()))
+                        if self._idle:
+                            entry = self._idle.pop()
+                            break
+                        if self.max_size is None or self._size < self.max_size:
+                            self._size += 1
+                            entry = None
+                            break
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise PoolTimeoutError(
+                                f"No connection available within {self.checkout_timeout} seconds")
+                        self._waiting += 1
+                        try:
+                            self._condition.wait(remaining)
+                        finally:
+                            self._waiting -= 1
+            finally:
+                for stale_entry in stale:
+                    self._close_quietly(stale_entry.connection)
+
+            if entry is None:
+                entry = self._create(**connect_kwargs)
+            elif self.pre_ping:
+                try:
+                    self._ping(entry.connection)
+                except Exception:
+                    self._discard(entry)
+                    continue
+
+            with self._condition:
+                self._checked_out[id(entry.connection)] = entry
+            return entry.connection
+
+    def checkin(self, connection: Any):
+        """Returns a checked out connection to the pool."""
+        with self._condition:
+            entry = self._checked_out.pop(id(connection), None)
+        if entry is None:
+            raise ValueError("The connection was not checked out from this pool.")
+
+        if self._closed:
+            self._discard(entry, recycled=False)
+            return
+        now = time.monotonic()
+        if self._expired(entry, now):
+            self._discard(entry)
+            return
+        try:
+            self._reset(connection)
+        except Exception:
+            self._discard(entry)
+            return
+        with self._condition:
+            entry.returned_at = now
+            self._idle.append(entry)
+            self._condition.notify()
+
+    def warm(self, **connect_kwargs):
+        """Opens connections until the pool holds `min_size`."""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            entry = self._create(**connect_kwargs)
+            with self._condition:
+                self._idle.appendleft(entry)
+                self._condition.notify()
+
+    def connection_resolver(self, **connect_kwargs) -> Any:
+        """`connection_resolver` hook of the adapters: checks out a connection."""
+        return self.checkout(**connect_kwargs)
+
+    def connection_closer(self, adapter):
+        """`connection_closer` hook of the adapters: returns the adapter's connection to the pool."""
+        connection = adapter._detach_connection()
+        if connection is not None:
+            self.checkin(connection)
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                checked_out=len(self._checked_out),
+                waiting=self._waiting,
+                created=self._created,
+                recycled=self._recycled,
+            )
+
+    def close(self):
+        """Closes the idle connections; checked out connections are closed when returned."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.connection)
@@ -1,16 +1,97 @@
 import json
+import re
 import time
+import hashlib
 import logging
+import itertools
+import threading
+import weakref
 import psycopg2
-from uuid import UUID
-from typing import Any, Dict, List, Tuple, Union, Optional, Callable
+import psycopg2.errors
+from datetime import date, datetime, time as datetime_time
+from enum import Enum
+from uuid import UUID, uuid4
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union, Optional, Callable
 
 from rococo.data.base import DbAdapter
+from rococo.data.schema_catalog import SchemaCatalog, schema_catalog as default_schema_catalog
+from rococo.data.statement_cache import statement_key
+from rococo.serialization import json_dumps, json_loads
+
+# Names of the statements prepared on each server connection
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_statements_lock = threading.Lock()
+
+
+def _copy_csv_field(value: Any) -> str:
+    """Encodes a value as a field of COPY's CSV format, where an unquoted empty field is NULL."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        text = 'true' if value else 'false'
+    elif isinstance(value, (dict, list)):
+        text = json_dumps(value)
+    elif isinstance(value, (datetime, date, datetime_time)):
+        text = value.isoformat()
+    elif isinstance(value, UUID):
+        text = value.hex
+    elif isinstance(value, Enum):
+        return _copy_csv_field(value.value)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        text = '\\x' + bytes(value).hex()
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+class _CopyStream:
+    """File-like object encoding rows as CSV while COPY ... FROM STDIN reads it."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], columns: List[str]):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._buffer = bytearray()
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += (','.join(_copy_csv_field(row.get(col)) for col in self._columns) + '\n').encode()
+            self.count += 1
+        if size < 0:
+            size = len(self._buffer)
+        chunk = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return chunk
 
 
 class PostgreSQLAdapter(DbAdapter):
     """PostgreSQL adapter for interacting with PostgreSQL."""
 
+    supports_partial_updates = True
+    supports_batch_save = True
+    # Most bind parameters PostgreSQL accepts in one statement
+    MAX_QUERY_PARAMETERS = 65535
+    # Columns and keys of tables, for the schema catalog (see rococo.data.schema_catalog)
+    TABLE_COLUMNS_QUERY = """
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = COALESCE(%s, current_schema()) AND table_name = ANY(%s)
+        ORDER BY table_name, ordinal_position
+    """
+    TABLE_CONSTRAINTS_QUERY = """
+        SELECT tc.table_name, tc.constraint_name, tc.constraint_type, kcu.column_name
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu
+          ON kcu.constraint_name = tc.constraint_name
+         AND kcu.table_schema = tc.table_schema
+         AND kcu.table_name = tc.table_name
+        WHERE tc.table_schema = COALESCE(%s, current_schema()) AND tc.table_name = ANY(%s)
+          AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+        ORDER BY tc.table_name, tc.constraint_type, tc.constraint_name, kcu.ordinal_position
+    """
 
     def __init__(
         self,
@@ -22,7 +103,24 @@ class PostgreSQLAdapter(DbAdapter):
         connection_resolver: Optional[Callable] = None,
         connection_closer: Optional[Callable] = None,
         connect_kwargs: Optional[dict] = None,
+        connection_mode: str = 'per_call',
+        health_check_interval: float = 30.0,
+        statement_cache_size: int = 512,
+        prepare_statements: bool = False,
+        schema: Optional[str] = None,
+        schema_catalog: Optional[SchemaCatalog] = None,
     ):
+        """
+        :param connection_mode: 'per_call' to connect for each outermost `with adapter:` block,
+            'persistent' to keep the connection open between blocks
+        :param health_check_interval: seconds a persistent connection may sit idle before it is checked on reuse
+        :param statement_cache_size: generated SQL statements kept for reuse by the adapters of the database
+            (see rococo.data.statement_cache); 0 to build every statement
+        :param prepare_statements: run reads as statements prepared once per server connection,
+            worth it with persistent or pooled connections
+        :param schema: schema whose tables are discovered, the connection's current schema by default
+        :param schema_catalog: catalog of the discovered table schemas, the one of the process by default
+        """
         self._host = host
         self._port = port
         self._user = user
@@ -30,8 +128,13 @@ class PostgreSQLAdapter(DbAdapter):
         self._database = database
         self._connection = None
         self._cursor = None
-        self._table_columns_cache = {}
+        self._schema = schema
         self._connect_kwargs = connect_kwargs or {}
+        self.schema_catalog = default_schema_catalog if schema_catalog is None else schema_catalog
+        # Shared with the other adapters of the database, like the table schemas
+        self.statement_cache = (self.schema_catalog.statement_cache(*self._schema_catalog_key(), statement_cache_size)
+                                if statement_cache_size else None)
+        self.prepare_statements = prepare_statements
 
         if connection_resolver is None:
             self._connection_resolver = psycopg2.connect
@@ -39,32 +142,58 @@ class PostgreSQLAdapter(DbAdapter):
             self._connection_resolver = connection_resolver
 
         self._connection_closer = connection_closer
+        self._set_connection_lifecycle(connection_mode, health_check_interval)
 
 
     def __enter__(self):
-        """Context manager entry point for creating DB connection."""
-        self._connection = self.connect
-        self._cursor = self._connection.cursor()
-
+        """Context manager entry point for creating DB connection (see DbAdapter._enter_context)."""
+        self._enter_context()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Context manager exit point for closing DB connection."""
+        self._exit_context()
+
+    def _connection_is_open(self):
+        return self._connection is not None
+
+    def _open_connection(self):
+        self._connection = self.connect
+        self._cursor = self._connection.cursor()
+
+    def _close_connection(self):
         self.close_connection()
 
+    def _check_connection(self):
+        try:
+            self._cursor.execute("SELECT 1")
+            self._cursor.fetchall()
+            self._connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _release_connection(self):
+        # End the read transaction, so the next block does not see a stale snapshot
+        self._connection.rollback()
+
     def close_connection(self):
         """Closes the connection and cursor."""
 
         if self._connection_closer:
             self._connection_closer(self)
         else:
-            if self._cursor is not None:
-                self._cursor.close()
-                self._cursor = None
-
-            if self._connection is not None:
-                self._connection.close()
-                self._connection = None
+            connection = self._detach_connection()
+            if connection is not None:
+                connection.close()
+
+    def _detach_connection(self):
+        """Closes the cursor and hands over the connection, which the adapter no longer holds."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        connection, self._connection = self._connection, None
+        return connection
 
     @property
     def connect(self):
@@ -104,10 +233,55 @@ class PostgreSQLAdapter(DbAdapter):
             raise Exception(
                 f"Unsupported type {type(value)} for condition key: {key}, value: {value}")
 
+    def _condition_values(self, value):
+        """The values bound by the condition on `value` (see _build_condition_string)."""
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, UUID):
+            return [str(value)]
+        if value is None:
+            return []
+        return [value]
+
+    def _execute_select(self, query: str, values: tuple) -> List[Dict[str, Any]]:
+        """Runs a generated SELECT, as a prepared statement with `prepare_statements`."""
+        if not self.prepare_statements:
+            return self.execute_query(query, values)
+
+        name = f"rococo_{hashlib.sha1(query.encode()).hexdigest()[:20]}"
+        with _prepared_statements_lock:
+            prepared = _prepared_statements.setdefault(self._connection, set())
+        if name not in prepared:
+            # A pooled connection may have prepared it for another adapter
+            self._call_cursor('execute', "SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+            if not self._call_cursor('fetchall'):
+                # %s placeholders become $1, $2...; the statement is sent without parameters
+                position = itertools.count(1)
+                self._call_cursor('execute', f"PREPARE {name} AS " + re.sub(
+                    r'%([%s])', lambda match: '%' if match.group(1) == '%' else f"${next(position)}", query))
+                if self.statement_cache is not None:
+                    self.statement_cache.record_prepare()
+            prepared.add(name)
+
+        placeholders = f" ({', '.join(['%s'] * len(values))})" if values else ""
+        try:
+            self._call_cursor('execute', f"EXECUTE {name}{placeholders}", values)
+        except psycopg2.errors.InvalidSqlStatementName:
+            prepared.discard(name)
+            raise
+        column_names = [desc[0] for desc in self._cursor.description]
+        return [dict(zip(column_names, row)) for row in self._call_cursor('fetchall')]
+
     def get_move_entity_to_audit_table_query(self, table, entity_id):
         """Returns the query to move an entity to audit table."""
         return f"""INSERT INTO {table}_audit (SELECT * FROM {table} WHERE entity_id=%s)""", (str(entity_id).replace('-', ''),)
 
+    def get_move_entities_to_audit_table_query(self, table, entity_ids):
+        """Returns the query to move many entities to audit table."""
+        placeholders = ', '.join(['%s'] * len(entity_ids))
+        return (f"INSERT INTO {table}_audit (SELECT * FROM {table} WHERE entity_id IN ({placeholders}))",
+                tuple(str(entity_id).replace('-', '') for entity_id in entity_ids))
+
     def move_entity_to_audit_table(self, table, entity_id):
         """Executes the query to move an entity to audit table."""
         query, values = self.get_move_entity_to_audit_table_query(
@@ -148,7 +322,7 @@ class PostgreSQLAdapter(DbAdapter):
             for value in values:
                 if isinstance(value, dict):
                     # Convert dict to JSON string
-                    transformed_values.append(json.dumps(value))
+                    transformed_values.append(json_dumps(value))
                 else:
                     transformed_values.append(value)
 
@@ -168,6 +342,15 @@ class PostgreSQLAdapter(DbAdapter):
 
         return response
 
+    def _select_fields(self, table: str, columns: list = None, exclude_columns: list = None) -> List[str]:
+        """Returns the selected columns: `columns`, or all columns of `table` but `exclude_columns`."""
+        if columns:
+            return [f'{table}.{column}' for column in columns]
+        if exclude_columns:
+            return [f'{table}.{column}' for column in self._get_table_columns(table)
+                    if column not in exclude_columns]
+        return [f'{table}.*']
+
     def get_one(
             self,
             table: str,
@@ -175,35 +358,14 @@ class PostgreSQLAdapter(DbAdapter):
             sort: List[Tuple[str, str]] = None,
             join_statements: list = None,
             additional_fields: list = None,
-            active: bool = True
+            active: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
     ) -> Optional[Dict[str, Any]]:
-        fields = [f'{table}.*']
-        if additional_fields:
-            fields += additional_fields
-
-        query = f"SELECT {', '.join(fields)} FROM {table}"
-        if join_statements:
-            for join_stmt in join_statements:
-                query += f"""\n{join_stmt}\n"""
-
-        condition_strs_values = []
-        if conditions:
-            condition_strs_values = [self._build_condition_string(
-                table, k, v) for k, v in conditions.items()]
-        if active:
-            condition_strs_values.append((f"{table}.active = %s", ['true']))
-        query += f" WHERE {' AND '.join([condition_str for condition_str, condition_value in condition_strs_values])}"
-
-        if sort:
-            sort_strs = [f"{column} {direction}" for column, direction in sort]
-            query += f" ORDER BY {', '.join(sort_strs)}"
-        query += " LIMIT 1"
-
-        values = sum((condition_value for condition_str,
-                     condition_value in condition_strs_values), [])
-
-        db_response = self.parse_db_response(
-            self.execute_query(query, tuple(values)))
+        query, values = self._build_select_query(
+            table, conditions, sort, 1, None, active, join_statements,
+            additional_fields, columns, exclude_columns)
+        db_response = self.parse_db_response(self._execute_select(query, values))
 
         if not db_response:
             return None
@@ -213,7 +375,7 @@ class PostgreSQLAdapter(DbAdapter):
         else:
             return self._deserialize_extra_fields(db_response)
 
-    def get_many(
+    def _build_select_query(
             self,
             table: str,
             conditions: Dict[str, Any] = None,
@@ -222,40 +384,77 @@ class PostgreSQLAdapter(DbAdapter):
             offset: int = None,
             active: bool = True,
             join_statements: list = None,
-            additional_fields: list = None
-    ) -> List[Dict[str, Any]]:
-
-        fields = [f'{table}.*']
-        if additional_fields:
-            fields += additional_fields
-
-        query = f"SELECT {', '.join(fields)} FROM {table}"
-        if join_statements:
-            for join_stmt in join_statements:
-                query += f"""\n{join_stmt}\n"""
-
-        condition_strs_values = []
-        if conditions:
-            condition_strs_values = [self._build_condition_string(
-                table, k, v) for k, v in conditions.items()]
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None,
+            seek: Tuple[str, list] = None
+    ) -> Tuple[str, tuple]:
+        """
+        Returns the SELECT query of `get_many()` and its values, with an optional seek condition.
+        The SQL text is reused for queries of the same shape (see rococo.data.statement_cache).
+        """
+        key = statement_key(
+            'select', table, conditions, sort, limit is not None, offset is not None, active,
+            join_statements, additional_fields, columns, exclude_columns, seek[0] if seek else None)
+        query = self._cached_statement(key)
+        if query is None:
+            fields = self._select_fields(table, columns, exclude_columns)
+            if additional_fields:
+                fields += additional_fields
+
+            query = f"SELECT {', '.join(fields)} FROM {table}"
+            if join_statements:
+                for join_stmt in join_statements:
+                    query += f"""\n{join_stmt}\n"""
+
+            condition_strs = []
+            if conditions:
+                condition_strs = [self._build_condition_string(table, k, v)[0] for k, v in conditions.items()]
+            if active:
+                condition_strs.append(f"{table}.active = %s")
+            if seek:
+                condition_strs.append(seek[0])
+            if condition_strs:
+                query += f" WHERE {' AND '.join(condition_strs)}"
+
+            if sort:
+                sort_strs = [f"{column} {direction}" for column, direction in sort]
+                query += f" ORDER BY {', '.join(sort_strs)}"
+            if limit is not None:
+                query += " LIMIT %s"
+            if offset is not None:
+                query += " OFFSET %s"
+            self._store_statement(key, query)
+
+        values = self._conditions_values(conditions)
         if active:
-            condition_strs_values.append((f"{table}.active = %s", ["true"]))
-
-        if condition_strs_values:
-            query += f" WHERE {' AND '.join([condition_str for condition_str, condition_value in condition_strs_values])}"
-
-        if sort:
-            sort_strs = [f"{column} {direction}" for column, direction in sort]
-            query += f" ORDER BY {', '.join(sort_strs)}"
+            values.append('true')
+        if seek:
+            values.extend(seek[1])
         if limit is not None:
-            query += f" LIMIT {int(limit)}"
+            values.append(int(limit))
         if offset is not None:
-            query += f" OFFSET {int(offset)}"
+            values.append(int(offset))
+        return query, tuple(values)
+
+    def get_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            limit: int = None,
+            offset: int = None,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
 
-        values = sum((condition_value for condition_str,
-                     condition_value in condition_strs_values), [])
-        db_response = self.parse_db_response(
-            self.execute_query(query, tuple(values)))
+        query, values = self._build_select_query(
+            table, conditions, sort, limit, offset, active, join_statements,
+            additional_fields, columns, exclude_columns)
+        db_response = self.parse_db_response(self._execute_select(query, values))
         if not db_response:
             return []
         elif isinstance(db_response, dict):
@@ -263,6 +462,112 @@ class PostgreSQLAdapter(DbAdapter):
         else:
             return [self._deserialize_extra_fields(row) for row in db_response]
 
+    def _build_seek_condition(self, table: str, keys: List[Tuple[str, str]], values: List[Any]) -> Tuple[str, list]:
+        """
+        Returns the condition selecting the rows after `values` in the order of `keys`.
+        Keys sorted in one direction compare as a row value, which can use a composite index.
+        """
+        columns = [column if '.' in column else f"{table}.{column}" for column, _ in keys]
+        operators = ['<' if direction.upper() == 'DESC' else '>' for _, direction in keys]
+        if len(columns) == 1:
+            return f"{columns[0]} {operators[0]} %s", list(values)
+        if len(set(operators)) == 1:
+            placeholders = ', '.join(['%s'] * len(columns))
+            return f"({', '.join(columns)}) {operators[0]} ({placeholders})", list(values)
+
+        clauses = []
+        clause_values = []
+        for i, column in enumerate(columns):
+            parts = [f"{columns[j]} = %s" for j in range(i)] + [f"{column} {operators[i]} %s"]
+            clauses.append(f"({' AND '.join(parts)})")
+            clause_values += list(values[:i + 1])
+        return f"({' OR '.join(clauses)})", clause_values
+
+    def get_page(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            after: List[Any] = None,
+            limit: int = 100,
+            active: bool = True,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` rows ordered by `sort`, starting after the row whose sort
+        values are `after`. The last sort key must be unique (the repository adds entity_id).
+        """
+        seek = self._build_seek_condition(table, sort, after) if after is not None else None
+        query, values = self._build_select_query(
+            table, conditions, sort, limit, None, active, columns=columns,
+            exclude_columns=exclude_columns, seek=seek)
+        db_response = self.parse_db_response(self._execute_select(query, values))
+        if not db_response:
+            return []
+        if isinstance(db_response, dict):
+            db_response = [db_response]
+        return [self._deserialize_extra_fields(row) for row in db_response]
+
+    def iter_many(
+            self,
+            table: str,
+            conditions: Dict[str, Any] = None,
+            sort: List[Tuple[str, str]] = None,
+            batch_size: int = 1000,
+            active: bool = True,
+            join_statements: list = None,
+            additional_fields: list = None,
+            columns: list = None,
+            exclude_columns: list = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the rows `get_many()` would return in lists of up to `batch_size` rows.
+        The rows are read with a server-side (named) cursor, so only one batch is held
+        in memory. The adapter connection must stay open while iterating.
+        """
+        query, values = self._build_select_query(
+            table, conditions, sort, None, None, active, join_statements,
+            additional_fields, columns, exclude_columns)
+        for rows in self.stream_query(query, values, itersize=batch_size, batches=True):
+            yield [self._deserialize_extra_fields(row) for row in rows]
+
+    def stream_query(
+            self,
+            sql: str,
+            _vars: Any = None,
+            itersize: int = 2000,
+            batches: bool = False
+    ) -> Iterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Runs a query on a server-side (named) cursor and lazily yields its rows as dicts,
+        or lists of up to `itersize` rows with `batches`. Rows are fetched `itersize` at a
+        time and the column names are read once, so only one batch is held in memory.
+        The adapter connection must stay open while iterating; the cursor is closed when
+        the iteration ends or the iterator is closed.
+        """
+        if not self._connection:
+            raise Exception("No connection is available.")
+
+        cursor = self._connection.cursor(name=f"rococo_{uuid4().hex}")
+        cursor.itersize = itersize
+        try:
+            cursor.execute(sql, _vars or ())
+            column_names = None
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                if column_names is None:
+                    column_names = [desc[0] for desc in cursor.description]
+                if batches:
+                    yield [dict(zip(column_names, row)) for row in rows]
+                else:
+                    for row in rows:
+                        yield dict(zip(column_names, row))
+        finally:
+            cursor.close()
+
     def get_count(
         self,
         table: str,
@@ -274,20 +579,15 @@ class PostgreSQLAdapter(DbAdapter):
         The 'options' parameter is included for interface compatibility; PostgreSQL hints
         are typically injected as SQL comments or via session parameters.
         """
-        # Quote the table name for safety
-        safe_table = f'"{table}"'
-        where_clauses: List[str] = []
-        params: List[Any] = []
-
-        # Build WHERE clauses
-        if conditions:
-            for key, val in conditions.items():
-                clause, vals = self._build_condition_string(table, key, val)
-                where_clauses.append(clause)
-                params.extend(vals)
-
-        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        sql = f'SELECT COUNT(*) AS count FROM {safe_table} {where_sql}'
+        key = statement_key('count', table, conditions)
+        sql = self._cached_statement(key)
+        if sql is None:
+            # Quote the table name for safety
+            safe_table = f'"{table}"'
+            where_sql, _ = self._build_count_where(table, conditions)
+            sql = f'SELECT COUNT(*) AS count FROM {safe_table} {where_sql}'
+            self._store_statement(key, sql)
+        params = self._conditions_values(conditions)
 
         # Log any hint passed through options (Postgres doesn’t support generic hints here)
         if options and 'hint' in options:
@@ -296,15 +596,57 @@ class PostgreSQLAdapter(DbAdapter):
                 options['hint']
             )
 
-        rows = self.execute_query(sql, tuple(params))
+        rows = self._execute_select(sql, tuple(params))
         if isinstance(rows, list) and rows:
             return int(rows[0].get('count', 0) or 0)
         return 0
 
+    def _build_count_where(self, table: str, conditions: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        where_clauses: List[str] = []
+        params: List[Any] = []
+        if conditions:
+            for key, val in conditions.items():
+                clause, vals = self._build_condition_string(table, key, val)
+                where_clauses.append(clause)
+                params.extend(vals)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        return where_sql, params
+
+    def get_count_estimate(self, table: str, conditions: Dict[str, Any]) -> Optional[int]:
+        """
+        Estimate the rows in `table` matching `conditions` from planner statistics:
+        pg_class.reltuples for the whole table, the EXPLAIN row estimate otherwise.
+        Returns None if the table has no statistics yet.
+        """
+        if not conditions:
+            rows = self.execute_query(
+                "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+            estimate = rows[0].get('estimate') if rows else None
+            # reltuples is -1 until the table is first vacuumed or analyzed
+            return int(estimate) if estimate is not None and estimate >= 0 else None
+
+        where_sql, params = self._build_count_where(table, conditions)
+        self._call_cursor('execute', f'EXPLAIN (FORMAT JSON) SELECT 1 FROM "{table}" {where_sql}', tuple(params))
+        plan = self._call_cursor('fetchone')[0]
+        if isinstance(plan, str):
+            plan = json_loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def _schema_catalog_key(self) -> Tuple[str, Optional[str]]:
+        dsn = f"postgresql://{self._user}@{self._host}:{self._port}/{self._database}"
+        # Options such as search_path change which tables unqualified names resolve to
+        if self._connect_kwargs.get('options'):
+            dsn += f"?options={self._connect_kwargs['options']}"
+        return dsn, self._schema
+
+    def _table_schema_queries(self, tables: List[str]) -> List[Tuple[str, tuple]]:
+        return [(self.TABLE_COLUMNS_QUERY, (self._schema, tables)),
+                (self.TABLE_CONSTRAINTS_QUERY, (self._schema, tables))]
+
     def _get_table_columns(self, table_name: str) -> List[str]:
         """
         Get the list of column names for a table from the database schema.
-        Results are cached for performance.
+        Results are cached for the process in the schema catalog.
 
         Args:
             table_name: Name of the table
@@ -312,19 +654,26 @@ class PostgreSQLAdapter(DbAdapter):
         Returns:
             List of column names
         """
-        if table_name in self._table_columns_cache:
-            return self._table_columns_cache[table_name]
+        return list(self._get_table_schema(table_name).columns)
 
-        query = """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = %s
-            ORDER BY ordinal_position
+    def _get_conflict_target(self, table_name: str) -> Optional[Tuple[str, ...]]:
+        """
+        Get the columns of the constraint that identifies the rows of a table, or None
+        if the table has no primary key or unique constraint (see TableSchema.conflict_target).
         """
-        rows = self.execute_query(query, (table_name,))
-        columns = [row['column_name'] for row in rows]
-        self._table_columns_cache[table_name] = columns
-        return columns
+        return self._get_table_schema(table_name).conflict_target
+
+    def _upsert_query(self, table_name: str, columns: List[str], conflict_target: Tuple[str, ...],
+                      row_count: int = 1) -> str:
+        """Returns an INSERT ... ON CONFLICT DO UPDATE of `row_count` rows of `columns`."""
+        row_placeholders = f"({', '.join(['%s'] * len(columns))})"
+        assignments = ', '.join([f"{col} = EXCLUDED.{col}" for col in columns if col not in conflict_target])
+        action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
+        return (
+            f"INSERT INTO {table_name} ({', '.join(columns)}) "
+            f"VALUES {', '.join([row_placeholders] * row_count)} "
+            f"ON CONFLICT ({', '.join(conflict_target)}) {action}"
+        )
 
     def _deserialize_extra_fields(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -340,7 +689,7 @@ class PostgreSQLAdapter(DbAdapter):
             # If extra is a string, parse it as JSON
             if isinstance(row['extra'], str):
                 try:
-                    extra_data = json.loads(row['extra'])
+                    extra_data = json_loads(row['extra'])
                     if isinstance(extra_data, dict):
                         # Remove the 'extra' key and merge extra fields into the row
                         row.pop('extra')
@@ -353,8 +702,12 @@ class PostgreSQLAdapter(DbAdapter):
                 row.update(extra_data)
         return row
 
-    def get_save_query(self, table_name, data):
-        """Returns a query to update a row or insert a new one in PostgreSQL."""
+    def _split_extra_fields(self, table_name, data, encode_extra=True):
+        """
+        Returns `data` limited to the table columns, with the remaining fields
+        stored as JSON in the 'extra' column if the table has one (as a dict
+        if `encode_extra` is False).
+        """
         # Get table columns from database schema
         table_columns = self._get_table_columns(table_name)
 
@@ -370,13 +723,32 @@ class PostgreSQLAdapter(DbAdapter):
 
         # If there are extra fields and the table has an 'extra' column, store them as JSON
         if extra_data and 'extra' in table_columns:
-            table_data['extra'] = json.dumps(extra_data)
+            table_data['extra'] = json_dumps(extra_data) if encode_extra else extra_data
         elif extra_data:
             # Log warning if there are extra fields but no 'extra' column
             logging.warning(
                 f"Table '{table_name}' has no 'extra' column but received extra fields: {list(extra_data.keys())}"
             )
 
+        return table_data
+
+    def get_save_query(self, table_name, data):
+        """
+        Returns a query to update a row or insert a new one in PostgreSQL: an
+        INSERT ... ON CONFLICT on the table's primary key or unique constraint,
+        or an UPDATE falling back to an INSERT for tables without one.
+        """
+        table_data = self._split_extra_fields(table_name, data)
+
+        conflict_target = self._get_conflict_target(table_name)
+        if conflict_target and all(col in table_data for col in conflict_target):
+            key = ('save', table_name, tuple(table_data), conflict_target)
+            query = self._cached_statement(key)
+            if query is None:
+                query = self._upsert_query(table_name, list(table_data), conflict_target)
+                self._store_statement(key, query)
+            return query, tuple(table_data.values())
+
         # Use table_data for the SQL query
         columns = ', '.join(table_data.keys())
         placeholders = ', '.join(['%s'] * len(table_data))
@@ -411,6 +783,171 @@ class PostgreSQLAdapter(DbAdapter):
 
         return query, values
 
+    def get_save_many_queries(self, table_name, data_list):
+        """
+        Returns queries updating the rows of `data_list` that exist and inserting
+        the others, one query per set of columns: multi-row INSERT ... ON CONFLICT
+        queries on the table's primary key or unique constraint. For tables without
+        one, the rows are sent as a single JSON parameter, typed by the table's row
+        type, to an UPDATE falling back to an INSERT.
+        """
+        conflict_target = self._get_conflict_target(table_name)
+        rows_by_columns = {}
+        for data in data_list:
+            table_data = self._split_extra_fields(table_name, data, encode_extra=False)
+            rows_by_columns.setdefault(tuple(table_data), []).append(table_data)
+
+        queries = []
+        for columns, rows in rows_by_columns.items():
+            if conflict_target and all(col in columns for col in conflict_target):
+                queries.extend(self._get_upsert_many_queries(table_name, list(columns), rows, conflict_target))
+                continue
+            column_list = ', '.join(columns)
+            assignments = ', '.join([f"{col} = data.{col}" for col in columns if col != 'entity_id'])
+            if not assignments:
+                # Nothing to update: only insert the rows that don't exist yet
+                query = (
+                    f"WITH data AS ("
+                    f"  SELECT * FROM json_populate_recordset(NULL::{table_name}, %s::json)"
+                    f") "
+                    f"INSERT INTO {table_name} ({column_list}) "
+                    f"SELECT {column_list} FROM data "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM {table_name} WHERE {table_name}.entity_id = data.entity_id)"
+                )
+                queries.append((query, (json_dumps(rows),)))
+                continue
+            query = (
+                f"WITH data AS ("
+                f"  SELECT * FROM json_populate_recordset(NULL::{table_name}, %s::json)"
+                f"), updated AS ("
+                f"  UPDATE {table_name} SET {assignments} "
+                f"  FROM data WHERE {table_name}.entity_id = data.entity_id "
+                f"  RETURNING {table_name}.entity_id"
+                f") "
+                f"INSERT INTO {table_name} ({column_list}) "
+                f"SELECT {column_list} FROM data "
+                f"WHERE data.entity_id NOT IN (SELECT entity_id FROM updated)"
+            )
+            queries.append((query, (json_dumps(rows),)))
+        return queries
+
+    def _get_upsert_many_queries(self, table_name, columns, rows, conflict_target):
+        """Multi-row upserts of `rows`, split to stay within MAX_QUERY_PARAMETERS."""
+        # A statement can't update a row twice: the last row of a key wins
+        rows = list({tuple(row[col] for col in conflict_target): row for row in rows}.values())
+        rows_per_query = max(1, self.MAX_QUERY_PARAMETERS // len(columns))
+        queries = []
+        for start in range(0, len(rows), rows_per_query):
+            chunk = rows[start:start + rows_per_query]
+            query = self._upsert_query(table_name, columns, conflict_target, len(chunk))
+            queries.append((query, tuple(row[col] for row in chunk for col in columns)))
+        return queries
+
+    def _bulk_rows(self, table_name: str, rows: Iterable[Dict[str, Any]],
+                   columns: Optional[List[str]]) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+        """
+        Splits the extra fields of `rows` as `get_save_query` does. Without `columns`,
+        the columns are those of the first row, and later rows may not have others.
+        """
+        table_rows = (self._split_extra_fields(table_name, row) for row in rows)
+        if columns is None:
+            first = next(table_rows, None)
+            if first is None:
+                return [], iter(())
+            columns = list(first)
+            table_rows = itertools.chain([first], table_rows)
+        known = set(columns)
+
+        def checked_rows():
+            for row in table_rows:
+                if not known.issuperset(row):
+                    raise ValueError(
+                        f"Row has columns {sorted(set(row) - known)} missing from the bulk columns {columns}")
+                yield row
+        return list(columns), checked_rows()
+
+    def _copy_rows(self, table_name: str, columns: List[str], rows: Iterator[Dict[str, Any]]) -> int:
+        """Streams `rows` into `table_name` with COPY ... FROM STDIN; returns the number of rows."""
+        stream = _CopyStream(rows, columns)
+        self._call_cursor('copy_expert', f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                          stream)
+        return stream.count
+
+    def bulk_insert(self, table_name: str, rows: Iterable[Dict[str, Any]], columns: Optional[List[str]] = None) -> int:
+        """
+        Inserts `rows` with one COPY, in a single transaction. Rows are streamed, so
+        `rows` may be a generator of any length. Fails if a row already exists.
+
+        :param columns: the columns to write; defaults to the columns of the first row
+        :return: the number of rows inserted
+        """
+        columns, rows = self._bulk_rows(table_name, rows, columns)
+        if not columns:
+            return 0
+        try:
+            count = self._copy_rows(table_name, columns, rows)
+            self._connection.commit()
+        except BaseException:
+            self._connection.rollback()
+            raise
+        return count
+
+    def bulk_upsert(self, table_name: str, rows: Iterable[Dict[str, Any]], columns: Optional[List[str]] = None,
+                    move_to_audit: bool = False) -> int:
+        """
+        Inserts or updates `rows` in a single transaction: the rows are streamed with
+        COPY into a temporary table, then merged with one INSERT ... SELECT ... ON CONFLICT
+        on the table's key (see `get_save_query`). Of rows with the same key, the last wins.
+
+        :param columns: the columns to write; defaults to the columns of the first row
+        :param move_to_audit: first copy the current version of updated rows to the audit table,
+            as saving versioned models does
+        :return: the number of rows read
+        """
+        conflict_target = self._get_conflict_target(table_name)
+        if not conflict_target:
+            raise ValueError(f"bulk_upsert needs a primary key or unique constraint on table '{table_name}'")
+        columns, rows = self._bulk_rows(table_name, rows, columns)
+        if not columns:
+            return 0
+        if not set(conflict_target).issubset(columns):
+            raise ValueError(f"bulk_upsert rows need the key columns {list(conflict_target)}")
+
+        staging = f"rococo_bulk_{uuid4().hex[:16]}"
+        column_list = ', '.join(columns)
+        key_list = ', '.join(conflict_target)
+        assignments = ', '.join([f"{col} = EXCLUDED.{col}" for col in columns if col not in conflict_target])
+        action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
+        try:
+            self._call_cursor('execute', f"CREATE TEMPORARY TABLE {staging} "
+                                         f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+            # Input order, so that the last row of a key wins
+            self._call_cursor('execute', f"ALTER TABLE {staging} ADD COLUMN rococo_row bigserial")
+            count = self._copy_rows(staging, columns, rows)
+            if move_to_audit:
+                self._call_cursor('execute', f"INSERT INTO {table_name}_audit SELECT * FROM {table_name} "
+                                             f"WHERE ({key_list}) IN (SELECT {key_list} FROM {staging})")
+            self._call_cursor('execute', f"INSERT INTO {table_name} ({column_list}) "
+                                         f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} "
+                                         f"ORDER BY {key_list}, rococo_row DESC "
+                                         f"ON CONFLICT ({key_list}) {action}")
+            self._connection.commit()
+        except BaseException:
+            self._connection.rollback()
+            raise
+        return count
+
+    def get_update_query(self, table_name, data):
+        """Returns a query to update the given columns of the row with data['entity_id']."""
+        table_data = self._split_extra_fields(table_name, data)
+        entity_id = table_data.pop('entity_id')
+        if not table_data:
+            return None
+
+        assignments = ', '.join([f'{col} = %s' for col in table_data.keys()])
+        query = f"UPDATE {table_name} SET {assignments} WHERE entity_id = %s"
+        return query, tuple(table_data.values()) + (entity_id,)
+
     def _create_in_database(self, table_name, data, retry_count=0):
         try:
             query, values = self.get_save_query(table_name, data)
@@ -0,0 +1,144 @@
+"""
+Catalog of the table schemas the SQL adapters discover.
+
+The PostgreSQL and MySQL adapters read the columns and keys of a table from
+information_schema the first time they need them: to split extra fields
+from columns, to pick the ON CONFLICT target of a save, or to select all
+columns but some. The schemas are kept in one catalog per process, keyed
+on (DSN, schema, table), so adapters created per request or per task share
+what earlier adapters have read. The catalog also holds the statement cache
+of each (DSN, schema) (see rococo.data.statement_cache), since statements
+are built from the schemas.
+
+Tables that are not found are not cataloged, so they are looked up again
+once a migration creates them. Load the tables of all known models at
+startup with `adapter.load_table_schemas(models)`, and call
+`adapter.invalidate_table_schemas()` after migrations change them.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rococo.data.statement_cache import StatementCache
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Columns and keys of a table. A table that does not exist has no columns and is not cataloged."""
+    columns: Tuple[str, ...]
+    # Column name to database type
+    column_types: Dict[str, str] = field(default_factory=dict)
+    primary_key: Tuple[str, ...] = ()
+    unique_constraints: Tuple[Tuple[str, ...], ...] = ()
+
+    @property
+    def has_extra(self) -> bool:
+        """Whether the table has the 'extra' column extra fields are stored in."""
+        return 'extra' in self.columns
+
+    @property
+    def conflict_target(self) -> Optional[Tuple[str, ...]]:
+        """
+        The columns that identify a row: a key on entity_id alone, else the
+        primary key, else the first unique constraint. None without any.
+        """
+        keys = ([self.primary_key] if self.primary_key else []) + list(self.unique_constraints)
+        if ('entity_id',) in keys:
+            return ('entity_id',)
+        return keys[0] if keys else None
+
+
+def table_schemas_from_rows(
+        tables: Iterable[str],
+        column_rows: List[Dict[str, Any]],
+        constraint_rows: List[Dict[str, Any]]
+) -> Dict[str, TableSchema]:
+    """
+    Builds the schemas of `tables` from the rows of the adapters' schema queries:
+    (table_name, column_name, data_type) in column order, and (table_name,
+    constraint_name, constraint_type, column_name) in key column order.
+    """
+    columns = {table: {} for table in tables}
+    for row in column_rows:
+        columns.setdefault(row['table_name'], {})[row['column_name']] = row['data_type']
+
+    constraints = {}
+    for row in constraint_rows:
+        key = (row['table_name'], row['constraint_type'], row['constraint_name'])
+        constraints.setdefault(key, []).append(row['column_name'])
+
+    schemas = {}
+    for table, column_types in columns.items():
+        primary_key = ()
+        unique_constraints = []
+        for (table_name, constraint_type, _), key_columns in constraints.items():
+            if table_name != table:
+                continue
+            if constraint_type == 'PRIMARY KEY':
+                primary_key = tuple(key_columns)
+            else:
+                unique_constraints.append(tuple(key_columns))
+        schemas[table] = TableSchema(tuple(column_types), column_types, primary_key, tuple(unique_constraints))
+    return schemas
+
+
+class SchemaCatalog:
+    """
+    Table schemas keyed on (DSN, schema, table), and statement caches keyed on
+    (DSN, schema), safe to share between threads.
+    """
+
+    def __init__(self):
+        self._schemas = {}
+        self._statement_caches = {}
+        self._lock = threading.Lock()
+
+    def get(self, dsn: str, schema: Optional[str], table: str) -> Optional[TableSchema]:
+        with self._lock:
+            return self._schemas.get((dsn, schema, table))
+
+    def put(self, dsn: str, schema: Optional[str], table: str, table_schema: TableSchema):
+        with self._lock:
+            self._schemas[(dsn, schema, table)] = table_schema
+
+    def statement_cache(self, dsn: str, schema: Optional[str], max_size: int) -> StatementCache:
+        """
+        The statement cache of the DSN and schema, created on first use. It keeps
+        the largest `max_size` any adapter asked for.
+        """
+        with self._lock:
+            cache = self._statement_caches.get((dsn, schema))
+            if cache is None:
+                cache = self._statement_caches[(dsn, schema)] = StatementCache(max_size)
+            cache.max_size = max(cache.max_size, max_size)
+            return cache
+
+    def invalidate(self, dsn: Optional[str] = None, schema: Optional[str] = None,
+                   tables: Optional[Iterable[str]] = None) -> int:
+        """
+        Forgets the schemas matching all of the given DSN, schema and tables,
+        every schema if none is given, and clears the statement caches of the
+        DSN and schema. Returns how many schemas were dropped.
+        """
+        tables = set(tables) if tables is not None else None
+        with self._lock:
+            keys = [key for key in self._schemas
+                    if (dsn is None or key[0] == dsn)
+                    and (schema is None or key[1] == schema)
+                    and (tables is None or key[2] in tables)]
+            for key in keys:
+                del self._schemas[key]
+            caches = [cache for (cache_dsn, cache_schema), cache in self._statement_caches.items()
+                      if (dsn is None or cache_dsn == dsn) and (schema is None or cache_schema == schema)]
+        # Statements selecting all columns but some were built from the old columns
+        for cache in caches:
+            cache.clear()
+        return len(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._schemas)
+
+
+# The catalog and statement caches shared by the adapters of the process, unless they are given their own
+schema_catalog = SchemaCatalog()
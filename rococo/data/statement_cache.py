@@ -0,0 +1,107 @@
+"""
+Cache of the SQL text the SQL adapters generate.
+
+Queries are cached under their shape: the kind of query, the table, the
+condition keys with the kind of each condition (equality, IN with n values,
+IS NULL) and the other options that change the text (sort, joins, columns,
+whether there is a limit or offset...). Values are always bound as
+parameters, so queries of the same shape share one text, which PostgreSQL
+can also keep prepared on the server (see PostgreSQLAdapter).
+
+The adapters of a database (DSN and schema) share one cache, held in the
+schema catalog next to the table schemas the statements are built from
+(see rococo.data.schema_catalog), so adapters created per request reuse
+what earlier ones built.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class StatementCacheStats:
+    """Counters of a `StatementCache`."""
+    hits: int
+    misses: int
+    # Statements in the cache
+    size: int
+    # Statements prepared on a server connection
+    prepared: int
+
+
+def _condition_shape(value: Any) -> Optional[Hashable]:
+    """The part of a condition on `value` that changes the SQL text, or None for unsupported values."""
+    if value is None:
+        return 'null'
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, (str, bool, int, float, UUID)):
+        return '='
+    return None
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def statement_key(kind: str, table: str, conditions: Optional[Dict[str, Any]], *options: Any) -> Optional[Hashable]:
+    """
+    Returns the cache key of a statement, or None if it can't be cached (a condition
+    value the adapters don't support, which they report when building the query).
+    """
+    shape = []
+    for key, value in (conditions or {}).items():
+        value_shape = _condition_shape(value)
+        if value_shape is None:
+            return None
+        shape.append((key, value_shape))
+    return (kind, table, tuple(shape), _hashable(options))
+
+
+class StatementCache:
+    """Least recently used cache of generated SQL, safe to share between threads."""
+
+    def __init__(self, max_size: int = 512):
+        """
+        :param max_size: most statements kept
+        """
+        self.max_size = max_size
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prepared = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            sql = self._statements.get(key)
+            if sql is None:
+                self.misses += 1
+                return None
+            self._statements.move_to_end(key)
+            self.hits += 1
+            return sql
+
+    def put(self, key: Hashable, sql: str):
+        with self._lock:
+            self._statements[key] = sql
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+
+    def record_prepare(self):
+        with self._lock:
+            self.prepared += 1
+
+    def stats(self) -> StatementCacheStats:
+        with self._lock:
+            return StatementCacheStats(hits=self.hits, misses=self.misses, size=len(self._statements),
+                                       prepared=self.prepared)
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
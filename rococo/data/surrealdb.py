@@ -1,42 +1,91 @@
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from uuid import UUID
 from surrealdb import Surreal
 
 from rococo.data.base import DbAdapter
 
 
+def connect_surrealdb(endpoint: str, username: str, password: str, namespace: str, db_name: str) -> Surreal:
+    """Opens a SurrealDB client signed in and using `namespace` and `db_name`."""
+    db = Surreal(endpoint)
+    db.signin({"username": username, "password": password})
+    db.use(namespace, db_name)
+    return db
+
+
 class SurrealDbAdapter(DbAdapter):
     """SurrealDB adapter for interacting with SurrealDB."""
 
     def __init__(
-        self, endpoint: str, username: str, password: str, namespace: str, db_name: str
+        self, endpoint: str, username: str, password: str, namespace: str, db_name: str,
+        connection_mode: str = 'per_call', health_check_interval: float = 30.0,
+        connection_resolver: Optional[Callable] = None, connection_closer: Optional[Callable] = None
     ):
-        """Initializes a new SurrealDB adapter."""
+        """
+        Initializes a new SurrealDB adapter.
+
+        :param connection_resolver: returns a signed-in client using the namespace and database, called with
+            endpoint, username, password, namespace and db_name
+        :param connection_closer: closes the adapter's client, called with the adapter
+        :param connection_mode: 'per_call' to connect and sign in for each outermost `with adapter:` block,
+            'persistent' to keep the signed-in client between blocks
+        :param health_check_interval: seconds a persistent client may sit idle before it is checked on reuse
+        """
         self._endpoint = endpoint
         self._username = username
         self._password = password
         self._namespace = namespace
         self._db_name = db_name
         self._db = None
+        self._connection_resolver = connection_resolver or connect_surrealdb
+        self._connection_closer = connection_closer
+        self._set_connection_lifecycle(connection_mode, health_check_interval)
 
     def __enter__(self):
-        """Context manager entry point for preparing DB connection."""
-        self._db = self._prepare_db()
+        """Context manager entry point for preparing DB connection (see DbAdapter._enter_context)."""
+        self._enter_context()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Context manager exit point for closing DB connection."""
+        self._exit_context()
+
+    def _connection_is_open(self):
+        return self._db is not None
+
+    def _open_connection(self):
+        self._db = self._prepare_db()
+
+    def _close_connection(self):
+        if self._connection_closer:
+            self._connection_closer(self)
+            return
         if self._db:
             self._db.close()
         self._db = None
 
+    def _detach_connection(self):
+        """Hands over the client, which the adapter no longer holds."""
+        db, self._db = self._db, None
+        return db
+
+    def _check_connection(self):
+        try:
+            self._db.query("RETURN 1")
+            return True
+        except Exception:
+            return False
+
     def _prepare_db(self):
         """Prepares the DB connection."""
-        db = Surreal(self._endpoint)
-        db.signin({"username": self._username, "password": self._password})
-        db.use(self._namespace, self._db_name)
-        return db
+        return self._connection_resolver(
+            endpoint=self._endpoint,
+            username=self._username,
+            password=self._password,
+            namespace=self._namespace,
+            db_name=self._db_name
+        )
 
     def _call_db(self, function_name, *args, **kwargs):
         """Calls a function specified by function_name argument in SurrealDB connection passing forward args and kwargs."""
@@ -174,6 +223,96 @@ class SurrealDbAdapter(DbAdapter):
 
         return db_response
 
+    def _build_seek_condition(self, keys: List[Tuple[str, str]], values: List[Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns the condition selecting the records after `values` in the order of `keys`,
+        and its query variables.
+        """
+        clauses = []
+        _vars = {}
+        for i, (column, direction) in enumerate(keys):
+            parts = [f"{keys[j][0]} = $seek_{j}" for j in range(i)]
+            operator = '<' if direction.upper() == 'DESC' else '>'
+            parts.append(f"{column} {operator} $seek_{i}")
+            clauses.append(f"({' AND '.join(parts)})")
+            _vars[f"seek_{i}"] = values[i]
+        return f"({' OR '.join(clauses)})", _vars
+
+    def get_page(
+        self,
+        table: str,
+        conditions: Dict[str, Any] = None,
+        sort: List[Tuple[str, str]] = None,
+        after: List[Any] = None,
+        limit: int = 100,
+        active: bool = True,
+        fetch_related: list = None,
+        additional_fields: list = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` records ordered by `sort`, starting after the record whose
+        sort values are `after`. The last sort key must be unique (e.g. `id`).
+        """
+        fields = ['*']
+        if additional_fields:
+            fields += additional_fields
+
+        condition_strs = []
+        if conditions:
+            condition_strs = [
+                f"{self._build_condition_string(k, v)}" for k, v in conditions.items()]
+        if active:
+            condition_strs.append("active=true")
+        _vars = {}
+        if after is not None:
+            seek_condition, _vars = self._build_seek_condition(sort, after)
+            condition_strs.append(seek_condition)
+
+        query = f"SELECT {', '.join(fields)} FROM {table}"
+        if condition_strs:
+            query += f" WHERE {' AND '.join(condition_strs)}"
+        if sort:
+            query += f" ORDER BY {', '.join(f'{column} {direction}' for column, direction in sort)}"
+        query += f" LIMIT {int(limit)}"
+        if fetch_related:
+            query += f" FETCH {', '.join(field for field in fetch_related)}"
+
+        rows = self.parse_db_response(self.execute_query(query, _vars))
+        if not rows:
+            return []
+        return [rows] if isinstance(rows, dict) else rows
+
+    def iter_many(
+        self,
+        table: str,
+        conditions: Dict[str, Any] = None,
+        sort: List[Tuple[str, str]] = None,
+        batch_size: int = 1000,
+        active: bool = True,
+        fetch_related: list = None,
+        additional_fields: list = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the matching records in pages of up to `batch_size` records. Pages are
+        read with keyset pagination: ordered by `sort` and then the record id, each page
+        starts after the last record of the previous one.
+        """
+        keys = list(sort or [])
+        if 'id' not in [column for column, _ in keys]:
+            keys.append(('id', 'ASC'))
+
+        after = None
+        while True:
+            rows = self.get_page(
+                table, conditions, keys, after, batch_size, active, fetch_related, additional_fields)
+            if not rows:
+                break
+            # Taken before yielding: the caller may change the records
+            after = [rows[-1].get(column) for column, _ in keys]
+            yield rows
+            if len(rows) < batch_size:
+                break
+
     def get_count(
         self,
         table: str,
@@ -1,5 +1,5 @@
 """Module for messaging"""
 from .base import MessageAdapter
 from .rabbitmq import RabbitMqConnection
-from .sqs import SqsConnection
+from .sqs import SqsConnection, SqsSendError
 from .base import BaseServiceProcessor
@@ -4,6 +4,8 @@
 """
 from abc import abstractmethod
 
+from rococo.serialization import Serializer, get_serializer
+
 
 class MessageAdapter:
     """Abstract class for a connection to a message queue."""
@@ -11,6 +13,11 @@ class MessageAdapter:
     def __init__(self):
         pass
 
+    @property
+    def serializer(self) -> Serializer:
+        """The serializer of message bodies: the one given to the adapter, or the default one."""
+        return getattr(self, '_serializer', None) or get_serializer()
+
     @abstractmethod
     def send_message(self, queue_name: str, message: dict):
         """
@@ -21,6 +28,17 @@ class MessageAdapter:
             message (dict): The message to send.
         """
 
+    def send_messages(self, queue_name: str, messages: list):
+        """
+        Sends many messages to the specified queue.
+
+        Args:
+            queue_name (str): The name of the queue to send the messages to.
+            messages (list): The messages (dicts) to send.
+        """
+        for message in messages:
+            self.send_message(queue_name, message)
+
     @abstractmethod
     def consume_messages(self, queue_name: str, callback_function: callable = None):
         """
@@ -1,7 +1,6 @@
 """
 A connection to a RabbitMQ message queue that allows to send and receive messages.
 """
-import json
 import functools
 import threading
 import logging
@@ -11,6 +10,7 @@ from dotenv import dotenv_values
 import time
 
 from . import MessageAdapter
+from rococo.serialization import Serializer
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,8 @@ logger = logging.getLogger(__name__)
 class RabbitMqConnection(MessageAdapter):
     """A connection to a RabbitMQ message queue that allows to send and receive messages."""
 
-    def __init__(self, host: str, port: int, username: str, password: str, virtual_host: str = '', consume_config_file_path: str = None):
+    def __init__(self, host: str, port: int, username: str, password: str, virtual_host: str = '', consume_config_file_path: str = None,
+                 serializer: Serializer = None):
         """
         Initializes a new RabbitMQ connection.
 
@@ -28,6 +29,8 @@ class RabbitMqConnection(MessageAdapter):
             username (str): The username to use when connecting to the RabbitMQ server.
             password (str): The password to use when connecting to the RabbitMQ server.
             virtual_host (str): The virtual host to use when connecting to the RabbitMQ server.
+            serializer (Serializer): The serializer of message bodies. Defaults to the default
+                serializer of `rococo.serialization`.
         """
         self._host = host
         self._port = port
@@ -35,6 +38,7 @@ class RabbitMqConnection(MessageAdapter):
         self._password = password
         self._virtual_host = virtual_host
         self._consume_config_file_path = consume_config_file_path
+        self._serializer = serializer
 
         self._connection = None
         self._channel = None
@@ -104,13 +108,15 @@ class RabbitMqConnection(MessageAdapter):
         from pika.spec import PERSISTENT_DELIVERY_MODE, TRANSIENT_DELIVERY_MODE
 
         delivery_mode = PERSISTENT_DELIVERY_MODE if persistent else TRANSIENT_DELIVERY_MODE
+        serializer = self.serializer
 
         self._channel.basic_publish(
             exchange='',
             routing_key=queue_name,
-            body=json.dumps(message).encode(),
+            body=serializer.dumps(message),
             properties=pika.BasicProperties(
-                delivery_mode=delivery_mode
+                delivery_mode=delivery_mode,
+                content_type=serializer.content_type
             )
         )
 
@@ -160,7 +166,7 @@ class RabbitMqConnection(MessageAdapter):
         def _on_message(ch, method_frame, _header_frame, body, args):
             """Called when a message is received."""
 
-            body = json.loads(body.decode())
+            body = self.serializer.loads(body)
             (callback,) = args
             delivery_tag = method_frame.delivery_tag
             t = threading.Thread(
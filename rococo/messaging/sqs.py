@@ -1,14 +1,31 @@
 """A connection to AWS SQS that allows sending and receiving messages to and from queues."""
-import json
 import logging
 import uuid
 import boto3
 from dotenv import dotenv_values
 
 from . import MessageAdapter
+from rococo.serialization import Serializer, get_serializer
 
 logger = logging.getLogger(__name__)
 
+# Attempts at sending a batch entry that SQS failed on its side
+SEND_ATTEMPTS = 3
+
+
+class SqsSendError(Exception):
+    """Raised when SQS rejects messages of a batch.
+
+    Attributes:
+        failed (list): The `Failed` entries of the SQS responses (Id, Code, Message, SenderFault),
+            the Id being the position of the message in the list given to `send_messages`.
+    """
+
+    def __init__(self, failed):
+        self.failed = failed
+        super().__init__(f"SQS failed to send {len(failed)} message(s): "
+                         + ", ".join(f"{entry['Id']} ({entry.get('Code')})" for entry in failed))
+
 
 class SqsConnection(MessageAdapter):
     """A connection to AWS SQS that allows sending and receiving messages to and from queues."""
@@ -16,19 +33,26 @@ class SqsConnection(MessageAdapter):
     def __init__(self, aws_access_key_id: str = None,
                  aws_access_key_secret: str = None,
                  region_name: str = None,
-                 consume_config_file_path: str = None):
+                 consume_config_file_path: str = None,
+                 serializer: Serializer = None):
         """Initializes a new SQS connection.
 
         Args:
             aws_access_key_id (str): The AWS access key ID.
             aws_access_key_secret (str): The AWS access key secret.
             region_name (str): The AWS region name.
+            serializer (Serializer): The serializer of message bodies. SQS bodies are text,
+                so binary serializers are not supported. Defaults to the default serializer
+                of `rococo.serialization`.
         """
+        if serializer is not None and serializer.binary:
+            raise ValueError(f"SQS message bodies are text; the '{serializer.name}' serializer is binary")
 
         self._aws_access_key_id = aws_access_key_id
         self._aws_access_key_secret = aws_access_key_secret
         self._region_name = region_name
         self._consume_config_file_path = consume_config_file_path
+        self._serializer = serializer
         self._sqs = boto3.resource('sqs',
                                    aws_access_key_id=self._aws_access_key_id,
                                    aws_secret_access_key=self._aws_access_key_secret,
@@ -46,6 +70,12 @@ class SqsConnection(MessageAdapter):
             return {}
         return dotenv_values(self._consume_config_file_path)
 
+    @property
+    def serializer(self) -> Serializer:
+        serializer = super().serializer
+        # SQS bodies are text: a binary default serializer is replaced by JSON
+        return get_serializer('json') if serializer.binary else serializer
+
     def send_message(self, queue_name: str, message: dict):
         """Sends a message to the specified SQS queue.
 
@@ -59,7 +89,39 @@ class SqsConnection(MessageAdapter):
             queue = self._sqs.create_queue(QueueName=queue_name)
 
         queue.send_message(QueueUrl=queue_name,
-                           MessageBody=json.dumps(message))
+                           MessageBody=self.serializer.dumps(message).decode())
+
+    def send_messages(self, queue_name: str, messages: list):
+        """Sends many messages to the specified SQS queue, ten per request.
+
+        Messages that SQS fails to send on its side are retried; `SqsSendError` is
+        raised for messages it rejects, or that still fail after `SEND_ATTEMPTS`.
+
+        Args:
+            queue_name (str): The name of the queue to send the messages to.
+            messages (list): The messages (dicts) to send.
+        """
+        if queue_name in self._queue_map:
+            queue = self._queue_map[queue_name]
+        else:
+            queue = self._sqs.create_queue(QueueName=queue_name)
+
+        serializer = self.serializer
+        # SQS accepts at most 10 messages per batch request
+        for start in range(0, len(messages), 10):
+            entries = {
+                str(index): {'Id': str(index), 'MessageBody': serializer.dumps(message).decode()}
+                for index, message in enumerate(messages[start:start + 10], start)
+            }
+            for attempt in range(1, SEND_ATTEMPTS + 1):
+                failed = queue.send_messages(Entries=list(entries.values())).get('Failed') or []
+                if not failed:
+                    break
+                # Entries rejected as invalid would fail again
+                if attempt == SEND_ATTEMPTS or any(entry.get('SenderFault') for entry in failed):
+                    raise SqsSendError(failed)
+                logger.warning("Retrying %d message(s) SQS failed to send.", len(failed))
+                entries = {entry['Id']: entries[entry['Id']] for entry in failed}
 
     def consume_messages(self, queue_name: str, callback_function: callable = None):
         """Consumes messages from the specified SQS queue.
@@ -117,7 +179,7 @@ class SqsConnection(MessageAdapter):
             response = {}
             try:
                 response = responses[0]
-                body = json.loads(response.body)
+                body = self.serializer.loads(response.body)
                 if callback_function is not None:
                     callback_function(body)
             except Exception as _:  # pylint: disable=W0718
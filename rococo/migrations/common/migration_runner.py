@@ -182,6 +182,9 @@ class MigrationRunner:
                 print(f"Error applying migration {current_script_filename}.py. Halting.")
                 print(f"Current DB version after error: {self.get_db_version()}")
                 return
+            finally:
+                # The migration may have changed the tables the process has cataloged
+                self.migration.db_adapter.invalidate_table_schemas()
 
     def run_backward_migration_script(self):
         current_script_filename = self._get_backward_migration_script()
@@ -202,6 +205,8 @@ class MigrationRunner:
             print(f"Error applying downgrade migration {current_script_filename}.py. Halting.")
             print(f"Current DB version after error: {self.get_db_version()}")
             return
+        finally:
+            self.migration.db_adapter.invalidate_table_schemas()
 
         # Unlike forward, backward usually runs one step at a time.
         # If you wanted chain downgrades, this would also be recursive.
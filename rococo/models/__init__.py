@@ -3,6 +3,7 @@ Models for rococo
 """
 
 from .versioned_model import BaseModel, VersionedModel
+from .compact import compact_model
 
 # NonVersionedModel is an alias for BaseModel (the unversioned model).
 # Use either name - they are identical:
@@ -0,0 +1,218 @@
+"""
+Code generation of specialized `as_dict` / `from_dict` converters.
+
+Models that set the class flag `use_compiled_converters = True` get a
+converter function generated once per class (and, for `as_dict`, per
+combination of `convert_datetime_to_iso_string`, `convert_uuids` and
+`export_properties`). The generated code only contains the branches needed
+by the fields the class actually declares and produces the same output as
+the generic implementation in `BaseModel`.
+"""
+import keyword
+from dataclasses import is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List
+from uuid import UUID
+
+from .metadata import ModelMetadata, dataclass_values
+
+_MISSING = object()
+
+# Values of these exact types are never touched by any `as_dict` conversion.
+_PLAIN_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _attribute_access(name: str) -> str:
+    if name.isidentifier() and not keyword.iskeyword(name):
+        return f"self.{name}"
+    return f"getattr(self, {name!r})"
+
+
+def _field_value_lines(meta: ModelMetadata, name: str, cdt: bool, cu: bool) -> List[str]:
+    """Source lines converting the field value `v` into `r`, mirroring `BaseModel.as_dict`."""
+    field_type = meta.field_types[name]
+    lines = ["r = v"]
+
+    if field_type == 'm2m_list':
+        lines += [
+            "if isinstance(v, list):",
+            f"    r = [obj.as_dict({cdt}) for obj in v]",
+        ]
+    elif field_type in ('record_id', 'entity_id'):
+        lines += [
+            "if hasattr(v, 'as_dict'):",
+            f"    r = {{'entity_id': str(v.entity_id)}} if getattr(v, '_is_partial', False) else v.as_dict({cdt})",
+            "elif isinstance(v, UUID):",
+            f"    r = {'str(v)' if cu else 'v'}",
+            "elif isinstance(v, list) and all(isinstance(i, UUID) for i in v):",
+            f"    r = [{'str(i)' if cu else 'i'} for i in v]",
+            "elif is_dataclass(v):",
+            f"    r = v.as_dict({cdt}, {cu}) if hasattr(v, 'as_dict') else v",
+            "elif isinstance(v, dict):",
+            f"    r = {'str(v.get(' + repr('entity_id') + '))' if cu else 'v.get(' + repr('entity_id') + ')'}",
+        ]
+
+    if cdt:
+        lines += ["if isinstance(v, datetime):", "    r = v.isoformat()"]
+    if cu:
+        lines += ["if isinstance(v, UUID):", "    r = str(v)"]
+    lines += ["if isinstance(v, Enum):", "    r = v.value"]
+
+    if name in meta.model_fields:
+        lines += [
+            "if v is not None:",
+            "    if isinstance(v, list):",
+            "        r = [dataclass_values(obj) if is_dataclass(obj) else obj for obj in v]",
+            "    elif is_dataclass(v):",
+            "        r = dataclass_values(v)",
+        ]
+    return lines
+
+
+def _indent(lines: List[str], level: int) -> List[str]:
+    return [("    " * level) + line for line in lines]
+
+
+def _compile(source: str, namespace: Dict[str, Any], func_name: str, meta: ModelMetadata) -> Callable:
+    filename = f"<rococo-compiled {meta.cls.__module__}.{meta.cls.__qualname__}.{func_name}>"
+    exec(compile(source, filename, 'exec'), namespace)  # pylint: disable=exec-used
+    func = namespace[func_name]
+    func.__rococo_source__ = source
+    return func
+
+
+def _read_lines(meta: ModelMetadata, name: str, target: str, namespace: Dict[str, Any]) -> List[str]:
+    """Source lines reading the stored value of field `name` into `target` (MISSING if unset)."""
+    descriptor = meta.slot_descriptors.get(name)
+    if descriptor is None:
+        return [f"    {target} = d.get({name!r}, MISSING)"]
+    slot = f"SLOT_{name}" if name.isidentifier() else f"SLOT_{len(namespace)}"
+    namespace[slot] = descriptor
+    return [
+        "    try:",
+        f"        {target} = {slot}.__get__(self)",
+        "    except AttributeError:",
+        f"        {target} = MISSING",
+    ]
+
+
+def build_as_dict(meta: ModelMetadata, cdt: bool, cu: bool, ep: bool) -> Callable[[Any], Dict[str, Any]]:
+    """Generate an `as_dict(self)` function specialized for `meta.cls` and the given options."""
+    namespace = {
+        'MISSING': _MISSING,
+        'PLAIN': _PLAIN_TYPES,
+        'ALIASES': meta.field_to_alias,
+        'UUID': UUID,
+        'datetime': datetime,
+        'Enum': Enum,
+        'is_dataclass': is_dataclass,
+        'dataclass_values': dataclass_values,
+    }
+    lines = [
+        "def as_dict(self):",
+        "    d = self.__dict__" if meta.has_instance_dict else "    d = {}",
+        "    result = {}",
+    ]
+    for name in meta.field_names:
+        lines += _read_lines(meta, name, 'v', namespace)
+        lines += ["    if v is not MISSING:"]
+        if meta.field_types[name] == 'm2m_list':
+            # Unloaded many-to-many fields are left out of the output
+            lines += ["        if v is not None:"]
+            body_level = 3
+        else:
+            body_level = 2
+        lines += _indent([
+            "if type(v) in PLAIN:",
+            f"    result[{name!r}] = v",
+            "else:",
+        ], body_level)
+        lines += _indent(_field_value_lines(meta, name, cdt, cu), body_level + 1)
+        lines += _indent([f"result[{name!r}] = r"], body_level + 1)
+
+    lines += _read_lines(meta, 'extra', 'extra', namespace)
+    lines += [
+        "    if extra is not MISSING and extra:",
+        "        result.update(extra)",
+        "        result.pop('extra', None)",
+    ]
+
+    if ep:
+        for prop in meta.property_names:
+            lines += [
+                f"    if {prop!r} not in result:",
+                "        try:",
+                f"            pv = {_attribute_access(prop)}",
+            ]
+            if cdt:
+                lines += ["            if isinstance(pv, datetime):",
+                          "                pv = pv.isoformat()"]
+            if cu:
+                lines += ["            if isinstance(pv, UUID):",
+                          "                pv = str(pv)"]
+            lines += [
+                "            if isinstance(pv, Enum):",
+                "                pv = pv.value",
+                f"            result[{prop!r}] = pv",
+                "        except Exception:",
+                "            pass",
+            ]
+
+    if meta.field_to_alias:
+        lines += ["    return {ALIASES.get(k, k): v for k, v in result.items()}"]
+    else:
+        lines += ["    return result"]
+
+    return _compile("\n".join(lines) + "\n", namespace, 'as_dict', meta)
+
+
+def build_from_dict(meta: ModelMetadata) -> Callable[[type, Dict[str, Any]], Any]:
+    """Generate a `from_dict(cls, data)` function specialized for `meta.cls`."""
+    converters = meta.converters
+    namespace: Dict[str, Any] = {
+        'FIELDS': meta.field_name_set,
+        'ALIASES': meta.alias_to_field,
+        'READ_ONLY_PROPERTIES': meta.read_only_properties,
+    }
+    lines = ["def from_dict(cls, data):"]
+
+    if meta.alias_to_field:
+        # Alias resolution depends on the order of keys in `data`
+        lines += [
+            "    clean = {}",
+            "    for k, v in data.items():",
+            "        k = ALIASES.get(k, k)",
+            "        if k in FIELDS:",
+            "            clean[k] = v",
+        ]
+        for index, name in enumerate(meta.field_names):
+            if name in converters:
+                namespace[f"convert_{index}"] = converters[name]
+                lines += [
+                    f"    if {name!r} in clean:",
+                    f"        clean[{name!r}] = convert_{index}(clean[{name!r}])",
+                ]
+    else:
+        lines += ["    clean = {}"]
+        for index, name in enumerate(meta.field_names):
+            lines += [f"    if {name!r} in data:"]
+            if name in converters:
+                namespace[f"convert_{index}"] = converters[name]
+                lines += [f"        clean[{name!r}] = convert_{index}(data[{name!r}])"]
+            else:
+                lines += [f"        clean[{name!r}] = data[{name!r}]"]
+
+    lines += [
+        "    if not getattr(cls, 'allow_extra', False):",
+        "        return cls(**clean)",
+        "    extra_data = {k: v for k, v in data.items()",
+        "                  if k not in FIELDS and k not in ALIASES and k != 'extra'}",
+        "    if 'extra' in data and isinstance(data['extra'], dict):",
+        "        extra_data.update(data['extra'])",
+        "    instance = cls(**clean)",
+        "    if extra_data:",
+        "        instance.extra = {k: v for k, v in extra_data.items() if k not in READ_ONLY_PROPERTIES}",
+        "    return instance",
+    ]
+    return _compile("\n".join(lines) + "\n", namespace, 'from_dict', meta)
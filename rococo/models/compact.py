@@ -0,0 +1,140 @@
+"""
+`__slots__`-backed (compact) model classes.
+
+Regular model instances keep their field values in a per-instance `__dict__`.
+For bulk reads (hundreds of thousands of rows) that dictionary dominates the
+memory footprint of a model. `compact_model` rebuilds a model dataclass with
+`__slots__` for all its fields, inherited ones included, so its instances
+store field values in fixed slots instead:
+
+    @compact_model
+    @dataclass(kw_only=True)
+    class ExportRow(VersionedModel):
+        name: str = None
+        total: int = 0
+
+Compaction is opt-in: `BaseModel`, `VersionedModel` and undecorated models
+are left as they are. The compact class keeps the bases of the decorated
+class, so it passes their `isinstance()`/`issubclass()` checks as usual.
+Instances still have a `__dict__` from those bases, but it is only created
+when an attribute without a slot is set.
+
+Compact instances allocate no `extra` dictionary until extra fields are set.
+"""
+from dataclasses import InitVar, fields, is_dataclass
+from itertools import chain
+from typing import Iterable, Type, TypeVar
+
+from .metadata import METADATA_ATTR
+
+ModelType = TypeVar('ModelType', bound=type)
+
+# Slots that a class may only declare if no base class provides them
+_LAYOUT_SLOTS = {'__dict__': '__dictoffset__', '__weakref__': '__weakrefoffset__'}
+
+
+def _inherited_slots(bases: Iterable[type]) -> set:
+    slots = set()
+    for klass in chain.from_iterable(base.__mro__[:-1] for base in bases):
+        klass_slots = klass.__dict__.get('__slots__', ())
+        if isinstance(klass_slots, str):
+            klass_slots = (klass_slots,)
+        slots.update(klass_slots)
+    return slots
+
+
+def _functions(value) -> Iterable:
+    """Yield the plain functions behind a class attribute (methods, properties, class/static methods)."""
+    if isinstance(value, (classmethod, staticmethod)):
+        value = value.__func__
+    if isinstance(value, property):
+        yield from (f for f in (value.fget, value.fset, value.fdel) if f is not None)
+    elif hasattr(value, '__code__'):
+        yield value
+
+
+def _rebind_class_cells(old_cls: type, new_cls: type) -> None:
+    """
+    Point the implicit `__class__` cells of methods at the rebuilt class, so
+    zero-argument `super()` keeps working after the class is recreated.
+    """
+    for value in new_cls.__dict__.values():
+        for func in _functions(value):
+            closure = func.__closure__ or ()
+            for name, cell in zip(func.__code__.co_freevars, closure):
+                if name == '__class__' and cell.cell_contents is old_cls:
+                    cell.cell_contents = new_cls
+
+
+def _slotted_class(cls: type, extra_slots: Iterable[str]) -> type:
+    """
+    Build a copy of the dataclass `cls`, on the same bases, with `__slots__` for
+    all its fields.
+
+    Leftover class-level defaults (of fields and `InitVar`s) that would clash
+    with the new slots are dropped; defaults are unaffected, since the generated
+    `__init__` already holds them. Inherited class-level defaults are shadowed
+    by the slots.
+    """
+    bases = cls.__bases__
+    inherited = _inherited_slots(bases)
+    initvars = [
+        name for name, f in cls.__dataclass_fields__.items()
+        if isinstance(f.type, InitVar) or f.type is InitVar
+    ]
+    field_names = [f.name for f in fields(cls)]
+    compact_slots = chain.from_iterable(klass.__dict__.get('_compact_slots', ()) for klass in cls.__mro__)
+
+    slots = tuple(dict.fromkeys(
+        name for name in chain(field_names, extra_slots, compact_slots)
+        if name not in inherited
+        and not (name in _LAYOUT_SLOTS and any(getattr(base, _LAYOUT_SLOTS[name]) for base in bases))))
+
+    cls_dict = dict(cls.__dict__)
+    for name in chain(field_names, initvars, slots):
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict.pop(METADATA_ATTR, None)
+    cls_dict['__slots__'] = slots
+
+    new_cls = type(cls)(cls.__name__, bases, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    _rebind_class_cells(cls, new_cls)
+    return new_cls
+
+
+def add_slots(cls: ModelType, extra_slots: Iterable[str] = ()) -> ModelType:
+    """
+    Recreate the dataclass `cls` with `__slots__` for its fields.
+
+    Unlike `@dataclass(slots=True)`, this also covers inherited fields and
+    rebinds zero-argument `super()` in methods.
+    """
+    if not is_dataclass(cls):
+        raise TypeError(f"{cls.__name__} must be a dataclass to be made compact.")
+    if '__slots__' in cls.__dict__:
+        return cls
+    return _slotted_class(cls, extra_slots)
+
+
+def compact_model(cls: ModelType = None, *, extra_slots: Iterable[str] = ()):
+    """
+    Class decorator turning a model dataclass into a `__slots__`-backed class.
+
+    Apply it on top of `@dataclass`. Field values live in slots, and there is
+    no `extra` dictionary unless extra fields are actually set. `extra_slots`
+    adds slots for private per-instance attributes.
+    """
+    def wrap(model_cls):
+        return add_slots(model_cls, extra_slots)
+
+    return wrap if cls is None else wrap(cls)
+
+
+def is_compact(cls: Type) -> bool:
+    """Return True if instances of the dataclass `cls` keep all their fields in slots."""
+    if not is_dataclass(cls):
+        return False
+    slots = _inherited_slots((cls,))
+    return all(f.name in slots for f in fields(cls))
@@ -0,0 +1,573 @@
+"""
+Per-class field metadata registry for rococo models.
+
+Model code paths (serialization, hydration, attribute access, validation)
+need the same facts about a model class over and over: its dataclass fields,
+their aliases, resolved type hints, relationship targets and how string
+values coming from the database map back onto typed attributes.
+`get_model_metadata` computes those facts once per class and caches them on
+the class itself, so per-instance work is reduced to dictionary lookups.
+
+Relationship targets given by name (`metadata={'relationship': {'model': 'Person'}}`)
+are resolved once per class by `ModelMetadata.resolve_relationships`, against
+a process-wide cache of the modules models are looked up in.
+"""
+import inspect
+import logging
+import re
+import threading
+from dataclasses import Field, fields
+from datetime import datetime
+from enum import Enum
+from types import FunctionType, MemberDescriptorType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple, Union, get_args, get_origin, get_type_hints
+from uuid import UUID
+
+from dateutil.parser import isoparse
+
+logger = logging.getLogger(__name__)
+
+# Constants for VersionedModel field groups
+BIG_6_FIELDS = {'entity_id', 'version', 'previous_version',
+                'changed_on', 'changed_by_id', 'active'}
+BIG_6_UUID_FIELDS = ['entity_id', 'version',
+                     'previous_version', 'changed_by_id']
+
+# Big 6 fields that cannot be read on partial instances
+PARTIAL_GUARDED_FIELDS = frozenset(BIG_6_FIELDS - {'entity_id'})
+
+REFERENCE_FIELD_TYPES = ('record_id', 'entity_id')
+
+METADATA_ATTR = '__rococo_metadata__'
+
+# Guards relationship resolution and the model modules cache. Re-entrant because
+# loading a models module may define (and resolve) further model classes.
+_RESOLUTION_LOCK = threading.RLock()
+_model_modules: Dict[str, Tuple[Any, ...]] = {}
+
+
+def _convert_uuid(value):
+    """Normalize a Big 6 UUID value to its hex representation."""
+    try:
+        return UUID(value).hex if value and not isinstance(value, UUID) else value
+    except ValueError:
+        logger.info(f"'{value}' is not a valid UUID.")
+        return value
+
+
+# Upper bound on cached key layouts per class (documents may vary in shape)
+_MAX_HYDRATION_PLANS = 64
+
+_HEX_UUID = re.compile(r'[0-9a-f]{32}')
+_UNSET = object()
+
+
+def _convert_uuid_column(values: Sequence[Any]) -> List[Any]:
+    """`_convert_uuid` applied to a whole column; values already in hex form are kept as is."""
+    is_hex = _HEX_UUID.fullmatch
+    return [value if type(value) is str and is_hex(value) else _convert_uuid(value)
+            for value in values]
+
+
+def _enum_converter(enum_type):
+    def convert(value):
+        try:
+            return enum_type(value)
+        except ValueError:
+            # If the string value doesn't match any enum value, leave as is
+            return value
+    return convert
+
+
+def _convert_datetime(value):
+    try:
+        return isoparse(value)
+    except (ValueError, TypeError):
+        # If the string value can't be parsed as datetime, leave as is
+        return value
+
+
+def _convert_datetime_column(values: Sequence[Any]) -> List[Any]:
+    """`_convert_datetime` applied to a whole column, parsing each distinct string once."""
+    parsed = {}
+    result = []
+    for value in values:
+        if isinstance(value, str):
+            converted = parsed.get(value, _UNSET)
+            if converted is _UNSET:
+                converted = parsed[value] = _convert_datetime(value)
+            result.append(converted)
+        else:
+            result.append(value)
+    return result
+
+
+def _column_converter(converter: Callable[[Any], Any]) -> Callable[[Sequence[Any]], List[Any]]:
+    def convert(values):
+        return [converter(value) for value in values]
+    return convert
+
+
+def _is_datetime_type(expected_type) -> bool:
+    """True if `from_dict` only applies datetime parsing to values of this type."""
+    if expected_type is datetime:
+        return True
+    if get_origin(expected_type) is Union:
+        args = get_args(expected_type)
+        return datetime in args and not any(
+            isinstance(arg, type) and issubclass(arg, Enum) for arg in args)
+    return False
+
+
+def _model_converter(model_class):
+    def convert(value):
+        if isinstance(value, list):
+            # Handle list of dict objects -> list of dataclass objects
+            return [model_class(**item) if isinstance(item, dict) else item for item in value]
+        # Handle single dict object -> dataclass object
+        return model_class(**value)
+    return convert
+
+
+def _build_value_converter(expected_type, model_class) -> Optional[Callable[[Any], Any]]:
+    """
+    Build the converter applied by `from_dict` to a non Big 6 field.
+
+    Returns None when values for the field are always passed through as is.
+    """
+    string_converters = []
+    if expected_type:
+        if get_origin(expected_type) is Union:
+            args = get_args(expected_type)
+            # Find the non-None Enum type in the Union (Optional[EnumType])
+            enum_type = next((arg for arg in args if arg is not type(None)
+                              and isinstance(arg, type) and issubclass(arg, Enum)), None)
+            if enum_type:
+                string_converters.append(_enum_converter(enum_type))
+            # Find datetime type in the Union for Optional[datetime]
+            if any(arg is datetime for arg in args):
+                string_converters.append(_convert_datetime)
+        elif isinstance(expected_type, type) and issubclass(expected_type, Enum):
+            string_converters.append(_enum_converter(expected_type))
+        elif expected_type is datetime:
+            string_converters.append(_convert_datetime)
+
+    dict_converter = _model_converter(model_class) if model_class else None
+
+    if not string_converters and dict_converter is None:
+        return None
+
+    def convert(value):
+        if value is None:
+            return value
+        result = value
+        if isinstance(value, str):
+            for string_converter in string_converters:
+                converted = string_converter(value)
+                if converted is not value:
+                    result = converted
+        if dict_converter is not None and isinstance(value, (dict, list)):
+            result = dict_converter(value)
+        return result
+
+    return convert
+
+
+# Types `validate()` casts mismatching values to when `use_type_checking` is on
+_CASTABLE_TYPES = {int, str, float, bool, UUID}
+
+
+def _build_type_checker(name: str, expected_type) -> Callable[[Any, Any], Optional[str]]:
+    """
+    Build the `use_type_checking` check of field `name`, run by `validate()`.
+
+    The check takes the instance and the field value, casts castable values in
+    place and returns an error message, or None if the value is valid.
+    """
+    if get_origin(expected_type) is Union:
+        args = get_args(expected_type)
+        optional = type(None) in args
+        ordered_args = sorted(args, key=lambda x: 0 if x in _CASTABLE_TYPES else 1)
+
+        def check_union(instance, value):
+            if value is None and optional:
+                return None
+            for arg in ordered_args:
+                try:
+                    if isinstance(value, arg):
+                        return None
+                    if arg in _CASTABLE_TYPES or issubclass(arg, Enum):
+                        setattr(instance, name, arg(value))
+                        return None
+                except Exception:
+                    continue
+            return f"Invalid type for '{name}': expected {args}, got {type(value).__name__}"
+
+        return check_union
+
+    def check(instance, value):
+        if value is None:
+            return f"Invalid type for '{name}': expected {expected_type.__name__}, got NoneType"
+        if isinstance(value, expected_type):
+            return None
+        try:
+            if expected_type in _CASTABLE_TYPES or issubclass(expected_type, Enum):
+                setattr(instance, name, expected_type(value))
+            elif isinstance(value, UUID) and expected_type is str:
+                setattr(instance, name, value.hex)
+            else:
+                raise TypeError
+        except Exception:
+            return f"Invalid type for '{name}': expected {expected_type.__name__}, got {type(value).__name__}"
+        return None
+
+    return check
+
+
+def _build_validator_call(cls: type, name: str) -> Optional[Callable[[Any], Any]]:
+    """
+    Build the call of the `validate_<name>` method of `cls`, run by `validate()`.
+
+    Returns None when the class has no such attribute.
+    """
+    attribute = f"validate_{name}"
+    validator = inspect.getattr_static(cls, attribute, None)
+    if validator is None:
+        return None
+    if isinstance(validator, FunctionType):
+        # Plain method: call the function directly instead of binding it every time
+        return validator
+
+    def call(instance):
+        bound = getattr(instance, attribute, None)
+        return bound() if callable(bound) else None
+
+    return call
+
+
+class ModelMetadata:
+    """
+    Precompiled field metadata for a single model class.
+
+    Attributes that depend on type hints are resolved lazily, on first use,
+    because forward references may not be resolvable at class creation time.
+    """
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.dataclass_fields = cls.__dataclass_fields__
+
+        self.fields: Tuple[Field, ...] = fields(cls)
+        self.field_map: Dict[str, Field] = {f.name: f for f in self.fields}
+        # Field names exposed by `Model.fields()`, i.e. without the `extra` container.
+        self.field_names: Tuple[str, ...] = tuple(
+            f.name for f in self.fields if f.name != 'extra')
+        self.field_name_set: FrozenSet[str] = frozenset(self.field_names)
+
+        # Aliases only apply to custom fields, never to the Big 6.
+        self.field_to_alias: Dict[str, str] = {
+            f.name: f.metadata['alias'] for f in self.fields
+            if f.name not in BIG_6_FIELDS and f.metadata.get('alias')
+        }
+        self.alias_to_field: Dict[str, str] = {
+            alias: name for name, alias in self.field_to_alias.items()}
+
+        self.field_types: Dict[str, Optional[str]] = {
+            f.name: f.metadata.get('field_type') for f in self.fields}
+        self.m2m_fields: FrozenSet[str] = frozenset(
+            name for name, field_type in self.field_types.items() if field_type == 'm2m_list')
+        # Names whose reads are checked by VersionedModel (unloaded m2m fields,
+        # Big 6 fields of partial instances). Every other attribute is read
+        # without any Python-level hook.
+        self.guarded_names: FrozenSet[str] = self.m2m_fields | PARTIAL_GUARDED_FIELDS
+        # Fields declared with `metadata={'deferred': True}`, which repositories
+        # leave out of their queries and load on first access.
+        self.deferred_fields: Tuple[str, ...] = tuple(
+            f.name for f in self.fields if f.metadata.get('deferred') and f.name not in BIG_6_FIELDS)
+        self.reference_fields: FrozenSet[str] = frozenset(
+            name for name, field_type in self.field_types.items() if field_type in REFERENCE_FIELD_TYPES)
+        # Nested dataclass models declared via `metadata={'model': ...}`
+        self.model_fields: Dict[str, type] = {
+            f.name: f.metadata['model'] for f in self.fields if f.metadata.get('model')}
+        # Relationship metadata dicts are shared with the dataclass fields, so
+        # model classes resolved from strings are visible through both.
+        self.relationships: Dict[str, Dict[str, Any]] = {
+            f.name: f.metadata['relationship'] for f in self.fields if f.metadata.get('relationship')}
+        self.relationships_resolved: bool = not any(
+            isinstance(relationship.get('model'), str) for relationship in self.relationships.values())
+
+        # Instances of compact models keep (some) field values in __slots__
+        # instead of __dict__. A field lives in a slot when the first class in
+        # the MRO defining its name holds a slot descriptor for it.
+        self.slot_descriptors: Dict[str, MemberDescriptorType] = {}
+        for name in self.field_map:
+            for klass in cls.__mro__:
+                if name in klass.__dict__:
+                    attr = klass.__dict__[name]
+                    # Attribute guards (see VersionedModel) wrap the slot they read from
+                    slot = attr if isinstance(attr, MemberDescriptorType) else getattr(attr, 'slot', None)
+                    if isinstance(slot, MemberDescriptorType):
+                        self.slot_descriptors[name] = slot
+                    break
+        # Whether field values may be in __dict__; when all fields have slots,
+        # reading __dict__ would create it for nothing
+        self.has_instance_dict: bool = cls.__dictoffset__ != 0 and len(self.slot_descriptors) < len(self.field_map)
+
+        self.property_names: Tuple[str, ...] = tuple(
+            name for name in dir(cls)
+            if not name.startswith('_') and isinstance(getattr(cls, name, None), property)
+        )
+        self.read_only_properties: FrozenSet[str] = frozenset(
+            name for name in self.property_names if getattr(cls, name).fset is None)
+
+        self._type_hints: Optional[Dict[str, Any]] = None
+        self._converters: Optional[Dict[str, Callable[[Any], Any]]] = None
+        self._uuid_list_fields: Optional[Tuple[str, ...]] = None
+        self._column_converters: Optional[Dict[str, Callable[[Sequence[Any]], List[Any]]]] = None
+        self._hydration_plans: Dict[Tuple[str, ...], Tuple[Tuple[str, str], ...]] = {}
+        self._compiled_as_dict: Dict[Tuple[bool, bool, bool], Callable] = {}
+        self._compiled_from_dict: Optional[Callable] = None
+        self._validation_plan: Optional[Tuple[Tuple[str, Optional[Callable], Callable], ...]] = None
+
+    @property
+    def type_hints(self) -> Dict[str, Any]:
+        """Resolved type hints of the model class."""
+        if self._type_hints is None:
+            self._type_hints = get_type_hints(self.cls)
+        return self._type_hints
+
+    @property
+    def converters(self) -> Dict[str, Callable[[Any], Any]]:
+        """Per-field converters applied by `from_dict`, keyed by field name."""
+        if self._converters is None:
+            converters = {}
+            hints = self.type_hints
+            for name in self.field_names:
+                if name in BIG_6_UUID_FIELDS:
+                    converters[name] = _convert_uuid
+                    continue
+                converter = _build_value_converter(
+                    hints.get(name), self.model_fields.get(name))
+                if converter is not None:
+                    converters[name] = converter
+            self._converters = converters
+        return self._converters
+
+    @property
+    def column_converters(self) -> Dict[str, Callable[[Sequence[Any]], List[Any]]]:
+        """
+        Per-field converters applied by `from_columns` to a whole column.
+
+        They give the same results as `converters` applied value by value, but
+        UUID normalisation and datetime parsing work on the column at once.
+        """
+        if self._column_converters is None:
+            column_converters = {}
+            hints = self.type_hints
+            for name, converter in self.converters.items():
+                if converter is _convert_uuid:
+                    column_converters[name] = _convert_uuid_column
+                elif name not in self.model_fields and _is_datetime_type(hints.get(name)):
+                    column_converters[name] = _convert_datetime_column
+                else:
+                    column_converters[name] = _column_converter(converter)
+            self._column_converters = column_converters
+        return self._column_converters
+
+    def hydration_plan(self, keys: Sequence[str],
+                       mapping: Optional[Mapping[str, str]] = None) -> Tuple[Tuple[str, str], ...]:
+        """
+        Return the `(field name, source key)` pairs `from_dict` would read from
+        data with the given keys.
+
+        Keys are resolved through `mapping` (source key -> field name) first,
+        then through field aliases; keys that match no field are skipped. When
+        several keys resolve to the same field, the last one wins.
+        """
+        keys = tuple(keys)
+        plan = None if mapping else self._hydration_plans.get(keys)
+        if plan is None:
+            sources = {}
+            for key in keys:
+                name = mapping[key] if mapping and key in mapping else self.alias_to_field.get(key, key)
+                if name in self.field_name_set:
+                    sources[name] = key
+            plan = tuple(sources.items())
+            if not mapping and len(self._hydration_plans) < _MAX_HYDRATION_PLANS:
+                self._hydration_plans[keys] = plan
+        return plan
+
+    @property
+    def uuid_list_fields(self) -> Tuple[str, ...]:
+        """Names of fields annotated as `List[UUID]`."""
+        if self._uuid_list_fields is None:
+            hints = self.type_hints
+            self._uuid_list_fields = tuple(
+                f.name for f in self.fields
+                if getattr(hints.get(f.name), '__origin__', None) is list
+                and UUID in getattr(hints.get(f.name), '__args__', [])
+            )
+        return self._uuid_list_fields
+
+    @property
+    def validation_plan(self) -> Tuple[Tuple[str, Optional[Callable], Callable], ...]:
+        """
+        Steps run by `validate()`, one per field in field order: the field name, the
+        call of its `validate_<name>` method (or None) and its `use_type_checking` check.
+        """
+        if self._validation_plan is None:
+            hints = self.type_hints
+            self._validation_plan = tuple(
+                (name, _build_validator_call(self.cls, name), _build_type_checker(name, hints.get(name)))
+                for name in self.field_names
+            )
+        return self._validation_plan
+
+    def compiled_as_dict(self, convert_datetime_to_iso_string: bool, convert_uuids: bool,
+                         export_properties: bool) -> Callable[[Any], Dict[str, Any]]:
+        """Return the generated `as_dict` function for the given option combination."""
+        options = (bool(convert_datetime_to_iso_string), bool(convert_uuids), bool(export_properties))
+        func = self._compiled_as_dict.get(options)
+        if func is None:
+            from .codegen import build_as_dict
+            func = build_as_dict(self, *options)
+            self._compiled_as_dict[options] = func
+        return func
+
+    def compiled_from_dict(self) -> Callable[[type, Dict[str, Any]], Any]:
+        """Return the generated `from_dict` function of the model class."""
+        if self._compiled_from_dict is None:
+            from .codegen import build_from_dict
+            self._compiled_from_dict = build_from_dict(self)
+        return self._compiled_from_dict
+
+    def instance_values(self, instance) -> Dict[str, Any]:
+        """
+        Return the field values set on `instance` (without `extra`), in field order.
+
+        Values are read from the instance storage directly, bypassing attribute
+        hooks, so unloaded or partial fields are returned as stored.
+        """
+        instance_dict = instance.__dict__ if self.has_instance_dict else {}
+        slots = self.slot_descriptors
+        values = {}
+        for name in self.field_names:
+            descriptor = slots.get(name)
+            if descriptor is None:
+                if name in instance_dict:
+                    values[name] = instance_dict[name]
+            else:
+                try:
+                    values[name] = descriptor.__get__(instance)
+                except AttributeError:
+                    pass
+        return values
+
+    def raw_value(self, instance, name: str, default: Any = None) -> Any:
+        """Return the stored value of field `name` on `instance`, or `default` if unset."""
+        descriptor = self.slot_descriptors.get(name)
+        if descriptor is None:
+            return instance.__dict__.get(name, default) if self.has_instance_dict else default
+        try:
+            return descriptor.__get__(instance)
+        except AttributeError:
+            return default
+
+    def resolve_relationships(self) -> 'ModelMetadata':
+        """
+        Replace relationship model names with the model classes they refer to.
+
+        Runs once per class; later calls return immediately. Names are looked up,
+        in order, in the modules returned by the class' `_relationship_modules()`.
+
+        Raises:
+            ImportError: If a related model class cannot be found.
+        """
+        if self.relationships_resolved:
+            return self
+        with _RESOLUTION_LOCK:
+            if self.relationships_resolved:
+                return self
+            modules = self.cls._relationship_modules()
+            for relationship in self.relationships.values():
+                model_name = relationship.get('model')
+                if not isinstance(model_name, str):
+                    continue
+                model_cls = None
+                for module in modules:
+                    model_cls = getattr(module, model_name, None) if module else None
+                    if model_cls:
+                        break
+                if not model_cls:
+                    raise ImportError(
+                        f"Unable to import {model_name} class from current/module/models.")
+                relationship['model'] = model_cls
+            self.relationships_resolved = True
+        return self
+
+    def get_field(self, name: str) -> Optional[Field]:
+        """Return the dataclass field called `name`, or None."""
+        return self.field_map.get(name)
+
+
+def dataclass_values(instance) -> Dict[str, Any]:
+    """Return the field values set on a dataclass instance, whether it keeps them in `__dict__` or in slots."""
+    values = {}
+    for f in fields(instance):
+        try:
+            values[f.name] = getattr(instance, f.name)
+        except AttributeError:
+            pass
+    return values
+
+
+def get_model_metadata(cls: type) -> ModelMetadata:
+    """
+    Return the cached `ModelMetadata` for a model class, building it on first use.
+
+    The registry entry lives in the class' own namespace, so subclasses never
+    share their parent's entry, and it is rebuilt automatically if the class is
+    re-processed by `@dataclass` (which replaces `__dataclass_fields__`).
+    """
+    meta = cls.__dict__.get(METADATA_ATTR)
+    if meta is None or meta.cls is not cls or meta.dataclass_fields is not cls.__dataclass_fields__:
+        meta = ModelMetadata(cls)
+        setattr(cls, METADATA_ATTR, meta)
+        install_guards = getattr(cls, '_install_attribute_guards', None)
+        if install_guards is not None:
+            install_guards(meta)
+    return meta
+
+
+def invalidate_model_metadata(cls: type) -> None:
+    """
+    Drop the cached metadata of a model class.
+
+    Only needed when a class is changed in place after first use, e.g. when
+    properties are attached to it dynamically.
+    """
+    if METADATA_ATTR in cls.__dict__:
+        delattr(cls, METADATA_ATTR)
+
+
+def get_model_modules(key: str, loader: Callable[[], Tuple[Any, ...]]) -> Tuple[Any, ...]:
+    """
+    Return the modules relationship models are looked up in, loading them once per process.
+
+    `key` identifies the lookup strategy (model families search different
+    packages) and `loader` is only called on the first request for that key.
+    """
+    modules = _model_modules.get(key)
+    if modules is None:
+        with _RESOLUTION_LOCK:
+            modules = _model_modules.get(key)
+            if modules is None:
+                modules = tuple(loader())
+                _model_modules[key] = modules
+    return modules
+
+
+def invalidate_model_modules() -> None:
+    """Forget the cached model modules, e.g. after the `models` package was reloaded."""
+    with _RESOLUTION_LOCK:
+        _model_modules.clear()
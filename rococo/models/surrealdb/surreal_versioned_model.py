@@ -2,8 +2,9 @@ import os
 import pkgutil
 import importlib
 from uuid import UUID
-from dataclasses import dataclass, field, fields
+from dataclasses import dataclass, field
 from rococo.models import VersionedModel
+from rococo.models.metadata import get_model_metadata, get_model_modules
 from rococo.models.versioned_model import get_uuid_hex
 
 
@@ -26,17 +27,18 @@ class SurrealVersionedModel(VersionedModel):
 
     def __post_init__(self, _is_partial):
         self._is_partial = _is_partial
-        for field_obj in fields(self):
-            field_model = field_obj.metadata.get('relationship', {}).get('model')
-            if field_model is not None and isinstance(field_model, str):
-                current_module = importlib.import_module('__main__')
-                models_module = import_models_module(current_module, 'models')
-                rococo_module = importlib.import_module('rococo.models.surrealdb')
-                field_model_cls = getattr(current_module, field_model, None) or  \
-                                    (getattr(models_module, field_model, None) if models_module else None) or \
-                                    (getattr(rococo_module, field_model, None) if rococo_module else None)
-                if not field_model_cls:
-                    raise ImportError(f"Unable to import {field_model} class from current module or models module.")
-
-                field_obj.metadata['relationship']['model'] = field_model_cls
-
+        get_model_metadata(type(self)).resolve_relationships()
+
+    @classmethod
+    def _relationship_modules(cls):
+        """
+        Modules searched, in order, for related model classes given by name:
+        `__main__`, the application's `models` module and `rococo.models.surrealdb`.
+        """
+        def load():
+            current_module = importlib.import_module('__main__')
+            models_module = import_models_module(current_module, 'models')
+            rococo_module = importlib.import_module('rococo.models.surrealdb')
+            return current_module, models_module, rococo_module
+
+        return get_model_modules('rococo.models.surrealdb', load)
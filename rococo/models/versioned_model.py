@@ -3,19 +3,15 @@ import os
 import importlib
 import logging
 from uuid import uuid4, UUID
-from dataclasses import dataclass, field, fields, InitVar, is_dataclass
+from dataclasses import dataclass, field, InitVar, is_dataclass
 from datetime import datetime, timezone
-from dateutil.parser import isoparse
-from typing import Any, Dict, List, Union, get_type_hints, get_origin, get_args
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
 from enum import Enum
+from types import MemberDescriptorType
 
-logger = logging.getLogger(__name__)
+from .metadata import BIG_6_FIELDS, BIG_6_UUID_FIELDS, dataclass_values, get_model_metadata, get_model_modules
 
-# Constants for VersionedModel field groups
-BIG_6_FIELDS = {'entity_id', 'version', 'previous_version',
-                'changed_on', 'changed_by_id', 'active'}
-BIG_6_UUID_FIELDS = ['entity_id', 'version',
-                     'previous_version', 'changed_by_id']
+logger = logging.getLogger(__name__)
 
 
 def default_datetime():
@@ -32,6 +28,23 @@ def get_uuid_hex(_int=None):
     return uuid4().hex if _int is None else UUID(int=_int, version=4).hex
 
 
+def _snapshot_value(value):
+    """Copy mutable containers so in-place changes show up in `changed_fields()`."""
+    if isinstance(value, (list, dict, set)):
+        return value.copy()
+    return value
+
+
+def _value_changed(old, new) -> bool:
+    if old is new:
+        return False
+    try:
+        return bool(old != new)
+    except Exception:
+        # e.g. comparing partial instances of related models
+        return True
+
+
 def import_models_module(current_module, module_name):
     """
     Dynamically import a module named `module_name` from the same tree as `current_module`
@@ -66,18 +79,27 @@ class ModelValidationError(Exception):
 
     Attributes:
         errors (list): A list of error messages returned from validation methods.
+        errors_by_index (dict): For `validate_many`, the error messages of each
+            invalid instance, keyed by its position.
     """
 
-    def __init__(self, errors):
+    def __init__(self, errors, errors_by_index=None):
         # Ensure errors is a list of messages
         if isinstance(errors, str):
             errors = [errors]  # Convert a single string to a list
         elif not isinstance(errors, list):
             raise ValueError("Errors should be a string or a list of strings")
         self.errors = errors
+        self.errors_by_index = errors_by_index or {}
         # Call the base class constructor with a formatted error message
         super().__init__(self.format_errors())
 
+    @classmethod
+    def for_instances(cls, errors_by_index: Dict[int, List[str]]) -> "ModelValidationError":
+        """Builds the error of many instances, prefixing each message with its instance position."""
+        return cls([f"[{index}] {error}" for index, errors in errors_by_index.items() for error in errors],
+                   errors_by_index=errors_by_index)
+
     def format_errors(self):
         # Format the error messages as a single string
         return "\n".join(self.errors)
@@ -126,52 +148,70 @@ class BaseModel:
                            metadata={'field_type': 'entity_id'})
     extra: Dict[str, Any] = field(default_factory=dict)
 
+    # Private per-instance attributes of compact instances (see rococo.models.compact)
+    _compact_slots = ('_is_partial', '_attributes', '_loaded_state', '_deferred_loader')
+
     def __post_init__(self):
         """
         Post-initialization hook for the BaseModel class.
-        Resolves related model classes from strings specified in field metadata.
-        """
-        current_module = importlib.import_module('__main__')
-        models_module = import_models_module(current_module, 'models')
-        rococo_module = importlib.import_module('rococo.models')
-
-        for f in fields(self):
-            # Resolve and load related model classes if specified as string in metadata
-            metadata = f.metadata.get('relationship', {})
-            model_name = metadata.get('model')
-            if isinstance(model_name, str):
-                field_model_cls = (
-                    getattr(current_module, model_name, None)
-                    or (getattr(models_module, model_name, None) if models_module else None)
-                    or (getattr(rococo_module, model_name, None) if rococo_module else None)
-                )
-                if not field_model_cls:
-                    raise ImportError(
-                        f"Unable to import {model_name} class from current/module/models.")
-                metadata['model'] = field_model_cls
-
-            # Handle list of uuid.UUID specifically
-            hint = get_type_hints(self.__class__).get(f.name)
-            if getattr(hint, '__origin__', None) is list and UUID in getattr(hint, '__args__', []):
-                value = getattr(self, f.name)
-                if value is None:
-                    setattr(self, f.name, [])
-                elif isinstance(value, str):
-                    try:
-                        uuid_list = [UUID(u.strip())
-                                     for u in value[1:-1].split(',') if u.strip()]
-                        setattr(self, f.name, uuid_list)
-                    except ValueError:
-                        logger.info(
-                            f"Invalid UUIDs in list for field '{f.name}'")
+        Resolves related model classes from strings specified in field metadata
+        (once per class, see `ModelMetadata.resolve_relationships`).
+        """
+        meta = get_model_metadata(type(self)).resolve_relationships()
+
+        if not meta.has_instance_dict and not self.extra:
+            # Compact instances carry no extra dict until extra fields are set
+            object.__delattr__(self, 'extra')
+
+        # Handle list of uuid.UUID specifically
+        for name in meta.uuid_list_fields:
+            value = getattr(self, name)
+            if value is None:
+                setattr(self, name, [])
+            elif isinstance(value, str):
+                try:
+                    uuid_list = [UUID(u.strip())
+                                 for u in value[1:-1].split(',') if u.strip()]
+                    setattr(self, name, uuid_list)
+                except ValueError:
+                    logger.info(
+                        f"Invalid UUIDs in list for field '{name}'")
+
+    @classmethod
+    def _relationship_modules(cls):
+        """
+        Modules searched, in order, for related model classes given by name:
+        `__main__`, the application's `models` module and `rococo.models`.
+        """
+        def load():
+            current_module = importlib.import_module('__main__')
+            models_module = import_models_module(current_module, 'models')
+            rococo_module = importlib.import_module('rococo.models')
+            return current_module, models_module, rococo_module
+
+        return get_model_modules('rococo.models', load)
 
     def __getattr__(self, name):
         """
         Called when an attribute is not found through normal lookup.
         This handles extra fields for models that allow them.
         """
-        f = next((f for f in fields(type(self)) if f.name == name), None)
-        if f and f.metadata.get('field_type') == 'm2m_list':
+        if name == 'extra':
+            extra = {}
+            object.__setattr__(self, 'extra', extra)
+            return extra
+        if name == '_is_partial':
+            return False
+        if name in ('_loaded_state', '_deferred_loader'):
+            return None
+        try:
+            attributes = object.__getattribute__(self, '_attributes')
+        except AttributeError:
+            attributes = None
+        if attributes and name in attributes:
+            return attributes[name]
+
+        if name in get_model_metadata(type(self)).m2m_fields:
             raise AttributeError(
                 f"Many-to-many field '{name}' is not loaded.")
 
@@ -200,22 +240,20 @@ class BaseModel:
         store it in the extra dict.
         Skip setting calculated properties (properties without setters).
         """
-        # Check if this is a calculated property (property without setter)
-        if not name.startswith('_'):
-            attr = getattr(type(self), name, None)
-            if isinstance(attr, property) and attr.fset is None:
-                # This is a calculated property (read-only), skip setting it
-                return
+        # Always allow setting private attributes
+        if name.startswith('_'):
+            self._set_attribute(name, value)
+            return
 
-        # Get model fields (but handle the case where fields() might not be available yet)
-        try:
-            model_fields = self.fields()
-        except:
-            # During initialization, fields() might not work yet
-            model_fields = [f.name for f in fields(type(self))]
+        meta = get_model_metadata(type(self))
+
+        # Check if this is a calculated property (property without setter)
+        if name in meta.read_only_properties:
+            # This is a calculated property (read-only), skip setting it
+            return
 
-        # Always allow setting defined model fields and private attributes
-        if name.startswith('_') or name in model_fields:
+        # Always allow setting defined model fields
+        if name in meta.field_name_set:
             object.__setattr__(self, name, value)
         elif getattr(type(self), 'allow_extra', False) and name != 'extra':
             # Initialize extra dict if it doesn't exist
@@ -227,14 +265,29 @@ class BaseModel:
             extra[name] = value
         else:
             # Default behavior - set the attribute normally
+            self._set_attribute(name, value)
+
+    def _set_attribute(self, name: str, value):
+        """
+        Set an attribute on the instance. Compact instances have no __dict__, so
+        attributes without a slot are kept in a lazily created `_attributes` dict.
+        """
+        try:
             object.__setattr__(self, name, value)
+        except AttributeError:
+            try:
+                attributes = object.__getattribute__(self, '_attributes')
+            except AttributeError:
+                attributes = {}
+                object.__setattr__(self, '_attributes', attributes)
+            attributes[name] = value
 
     def __repr__(self) -> str:
         """
         Return a string representation of the BaseModel instance.
         """
         field_strings = []
-        for f in fields(type(self)):
+        for f in get_model_metadata(type(self)).fields:
             try:
                 value = getattr(self, f.name)
                 if f.metadata.get('field_type') == 'm2m_list' and value is not None:
@@ -254,7 +307,7 @@ class BaseModel:
         Returns:
             List[str]: A list of field names.
         """
-        return [f.name for f in fields(cls) if f.name != 'extra']
+        return list(get_model_metadata(cls).field_names)
 
     def as_dict(self, convert_datetime_to_iso_string: bool = False, convert_uuids: bool = True, export_properties: bool = True) -> Dict[str, Any]:
         """
@@ -268,20 +321,25 @@ class BaseModel:
         Returns:
             Dict[str, Any]: A dictionary representation of this model.
         """
-        result = {k: v for k, v in self.__dict__.items() if k in self.fields()}
+        meta = get_model_metadata(type(self))
+        if getattr(type(self), 'use_compiled_converters', False):
+            return meta.compiled_as_dict(
+                convert_datetime_to_iso_string, convert_uuids, export_properties)(self)
+
+        result = meta.instance_values(self)
         keys_to_remove = []
 
         for k, v in result.items():
-            f = next((f for f in fields(type(self)) if f.name == k), None)
+            field_type = meta.field_types[k]
 
-            if f.metadata.get('field_type') == 'm2m_list':
+            if field_type == 'm2m_list':
                 if v is None:
                     keys_to_remove.append(k)
                 elif isinstance(v, list):
                     result[k] = [obj.as_dict(
                         convert_datetime_to_iso_string) for obj in v]
 
-            elif f.metadata.get('field_type') in ['record_id', 'entity_id']:
+            elif field_type in ('record_id', 'entity_id'):
                 # Handle references or nested models
                 if hasattr(v, 'as_dict'):
                     is_partial = getattr(v, '_is_partial', False)
@@ -307,25 +365,24 @@ class BaseModel:
                 result[k] = v.value
 
             # Convert dataclass fields with 'model' metadata
-            f = next((f for f in fields(type(self)) if f.name == k), None)
-            if f and f.metadata.get('model') and v is not None:
-                model_class = f.metadata['model']
+            if v is not None and k in meta.model_fields:
                 if isinstance(v, list):
                     # Handle list of dataclass objects
                     result[k] = [
-                        obj.__dict__ if is_dataclass(obj) else obj
+                        dataclass_values(obj) if is_dataclass(obj) else obj
                         for obj in v
                     ]
                 elif is_dataclass(v):
                     # Handle single dataclass object
-                    result[k] = v.__dict__
+                    result[k] = dataclass_values(v)
 
         for k in keys_to_remove:
             result.pop(k, None)
 
         # Handle extra fields - unwrap them into the result dict
-        if hasattr(self, 'extra') and self.extra:
-            for extra_key, extra_value in self.extra.items():
+        extra = meta.raw_value(self, 'extra')
+        if extra:
+            for extra_key, extra_value in extra.items():
                 result[extra_key] = extra_value
 
         # Remove the 'extra' field itself from the result
@@ -333,149 +390,70 @@ class BaseModel:
 
         # Export properties if requested
         if export_properties:
-            for attr_name in dir(type(self)):
-                # Skip private attributes and methods
-                if attr_name.startswith('_'):
-                    continue
-
-                # Get the attribute from the class
-                attr = getattr(type(self), attr_name, None)
-
-                # Check if it's a property
-                if isinstance(attr, property):
-                    # Skip if it's already in the result (from regular fields)
-                    if attr_name not in result:
-                        try:
-                            # Get the property value
-                            prop_value = getattr(self, attr_name)
-
-                            # Apply the same conversions as regular fields
-                            if convert_datetime_to_iso_string and isinstance(prop_value, datetime):
-                                prop_value = prop_value.isoformat()
-                            if convert_uuids and isinstance(prop_value, UUID):
-                                prop_value = str(prop_value)
-                            if isinstance(prop_value, Enum):
-                                prop_value = prop_value.value
-
-                            result[attr_name] = prop_value
-                        except Exception:
-                            # Skip properties that raise exceptions when accessed
-                            pass
+            for attr_name in meta.property_names:
+                # Skip if it's already in the result (from regular fields)
+                if attr_name not in result:
+                    try:
+                        # Get the property value
+                        prop_value = getattr(self, attr_name)
+
+                        # Apply the same conversions as regular fields
+                        if convert_datetime_to_iso_string and isinstance(prop_value, datetime):
+                            prop_value = prop_value.isoformat()
+                        if convert_uuids and isinstance(prop_value, UUID):
+                            prop_value = str(prop_value)
+                        if isinstance(prop_value, Enum):
+                            prop_value = prop_value.value
+
+                        result[attr_name] = prop_value
+                    except Exception:
+                        # Skip properties that raise exceptions when accessed
+                        pass
 
         # Apply field aliases for serialization (only for custom fields, not Big 6)
-        aliased_result = {}
-        for k, v in result.items():
-            if k not in BIG_6_FIELDS:
-                f = next((f for f in fields(type(self)) if f.name == k), None)
-                if f and f.metadata.get('alias'):
-                    # Use alias as the key in the output
-                    aliased_result[f.metadata['alias']] = v
-                else:
-                    # Use original field name
-                    aliased_result[k] = v
-            else:
-                # Big 6 fields always use original names
-                aliased_result[k] = v
-
-        return aliased_result
+        field_to_alias = meta.field_to_alias
+        if not field_to_alias:
+            return result
+        return {field_to_alias.get(k, k): v for k, v in result.items()}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "BaseModel":
         """
         Load model from dict
         """
-        # Handle field aliases for deserialization (only for custom fields, not Big 6)
-        # Create a mapping from alias to field name for custom fields
-        alias_to_field = {}
-        for f in fields(cls):
-            if f.name not in BIG_6_FIELDS and f.metadata.get('alias'):
-                alias_to_field[f.metadata['alias']] = f.name
-
-        # Convert aliased keys back to field names
-        converted_data = {}
-        for k, v in data.items():
-            if k in alias_to_field:
-                # Use the original field name
-                converted_data[alias_to_field[k]] = v
-            else:
-                # Use the key as-is
-                converted_data[k] = v
+        meta = get_model_metadata(cls)
+        if getattr(cls, 'use_compiled_converters', False):
+            instance = meta.compiled_from_dict()(cls, data)
+            if getattr(cls, 'track_changes', False):
+                instance.clear_changed_fields()
+            return instance
 
-        clean_data = {k: v for k, v in converted_data.items()
-                      if k in cls.fields()}
-        hints = get_type_hints(cls)
+        # Handle field aliases for deserialization (only for custom fields, not Big 6)
+        alias_to_field = meta.alias_to_field
+        model_fields = meta.field_name_set
+        if alias_to_field:
+            # Convert aliased keys back to field names
+            clean_data = {}
+            for k, v in data.items():
+                k = alias_to_field.get(k, k)
+                if k in model_fields:
+                    clean_data[k] = v
+        else:
+            clean_data = {k: v for k, v in data.items() if k in model_fields}
 
+        converters = meta.converters
         for k, v in clean_data.items():
-            if k in BIG_6_UUID_FIELDS:
-                try:
-                    clean_data[k] = UUID(
-                        v).hex if v and not isinstance(v, UUID) else v
-                except ValueError:
-                    logger.info(f"'{v}' is not a valid UUID.")
-
-            # Handle enum conversion from string values and datetime conversion from ISO strings
-            elif v is not None:
-                expected_type = hints.get(k)
-                if expected_type:
-                    # Handle Optional[EnumType] (Union[EnumType, None])
-                    origin = get_origin(expected_type)
-                    if origin is Union:
-                        args = get_args(expected_type)
-                        # Find the non-None type in the Union
-                        enum_type = next((arg for arg in args if arg is not type(
-                            None) and isinstance(arg, type) and issubclass(arg, Enum)), None)
-                        if enum_type and isinstance(v, str):
-                            try:
-                                clean_data[k] = enum_type(v)
-                            except ValueError:
-                                # If the string value doesn't match any enum value, leave as is
-                                pass
-                        # Find datetime type in the Union for Optional[datetime]
-                        datetime_type = next(
-                            (arg for arg in args if arg is datetime), None)
-                        if datetime_type and isinstance(v, str):
-                            try:
-                                clean_data[k] = isoparse(v)
-                            except (ValueError, TypeError):
-                                # If the string value can't be parsed as datetime, leave as is
-                                pass
-                    # Handle direct enum types
-                    elif isinstance(expected_type, type) and issubclass(expected_type, Enum) and isinstance(v, str):
-                        try:
-                            clean_data[k] = expected_type(v)
-                        except ValueError:
-                            # If the string value doesn't match any enum value, leave as is
-                            pass
-                    # Handle direct datetime types
-                    elif expected_type is datetime and isinstance(v, str):
-                        try:
-                            clean_data[k] = isoparse(v)
-                        except (ValueError, TypeError):
-                            # If the string value can't be parsed as datetime, leave as is
-                            pass
-
-                # Handle dataclass conversion from dict values
-                f = next((f for f in fields(cls) if f.name == k), None)
-                if f and f.metadata.get('model') and isinstance(v, (dict, list)):
-                    model_class = f.metadata['model']
-                    if isinstance(v, list):
-                        # Handle list of dict objects -> list of dataclass objects
-                        clean_data[k] = [
-                            model_class(**item) if isinstance(item,
-                                                              dict) else item
-                            for item in v
-                        ]
-                    elif isinstance(v, dict):
-                        # Handle single dict object -> dataclass object
-                        clean_data[k] = model_class(**v)
+            converter = converters.get(k)
+            if converter is not None:
+                clean_data[k] = converter(v)
 
         # Handle extra fields if the model allows them
         extra_data = {}
         if getattr(cls, 'allow_extra', False):
             # Collect fields that are not in the model definition
-            model_fields = cls.fields()
             for k, v in data.items():
-                if k not in model_fields and k != 'extra':  # Don't include 'extra' itself
+                # Don't include 'extra' itself or aliased fields
+                if k not in model_fields and k not in alias_to_field and k != 'extra':
                     extra_data[k] = v
 
             # Also handle explicit 'extra' field from data
@@ -487,76 +465,294 @@ class BaseModel:
 
         # Set extra fields directly (not nested), but skip calculated properties
         if extra_data:
-            filtered_extra_data = {}
-            for k, v in extra_data.items():
-                # Check if this is a calculated property (property without setter)
-                attr = getattr(cls, k, None)
-                if isinstance(attr, property) and attr.fset is None:
-                    # This is a calculated property (read-only), skip setting it
-                    continue
-                filtered_extra_data[k] = v
-
+            read_only_properties = meta.read_only_properties
             # Replace the entire extra dict to avoid nesting
-            instance.extra = filtered_extra_data
+            instance.extra = {k: v for k, v in extra_data.items()
+                              if k not in read_only_properties}
 
+        if getattr(cls, 'track_changes', False):
+            instance.clear_changed_fields()
         return instance
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]],
+                  mapping: Optional[Dict[str, str]] = None) -> List["BaseModel"]:
+        """
+        Load a batch of models from a list of dicts, e.g. rows fetched from a database.
+
+        Gives the same instances as calling `from_dict` on every row, but the
+        key-to-field resolution and converters are worked out once per batch and
+        values are converted a column at a time (see `from_columns`).
+
+        Args:
+            rows: Row dicts. Rows with different keys are handled separately.
+            mapping (optional): Source key -> field name, checked before field aliases.
+
+        Returns:
+            List[BaseModel]: One instance per row, in order.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if cls._has_custom_from_dict():
+            return [cls.from_dict(cls._map_keys(row, mapping)) for row in rows]
+
+        layouts: Dict[tuple, List[int]] = {}
+        for index, row in enumerate(rows):
+            layouts.setdefault(tuple(row), []).append(index)
+
+        if len(layouts) == 1:
+            keys = next(iter(layouts))
+            return cls.from_columns({key: [row[key] for row in rows] for key in keys}, mapping)
+
+        instances = [None] * len(rows)
+        for keys, indexes in layouts.items():
+            columns = {key: [rows[index][key] for index in indexes] for key in keys}
+            for index, instance in zip(indexes, cls.from_columns(columns, mapping)):
+                instances[index] = instance
+        return instances
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence[Any]],
+                     mapping: Optional[Dict[str, str]] = None) -> List["BaseModel"]:
+        """
+        Load a batch of models from column arrays.
+
+        Args:
+            columns: Column name -> list of values; all columns have the same length.
+            mapping (optional): Column name -> field name, checked before field aliases.
+
+        Returns:
+            List[BaseModel]: One instance per position in the columns.
+        """
+        if not columns:
+            return []
+        count = len(next(iter(columns.values())))
+        if cls._has_custom_from_dict():
+            keys = list(columns)
+            return [cls.from_dict(cls._map_keys({key: columns[key][i] for key in keys}, mapping))
+                    for i in range(count)]
+
+        meta = get_model_metadata(cls)
+        column_converters = meta.column_converters
+        names = []
+        values = []
+        for name, key in meta.hydration_plan(columns, mapping):
+            converter = column_converters.get(name)
+            names.append(name)
+            values.append(converter(columns[key]) if converter is not None else columns[key])
+
+        if names:
+            instances = [cls(**dict(zip(names, row))) for row in zip(*values)]
+        else:
+            instances = [cls() for _ in range(count)]
+
+        if getattr(cls, 'allow_extra', False):
+            # Same extra field handling as from_dict, row by row
+            extra_keys = [key for key in columns
+                          if key not in meta.field_name_set and key not in meta.alias_to_field
+                          and key != 'extra' and not (mapping and key in mapping)]
+            explicit_extra = columns.get('extra')
+            read_only_properties = meta.read_only_properties
+            for i, instance in enumerate(instances):
+                extra_data = {key: columns[key][i] for key in extra_keys}
+                if explicit_extra is not None and isinstance(explicit_extra[i], dict):
+                    extra_data.update(explicit_extra[i])
+                if extra_data:
+                    instance.extra = {k: v for k, v in extra_data.items()
+                                      if k not in read_only_properties}
+
+        if getattr(cls, 'track_changes', False):
+            for instance in instances:
+                instance.clear_changed_fields()
+        return instances
+
+    @classmethod
+    def _has_custom_from_dict(cls) -> bool:
+        """True if a subclass overrides `from_dict`, which batch loading must then honour."""
+        return getattr(cls.from_dict, '__func__', None) is not BaseModel.from_dict.__func__
+
+    @staticmethod
+    def _map_keys(data: Dict[str, Any], mapping: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        if not mapping:
+            return data
+        return {mapping.get(k, k): v for k, v in data.items()}
+
+    def _tracked_values(self) -> Dict[str, Any]:
+        """Field values compared by `changed_fields()`, plus `extra` when it holds anything."""
+        meta = get_model_metadata(type(self))
+        values = meta.instance_values(self)
+        values.pop('extra', None)
+        extra = meta.raw_value(self, 'extra')
+        if extra:
+            values['extra'] = extra
+        return values
+
+    def changed_fields(self) -> List[str]:
+        """
+        Return the names of the fields changed since the instance was loaded or last saved.
+
+        Models record their loaded values when the class sets `track_changes = True`
+        (or after `clear_changed_fields()`); until then every set field is reported.
+        Changes to extra fields are reported as `extra`. Lists, dicts and sets are
+        compared against a shallow copy, so in-place changes to them are detected too.
+        """
+        current = self._tracked_values()
+        loaded = self._loaded_state
+        if loaded is None:
+            return list(current)
+
+        changed = [name for name, value in current.items()
+                   if name not in loaded or _value_changed(loaded[name], value)]
+        changed.extend(name for name in loaded if name not in current)
+        return changed
+
+    def clear_changed_fields(self):
+        """Record the current field values as the unchanged state."""
+        self._loaded_state = {name: _snapshot_value(value)
+                              for name, value in self._tracked_values().items()}
+
+    @classmethod
+    def _install_attribute_guards(cls, meta):
+        """Install the guards loading deferred fields on first access (see `_DeferredGuard`)."""
+        for name in meta.deferred_fields:
+            _install_guard(cls, name, _DeferredGuard)
+
+    @classmethod
+    def set_deferred_loader(cls, instances: Iterable["BaseModel"],
+                            load: Callable[[List["BaseModel"], List[str]], List["BaseModel"]]):
+        """
+        Mark the deferred fields of `instances` as not loaded.
+
+        Used by repositories that leave deferred fields out of their queries.
+        The fields are fetched on first access, or with `undefer()`, by calling
+        `load(instances, names)`, which returns model instances holding the
+        values of fields `names`.
+        """
+        meta = get_model_metadata(cls)
+        if not meta.deferred_fields:
+            return
+        loader = _DeferredLoader(load)
+        for instance in instances:
+            loaded_state = instance._loaded_state
+            for name in meta.deferred_fields:
+                try:
+                    object.__delattr__(instance, name)
+                except AttributeError:
+                    pass
+                if loaded_state is not None:
+                    loaded_state.pop(name, None)
+            instance._deferred_loader = loader
+
+    def unloaded_fields(self) -> List[str]:
+        """Return the deferred fields of this instance that are not loaded yet."""
+        if self._deferred_loader is None:
+            return []
+        meta = get_model_metadata(type(self))
+        return [name for name in meta.deferred_fields
+                if meta.raw_value(self, name, _MISSING) is _MISSING]
+
+    @classmethod
+    def undefer(cls, instances: Iterable["BaseModel"], fields: Optional[Iterable[str]] = None):
+        """
+        Load the deferred fields of `instances` that are not loaded yet.
+
+        Instances returned by the same repository query are loaded with a single
+        query, instead of one query per instance and field on first access.
+
+        Args:
+            instances: Model instances, e.g. the result of a repository `get_many()`.
+            fields (optional): Deferred fields to load. Defaults to all of them.
+        """
+        wanted = None if fields is None else set(fields)
+        groups: Dict[Any, tuple] = {}
+        for instance in instances:
+            loader = instance._deferred_loader
+            if loader is None:
+                continue
+            names = [name for name in instance.unloaded_fields() if wanted is None or name in wanted]
+            if names:
+                members, group_names = groups.setdefault(loader, ([], set()))
+                members.append((instance, names))
+                group_names.update(names)
+
+        for loader, (members, group_names) in groups.items():
+            meta = get_model_metadata(type(members[0][0]))
+            names = [name for name in meta.deferred_fields if name in group_names]
+            loaded = {source.entity_id: source
+                      for source in loader([instance for instance, _ in members], names)}
+            for instance, instance_names in members:
+                instance._set_deferred_values(loaded.get(instance.entity_id), instance_names)
+
+    def _set_deferred_values(self, source: Optional["BaseModel"], names: List[str]):
+        """Copy the deferred fields `names` from `source`, as loaded from the database."""
+        meta = get_model_metadata(type(self))
+        loaded_state = self._loaded_state
+        for name in names:
+            value = _MISSING if source is None else meta.raw_value(source, name, _MISSING)
+            if value is _MISSING:
+                continue
+            object.__setattr__(self, name, value)
+            if loaded_state is not None:
+                loaded_state[name] = _snapshot_value(value)
+        if all(name in names for name in self.unloaded_fields()):
+            # Everything was fetched once; fields still unset keep their defaults
+            self._deferred_loader = None
+
     def validate(self):
         """
         Validate all fields by calling corresponding `validate_<field_name>` methods if defined,
         and validate the type of each field. Raise `ModelValidationError` if any validations fail.
         """
-        errors = []
-        hints = get_type_hints(type(self))
-        castable = {int, str, float, bool, UUID}
+        errors = self._validation_errors()
+        if errors:
+            raise ModelValidationError(errors)
 
-        for name in self.fields():
+    def _validation_errors(self) -> List[str]:
+        """Run the validation plan of the model class (see `ModelMetadata.validation_plan`)."""
+        plan = get_model_metadata(type(self)).validation_plan
+        type_checking = getattr(type(self), 'use_type_checking', False)
+        # Deferred fields that were never loaded keep their stored values
+        unloaded = self.unloaded_fields()
+
+        errors = []
+        for name, validator, type_check in plan:
+            if unloaded and name in unloaded:
+                continue
             value = getattr(self, name)
-            expected = hints.get(name)
-            validator = getattr(self, f"validate_{name}", None)
-            if callable(validator):
-                error = validator()
+            if validator is not None:
+                error = validator(self)
                 if error:
                     errors.append(error)
+            if type_checking:
+                error = type_check(self, value)
+                if error:
+                    errors.append(error)
+        return errors
 
-            if not getattr(type(self), 'use_type_checking', False):
-                continue
-
-            origin = get_origin(expected)
-            args = get_args(expected)
+    @classmethod
+    def validate_many(cls, instances: Iterable["BaseModel"]):
+        """
+        Validate many instances at once, e.g. before a bulk save.
 
-            if origin is Union:
-                if value is None and type(None) in args:
-                    continue
-                for arg in sorted(args, key=lambda x: 0 if x in castable else 1):
-                    try:
-                        if isinstance(value, arg):
-                            break
-                        if arg in castable or issubclass(arg, Enum):
-                            setattr(self, name, arg(value))
-                            break
-                    except Exception:
-                        continue
-                else:
-                    errors.append(
-                        f"Invalid type for '{name}': expected {args}, got {type(value).__name__}")
-            elif value is None:
-                errors.append(
-                    f"Invalid type for '{name}': expected {expected.__name__}, got NoneType")
-            elif not isinstance(value, expected):
+        Runs the checks of `validate()` on every instance and raises a single
+        `ModelValidationError` with the errors of all invalid instances, each
+        prefixed with the position of its instance (see `errors_by_index`).
+        """
+        errors_by_index = {}
+        for index, instance in enumerate(instances):
+            if type(instance).validate is BaseModel.validate:
+                errors = instance._validation_errors()
+            else:
+                # Overridden validate(): run it as is
                 try:
-                    if expected in castable or issubclass(expected, Enum):
-                        setattr(self, name, expected(value))
-                    elif isinstance(value, UUID) and expected is str:
-                        setattr(self, name, value.hex)
-                    else:
-                        raise TypeError
-                except Exception:
-                    errors.append(
-                        f"Invalid type for '{name}': expected {expected.__name__}, got {type(value).__name__}")
+                    instance.validate()
+                    errors = None
+                except ModelValidationError as ex:
+                    errors = ex.errors
+            if errors:
+                errors_by_index[index] = errors
 
-        if errors:
-            raise ModelValidationError(errors)
+        if errors_by_index:
+            raise ModelValidationError.for_instances(errors_by_index)
 
     def prepare_for_save(self, changed_by_id: UUID = None):
         """
@@ -583,6 +779,157 @@ class BaseModel:
         return {k: v for k, v in d.items() if k not in excluded}
 
 
+_MISSING = object()
+
+
+class _AttributeGuard:
+    """
+    Data descriptor standing in for a guarded VersionedModel field.
+
+    Values are kept where the field would store them without the guard: in the
+    slot it replaces (`slot`), or in the instance `__dict__` (with `default`
+    being the class-level default it replaces, if any).
+    """
+    __slots__ = ('name', 'slot', 'default')
+
+    def __init__(self, name, current):
+        self.name = name
+        self.slot = current if isinstance(current, MemberDescriptorType) else None
+        self.default = _MISSING if self.slot is not None else current
+
+    def _stored(self, instance):
+        """Value stored on `instance`, without falling back to the class default."""
+        if self.slot is not None:
+            return self.slot.__get__(instance)
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def _get(self, instance):
+        if self.slot is not None:
+            return self.slot.__get__(instance)
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            if self.default is _MISSING:
+                raise AttributeError(self.name) from None
+            return self.default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            if self.default is _MISSING:
+                raise AttributeError(self.name)
+            return self.default
+        return self._get(instance)
+
+    def __set__(self, instance, value):
+        if self.slot is not None:
+            self.slot.__set__(instance, value)
+        else:
+            instance.__dict__[self.name] = value
+
+    def __delete__(self, instance):
+        if self.slot is not None:
+            self.slot.__delete__(instance)
+        else:
+            try:
+                del instance.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+
+
+class _PartialGuard(_AttributeGuard):
+    """Big 6 field, not available on partial instances."""
+    __slots__ = ()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return super().__get__(instance, owner)
+        # Falls back to BaseModel.__getattr__ (False) while _is_partial is not set yet
+        if instance._is_partial:
+            raise AttributeError(
+                f"Attribute '{self.name}' is not available in a partial instance.")
+        if self.slot is not None:
+            return self.slot.__get__(instance)
+        return self._get(instance)
+
+
+class _M2MGuard(_AttributeGuard):
+    """Many-to-many field, not available until loaded."""
+    __slots__ = ()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return super().__get__(instance, owner)
+        try:
+            value = self._get(instance)
+        except AttributeError:
+            # Field doesn't exist, so it's definitely not loaded
+            value = None
+        if value is None:
+            raise AttributeError(
+                f"Many-to-many field '{self.name}' is not loaded.")
+        return value
+
+
+class _DeferredGuard(_AttributeGuard):
+    """Deferred field, loaded on first access if it was left out of the query."""
+    __slots__ = ()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return super().__get__(instance, owner)
+        try:
+            return self._stored(instance)
+        except AttributeError:
+            pass
+        if instance._deferred_loader is not None:
+            type(instance).undefer([instance], [self.name])
+        return self._get(instance)
+
+
+def _install_guard(cls, name, guard_cls):
+    """Set a `guard_cls` guard for field `name` on `cls`, wrapping its slot or default."""
+    owner = next((klass for klass in cls.__mro__ if name in klass.__dict__), None)
+    current = owner.__dict__[name] if owner is not None else _MISSING
+    if type(current) is guard_cls:
+        # Inherited from a class that is already guarded
+        return
+    if isinstance(current, _AttributeGuard):
+        current = current.slot if current.slot is not None else current.default
+    setattr(cls, name, guard_cls(name, current))
+
+
+def _no_loader():
+    return None
+
+
+class _DeferredLoader:
+    """
+    Loader of the deferred fields of the instances returned by one query.
+
+    Copies of the instances share it, and pickled instances drop it: their
+    unloaded deferred fields keep their defaults.
+    """
+    __slots__ = ('load',)
+
+    def __init__(self, load):
+        self.load = load
+
+    def __call__(self, instances, names):
+        return self.load(instances, names)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return _no_loader, ()
+
+
 @dataclass(kw_only=True)
 class VersionedModel(BaseModel):
     """
@@ -655,62 +1002,28 @@ class VersionedModel(BaseModel):
         # Call parent's __post_init__
         super().__post_init__()
 
-    def __getattribute__(self, name):
+    @classmethod
+    def _install_attribute_guards(cls, meta):
         """
-        Override of __getattribute__ to add additional checks for partial instances
-        and many-to-many fields.
-
-        For partial instances (i.e. instances loaded from the database as a
-        foreign key of another model), this method raises an AttributeError if
-        the requested attribute is not the 'entity_id' field.
+        Install the attribute guards of `cls`, once its metadata is built.
 
-        For many-to-many fields, this method raises an AttributeError if the
-        field has not been loaded yet (i.e. its value is None).
+        Only the names in `meta.guarded_names` (many-to-many fields and the Big 6
+        fields that are unavailable on partial instances) get a guard; every
+        other attribute keeps plain attribute access, without a Python-level hook.
         """
-        # Skip checks for private attributes and special methods to avoid recursion
-        if name.startswith('_') or name in ['fields']:
-            return object.__getattribute__(self, name)
-
-        # Handle partial instance restrictions first
-        try:
-            is_partial = object.__getattribute__(self, '_is_partial')
-        except AttributeError:
-            # _is_partial not set yet, continue normally
-            is_partial = False
-
-        if is_partial and name in VersionedModel.fields() and name != 'entity_id':
-            raise AttributeError(
-                f"Attribute '{name}' is not available in a partial instance.")
-
-        # Check for m2m field restrictions
-        try:
-            f = next((f for f in fields(type(self)) if f.name == name), None)
-            if f and f.metadata.get('field_type') == 'm2m_list':
-                # Try to get the value using object.__getattribute__
-                try:
-                    value = object.__getattribute__(self, name)
-                    if value is None:
-                        raise AttributeError(
-                            f"Many-to-many field '{name}' is not loaded.")
-                    return value
-                except AttributeError:
-                    # Field doesn't exist, so it's definitely not loaded
-                    raise AttributeError(
-                        f"Many-to-many field '{name}' is not loaded.")
-        except (TypeError, StopIteration):
-            # fields() might not be available during initialization, continue normally
-            pass
-
-        # Get the value normally
-        return object.__getattribute__(self, name)
+        super()._install_attribute_guards(meta)
+        for name in meta.guarded_names:
+            if name in meta.deferred_fields:
+                continue
+            guard_cls = _M2MGuard if name in meta.m2m_fields else _PartialGuard
+            _install_guard(cls, name, guard_cls)
 
     def __getattr__(self, name):
         """
         Called when an attribute is not found through normal lookup.
         This handles extra fields for models that allow them.
         """
-        f = next((f for f in fields(type(self)) if f.name == name), None)
-        if f and f.metadata.get('field_type') == 'm2m_list':
+        if name in get_model_metadata(type(self)).m2m_fields:
             raise AttributeError(
                 f"Many-to-many field '{name}' is not loaded.")
 
@@ -721,7 +1034,7 @@ class VersionedModel(BaseModel):
             # _is_partial not set yet, continue normally
             is_partial = False
 
-        if is_partial and name in VersionedModel.fields() and name != 'entity_id':
+        if is_partial and name in BIG_6_FIELDS and name != 'entity_id':
             raise AttributeError(
                 f"Attribute '{name}' is not available in a partial instance.")
 
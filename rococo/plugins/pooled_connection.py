@@ -1,25 +1,36 @@
-from dbutils.pooled_db import PooledDB
+from functools import partial
+
 import pymysql
 import psycopg2
 
+from rococo.data.pool import ConnectionPool
+from rococo.repositories.unit_of_work import unit_of_work
+
 
 class PooledConnectionPlugin:
     """
-    A Flask plugin for managing pooled database connections using PooledDB.
+    A Flask plugin for managing pooled database connections using ConnectionPool.
 
     This plugin initializes a database connection pool and integrates it with
-    a Flask application. It provides methods to retrieve pooled connections
-    and ensures connections are properly closed after each request.
+    a Flask application. Each request checks out at most one connection, which
+    its adapters share and which is returned to the pool after the request.
+
+    Use `get_connection` and `connection_closer` as the adapters' hooks:
+
+        PostgreSQLAdapter(..., connection_resolver=plugin.get_connection,
+                          connection_closer=plugin.connection_closer)
     """
 
     SUPPORTED_DATABASES = ("mysql", "postgres")
 
-    def __init__(self, app=None, database_type="mysql"):
+    def __init__(self, app=None, database_type="mysql", use_unit_of_work=False):
         """
         Initialize the plugin with optional Flask app and database configuration.
         
         :param app: Flask app instance
         :param database_type: The type of database to use ("mysql" or "postgres").
+        :param use_unit_of_work: Run each request in a unit of work, so that repositories share
+            an identity map for the request (see rococo.repositories.unit_of_work).
         :raises ValueError: If an unsupported database type is provided.
         """
 
@@ -28,6 +39,7 @@ class PooledConnectionPlugin:
                 f"Invalid database type specified: {database_type}. Must be one of: {self.SUPPORTED_DATABASES}"
             )
         self.database_type = database_type
+        self.use_unit_of_work = use_unit_of_work
 
         self.pool = None
         self.app = app
@@ -37,36 +49,46 @@ class PooledConnectionPlugin:
 
     def init_app(self, app):
         """
-        Initialize the Flask app with the PooledDB instance.
+        Initialize the Flask app with the ConnectionPool instance.
         
         :param app: Flask app instance
         """
 
         # Configure connection pool based on database type.
         if self.database_type == "postgres":
-            pool_config = {
-                "creator": psycopg2,
-                "maxconnections": app.config.get('POSTGRES_POOL_MAX_CONNECTIONS'),
-                "host": app.config.get('POSTGRES_HOST'),
-                "port": app.config.get('POSTGRES_PORT'),
-                "user": app.config.get('POSTGRES_USER'),
-                "password": app.config.get('POSTGRES_PASSWORD'),
-                "database": app.config.get('POSTGRES_DB')
-            }
+            prefix = 'POSTGRES'
+            creator = partial(
+                psycopg2.connect,
+                host=app.config.get('POSTGRES_HOST'),
+                port=app.config.get('POSTGRES_PORT'),
+                user=app.config.get('POSTGRES_USER'),
+                password=app.config.get('POSTGRES_PASSWORD'),
+                database=app.config.get('POSTGRES_DB')
+            )
         else:  # Default to MySQL configuration
-            pool_config = {
-                "creator": pymysql,
-                "maxconnections": app.config.get('MYSQL_POOL_MAX_CONNECTIONS'),
-                "host": app.config.get('MYSQL_HOST'),
-                "port": app.config.get('MYSQL_PORT'),
-                "user": app.config.get('MYSQL_USER'),
-                "password": app.config.get('MYSQL_PASSWORD'),
-                "database": app.config.get('MYSQL_DATABASE'),
-                "cursorclass": app.config.get('MYSQL_CURSORCLASS', pymysql.cursors.DictCursor)
-            }
-
-        self.pool = PooledDB(
-            **pool_config
+            prefix = 'MYSQL'
+            creator = partial(
+                pymysql.connect,
+                host=app.config.get('MYSQL_HOST'),
+                port=app.config.get('MYSQL_PORT'),
+                user=app.config.get('MYSQL_USER'),
+                password=app.config.get('MYSQL_PASSWORD'),
+                database=app.config.get('MYSQL_DATABASE'),
+                cursorclass=app.config.get('MYSQL_CURSORCLASS', pymysql.cursors.DictCursor)
+            )
+
+        pool_config = {
+            "min_size": app.config.get(f'{prefix}_POOL_MIN_CONNECTIONS'),
+            # No limit when unset or 0, as with the PooledDB this plugin used before
+            "max_size": app.config.get(f'{prefix}_POOL_MAX_CONNECTIONS') or None,
+            "idle_timeout": app.config.get(f'{prefix}_POOL_IDLE_TIMEOUT'),
+            "max_lifetime": app.config.get(f'{prefix}_POOL_MAX_LIFETIME'),
+            "checkout_timeout": app.config.get(f'{prefix}_POOL_CHECKOUT_TIMEOUT'),
+        }
+        # Other unset options keep the pool's defaults
+        self.pool = ConnectionPool(
+            lambda **_: creator(),
+            **{key: value for key, value in pool_config.items() if value is not None or key == 'max_size'}
         )
 
          # Store the plugin in Flask app extensions
@@ -75,6 +97,9 @@ class PooledConnectionPlugin:
         # Register teardown function
         app.teardown_appcontext(self._teardown)
 
+        if self.use_unit_of_work:
+            app.before_request(self._begin_unit_of_work)
+
     def get_connection(self, *args, **kwargs):
         """
         Get a database connection from the pool or flask.g object if cached.
@@ -88,10 +113,17 @@ class PooledConnectionPlugin:
         else:
             if not self.pool:
                 raise RuntimeError("Database pool is not initialized. Call init_app() first.")
-            db_conn = self.pool.connection()
+            db_conn = self.pool.checkout()
             g.db_conn = db_conn
             return g.db_conn
 
+    def connection_closer(self, adapter):
+        """
+        `connection_closer` hook of the adapters: the connection stays checked out
+        for the rest of the request, and is returned to the pool on teardown.
+        """
+        adapter._detach_connection()
+
     def _teardown(self, exception):
         """
         Teardown function to close database connections (if any) after a request.
@@ -102,4 +134,18 @@ class PooledConnectionPlugin:
 
         db_conn = g.pop('db_conn', None)
         if db_conn:
-            db_conn.close()  # Return the connection to the pool
+            self.pool.checkin(db_conn)
+
+        request_unit_of_work = g.pop('rococo_unit_of_work', None)
+        if request_unit_of_work is not None:
+            request_unit_of_work.__exit__(None, None, None)
+
+    def _begin_unit_of_work(self):
+        """
+        Before-request function starting the unit of work of the request; the
+        teardown function ends it.
+        """
+        from flask import g
+
+        g.rococo_unit_of_work = unit_of_work()
+        g.rococo_unit_of_work.__enter__()
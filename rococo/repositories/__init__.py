@@ -1 +1,4 @@
-from .base_repository import BaseRepository
\ No newline at end of file
+from .base_repository import BaseRepository
+from .async_base_repository import AsyncBaseRepository
+from .pagination import Page
+from .count import Count
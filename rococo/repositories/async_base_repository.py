@@ -0,0 +1,310 @@
+"""
+asyncio base repository for rococo
+"""
+from typing import Any, Dict, List, Optional, Type, Union
+from uuid import UUID
+
+from rococo.data.async_base import AsyncDbAdapter
+from rococo.messaging.base import MessageAdapter
+from rococo.models.versioned_model import BaseModel, VersionedModel
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.count import Count
+from rococo.repositories.read_cache import ReadCache
+from rococo.repositories.relation_loader import RelationLoader, relation_table_name
+
+
+class AsyncBaseRepository(BaseRepository):
+    """
+    Repository on an `AsyncDbAdapter`: `get_one`, `get_many`, `get_count`, `save`,
+    `save_many` and `delete` are coroutines taking the arguments of the synchronous
+    repositories.
+
+    Model conversion, validation, the read-through cache and the unit-of-work
+    identity map are shared with `BaseRepository`. Database-specific conversions
+    come from the synchronous repository of the database:
+
+        class AsyncPersonRepository(AsyncBaseRepository, PostgreSQLRepository):
+            pass
+
+    Deferred fields are loaded with the rest of the record.
+    """
+
+    def __init__(
+        self,
+        adapter: AsyncDbAdapter,
+        model: Type[BaseModel],
+        message_adapter: MessageAdapter,
+        queue_name: str = 'placeholder',
+        user_id: UUID = None
+    ):
+        super().__init__(adapter, model, message_adapter, queue_name, user_id=user_id)
+
+    async def _execute_within_context_async(
+        self,
+        func,
+        *args,
+        **kwargs
+    ):
+        """Utility method to await adapter methods within the async context manager."""
+        async with self.adapter:
+            return await func(*args, **kwargs)
+
+    async def _cached_read_async(
+        self,
+        kind: str,
+        parts: Any,
+        load,
+        entity_id: Any = None
+    ) -> Any:
+        """`_cached_read()` with a coroutine function `load`."""
+        if self.cache is None:
+            return await load()
+        return await ReadCache(self.cache, self.cache_ttl).read_async(
+            self.table_name, kind, parts, load, entity_id=entity_id)
+
+    async def get_one(
+        self,
+        conditions: Dict[str, Any] = None,
+        fetch_related: List[str] = None
+    ) -> Union[BaseModel, None]:
+        """
+        Fetches a single record from the repository's table based on given conditions.
+
+        :param conditions: filter conditions
+        :param fetch_related: list of related fields to fetch
+        :return: a BaseModel instance if found, None otherwise
+        """
+        cached = self._identity_map_get(conditions, fetch_related)
+        if cached is not None:
+            return cached
+
+        if conditions is not None:
+            conditions = self._adjust_conditions(conditions)
+
+        data = await self._cached_read_async(
+            'one', [conditions],
+            lambda: self._execute_within_context_async(
+                self.adapter.get_one, self.table_name, conditions, active=self._is_versioned_model()),
+            entity_id=self._single_entity_id(conditions)
+        )
+
+        self._process_data_from_db(data)
+
+        if not data:
+            return None
+        instance = self.model.from_dict(data)
+        if fetch_related:
+            await self._load_related_async([instance], fetch_related)
+        return self._identity_map_add([instance], fetch_related)[0]
+
+    async def get_many(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        limit: int = 100,
+        offset: int = 0,
+        fetch_related: List[str] = None
+    ) -> List[BaseModel]:
+        """
+        Fetches multiple records from the repository's table based on given conditions.
+
+        :param conditions: filter conditions
+        :param sort: sort order
+        :param limit: maximum number of records to return
+        :param offset: number of records to skip before returning results
+        :param fetch_related: list of related fields to fetch
+        :return: list of BaseModel instances
+        """
+        limit = self._validate_int(limit, "limit", 0, 100000)
+        offset = self._validate_int(offset, "offset", 0)
+        if conditions is not None:
+            conditions = self._adjust_conditions(conditions)
+
+        records = await self._cached_read_async(
+            'many', [conditions, sort, limit, offset],
+            lambda: self._execute_within_context_async(
+                self.adapter.get_many, self.table_name, conditions, sort, limit, offset,
+                active=self._is_versioned_model())
+        )
+
+        if isinstance(records, dict):
+            records = [records]
+
+        self._process_data_from_db(records)
+
+        instances = self.model.from_rows(records)
+        if fetch_related:
+            await self._load_related_async(instances, fetch_related)
+        return self._identity_map_add(instances, fetch_related)
+
+    async def _load_related_async(self, instances: List[BaseModel], fetch_related: List[str]):
+        """Set the related entities of `fetch_related` on `instances`, one query per related model."""
+        await RelationLoader(self._fetch_related_records_async).load_async(instances, fetch_related)
+
+    async def _fetch_related_records_async(
+        self,
+        relation_model: Type[BaseModel],
+        key_column: str,
+        keys: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetch the records of `relation_model` whose `key_column` is one of `keys` (see RelationLoader)."""
+        return await self._execute_within_context_async(
+            self.adapter.get_many, relation_table_name(relation_model), {key_column: keys},
+            active=issubclass(relation_model, VersionedModel)
+        )
+
+    async def get_count(
+        self,
+        index: Optional[str] = None,
+        query: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
+    ) -> Count:
+        """
+        Retrieves the count of active records in the repository's table that match the given query.
+
+        Args:
+            index (Optional[str], optional): The name of the index to use for the query (passed as a hint). Defaults to None.
+            query (Optional[Dict[str, Any]], optional): Additional query parameters to filter the results. Defaults to None.
+            mode (Optional[str], optional): 'exact', 'cached' or 'estimate' (see rococo.repositories.count).
+                Defaults to the repository's `count_mode`.
+
+        Returns:
+            Count: The count of matching records, with the mode that produced it.
+        """
+        conditions = self._count_conditions(query)
+        options = {'hint': index} if index else {}
+        return await self._count_async(self.table_name, conditions, options, mode)
+
+    async def _count_async(
+        self,
+        table: str,
+        conditions: Dict[str, Any],
+        options: Dict[str, Any] = None,
+        mode: str = None
+    ) -> Count:
+        """`_count()` awaiting the adapter."""
+        mode = self._count_mode(mode)
+
+        if mode == 'estimate':
+            estimate = await self._execute_within_context_async(
+                self.adapter.get_count_estimate, table, conditions)
+            if estimate is not None:
+                return Count(estimate, 'estimate')
+
+        counted = []
+
+        async def count():
+            counted.append(True)
+            return await self._execute_within_context_async(
+                self.adapter.get_count, table, conditions, options=options or None)
+
+        if mode != 'cached':
+            return Count(await count(), 'exact')
+        value = await ReadCache(self._cache_for_counts(), self.cache_ttl).read_async(
+            table, 'count', [conditions, options], count)
+        return Count(value, 'exact' if counted else 'cached')
+
+    async def save(
+        self,
+        instance: BaseModel,
+        send_message: bool = False
+    ) -> BaseModel:
+        """
+        Saves a BaseModel instance to the database.
+
+        :param instance: The BaseModel instance to save.
+        :param send_message: Whether to send a message to the message queue after saving. Defaults to False.
+        :return: The saved BaseModel instance.
+        """
+        self._identity_map_discard([instance])
+        partial_update = self._uses_partial_update(instance)
+        if not partial_update:
+            # The whole record is written, deferred fields included
+            self.model.undefer([instance])
+        data = self._process_data_before_save(instance)
+
+        async with self.adapter:
+            if partial_update:
+                # Partial update of a loaded non-versioned record
+                queries = [await self.adapter.get_update_query(
+                    self.table_name, self._changed_data(instance, data))]
+            elif self._is_versioned_model() and self.use_audit_table:
+                queries = [
+                    await self.adapter.get_move_entity_to_audit_table_query(self.table_name, instance.entity_id),
+                    await self.adapter.get_save_query(self.table_name, data)
+                ]
+            else:
+                queries = [await self.adapter.get_save_query(self.table_name, data)]
+            queries = [query for query in queries if query is not None]
+            if queries:
+                await self.adapter.run_transaction(queries)
+        self._invalidate_cache([instance])
+
+        if getattr(type(instance), 'track_changes', False):
+            instance.clear_changed_fields()
+
+        if send_message:
+            message = instance.as_dict(convert_datetime_to_iso_string=True)
+            self.message_adapter.send_message(self.queue_name, message)
+
+        return instance
+
+    async def save_many(
+        self,
+        instances: List[BaseModel],
+        send_message: bool = False
+    ) -> List[BaseModel]:
+        """
+        Saves many BaseModel instances in one transaction (see BaseRepository.save_many).
+
+        :param instances: The BaseModel instances to save.
+        :param send_message: Whether to send a message per instance to the message queue after saving.
+        :return: The saved BaseModel instances.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+
+        self._identity_map_discard(instances)
+        partial_updates = [self._uses_partial_update(instance) for instance in instances]
+        # Whole records are written, deferred fields included
+        self.model.undefer([instance for instance, partial in zip(instances, partial_updates) if not partial])
+        data_list = self._process_many_before_save(instances)
+
+        async with self.adapter:
+            queries = []
+            for build, args, many in self._save_many_query_builders(instances, data_list, partial_updates):
+                self._collect_queries(queries, await build(*args), many)
+            if queries:
+                await self.adapter.run_transaction(queries)
+        self._invalidate_cache(instances)
+
+        for instance in instances:
+            if getattr(type(instance), 'track_changes', False):
+                instance.clear_changed_fields()
+
+        if send_message:
+            self._send_messages(instances)
+
+        return instances
+
+    async def delete(
+        self,
+        instance: BaseModel
+    ) -> BaseModel:
+        """
+        Deletes a model instance from the database: a soft delete for VersionedModel,
+        a hard delete for non-versioned models.
+
+        :param instance: The model instance to delete.
+        :return: The deleted model instance.
+        """
+        if self._is_versioned_model():
+            instance.active = False
+            return await self.save(instance)
+
+        self._identity_map_discard([instance])
+        async with self.adapter:
+            await self.adapter.hard_delete(self.table_name, instance.entity_id)
+        self._invalidate_cache([instance])
+        return instance
@@ -1,12 +1,19 @@
 """
 base repository for rococo
 """
-import json
 from uuid import UUID
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Type, Union
+from rococo.cache.base import CacheBackend
+from rococo.cache.memory import MemoryCache
 from rococo.data.base import DbAdapter
 from rococo.messaging.base import MessageAdapter
-from rococo.models.versioned_model import BaseModel, VersionedModel
+from rococo.models.metadata import get_model_metadata
+from rococo.models.versioned_model import BaseModel, ModelValidationError, VersionedModel
+from rococo.repositories.count import COUNT_MODES, Count
+from rococo.repositories.pagination import Page, decode_page_token, encode_page_token
+from rococo.repositories.read_cache import ReadCache
+from rococo.repositories.relation_loader import RelationLoader
+from rococo.repositories.unit_of_work import current_identity_map
 
 
 class BaseRepository:
@@ -32,10 +39,22 @@ class BaseRepository:
         self.save_calculated_fields = False
         # Enable auditing by default (only applies to VersionedModel)
         self.use_audit_table = True
+        # Write only changed fields of loaded BaseModel (non-versioned) instances
+        self.partial_updates = False
+        # Rows per multi-row statement in save_many()
+        self.save_batch_size = 1000
         # Ttl field for delete() method
         self.ttl_field = None
         # Ttl (in minutes) for deleted records
         self.ttl_minutes = 0
+        # Read-through cache of get_one/get_many/get_count results (see rococo.cache)
+        self.cache: CacheBackend = None
+        # Expiry (in seconds) of cached results
+        self.cache_ttl = 60
+        # Mode of get_count() calls without one: 'exact', 'cached' or 'estimate' (see rococo.repositories.count)
+        self.count_mode = 'exact'
+        # Cache of counts in 'cached' mode for repositories without a cache
+        self._count_cache = None
 
     def _is_versioned_model(self) -> bool:
         """Check if the repository's model is a VersionedModel (has versioning support)."""
@@ -51,6 +70,93 @@ class BaseRepository:
         with self.adapter:
             return func(*args, **kwargs)
 
+    def _cached_read(
+        self,
+        kind: str,
+        parts: Any,
+        load: Callable[[], Any],
+        entity_id: Any = None,
+        table: str = None
+    ) -> Any:
+        """
+        Returns the result of `load` through the repository's cache, if it has one
+        (see rococo.repositories.read_cache).
+        """
+        if self.cache is None:
+            return load()
+        return ReadCache(self.cache, self.cache_ttl).read(
+            table or self.table_name, kind, parts, load, entity_id=entity_id)
+
+    def _invalidate_cache(self, instances: Iterable[BaseModel], table: str = None):
+        """
+        Drops the cached results saving or deleting `instances` in `table` (the repository's
+        table by default) may have changed.
+        """
+        entity_ids = [instance.entity_id for instance in instances]
+        for cache in (self.cache, self._count_cache):
+            if cache is not None:
+                ReadCache(cache, self.cache_ttl).invalidate(table or self.table_name, entity_ids)
+
+    def _count(
+        self,
+        table: str,
+        conditions: Dict[str, Any],
+        options: Dict[str, Any] = None,
+        mode: str = None
+    ) -> Count:
+        """Counts the records of `table` matching `conditions` in `mode` (see rococo.repositories.count)."""
+        mode = self._count_mode(mode)
+
+        if mode == 'estimate':
+            estimate = self._execute_within_context(self.adapter.get_count_estimate, table, conditions)
+            if estimate is not None:
+                return Count(estimate, 'estimate')
+
+        def count():
+            return self._execute_within_context(
+                self.adapter.get_count,
+                table,
+                conditions,
+                options=options if options else None
+            )
+
+        if mode != 'cached':
+            return Count(count(), 'exact')
+
+        counted = []
+
+        def count_once():
+            counted.append(True)
+            return count()
+
+        value = ReadCache(self._cache_for_counts(), self.cache_ttl).read(
+            table, 'count', [conditions, options], count_once)
+        return Count(value, 'exact' if counted else 'cached')
+
+    def _count_mode(self, mode: str = None) -> str:
+        """The mode of a count: `mode`, else `count_mode`, else 'exact'."""
+        mode = mode or self.count_mode or 'exact'
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Invalid count mode '{mode}'; expected one of {list(COUNT_MODES)}")
+        return mode
+
+    def _count_conditions(self, query: Dict[str, Any] = None) -> Dict[str, Any]:
+        """The conditions of a get_count(query): the latest active versions only, for versioned models."""
+        conditions = {'latest': True, 'active': True} if self._is_versioned_model() else {}
+        if query:
+            conditions.update(self._adjust_conditions(query.copy()))
+        else:
+            conditions = self._adjust_conditions(conditions)
+        return conditions
+
+    def _cache_for_counts(self) -> CacheBackend:
+        """The cache of counts in 'cached' mode: the repository's, or one in process memory."""
+        if self.cache is not None:
+            return self.cache
+        if self._count_cache is None:
+            self._count_cache = MemoryCache(max_entries=1000)
+        return self._count_cache
+
     def _process_data_before_save(
         self,
         instance: BaseModel
@@ -62,6 +168,78 @@ class BaseRepository:
             export_properties=self.save_calculated_fields
         )
 
+    def _process_many_before_save(
+        self,
+        instances: List[BaseModel]
+    ) -> List[Dict[str, Any]]:
+        """
+        Convert many instances with `_process_data_before_save`, raising one
+        `ModelValidationError` for all invalid instances.
+        """
+        data_list = []
+        errors_by_index = {}
+        for index, instance in enumerate(instances):
+            try:
+                data_list.append(self._process_data_before_save(instance))
+            except ModelValidationError as ex:
+                errors_by_index[index] = ex.errors
+        if errors_by_index:
+            raise ModelValidationError.for_instances(errors_by_index)
+        return data_list
+
+    def _send_messages(self, instances: List[BaseModel]):
+        """Publish the saved instances to the message queue in one batch."""
+        messages = [instance.as_dict(convert_datetime_to_iso_string=True) for instance in instances]
+        self.message_adapter.send_messages(self.queue_name, messages)
+
+    def _deferred_columns(self) -> List[str]:
+        """Columns of the model's deferred fields, which queries can leave out."""
+        meta = get_model_metadata(self.model)
+        return [meta.field_to_alias.get(name, name) for name in meta.deferred_fields]
+
+    def _deferred_query_options(self) -> Dict[str, Any]:
+        """SQL adapter `get_one`/`get_many` options leaving deferred fields out of the query."""
+        deferred_columns = self._deferred_columns()
+        return {'exclude_columns': deferred_columns} if deferred_columns else {}
+
+    def _uses_partial_update(self, instance: BaseModel) -> bool:
+        """
+        Whether `instance` is saved by updating its changed fields only. Whole records
+        are saved for versioned models (every save is a new version), instances that
+        were not loaded from the database and adapters without partial update support.
+        """
+        return (self.partial_updates and not self._is_versioned_model()
+                and self.adapter.supports_partial_updates
+                and instance._loaded_state is not None
+                and 'entity_id' not in instance.changed_fields())
+
+    def _changed_data(
+        self,
+        instance: BaseModel,
+        data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Limit `data` to `entity_id` and the fields changed since `instance` was loaded or last saved."""
+        changed = set(instance.changed_fields())
+        meta = get_model_metadata(type(instance))
+        field_to_alias = meta.field_to_alias
+        changed_keys = {field_to_alias.get(name, name) for name in changed}
+        field_keys = {field_to_alias.get(name, name) for name in meta.field_names}
+        property_names = set(meta.property_names)
+        extra_changed = 'extra' in changed
+
+        changed_data = {}
+        for key, value in data.items():
+            if key == 'entity_id' or key in changed_keys:
+                changed_data[key] = value
+            elif key in property_names:
+                # Calculated fields may depend on any changed field
+                if changed:
+                    changed_data[key] = value
+            elif extra_changed and key not in field_keys:
+                # Extra fields are written together
+                changed_data[key] = value
+        return changed_data
+
     def _process_data_from_db(
         self,
         data: Any
@@ -69,6 +247,10 @@ class BaseRepository:
         """Hook to process raw DB data (can be overridden by subclass)."""
         pass
 
+    def _adjust_conditions(self, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """Hook to convert condition values to what the database expects (can be overridden by subclass)."""
+        return conditions
+
     def get_one(
         self,
         conditions: Dict[str, Any],
@@ -81,18 +263,71 @@ class BaseRepository:
         :param fetch_related: list of related fields to fetch
         :return: a BaseModel instance if found, None otherwise
         """
-        data = self._execute_within_context(
-            self.adapter.get_one,
-            self.table_name,
-            conditions,
-            fetch_related=fetch_related
+        cached = self._identity_map_get(conditions, fetch_related)
+        if cached is not None:
+            return cached
+
+        data = self._cached_read(
+            'one', [conditions, fetch_related],
+            lambda: self._execute_within_context(
+                self.adapter.get_one,
+                self.table_name,
+                conditions,
+                fetch_related=fetch_related
+            ),
+            entity_id=self._single_entity_id(conditions)
         )
 
         self._process_data_from_db(data)
 
         if not data:
             return None
-        return self.model.from_dict(data)
+        return self._identity_map_add([self.model.from_dict(data)], fetch_related)[0]
+
+    def _identity_map_get(self, conditions: Dict[str, Any], fetch_related: List[str] = None) -> Union[BaseModel, None]:
+        """
+        Returns the instance a get_one by entity_id alone would load if the current unit
+        of work has loaded it already (see rococo.repositories.unit_of_work). Any other
+        condition, and an inactive versioned instance get_one would not find, make the
+        read go to the database.
+        """
+        identity_map = current_identity_map()
+        if identity_map is None or fetch_related:
+            return None
+        entity_id = self._single_entity_id(conditions)
+        if entity_id is None:
+            return None
+        instance = identity_map.get(self.model, entity_id)
+        if instance is not None and self._is_versioned_model() and not instance.active:
+            return None
+        return instance
+
+    def _single_entity_id(self, conditions: Dict[str, Any]) -> Any:
+        """Returns the entity_id of conditions selecting one entity by entity_id alone, None otherwise."""
+        if not conditions or list(conditions) != ['entity_id']:
+            return None
+        entity_id = conditions['entity_id']
+        if entity_id is None or isinstance(entity_id, (list, dict)):
+            return None
+        return entity_id
+
+    def _identity_map_add(self, instances: List[BaseModel], fetch_related: List[str] = None) -> List[BaseModel]:
+        """
+        Adds loaded instances to the current unit of work's identity map, replacing
+        those loaded before by the instances already there.
+        """
+        identity_map = current_identity_map()
+        if identity_map is None or fetch_related:
+            # Instances with relations loaded are not interchangeable with the mapped ones
+            return instances
+        return [identity_map.add(instance) if instance is not None else None for instance in instances]
+
+    def _identity_map_discard(self, instances: Iterable[BaseModel]):
+        """Drops saved or deleted instances from the current unit of work's identity map."""
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            for instance in instances:
+                identity_map.discard(type(instance), instance.entity_id)
 
     def _validate_int(
         self,
@@ -172,14 +407,17 @@ class BaseRepository:
         limit = self._validate_int(limit, "limit", 0, 100000)
         offset = self._validate_int(offset, "offset", 0)
 
-        records = self._execute_within_context(
-            self.adapter.get_many,
-            self.table_name,
-            conditions,
-            sort,
-            limit,
-            offset,
-            fetch_related=fetch_related
+        records = self._cached_read(
+            'many', [conditions, sort, limit, offset, fetch_related],
+            lambda: self._execute_within_context(
+                self.adapter.get_many,
+                self.table_name,
+                conditions,
+                sort,
+                limit,
+                offset,
+                fetch_related=fetch_related
+            )
         )
 
         if isinstance(records, dict):
@@ -187,14 +425,131 @@ class BaseRepository:
 
         self._process_data_from_db(records)
 
-        return [self.model.from_dict(record) for record in records]
+        return self._identity_map_add(self.model.from_rows(records), fetch_related)
+
+    def iter_many(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """
+        Lazily yields the records matching the conditions, without a limit.
+
+        Records are read `batch_size` at a time (server-side cursors or keyset pages,
+        depending on the adapter), so memory stays bounded however many records match.
+        The adapter connection is held only while the iteration runs; stop early by
+        breaking out of the loop or closing the iterator. Deferred fields are loaded
+        with the records.
+
+        :param conditions: filter conditions
+        :param sort: sort order
+        :param batch_size: number of records read per round trip
+        :return: iterator of BaseModel instances
+        """
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        return self._iter_records(
+            self.adapter.iter_many, self.table_name, conditions, sort, batch_size=batch_size)
+
+    def _iter_records(self, iter_func, *args, **kwargs) -> Iterator[BaseModel]:
+        """Yields model instances from the record batches of an adapter `iter_many` call."""
+        with self.adapter:
+            for records in iter_func(*args, **kwargs):
+                self._process_data_from_db(records)
+                yield from self.model.from_rows(records)
+
+    def _load_related(self, instances: List[BaseModel], fetch_related: List[str]):
+        """
+        Sets the related entities of the `fetch_related` fields on `instances`, fetching
+        each related model once for all instances (see RelationLoader).
+        """
+        self._relation_loader().load(instances, fetch_related)
+
+    def _relation_loader(self) -> RelationLoader:
+        """
+        Returns the relation loader of the current unit of work for this repository type
+        and adapter, or a new loader outside of a unit of work.
+        """
+        identity_map = current_identity_map()
+        if identity_map is None:
+            return RelationLoader(self._fetch_related_records)
+        return identity_map.relation_loader((type(self), id(self.adapter)), self._fetch_related_records)
+
+    def _fetch_related_records(
+        self,
+        relation_model: Type[BaseModel],
+        key_column: str,
+        keys: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetches the records of `relation_model` whose `key_column` is one of `keys`."""
+        raise NotImplementedError(f"{type(self).__name__} does not support fetch_related.")
+
+    # Unique sort key appended to page sort keys, so that every record has one position
+    _page_tiebreaker = ('entity_id', 'ASC')
+
+    def get_page(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        after: str = None,
+        limit: int = 100
+    ) -> Page:
+        """
+        Fetches one page of records with keyset pagination.
+
+        Pages are ordered by `sort` and then entity_id, and each page starts right after
+        the last record of the previous one, so reading page 500 costs the same as page 1.
+        Pass the `next_token` of a page as `after` to fetch the next one; it is None on the
+        last page. Sort columns should not be NULL.
+
+        :param conditions: filter conditions
+        :param sort: sort order
+        :param after: the next_token of the previous page, None for the first page
+        :param limit: maximum number of records per page
+        :return: a Page of BaseModel instances
+        """
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        keys = self._page_keys(sort)
+        records = self._execute_within_context(
+            self.adapter.get_page, self.table_name, conditions, keys,
+            after=decode_page_token(after, keys), limit=limit + 1)
+
+        records, next_token = self._page_records(records, keys, limit)
+        self._process_data_from_db(records)
+        return Page(self.model.from_rows(records), next_token)
+
+    def _page_keys(self, sort: List[tuple] = None) -> List[tuple]:
+        """Returns the sort keys of a page: `sort` followed by the tiebreaker."""
+        keys = list(sort or [])
+        if self._page_tiebreaker[0] not in [column for column, _ in keys]:
+            keys.append(self._page_tiebreaker)
+        return keys
+
+    def _page_records(self, records: Any, keys: List[tuple], limit: int):
+        """
+        Trims the records fetched for a page (`limit` + 1 of them) to `limit` and returns
+        them with the next page token, None if the extra record was not found.
+        """
+        if isinstance(records, dict):
+            records = [records]
+        records = records or []
+        if len(records) <= limit:
+            return records, None
+
+        records = records[:limit]
+        return records, encode_page_token(keys, self._page_values(records[-1], keys))
+
+    def _page_values(self, record: Dict[str, Any], keys: List[tuple]) -> List[Any]:
+        """Returns the sort values of a raw record, as stored in page tokens."""
+        return [record.get(column.rsplit('.', 1)[-1]) for column, _ in keys]
 
     def get_count(
         self,
         collection_name: str,
         index: str,
-        query: Dict[str, Any]
-    ) -> int:
+        query: Dict[str, Any],
+        mode: str = None
+    ) -> Count:
         """
         Retrieves the count of records in a specified collection that match the given query parameters
         and index.
@@ -203,9 +558,11 @@ class BaseRepository:
             collection_name (str): The name of the collection to query.
             index (str): The name of the index to use for the query. hint actually work for MongoDB and ignore by other DBs
             query (Dict[str, Any], optional): Additional query parameters to filter the results.
+            mode (str, optional): 'exact', 'cached' or 'estimate' (see rococo.repositories.count).
+                Defaults to the repository's `count_mode`.
 
         Returns:
-            int: The count of matching records.
+            Count: The count of matching records, with the mode that produced it.
         """
         # The 'query' parameter directly represents the conditions for the count.
         # If an 'active' filter is needed, it should be included in the 'query' argument by the caller.
@@ -215,12 +572,7 @@ class BaseRepository:
         if index:
             adapter_options['hint'] = index
 
-        return self._execute_within_context(
-            self.adapter.get_count,
-            collection_name,
-            db_conditions,
-            options=adapter_options if adapter_options else None
-        )
+        return self._count(collection_name, db_conditions, adapter_options, mode)
 
     def save(
         self,
@@ -234,11 +586,22 @@ class BaseRepository:
         :param send_message: Whether to send a message to the message queue after saving. Defaults to False.
         :return: The saved BaseModel instance.
         """
+        self._identity_map_discard([instance])
+        partial_update = self._uses_partial_update(instance)
+        if not partial_update:
+            # The whole record is written, deferred fields included
+            self.model.undefer([instance])
         data = self._process_data_before_save(instance)
-        
+
         with self.adapter:
+            if partial_update:
+                # Partial update of a loaded non-versioned record
+                update_query = self.adapter.get_update_query(
+                    self.table_name, self._changed_data(instance, data))
+                if update_query is not None:
+                    self.adapter.run_transaction([update_query])
             # Only use audit table for VersionedModel instances
-            if self._is_versioned_model() and self.use_audit_table:
+            elif self._is_versioned_model() and self.use_audit_table:
                 move_entity_query = self.adapter.get_move_entity_to_audit_table_query(
                     self.table_name, instance.entity_id)
                 save_entity_query = self.adapter.get_save_query(
@@ -250,15 +613,120 @@ class BaseRepository:
                 save_entity_query = self.adapter.get_save_query(
                     self.table_name, data)
                 self.adapter.run_transaction([save_entity_query])
-        
+        self._invalidate_cache([instance])
+
+        if getattr(type(instance), 'track_changes', False):
+            instance.clear_changed_fields()
+
         if send_message:
             # This assumes that the instance is now in post-saved state with all the new DB updates
-            message = json.dumps(instance.as_dict(
-                convert_datetime_to_iso_string=True))
+            # The message adapter serializes the payload
+            message = instance.as_dict(convert_datetime_to_iso_string=True)
             self.message_adapter.send_message(self.queue_name, message)
 
         return instance
 
+    def _save_many_query_builders(
+        self,
+        instances: List[BaseModel],
+        data_list: List[Dict[str, Any]],
+        partial_updates: List[bool]
+    ) -> List[Tuple[Callable, tuple, bool]]:
+        """
+        The adapter calls building the queries of a save_many, in order, as (method, args,
+        returns-a-list) tuples: partial updates first, then whole records written with
+        multi-row statements if the adapter supports them. Sync and async repositories
+        run the same calls.
+        """
+        use_audit = self._is_versioned_model() and self.use_audit_table
+        builders = []
+        full_instances, full_data = [], []
+        for instance, data, partial in zip(instances, data_list, partial_updates):
+            if partial:
+                builders.append((self.adapter.get_update_query,
+                                 (self.table_name, self._changed_data(instance, data)), False))
+            else:
+                full_instances.append(instance)
+                full_data.append(data)
+        for start in range(0, len(full_data), self.save_batch_size):
+            batch = full_data[start:start + self.save_batch_size]
+            batch_instances = full_instances[start:start + self.save_batch_size]
+            if self.adapter.supports_batch_save:
+                if use_audit:
+                    builders.append((self.adapter.get_move_entities_to_audit_table_query,
+                                     (self.table_name, [instance.entity_id for instance in batch_instances]), False))
+                builders.append((self.adapter.get_save_many_queries, (self.table_name, batch), True))
+            else:
+                for instance, data in zip(batch_instances, batch):
+                    if use_audit:
+                        builders.append((self.adapter.get_move_entity_to_audit_table_query,
+                                         (self.table_name, instance.entity_id), False))
+                    builders.append((self.adapter.get_save_query, (self.table_name, data), False))
+        return builders
+
+    @staticmethod
+    def _collect_queries(queries: List[Any], built: Any, many: bool):
+        """Adds what a query builder returned to `queries`, skipping builders with nothing to run."""
+        if many:
+            queries.extend(built)
+        elif built is not None:
+            queries.append(built)
+
+    def _get_save_many_queries(
+        self,
+        instances: List[BaseModel],
+        data_list: List[Dict[str, Any]],
+        partial_updates: List[bool]
+    ) -> List[Any]:
+        """The queries of a save_many (see _save_many_query_builders)."""
+        queries = []
+        for build, args, many in self._save_many_query_builders(instances, data_list, partial_updates):
+            self._collect_queries(queries, build(*args), many)
+        return queries
+
+    def save_many(
+        self,
+        instances: Iterable[BaseModel],
+        send_message: bool = False
+    ) -> List[BaseModel]:
+        """
+        Saves many BaseModel instances in one transaction.
+
+        All instances are prepared and validated first; invalid instances raise a single
+        `ModelValidationError` and nothing is saved. Prior versions are moved to the audit
+        table and new records are written with multi-row statements when the adapter
+        supports them, with one query per instance otherwise.
+
+        :param instances: The BaseModel instances to save.
+        :param send_message: Whether to send a message per instance to the message queue after saving.
+        :return: The saved BaseModel instances.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+
+        self._identity_map_discard(instances)
+        partial_updates = [self._uses_partial_update(instance) for instance in instances]
+        # Whole records are written, deferred fields included
+        self.model.undefer([instance for instance, partial in zip(instances, partial_updates) if not partial])
+        data_list = self._process_many_before_save(instances)
+
+        with self.adapter:
+            # Building the queries may read the table schemas
+            queries = self._get_save_many_queries(instances, data_list, partial_updates)
+            if queries:
+                self.adapter.run_transaction(queries)
+        self._invalidate_cache(instances)
+
+        for instance in instances:
+            if getattr(type(instance), 'track_changes', False):
+                instance.clear_changed_fields()
+
+        if send_message:
+            self._send_messages(instances)
+
+        return instances
+
     def delete(
         self,
         instance: BaseModel
@@ -278,6 +746,8 @@ class BaseRepository:
             return self.save(instance)
         else:
             # Hard delete for non-versioned models
+            self._identity_map_discard([instance])
             with self.adapter:
                 self.adapter.hard_delete(self.table_name, instance.entity_id)
+            self._invalidate_cache([instance])
             return instance
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Record counts that say how they were obtained.
+
+`get_count` counts in one of three modes:
+
+- 'exact': counts the matching records with a query.
+- 'cached': an exact count, kept for the repository's `cache_ttl` seconds
+  and dropped when the repository saves or deletes records.
+- 'estimate': the database's estimate from its statistics, which costs
+  about nothing but may be off. Databases that can't estimate the count
+  count exactly instead.
+"""
+
+COUNT_MODES = ('exact', 'cached', 'estimate')
+
+
+class Count(int):
+    """
+    A record count, usable as an int, with the mode that produced it: 'exact',
+    'cached' (an exact count read from the cache) or 'estimate'.
+    """
+
+    def __new__(cls, value: int, mode: str = 'exact'):
+        count = super().__new__(cls, value)
+        count.mode = mode
+        return count
+
+    @property
+    def is_estimate(self) -> bool:
+        return self.mode == 'estimate'
+
+    def __repr__(self) -> str:
+        return f"Count({int(self)}, mode={self.mode!r})"
@@ -1,10 +1,10 @@
-import json
 import logging
 from uuid import UUID
-from typing import Any, Dict, List, Optional, Type, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Tuple
 from rococo.data.dynamodb import DynamoDbAdapter
 from rococo.messaging import MessageAdapter
 from rococo.repositories import BaseRepository
+from rococo.repositories.pagination import Page, decode_page_token, encode_page_token
 from rococo.models.versioned_model import BaseModel, VersionedModel, get_uuid_hex
 
 
@@ -50,6 +50,10 @@ class DynamoDbRepository(BaseRepository):
         conditions: Dict[str, Any],
         fetch_related: List[str] = None
     ) -> Optional[BaseModel]:
+        cached = self._identity_map_get(conditions, fetch_related)
+        if cached is not None:
+            return cached
+
         db_conditions = conditions.copy() if conditions else {}
         # Only add active condition for VersionedModel
         if self._is_versioned_model() and "active" not in db_conditions:
@@ -67,7 +71,7 @@ class DynamoDbRepository(BaseRepository):
             return None
 
         self._process_data_from_db(data)
-        return self.model.from_dict(data)
+        return self._identity_map_add([self.model.from_dict(data)])[0]
 
     def get_many(
         self,
@@ -95,17 +99,69 @@ class DynamoDbRepository(BaseRepository):
         if not records_data:
             return []
 
-        result = []
         for data in records_data:
             self._process_data_from_db(data)
-            result.append(self.model.from_dict(data))
-        return result
+        return self._identity_map_add(self.model.from_rows(records_data))
+
+    def get_page(
+        self,
+        conditions: Dict[str, Any] = None,
+        after: str = None,
+        limit: int = 100
+    ) -> Page:
+        """
+        Fetch one page of items (see BaseRepository.get_page). DynamoDB pages natively in
+        key order, so the token holds the last evaluated key and sorting is not supported.
+        The last page can be empty when DynamoDB could not tell there were no more items.
+        """
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        db_conditions = conditions.copy() if conditions else {}
+        if self._is_versioned_model() and "active" not in db_conditions:
+            db_conditions["active"] = True
+        after_values = decode_page_token(after, [])
+
+        records_data, last_evaluated_key = self._execute_within_context(
+            lambda: self.adapter.get_page(
+                table=self.table_name,
+                conditions=db_conditions,
+                after=after_values[0] if after_values else None,
+                limit=limit,
+                model_cls=self.model
+            )
+        )
+
+        for data in records_data:
+            self._process_data_from_db(data)
+        next_token = encode_page_token([], [last_evaluated_key]) if last_evaluated_key else None
+        return Page(self.model.from_rows(records_data), next_token)
+
+    def iter_many(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[Tuple[str, int]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """Lazily yield the matching items, page by page (see BaseRepository.iter_many)"""
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        db_conditions = conditions.copy() if conditions else {}
+        if self._is_versioned_model() and "active" not in db_conditions:
+            db_conditions["active"] = True
+
+        return self._iter_records(
+            self.adapter.iter_many,
+            table=self.table_name,
+            conditions=db_conditions,
+            sort=sort,
+            batch_size=batch_size,
+            model_cls=self.model
+        )
 
     def save(
         self,
         instance: BaseModel,
         send_message: bool = False
     ) -> BaseModel:
+        self._identity_map_discard([instance])
         # Prepare the data for saving
         payload = self._process_data_before_save(instance)
 
@@ -132,6 +188,7 @@ class DynamoDbRepository(BaseRepository):
             saved = self._execute_within_context(
                 lambda: self.adapter.upsert(self.table_name, payload, model_cls=self.model)
             )
+        self._invalidate_cache([instance])
 
         # Hydrate the returned fields onto our instance
         if saved:
@@ -139,16 +196,57 @@ class DynamoDbRepository(BaseRepository):
                 if hasattr(instance, k):
                     setattr(instance, k, v)
 
+        if getattr(type(instance), 'track_changes', False):
+            instance.clear_changed_fields()
+
         # Send a message if requested
         if send_message:
             self.message_adapter.send_message(
                 self.queue_name,
-                json.dumps(instance.as_dict(
-                    convert_datetime_to_iso_string=True))
+                instance.as_dict(convert_datetime_to_iso_string=True)
             )
 
         return instance
 
+    def save_many(
+        self,
+        instances: Iterable[BaseModel],
+        send_message: bool = False
+    ) -> List[BaseModel]:
+        instances = list(instances)
+        if not instances:
+            return instances
+
+        self._identity_map_discard(instances)
+        payloads = self._process_many_before_save(instances)
+
+        if self._is_versioned_model() and self.use_audit_table:
+            # Move the existing versions of updated entities to audit
+            updated_ids = [
+                instance.entity_id for instance in instances
+                if instance.previous_version and instance.previous_version != get_uuid_hex(0)
+            ]
+            if updated_ids:
+                self._execute_within_context(
+                    lambda: self.adapter.move_entities_to_audit_table(
+                        self.table_name, updated_ids, model_cls=self.model)
+                )
+
+        # Puts are upserts for versioned and non-versioned models alike
+        self._execute_within_context(
+            lambda: self.adapter.save_many(self.table_name, payloads, model_cls=self.model)
+        )
+        self._invalidate_cache(instances)
+
+        for instance in instances:
+            if getattr(type(instance), 'track_changes', False):
+                instance.clear_changed_fields()
+
+        if send_message:
+            self._send_messages(instances)
+
+        return instances
+
     def delete(
         self,
         instance: BaseModel
@@ -166,6 +264,7 @@ class DynamoDbRepository(BaseRepository):
         """
         self.logger.info(
             f"Deleting entity_id={getattr(instance, 'entity_id', 'N/A')} from {self.table_name}")
+        self._identity_map_discard([instance])
 
         if self._is_versioned_model():
             # Soft delete for versioned models
@@ -208,5 +307,6 @@ class DynamoDbRepository(BaseRepository):
                     item.delete()
                 except Exception as e:
                     self.logger.warning(f"Could not delete entity: {e}")
+        self._invalidate_cache([instance])
 
         return instance
@@ -1,11 +1,14 @@
-import json
+import functools
 import logging
 from datetime import datetime, timezone, timedelta
 from uuid import UUID
-from typing import Any, Dict, List, Optional, Type, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Tuple
 from rococo.data import MongoDBAdapter
 from rococo.messaging import MessageAdapter
 from rococo.repositories import BaseRepository
+from rococo.repositories.pagination import Page, decode_page_token
+from rococo.repositories.relation_loader import relation_table_name
+from rococo.models.metadata import get_model_metadata
 from rococo.models.versioned_model import BaseModel, VersionedModel, get_uuid_hex
 
 
@@ -88,7 +91,8 @@ class MongoDbRepository(BaseRepository):
         self,
         collection_name: str,
         index: str,
-        query: Dict[str, Any]
+        query: Dict[str, Any],
+        fetch_related: Optional[List[str]] = None
     ) -> Optional[BaseModel]:
         """
         Fetches a single record from a specified MongoDB collection based on the given query parameters and index.
@@ -97,10 +101,15 @@ class MongoDbRepository(BaseRepository):
             collection_name (str): The name of the collection from which to fetch the record.
             index (str): The index to use for the query, providing a hint for optimization.
             query (Dict[str, Any]): A dictionary of query parameters to filter the records.
+            fetch_related (Optional[List[str]], optional): Relationship fields to replace with the related records. Defaults to None.
 
         Returns:
             Optional[VersionedModel]: An instance of the model if a matching record is found, otherwise None.
         """
+        cached = self._identity_map_get(query, fetch_related)
+        if cached is not None:
+            return cached
+
         db_conditions = query.copy() if query else {}
         # Only add versioned model conditions for VersionedModel
         if self._is_versioned_model():
@@ -113,14 +122,20 @@ class MongoDbRepository(BaseRepository):
             lambda: self.adapter.get_one(
                 table=collection_name,
                 conditions=db_conditions,
-                hint=index
+                hint=index,
+                **self._deferred_query_options()
             )
         )
 
         if not data:
             return None
 
-        return self.model.from_dict(data)
+        instance = self.model.from_dict(data)
+        self.model.set_deferred_loader(
+            [instance], functools.partial(self._load_deferred_fields, collection_name))
+        if fetch_related:
+            self._load_related([instance], fetch_related)
+        return self._identity_map_add([instance], fetch_related)[0]
 
     def get_many(
         self,
@@ -129,7 +144,8 @@ class MongoDbRepository(BaseRepository):
         query: Optional[Dict[str, Any]] = None,
         sort: Optional[List[Tuple[str, int]]] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        fetch_related: Optional[List[str]] = None
     ) -> List[BaseModel]:
         """
         Retrieves a list of records from a specified MongoDB collection based on the given query parameters and index.
@@ -140,6 +156,8 @@ class MongoDbRepository(BaseRepository):
             query (Optional[Dict[str, Any]], optional): A dictionary of query parameters to filter the records. Defaults to None.
             limit (Optional[int], optional): The maximum number of records to retrieve. If None, no limit is applied. Defaults to None.
             offset (Optional[int], optional): The number of records to skip before returning results. If None, no offset is applied. Defaults to None.
+            fetch_related (Optional[List[str]], optional): Relationship fields to replace with the related records,
+                fetched with one query per related collection. Defaults to None.
 
         Returns:
             List[VersionedModel]: A list of model instances, each representing a record from the collection.
@@ -159,17 +177,165 @@ class MongoDbRepository(BaseRepository):
                 hint=index,
                 sort=sort,
                 limit=limit,
-                offset=offset
+                offset=offset,
+                **self._deferred_query_options()
             )
         )
 
         if not records_data:
             return []
 
-        result = []
-        for data in records_data:
-            result.append(self.model.from_dict(data))
-        return result
+        instances = self.model.from_rows(records_data)
+        self.model.set_deferred_loader(
+            instances, functools.partial(self._load_deferred_fields, collection_name))
+        if fetch_related:
+            self._load_related(instances, fetch_related)
+        return self._identity_map_add(instances, fetch_related)
+
+    _page_tiebreaker = ('entity_id', 1)
+
+    def get_page(
+        self,
+        collection_name: str,
+        index: str,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> Page:
+        """
+        Retrieves one page of records with keyset pagination instead of `skip`.
+
+        Pages are ordered by `sort` and then entity_id; each page starts right after the last
+        record of the previous one, so deep pages cost as much as the first.
+
+        Args:
+            collection_name (str): The name of the collection from which to fetch the records.
+            index (str): The index to use for the query, providing a hint for optimization.
+            query (Optional[Dict[str, Any]], optional): A dictionary of query parameters to filter the records. Defaults to None.
+            sort (Optional[List[Tuple[str, int]]], optional): The sort order. Defaults to None.
+            after (Optional[str], optional): The next_token of the previous page; None for the first page.
+            limit (int, optional): The maximum number of records per page. Defaults to 100.
+
+        Returns:
+            Page: The records of the page and the token of the next page (None on the last page).
+        """
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        db_conditions = query.copy() if query else {}
+        if self._is_versioned_model():
+            if "latest" not in db_conditions:
+                db_conditions["latest"] = True
+            if "active" not in db_conditions:
+                db_conditions["active"] = True
+        keys = self._page_keys(sort)
+
+        records_data = self._execute_within_context(
+            lambda: self.adapter.get_page(
+                table=collection_name,
+                conditions=db_conditions,
+                hint=index,
+                sort=keys,
+                after=decode_page_token(after, keys),
+                limit=limit + 1,
+                **self._deferred_query_options()
+            )
+        )
+
+        records_data, next_token = self._page_records(records_data, keys, limit)
+        instances = self.model.from_rows(records_data)
+        self.model.set_deferred_loader(
+            instances, functools.partial(self._load_deferred_fields, collection_name))
+        return Page(instances, next_token)
+
+    def iter_many(
+        self,
+        collection_name: str,
+        index: str,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """
+        Lazily yields the records get_many would return, without a limit.
+
+        Documents are read from one cursor `batch_size` at a time, so memory stays bounded;
+        the adapter connection is held only while the iteration runs. Deferred fields are
+        loaded with the records.
+
+        Args:
+            collection_name (str): The name of the collection from which to fetch the records.
+            index (str): The index to use for the query, providing a hint for optimization.
+            query (Optional[Dict[str, Any]], optional): A dictionary of query parameters to filter the records. Defaults to None.
+            sort (Optional[List[Tuple[str, int]]], optional): The sort order. Defaults to None.
+            batch_size (int, optional): The number of documents read per round trip. Defaults to 1000.
+
+        Returns:
+            Iterator[BaseModel]: An iterator of model instances.
+        """
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        db_conditions = query.copy() if query else {}
+        if self._is_versioned_model():
+            if "latest" not in db_conditions:
+                db_conditions["latest"] = True
+            if "active" not in db_conditions:
+                db_conditions["active"] = True
+
+        return self._iter_records(
+            self.adapter.iter_many,
+            table=collection_name,
+            conditions=db_conditions,
+            hint=index,
+            sort=sort,
+            batch_size=batch_size
+        )
+
+    def _fetch_related_records(
+        self,
+        relation_model: Type[BaseModel],
+        key_column: str,
+        keys: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the documents of `relation_model` whose `key_column` is one of `keys` (see RelationLoader).
+        Related documents are read from the collection named after the model in snake_case.
+        """
+        conditions: Dict[str, Any] = {key_column: {'$in': keys}}
+        if issubclass(relation_model, VersionedModel):
+            conditions['latest'] = True
+            conditions['active'] = True
+        return self._execute_within_context(
+            lambda: self.adapter.get_many(
+                table=relation_table_name(relation_model),
+                conditions=conditions
+            )
+        )
+
+    def _deferred_query_options(self) -> Dict[str, Any]:
+        """Adapter `get_one`/`get_many` options leaving deferred fields out of the query."""
+        deferred_columns = self._deferred_columns()
+        return {'projection': {column: 0 for column in deferred_columns}} if deferred_columns else {}
+
+    def _load_deferred_fields(
+        self,
+        collection_name: str,
+        instances: List[BaseModel],
+        names: List[str]
+    ) -> List[BaseModel]:
+        """Fetch the deferred fields `names` of `instances` (see `BaseModel.undefer`)."""
+        field_to_alias = get_model_metadata(self.model).field_to_alias
+        conditions: Dict[str, Any] = {'entity_id': {'$in': [instance.entity_id for instance in instances]}}
+        if self._is_versioned_model():
+            conditions['latest'] = True
+        projection = {'entity_id': 1, **{field_to_alias.get(name, name): 1 for name in names}}
+
+        records = self._execute_within_context(
+            lambda: self.adapter.get_many(
+                table=collection_name,
+                conditions=conditions,
+                projection=projection
+            )
+        )
+        return self.model.from_rows(records or [])
 
     def delete(
         self,
@@ -190,6 +356,7 @@ class MongoDbRepository(BaseRepository):
         """
         self.logger.info(
             f"Deleting entity_id={getattr(instance, 'entity_id', 'N/A')} from {collection_name}")
+        self._identity_map_discard([instance])
 
         if self._is_versioned_model():
             # Soft delete for versioned models: set active=False and call save()
@@ -207,6 +374,7 @@ class MongoDbRepository(BaseRepository):
             # Hard delete for non-versioned models
             with self.adapter:
                 self.adapter.hard_delete(collection_name, instance.entity_id)
+            self._invalidate_cache([instance], collection_name)
             return instance
 
     def aggregate(
@@ -258,10 +426,7 @@ class MongoDbRepository(BaseRepository):
         if not raw_results:
             return []
 
-        result = []
-        for data in raw_results:
-            result.append(self.model.from_dict(data))
-        return result
+        return self.model.from_rows(raw_results)
 
     def create(
         self,
@@ -319,6 +484,7 @@ class MongoDbRepository(BaseRepository):
             self._execute_within_context(
                 lambda: self.adapter.insert_many(collection_name, docs)
             )
+            self._invalidate_cache(instances, collection_name)
 
     def save(
         self,
@@ -340,6 +506,9 @@ class MongoDbRepository(BaseRepository):
         Returns:
             BaseModel: The saved BaseModel instance.
         """
+        self._identity_map_discard([instance])
+        # The whole document is written, deferred fields included
+        self.model.undefer([instance])
         # Prepare the data for saving
         payload = self._process_data_before_save(instance, extra_data=extra_data)
         
@@ -361,6 +530,7 @@ class MongoDbRepository(BaseRepository):
             saved = self._execute_within_context(
                 lambda: self.adapter.upsert(collection_name, payload)
             )
+        self._invalidate_cache([instance], collection_name)
 
         # Hydrate the returned fields onto our instance
         if saved:
@@ -368,12 +538,63 @@ class MongoDbRepository(BaseRepository):
                 if hasattr(instance, k):
                     setattr(instance, k, v)
 
+        if getattr(type(instance), 'track_changes', False):
+            instance.clear_changed_fields()
+
         # Send a message if requested
         if send_message:
             self.message_adapter.send_message(
                 self.queue_name,
-                json.dumps(instance.as_dict(
-                    convert_datetime_to_iso_string=True))
+                instance.as_dict(convert_datetime_to_iso_string=True)
             )
 
         return instance
+
+    def save_many(
+        self,
+        instances: Iterable[BaseModel],
+        collection_name: str,
+        send_message: bool = False
+    ) -> List[BaseModel]:
+        """
+        Saves many BaseModel instances with bulk operations.
+
+        All instances are prepared and validated first; invalid instances raise a single
+        `ModelValidationError` and nothing is saved.
+
+        Args:
+            instances (Iterable[BaseModel]): The BaseModel instances to save.
+            collection_name (str): The name of the MongoDB collection to save to.
+            send_message (bool, optional): Whether to send a message per instance to the message queue after saving. Defaults to False.
+
+        Returns:
+            List[BaseModel]: The saved BaseModel instances.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+
+        self._identity_map_discard(instances)
+        # Whole documents are written, deferred fields included
+        self.model.undefer(instances)
+        payloads = self._process_many_before_save(instances)
+
+        if self._is_versioned_model():
+            self._execute_within_context(
+                lambda: self.adapter.save_many(
+                    collection_name, payloads, move_to_audit=self.use_audit_table)
+            )
+        else:
+            self._execute_within_context(
+                lambda: self.adapter.upsert_many(collection_name, payloads)
+            )
+        self._invalidate_cache(instances, collection_name)
+
+        for instance in instances:
+            if getattr(type(instance), 'track_changes', False):
+                instance.clear_changed_fields()
+
+        if send_message:
+            self._send_messages(instances)
+
+        return instances
@@ -3,14 +3,16 @@
 import re
 from uuid import UUID
 from datetime import datetime
-from dataclasses import fields
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, Iterator, List, Type, Union
 
 from rococo.data import MySqlAdapter
 from rococo.messaging import MessageAdapter
 from rococo.models import VersionedModel
 from rococo.models.versioned_model import BaseModel
+from rococo.models.metadata import get_model_metadata
 from rococo.repositories import BaseRepository
+from rococo.repositories.pagination import Page, decode_page_token
+from rococo.repositories.relation_loader import relation_table_name
 
 
 class MySqlRepository(BaseRepository):
@@ -27,7 +29,7 @@ class MySqlRepository(BaseRepository):
         super().__init__(db_adapter, model, message_adapter, queue_name, user_id=user_id)
         self.table_name = re.sub(
             r'(?<!^)(?=[A-Z])', '_', model.__name__).lower()
-        self.model()
+        get_model_metadata(model).resolve_relationships()
 
     def _process_data_before_save(self, instance: BaseModel):
         # Step 1: Call prepare_for_save on the instance.
@@ -80,10 +82,10 @@ class MySqlRepository(BaseRepository):
         """Method to convert data dictionary fetched from MySQL to a VersionedModel instance."""
 
         def _process_record(data: dict, model):
-            model()
+            model_fields = get_model_metadata(model).resolve_relationships().fields
             is_partial = not all(
-                _field.name in data for _field in fields(model))
-            for field in fields(model):
+                _field.name in data for _field in model_fields)
+            for field in model_fields:
                 if data.get(field.name) is None:
                     continue
 
@@ -106,7 +108,7 @@ class MySqlRepository(BaseRepository):
                             data[field.name] = UUID(field_value).hex
                         else:
                             field_data = {'entity_id': field_value}
-                            for _field in fields(field_model_class):
+                            for _field in get_model_metadata(field_model_class).fields:
                                 if f'joined_{field.name}_{field_table_name}_{_field.name}' in data:
                                     field_data[_field.name] = data[
                                         f'joined_{field.name}_{field_table_name}_{_field.name}']
@@ -134,10 +136,49 @@ class MySqlRepository(BaseRepository):
         else:
             raise NotImplementedError
 
+    def _adjust_conditions(self, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert conditions on entity_id fields (instances, UUIDs or lists of them) to MySQL ids."""
+        for condition_name, value in conditions.copy().items():
+            condition_field = get_model_metadata(
+                self.model).get_field(condition_name)
+            if condition_field and condition_field.metadata.get('field_type') == 'entity_id':
+                if isinstance(value, BaseModel):
+                    conditions[condition_name] = str(
+                        value.entity_id).replace('-', '')
+                elif isinstance(value, (str, UUID)):
+                    conditions[condition_name] = str(
+                        value).replace('-', '')
+                elif isinstance(value, list):
+                    # Handle list
+                    if len(value) == 0:
+                        raise NotImplementedError(
+                            "Filtering an attribute with an empty list is not supported.")
+                    conditions[condition_name] = []
+                    for v in value:
+                        if isinstance(v, BaseModel):
+                            conditions[condition_name].append(
+                                str(v.entity_id).replace('-', ''))
+                        elif isinstance(v, (str, UUID)):
+                            conditions[condition_name].append(
+                                str(v).replace('-', ''))
+                        else:
+                            raise NotImplementedError
+                elif value is None:
+                    conditions[condition_name] = None
+                else:
+                    raise NotImplementedError
+        return conditions
+
     def get_one(self, conditions: Dict[str, Any] = None, join_fields: List[str] = None,
-                additional_fields: List[str] = None) -> Union[BaseModel, None]:
+                additional_fields: List[str] = None, fetch_related: List[str] = None) -> Union[BaseModel, None]:
         """get one"""
 
+        # Instances with joined or related fields loaded bypass the identity map
+        related = fetch_related or join_fields or additional_fields
+        cached = self._identity_map_get(conditions, related)
+        if cached is not None:
+            return cached
+
         if additional_fields is None:
             additional_fields = []
 
@@ -156,8 +197,8 @@ class MySqlRepository(BaseRepository):
                     child_field = field_name
                 parent_table_name = re.sub(
                     r'(?<!^)(?=[A-Z])', '_', parent_model.__name__).lower()
-                join_field = next((field for field in fields(
-                    parent_model) if field.name == child_field), None)
+                join_field = get_model_metadata(
+                    parent_model).get_field(child_field)
                 if join_field is None or join_field.metadata.get('field_type') != 'entity_id':
                     raise Exception(
                         f"Invalid join field {child_field} specified for model {parent_model.__name__}.")
@@ -171,54 +212,38 @@ class MySqlRepository(BaseRepository):
                 join_stmt_list.append(join_condition)
                 join_field_list = [
                     f'{join_table_name}.{_field.name} AS joined_{child_field}_{join_table_name}_{_field.name}' for
-                    _field in fields(join_model)]
+                    _field in get_model_metadata(join_model).fields]
                 additional_fields += join_field_list
                 joined_fields[field_name] = join_model
 
         if conditions:
-            for condition_name, value in conditions.copy().items():
-                condition_field = next((field for field in fields(
-                    self.model) if field.name == condition_name), None)
-                if condition_field and condition_field.metadata.get('field_type') == 'entity_id':
-                    if isinstance(value, BaseModel):
-                        conditions[condition_name] = str(
-                            value.entity_id).replace('-', '')
-                    elif isinstance(value, (str, UUID)):
-                        conditions[condition_name] = str(
-                            value).replace('-', '')
-                    elif isinstance(value, list):
-                        # Handle list
-                        if len(value) == 0:
-                            raise NotImplementedError(
-                                "Filtering an attribute with an empty list is not supported.")
-                        conditions[condition_name] = []
-                        for v in value:
-                            if isinstance(v, BaseModel):
-                                conditions[condition_name].append(
-                                    str(v.entity_id).replace('-', ''))
-                            elif isinstance(v, (str, UUID)):
-                                conditions[condition_name].append(
-                                    str(v).replace('-', ''))
-                            else:
-                                raise NotImplementedError
-                    elif value is None:
-                        conditions[condition_name] = None
-                    else:
-                        raise NotImplementedError
+            conditions = self._adjust_conditions(conditions)
 
-        data = self._execute_within_context(
-            self.adapter.get_one, self.table_name, conditions, join_statements=join_stmt_list,
-            additional_fields=additional_fields, is_versioned=self._is_versioned_model()
-        )
+        options = self._deferred_query_options()
 
-        # Calls __post_init__ of model to import related models and update fields.
-        self.model()
+        def load():
+            return self._execute_within_context(
+                self.adapter.get_one, self.table_name, conditions, join_statements=join_stmt_list,
+                additional_fields=additional_fields, is_versioned=self._is_versioned_model(),
+                **options
+            )
+
+        # Joined rows change with the joined tables, whose writes don't invalidate this one's cache
+        if join_stmt_list:
+            data = load()
+        else:
+            data = self._cached_read('one', [conditions, additional_fields, options], load,
+                                     entity_id=self._single_entity_id(conditions))
 
         self._process_data_from_db(data)
 
         if not data:
             return None
-        return self.model.from_dict(data)
+        instance = self.model.from_dict(data)
+        self.model.set_deferred_loader([instance], self._load_deferred_fields)
+        if fetch_related:
+            self._load_related([instance], fetch_related)
+        return self._identity_map_add([instance], related)[0]
 
     def get_many(
             self,
@@ -227,9 +252,12 @@ class MySqlRepository(BaseRepository):
             additional_fields: List[str] = None,
             sort: List[tuple] = None,
             limit: int = None,
-            offset: int = None
+            offset: int = None,
+            fetch_related: List[str] = None
     ) -> List[BaseModel]:
         """get many"""
+        # Instances with joined or related fields loaded bypass the identity map
+        related = fetch_related or join_fields or additional_fields
         if additional_fields is None:
             additional_fields = []
 
@@ -248,8 +276,8 @@ class MySqlRepository(BaseRepository):
                     child_field = field_name
                 parent_table_name = re.sub(
                     r'(?<!^)(?=[A-Z])', '_', parent_model.__name__).lower()
-                join_field = next((field for field in fields(
-                    parent_model) if field.name == child_field), None)
+                join_field = get_model_metadata(
+                    parent_model).get_field(child_field)
                 if join_field is None or join_field.metadata.get('field_type') != 'entity_id':
                     raise Exception(
                         f"Invalid join field {child_field} specified for model {parent_model.__name__}.")
@@ -263,54 +291,97 @@ class MySqlRepository(BaseRepository):
                 join_stmt_list.append(join_condition)
                 join_field_list = [
                     f'{join_table_name}.{_field.name} AS joined_{child_field}_{join_table_name}_{_field.name}' for
-                    _field in fields(join_model)]
+                    _field in get_model_metadata(join_model).fields]
                 additional_fields += join_field_list
                 joined_fields[field_name] = join_model
 
         if conditions:
-            for condition_name, value in conditions.copy().items():
-                condition_field = next((field for field in fields(
-                    self.model) if field.name == condition_name), None)
-                if condition_field and condition_field.metadata.get('field_type') == 'entity_id':
-                    if isinstance(value, BaseModel):
-                        conditions[condition_name] = str(
-                            value.entity_id).replace('-', '')
-                    elif isinstance(value, (str, UUID)):
-                        conditions[condition_name] = str(
-                            value).replace('-', '')
-                    elif isinstance(value, list):
-                        # Handle list
-                        if len(value) == 0:
-                            raise NotImplementedError(
-                                "Filtering an attribute with an empty list is not supported.")
-                        conditions[condition_name] = []
-                        for v in value:
-                            if isinstance(v, BaseModel):
-                                conditions[condition_name].append(
-                                    str(v.entity_id).replace('-', ''))
-                            elif isinstance(v, (str, UUID)):
-                                conditions[condition_name].append(
-                                    str(v).replace('-', ''))
-                            else:
-                                raise NotImplementedError
-                    elif value is None:
-                        conditions[condition_name] = None
-                    else:
-                        raise NotImplementedError
+            conditions = self._adjust_conditions(conditions)
 
-        records = self._execute_within_context(
-            self.adapter.get_many, self.table_name, conditions, sort, limit, offset,
-            active=self._is_versioned_model(), join_statements=join_stmt_list,
-            additional_fields=additional_fields
-        )
+        options = self._deferred_query_options()
+
+        def load():
+            return self._execute_within_context(
+                self.adapter.get_many, self.table_name, conditions, sort, limit, offset,
+                active=self._is_versioned_model(), join_statements=join_stmt_list,
+                additional_fields=additional_fields, **options
+            )
+
+        # Joined rows change with the joined tables, whose writes don't invalidate this one's cache
+        if join_stmt_list:
+            records = load()
+        else:
+            records = self._cached_read('many', [conditions, sort, limit, offset, additional_fields, options], load)
 
         # If the adapter returned a single dictionary, wrap it in a list
         if isinstance(records, dict):
             records = [records]
 
-        # Calls __post_init__ of model to import related models and update fields.
-        self.model()
-
         self._process_data_from_db(records)
 
-        return [self.model.from_dict(record) for record in records]
+        instances = self.model.from_rows(records)
+        self.model.set_deferred_loader(instances, self._load_deferred_fields)
+        # Fetch the related entities of all instances together, one query per related model
+        if fetch_related:
+            self._load_related(instances, fetch_related)
+        return self._identity_map_add(instances, related)
+
+    def iter_many(
+            self,
+            conditions: Dict[str, Any] = None,
+            sort: List[tuple] = None,
+            batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """Lazily yield the matching records, read with a server-side cursor (see BaseRepository.iter_many)"""
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        if conditions:
+            conditions = self._adjust_conditions(conditions)
+        return self._iter_records(
+            self.adapter.iter_many, self.table_name, conditions, sort, batch_size=batch_size,
+            active=self._is_versioned_model()
+        )
+
+    def get_page(
+            self,
+            conditions: Dict[str, Any] = None,
+            sort: List[tuple] = None,
+            after: str = None,
+            limit: int = 100
+    ) -> Page:
+        """Fetch one page of records with keyset pagination (see BaseRepository.get_page)"""
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        if conditions:
+            conditions = self._adjust_conditions(conditions)
+        keys = self._page_keys(sort)
+        records = self._execute_within_context(
+            self.adapter.get_page, self.table_name, conditions, keys,
+            after=decode_page_token(after, keys), limit=limit + 1,
+            active=self._is_versioned_model(), **self._deferred_query_options()
+        )
+
+        records, next_token = self._page_records(records, keys, limit)
+        instances = self.model.from_rows(records)
+        self.model.set_deferred_loader(instances, self._load_deferred_fields)
+        return Page(instances, next_token)
+
+    def _fetch_related_records(
+            self,
+            relation_model: Type[BaseModel],
+            key_column: str,
+            keys: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetch the records of `relation_model` whose `key_column` is one of `keys` (see RelationLoader)."""
+        return self._execute_within_context(
+            self.adapter.get_many, relation_table_name(relation_model), {key_column: keys},
+            active=issubclass(relation_model, VersionedModel)
+        )
+
+    def _load_deferred_fields(self, instances: List[BaseModel], names: List[str]) -> List[BaseModel]:
+        """Fetch the deferred fields `names` of `instances` (see `BaseModel.undefer`)."""
+        field_to_alias = get_model_metadata(self.model).field_to_alias
+        conditions = {'entity_id': [str(instance.entity_id).replace('-', '') for instance in instances]}
+        records = self._execute_within_context(
+            self.adapter.get_many, self.table_name, conditions, active=False,
+            columns=['entity_id'] + [field_to_alias.get(name, name) for name in names]
+        )
+        return self.model.from_rows(records)
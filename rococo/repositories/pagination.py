@@ -0,0 +1,55 @@
+"""
+Keyset pagination: result pages and the opaque tokens that continue them.
+
+A page token records the sort keys and the last record's values for them.
+The next page starts right after those values, so reading it costs the
+same however deep it is, unlike LIMIT/OFFSET.
+"""
+import base64
+import binascii
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from rococo.serialization import tagged_json_dumps, tagged_json_loads
+
+
+@dataclass
+class Page:
+    """A page of records and the token of the next page (None on the last page)."""
+
+    items: List[Any] = field(default_factory=list)
+    next_token: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_token is not None
+
+
+def _keys_state(keys: List[Tuple[str, Any]]) -> List[List[str]]:
+    return [[column, str(direction)] for column, direction in keys]
+
+
+def encode_page_token(keys: List[Tuple[str, Any]], values: List[Any]) -> str:
+    """Returns the token of the page after the record whose `keys` values are `values`."""
+    state = {'k': _keys_state(keys), 'v': values}
+    data = tagged_json_dumps(state)
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def decode_page_token(token: Optional[str], keys: List[Tuple[str, Any]]) -> Optional[List[Any]]:
+    """
+    Returns the values a page token continues after, or None if there is no token.
+
+    Raises ValueError if the token is malformed or was issued for other sort keys.
+    """
+    if token is None:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        state = tagged_json_loads(data)
+        values = state['v']
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid page token") from e
+    if state.get('k') != _keys_state(keys) or not isinstance(values, list):
+        raise ValueError("The page token was issued for a different sort order")
+    return values
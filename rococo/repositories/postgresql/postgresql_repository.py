@@ -3,14 +3,17 @@
 import re
 from uuid import UUID
 from datetime import datetime
-from dataclasses import fields
-from typing import Any, Dict, List, Type, Union, Optional
+from typing import Any, Dict, Iterator, List, Type, Union, Optional
 
 from rococo.data import PostgreSQLAdapter
 from rococo.messaging import MessageAdapter
 from rococo.models import VersionedModel
 from rococo.models.versioned_model import BaseModel
+from rococo.models.metadata import get_model_metadata
 from rococo.repositories import BaseRepository
+from rococo.repositories.count import Count
+from rococo.repositories.pagination import Page, decode_page_token
+from rococo.repositories.relation_loader import relation_table_name
 
 
 class PostgreSQLRepository(BaseRepository):
@@ -27,7 +30,7 @@ class PostgreSQLRepository(BaseRepository):
         super().__init__(db_adapter, model, message_adapter, queue_name, user_id=user_id)
         self.table_name = re.sub(
             r'(?<!^)(?=[A-Z])', '_', model.__name__).lower()
-        self.model()
+        get_model_metadata(model).resolve_relationships()
 
     @classmethod
     def _adjust_conditions(cls, conditions: Dict[str, Any]) -> Dict[str, Any]:
@@ -45,7 +48,7 @@ class PostgreSQLRepository(BaseRepository):
             convert_uuids=False,
             export_properties=self.save_calculated_fields
         )
-        for field in fields(instance):
+        for field in get_model_metadata(type(instance)).fields:
             if data.get(field.name) is None:
                 continue
 
@@ -75,35 +78,34 @@ class PostgreSQLRepository(BaseRepository):
     ) -> Union[BaseModel, None]:
         """get one"""
 
+        cached = self._identity_map_get(conditions, fetch_related)
+        if cached is not None:
+            return cached
+
         if conditions is not None:
             conditions = self._adjust_conditions(conditions)
 
-        data = self._execute_within_context(
-            self.adapter.get_one, self.table_name, conditions,
-            active=self._is_versioned_model()
+        options = self._deferred_query_options()
+        data = self._cached_read(
+            'one', [conditions, options],
+            lambda: self._execute_within_context(
+                self.adapter.get_one, self.table_name, conditions,
+                active=self._is_versioned_model(), **options
+            ),
+            entity_id=self._single_entity_id(conditions)
         )
 
         if not data:
             return None
 
         instance = self.model.from_dict(data)
+        self.model.set_deferred_loader([instance], self._load_deferred_fields)
 
         # Handle fetching related entities
         if fetch_related:
-            related_instances = {}
-            for related_field in fetch_related:
-                if hasattr(instance, related_field):
-                    related_entities = self.fetch_related_entities_for_field(
-                        instance, related_field
-                    )
-                    if related_entities is not None:
-                        related_instances[related_field] = related_entities
-
-            # Replace related_instances in the main instance
-            for key, value in related_instances.items():
-                setattr(instance, key, value)
+            self._load_related([instance], fetch_related)
 
-        return instance
+        return self._identity_map_add([instance], fetch_related)[0]
 
     def get_many(
         self,
@@ -118,9 +120,13 @@ class PostgreSQLRepository(BaseRepository):
         if conditions is not None:
             conditions = self._adjust_conditions(conditions)
         # Fetch the records
-        records = self._execute_within_context(
-            self.adapter.get_many, self.table_name, conditions, sort, limit, offset,
-            active=self._is_versioned_model()
+        options = self._deferred_query_options()
+        records = self._cached_read(
+            'many', [conditions, sort, limit, offset, options],
+            lambda: self._execute_within_context(
+                self.adapter.get_many, self.table_name, conditions, sort, limit, offset,
+                active=self._is_versioned_model(), **options
+            )
         )
 
         # If the adapter returned a single dictionary, wrap it in a list
@@ -128,32 +134,88 @@ class PostgreSQLRepository(BaseRepository):
             records = [records]
 
         # Create instances from the records
-        instances = [self.model.from_dict(record) for record in records]
+        instances = self.model.from_rows(records)
+        self.model.set_deferred_loader(instances, self._load_deferred_fields)
 
-        # Handle fetching related entities for each instance
+        # Fetch the related entities of all instances together, one query per related model
         if fetch_related:
-            for instance in instances:
-                related_instances = {}
-                for related_field in fetch_related:
-                    if hasattr(instance, related_field):
-                        related_entities = self.fetch_related_entities_for_field(
-                            instance, related_field
-                        )
-                        if related_entities is not None:
-                            related_instances[related_field] = related_entities
-
-                # Replace related_instances in the main instance
-                for key, value in related_instances.items():
-                    setattr(instance, key, value)
-
-        return instances
+            self._load_related(instances, fetch_related)
+
+        return self._identity_map_add(instances, fetch_related)
+
+    def iter_many(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """Lazily yield the matching records, read with a server-side cursor (see BaseRepository.iter_many)"""
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        if conditions is not None:
+            conditions = self._adjust_conditions(conditions)
+        return self._iter_records(
+            self.adapter.iter_many, self.table_name, conditions, sort, batch_size=batch_size,
+            active=self._is_versioned_model()
+        )
+
+    def iter_query(
+        self,
+        sql: str,
+        values: Any = None,
+        batch_size: int = 1000
+    ) -> Iterator[BaseModel]:
+        """
+        Lazily yield model instances from the rows of a raw SELECT on the repository's
+        table, read `batch_size` rows at a time with a server-side cursor
+        (see PostgreSQLAdapter.stream_query)
+        """
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        return self._iter_records(
+            lambda: ([self.adapter._deserialize_extra_fields(row) for row in rows]
+                     for rows in self.adapter.stream_query(sql, values, itersize=batch_size, batches=True))
+        )
+
+    def get_page(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        after: str = None,
+        limit: int = 100
+    ) -> Page:
+        """Fetch one page of records with keyset pagination (see BaseRepository.get_page)"""
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        if conditions is not None:
+            conditions = self._adjust_conditions(conditions)
+        keys = self._page_keys(sort)
+        records = self._execute_within_context(
+            self.adapter.get_page, self.table_name, conditions, keys,
+            after=decode_page_token(after, keys), limit=limit + 1,
+            active=self._is_versioned_model(), **self._deferred_query_options()
+        )
+
+        records, next_token = self._page_records(records, keys, limit)
+        instances = self.model.from_rows(records)
+        self.model.set_deferred_loader(instances, self._load_deferred_fields)
+        return Page(instances, next_token)
+
+    def _load_deferred_fields(self, instances: List[BaseModel], names: List[str]) -> List[BaseModel]:
+        """Fetch the deferred fields `names` of `instances` (see `BaseModel.undefer`)."""
+        field_to_alias = get_model_metadata(self.model).field_to_alias
+        conditions = self._adjust_conditions(
+            {'entity_id': [instance.entity_id for instance in instances]})
+        records = self._execute_within_context(
+            self.adapter.get_many, self.table_name, conditions, active=False,
+            columns=['entity_id'] + [field_to_alias.get(name, name) for name in names]
+        )
+        return self.model.from_rows(records)
 
     def get_count(
         self,
         # collection_name: str, # Use self.table_name for consistency
         index: Optional[str] = None,  # index (for hint) can be optional
-        query: Optional[Dict[str, Any]] = None  # query can be optional
-    ) -> int:
+        query: Optional[Dict[str, Any]] = None,  # query can be optional
+        mode: Optional[str] = None
+    ) -> Count:
         """
         Retrieves the count of records in the repository's table that match the given query parameters.
         The 'index' parameter is used as a hint via the 'options' argument to the adapter.
@@ -161,40 +223,34 @@ class PostgreSQLRepository(BaseRepository):
         Args:
             index (Optional[str], optional): The name of the index to use for the query (passed as a hint). Defaults to None.
             query (Optional[Dict[str, Any]], optional): Additional query parameters to filter the results. Defaults to None.
+            mode (Optional[str], optional): 'exact', 'cached' or 'estimate' (see rococo.repositories.count).
+                Defaults to the repository's `count_mode`.
 
         Returns:
-            int: The count of matching records.
+            Count: The count of matching records, with the mode that produced it.
         """
-        # Prepare the actual conditions for the database query
-        # Only add versioning filters for VersionedModel
-        if self._is_versioned_model():
-            db_conditions = {'latest': True, 'active': True}
-        else:
-            db_conditions = {}
-        if query:  # Ensure query is not None before updating
-            actual_query = self._adjust_conditions(
-                query.copy())  # Adjust UUIDs in query
-            db_conditions.update(actual_query)
-        # Ensure _adjust_conditions is called even if query is None but db_conditions has UUIDs (not in this default)
-        else:
-            db_conditions = self._adjust_conditions(db_conditions)
+        # The latest active versions only, for VersionedModel
+        db_conditions = self._count_conditions(query)
 
         # Prepare the options dictionary for the adapter
         adapter_options: Dict[str, Any] = {}
         if index:  # If an index (hint) is provided, add it to options
             adapter_options['hint'] = index
 
-        # Call the adapter's get_count method with table, conditions, and options
-        # self.adapter is PostgreSQLAdapter here.
-        # PostgreSQLAdapter.get_count signature (from previous context):
-        # def get_count(self, table: str, conditions: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> int:
-        count = self._execute_within_context(
-            self.adapter.get_count,  # type: ignore
-            self.table_name,  # Use self.table_name for the repository's primary table
-            db_conditions,
-            options=adapter_options if adapter_options else None
+        # Count with the adapter's get_count, its cached result or its estimate, depending on the mode
+        return self._count(self.table_name, db_conditions, adapter_options, mode)
+
+    def _fetch_related_records(
+        self,
+        relation_model: Type[BaseModel],
+        key_column: str,
+        keys: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetch the records of `relation_model` whose `key_column` is one of `keys` (see RelationLoader)."""
+        return self._execute_within_context(
+            self.adapter.get_many, relation_table_name(relation_model), {key_column: keys},
+            active=issubclass(relation_model, VersionedModel)
         )
-        return count
 
     def fetch_related_entities_for_field(
         self,
@@ -208,10 +264,8 @@ class PostgreSQLRepository(BaseRepository):
         if related_value is None or (isinstance(related_value, list) and len(related_value) == 0):
             return None
 
-        field_metadata = next((
-            field.metadata for field in fields(instance)
-            if field.name == related_field
-        ), None)
+        field = get_model_metadata(type(instance)).get_field(related_field)
+        field_metadata = field.metadata if field else None
 
         if field_metadata and 'relationship' in field_metadata:
             relation_model = field_metadata['relationship']['model']
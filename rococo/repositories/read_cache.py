@@ -0,0 +1,113 @@
+"""
+Read-through caching of repository queries.
+
+Query results are cached under a key made of the table, the kind of query
+and a hash of its parameters. Keys also carry a version: the table's for
+list queries and counts, the entity's for `get_one` by entity_id alone.
+Saving or deleting entities sets new versions for them and their table, so
+entries cached before the write are never read again and just expire.
+
+Versions are set after the write is committed: a reader racing with the
+write either caches under the old version or reads the new data.
+"""
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from rococo.cache.base import CacheBackend
+from rococo.serialization import encode_tagged, tagged_json_dumps, tagged_json_loads
+
+
+def _encode_key_part(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    try:
+        return encode_tagged(obj)
+    except TypeError:
+        return repr(obj)
+
+
+def _entity_key(entity_id: Any) -> str:
+    return str(entity_id).replace('-', '').lower()
+
+
+class ReadCache:
+    """Caches the results of a repository's queries in a `CacheBackend`."""
+
+    def __init__(self, backend: CacheBackend, ttl: Optional[float] = 60):
+        """
+        :param backend: where entries are kept
+        :param ttl: expiry of entries in seconds; None to keep them until evicted
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    def _version(self, key: str, ttl: Optional[float]) -> str:
+        version = self.backend.get(key)
+        if version is None:
+            version = uuid.uuid4().hex.encode()
+            self.backend.set(key, version, ttl)
+        return version.decode() if isinstance(version, bytes) else str(version)
+
+    def _table_version_key(self, table: str) -> str:
+        return f"{table}:version"
+
+    def _entity_version_key(self, table: str, entity_id: Any) -> str:
+        return f"{table}:version:{_entity_key(entity_id)}"
+
+    def _key(self, table: str, kind: str, parts: Any, entity_id: Any = None) -> str:
+        if entity_id is not None:
+            # Entries of single entities outlive writes to other entities of the table
+            version = self._version(self._entity_version_key(table, entity_id), self.ttl)
+        else:
+            version = self._version(self._table_version_key(table), None)
+        digest = hashlib.sha1(
+            json.dumps(parts, default=_encode_key_part, sort_keys=True).encode()).hexdigest()
+        return f"{table}:{kind}:{version}:{digest}"
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        data = self.backend.get(key)
+        if data is None:
+            return False, None
+        return True, tagged_json_loads(data)
+
+    def _set(self, key: str, result: Any):
+        try:
+            data = tagged_json_dumps(result)
+        except TypeError:
+            # Values we can't restore as they are (bytes, ...) are read uncached
+            return
+        self.backend.set(key, data, self.ttl)
+
+    def read(self, table: str, kind: str, parts: Any, load: Callable[[], Any], entity_id: Any = None) -> Any:
+        """
+        Returns the cached result of a query, or runs `load` and caches its result.
+
+        :param table: table the query reads
+        :param kind: kind of query ('one', 'many', 'count', ...)
+        :param parts: everything the result depends on (conditions, sort, options, ...)
+        :param load: runs the query
+        :param entity_id: the entity_id a `get_one` reads by, to version the entry by entity
+        """
+        key = self._key(table, kind, parts, entity_id)
+        hit, result = self._get(key)
+        if not hit:
+            result = load()
+            self._set(key, result)
+        return result
+
+    async def read_async(self, table: str, kind: str, parts: Any, load: Callable[[], Awaitable[Any]],
+                         entity_id: Any = None) -> Any:
+        """`read()` with a coroutine function `load`."""
+        key = self._key(table, kind, parts, entity_id)
+        hit, result = self._get(key)
+        if not hit:
+            result = await load()
+            self._set(key, result)
+        return result
+
+    def invalidate(self, table: str, entity_ids: Iterable[Any] = ()):
+        """Drops the cached results of `table` and of the entities with `entity_ids`."""
+        keys = [self._entity_version_key(table, entity_id) for entity_id in entity_ids]
+        self.backend.delete(self._table_version_key(table), *keys)
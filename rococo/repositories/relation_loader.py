@@ -0,0 +1,138 @@
+"""
+Batched loading of related entities for `fetch_related`.
+
+Loading the relations of each instance on its own costs one query per
+instance and field. `RelationLoader` collects the keys of a relation across
+all instances and fields, fetches each related model with one `IN` query
+and sets the results back on the instances.
+"""
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from rococo.models.metadata import get_model_metadata
+from rococo.models.versioned_model import BaseModel
+
+# fetch(relation_model, key_column, keys) -> raw records whose key_column value is in keys
+# (a coroutine function for load_async)
+FetchFunc = Callable[[Type[BaseModel], str, List[str]], List[Dict[str, Any]]]
+
+MANY_RELATION_TYPES = ('one_to_many', 'many_to_many')
+
+
+def relation_table_name(model: Type[BaseModel]) -> str:
+    """Returns the table (or collection) name of a related model: its snake_case class name."""
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', model.__name__).lower()
+
+
+def _relation_key(value: Any) -> Optional[str]:
+    """Normalizes a related entity reference (instance, UUID or hex string) to a hex id."""
+    if isinstance(value, BaseModel):
+        value = value.entity_id
+    if isinstance(value, dict):
+        value = value.get('entity_id')
+    if value is None:
+        return None
+    return str(value).replace('-', '')
+
+
+class RelationLoader:
+    """
+    Loads related entities for many instances with one query per related model.
+
+    A loader remembers the entities it fetched, so keys repeated across instances,
+    fields or `load()` calls are fetched once, and instances referring to the same
+    entity share one related instance. Use one loader per request; units of work
+    keep one per repository (see rococo.repositories.unit_of_work).
+    """
+
+    def __init__(self, fetch: FetchFunc, batch_size: int = 1000):
+        self._fetch = fetch
+        self.batch_size = batch_size
+        # (related model, key column) -> key -> entities whose key column holds the key
+        self._loaded: Dict[Tuple[Type[BaseModel], str], Dict[str, List[BaseModel]]] = {}
+
+    def load(self, instances: Iterable[BaseModel], fields: Iterable[str]) -> None:
+        """Sets the related entities of `fields` on `instances`, skipping fields with nothing found."""
+        instances = list(instances)
+        if not instances:
+            return
+        relations, pending = self._pending(instances, fields)
+        for (relation_model, key_column), keys in pending.items():
+            keys = list(keys)
+            for start in range(0, len(keys), self.batch_size):
+                batch = keys[start:start + self.batch_size]
+                self._store(relation_model, key_column, batch, self._fetch(relation_model, key_column, batch))
+        self._assign(instances, relations)
+
+    async def load_async(self, instances: Iterable[BaseModel], fields: Iterable[str]) -> None:
+        """`load()` with a coroutine function `fetch`."""
+        instances = list(instances)
+        if not instances:
+            return
+        relations, pending = self._pending(instances, fields)
+        for (relation_model, key_column), keys in pending.items():
+            keys = list(keys)
+            for start in range(0, len(keys), self.batch_size):
+                batch = keys[start:start + self.batch_size]
+                self._store(relation_model, key_column, batch, await self._fetch(relation_model, key_column, batch))
+        self._assign(instances, relations)
+
+    def forget(self, relation_model: Type[BaseModel]) -> None:
+        """Drops the loaded entities of `relation_model`, so the next `load()` fetches them again."""
+        for key in [key for key in self._loaded if key[0] is relation_model]:
+            del self._loaded[key]
+
+    def _pending(self, instances: List[BaseModel], fields: Iterable[str]):
+        """Returns the relations of `fields` and the keys of each related model not loaded yet."""
+        relations = []
+        pending = defaultdict(dict)
+        for name in fields:
+            relation = self._relation(type(instances[0]), name)
+            if relation is None:
+                continue
+            relations.append(relation)
+            _, relation_model, key_column, many = relation
+            loaded = self._loaded.get((relation_model, key_column), {})
+            for instance in instances:
+                for key in self._keys(getattr(instance, name, None), many):
+                    if key not in loaded:
+                        pending[(relation_model, key_column)][key] = None
+        return relations, pending
+
+    def _assign(self, instances: List[BaseModel], relations: list) -> None:
+        for name, relation_model, key_column, many in relations:
+            loaded = self._loaded.get((relation_model, key_column), {})
+            for instance in instances:
+                value = getattr(instance, name, None)
+                keys = self._keys(value, many)
+                if not keys:
+                    continue
+                if many:
+                    setattr(instance, name, [entity for key in keys for entity in loaded.get(key, [])])
+                elif loaded.get(keys[0]):
+                    setattr(instance, name, loaded[keys[0]][0])
+
+    @staticmethod
+    def _relation(model: Type[BaseModel], name: str):
+        """Returns (name, related model, key column, is-many) for a relationship field, else None."""
+        field = get_model_metadata(model).get_field(name)
+        if field is None or 'relationship' not in field.metadata:
+            return None
+        relationship = field.metadata['relationship']
+        many = relationship.get('relation_type') in MANY_RELATION_TYPES
+        return name, relationship['model'], field.metadata['field_type'], many
+
+    @staticmethod
+    def _keys(value: Any, many: bool) -> List[str]:
+        values = value if many and isinstance(value, list) else [value]
+        return [key for key in map(_relation_key, values) if key is not None]
+
+    def _store(self, relation_model: Type[BaseModel], key_column: str, keys: List[str],
+               records: List[Dict[str, Any]]) -> None:
+        loaded = self._loaded.setdefault((relation_model, key_column), {})
+        records = records or []
+        for key in keys:
+            loaded.setdefault(key, [])
+        for record, entity in zip(records, relation_model.from_rows([dict(record) for record in records])):
+            loaded.setdefault(_relation_key(record.get(key_column)), []).append(entity)
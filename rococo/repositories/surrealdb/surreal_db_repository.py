@@ -1,7 +1,6 @@
 """SurrealDbRepository class"""
 
-from dataclasses import fields
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, Iterator, List, Type, Union
 from uuid import UUID
 
 from surrealdb.data.types.record_id import RecordID
@@ -9,7 +8,9 @@ from surrealdb.data.types.record_id import RecordID
 from rococo.data import SurrealDbAdapter
 from rococo.messaging import MessageAdapter
 from rococo.models.surrealdb import SurrealVersionedModel
+from rococo.models.metadata import get_model_metadata
 from rococo.repositories import BaseRepository
+from rococo.repositories.pagination import Page, decode_page_token
 
 
 class SurrealDbRepository(BaseRepository):
@@ -24,8 +25,8 @@ class SurrealDbRepository(BaseRepository):
         user_id: UUID = None
     ):
         super().__init__(db_adapter, model, message_adapter, queue_name, user_id=user_id)
-        # ensure model context is initialized
-        self.model()
+        # resolve related model classes declared by name
+        get_model_metadata(model).resolve_relationships()
 
     def _extract_uuid_from_surreal_id(self, surreal_id: str, table_name: str) -> str:
         try:
@@ -47,7 +48,7 @@ class SurrealDbRepository(BaseRepository):
         )
 
         # Map entity_id -> id (plain), other record_id fields with backticks
-        for field in fields(instance):
+        for field in get_model_metadata(type(instance)).fields:
             if data.get(field.name) is None:
                 continue
             if field.metadata.get('field_type') == 'record_id':
@@ -79,13 +80,11 @@ class SurrealDbRepository(BaseRepository):
         data: Union[Dict[str, Any], List[Dict[str, Any]]]
     ) -> Union[SurrealVersionedModel, List[SurrealVersionedModel], None]:
         """Method to convert raw SurrealDB data into SurrealVersionedModel instance(s)."""
-        def _process_record(rec: Dict[str, Any], model_cls: Type[SurrealVersionedModel]) -> SurrealVersionedModel:
+        def _prepare_record(rec: Dict[str, Any], model_cls: Type[SurrealVersionedModel]) -> Dict[str, Any]:
             # unwrap the SurrealDB record id into entity_id
             rec['entity_id'] = rec.pop('id')
-            # initialize model context for nested processing
-            model_cls()
             # recursively process fields
-            for field_def in fields(model_cls):
+            for field_def in get_model_metadata(model_cls).resolve_relationships().fields:
                 val = rec.get(field_def.name)
                 if val is None:
                     continue
@@ -96,8 +95,8 @@ class SurrealDbRepository(BaseRepository):
                 if ftype == 'm2m_list':
                     child_cls = rel.get('model') or model_cls
                     if isinstance(val, list):
-                        rec[field_def.name] = [_process_record(
-                            item, child_cls) for item in val]
+                        rec[field_def.name] = child_cls.from_rows(
+                            [_prepare_record(item, child_cls) for item in val])
                     else:
                         raise NotImplementedError(
                             f"Expected list for m2m_list field '{field_def.name}'")
@@ -132,28 +131,58 @@ class SurrealDbRepository(BaseRepository):
                         raise NotImplementedError(
                             f"Unsupported type for record_id field '{field_def.name}': {type(val)}")
 
-            # finally, build the model instance
-            return model_cls.from_dict(rec)
+            return rec
+
+        def _process_record(rec: Dict[str, Any], model_cls: Type[SurrealVersionedModel]) -> SurrealVersionedModel:
+            return model_cls.from_dict(_prepare_record(rec, model_cls))
 
         if data is None:
             return None
         if isinstance(data, list):
-            return [_process_record(item, self.model) for item in data]
+            return self.model.from_rows([_prepare_record(item, self.model) for item in data])
         if isinstance(data, dict):
             return _process_record(data, self.model)
         raise NotImplementedError(f"Unsupported data type: {type(data)}")
 
+    def _adjust_conditions(self, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """Format conditions on record_id fields as SurrealDB record ids."""
+        for name, val in list(conditions.items()):
+            field_def = get_model_metadata(self.model).get_field(name)
+            if field_def and field_def.metadata.get('field_type') == 'record_id':
+                if name == 'entity_id':
+                    conditions['id'] = conditions.pop('entity_id')
+                    name = 'id'
+                prefix = field_def.metadata.get(
+                    'relationship', {}).get('model', self.model)
+                prefix = (
+                    prefix.__name__.lower()
+                    if isinstance(prefix, type)
+                    else prefix
+                )
+                if isinstance(val, SurrealVersionedModel):
+                    conditions[name] = f"{prefix}:`{val.entity_id}`"
+                elif isinstance(val, (str, UUID)):
+                    conditions[name] = f"{prefix}:`{val}`"
+                else:
+                    raise NotImplementedError
+        return conditions
+
     def get_one(
         self,
         conditions: Dict[str, Any],
         fetch_related: List[str] = None
     ) -> Union[SurrealVersionedModel, None]:
         """Fetch a single record matching conditions"""
+        cached = self._identity_map_get(conditions, fetch_related)
+        if cached is not None:
+            return cached
+        # fetch_related is consumed below
+        related = list(fetch_related or [])
         additional_fields: List[str] = []
 
         # handle fetch_related edges
         if fetch_related:
-            for field in fields(self.model):
+            for field in get_model_metadata(self.model).fields:
                 rel = field.metadata.get('relationship', {})
                 if rel.get('type') == 'associative' and field.name in fetch_related:
                     name = rel.get('name')
@@ -168,28 +197,7 @@ class SurrealDbRepository(BaseRepository):
 
         # format record_id conditions
         if conditions:
-            for name, val in list(conditions.items()):
-                field_def = next(
-                    (f for f in fields(self.model) if f.name == name),
-                    None
-                )
-                if field_def and field_def.metadata.get('field_type') == 'record_id':
-                    if name == 'entity_id':
-                        conditions['id'] = conditions.pop('entity_id')
-                        name = 'id'
-                    prefix = field_def.metadata.get(
-                        'relationship', {}).get('model', self.model)
-                    prefix = (
-                        prefix.__name__.lower()
-                        if isinstance(prefix, type)
-                        else prefix
-                    )
-                    if isinstance(val, SurrealVersionedModel):
-                        conditions[name] = f"{prefix}:`{val.entity_id}`"
-                    elif isinstance(val, (str, UUID)):
-                        conditions[name] = f"{prefix}:`{val}`"
-                    else:
-                        raise NotImplementedError
+            conditions = self._adjust_conditions(conditions)
 
         # fetch raw data
         raw = self._execute_within_context(
@@ -200,14 +208,14 @@ class SurrealDbRepository(BaseRepository):
             additional_fields=additional_fields,
             active=self._is_versioned_model()
         )
-        # prep model context
-        self.model()
         proc = self._process_data_from_db(raw)
         # _process_data_from_db already converts to model instance
         # If it's a list, return the first item or None if empty
         if isinstance(proc, list):
-            return proc[0] if proc else None
-        return proc
+            proc = proc[0] if proc else None
+        if proc is None:
+            return None
+        return self._identity_map_add([proc], related)[0]
 
     def get_many(
         self,
@@ -217,11 +225,13 @@ class SurrealDbRepository(BaseRepository):
         fetch_related: List[str] = None,
     ) -> List[SurrealVersionedModel]:
         """Fetch multiple records matching conditions"""
+        # fetch_related is consumed below
+        related = list(fetch_related or [])
         additional_fields: List[str] = []
 
         # handle fetch_related edges
         if fetch_related:
-            for field in fields(self.model):
+            for field in get_model_metadata(self.model).fields:
                 rel = field.metadata.get('relationship', {})
                 if rel.get('type') == 'associative' and field.name in fetch_related:
                     name = rel.get('name')
@@ -236,28 +246,7 @@ class SurrealDbRepository(BaseRepository):
 
         # format record_id conditions
         if conditions:
-            for name, val in list(conditions.items()):
-                field_def = next(
-                    (f for f in fields(self.model) if f.name == name),
-                    None
-                )
-                if field_def and field_def.metadata.get('field_type') == 'record_id':
-                    if name == 'entity_id':
-                        conditions['id'] = conditions.pop('entity_id')
-                        name = 'id'
-                    prefix = field_def.metadata.get(
-                        'relationship', {}).get('model', self.model)
-                    prefix = (
-                        prefix.__name__.lower()
-                        if isinstance(prefix, type)
-                        else prefix
-                    )
-                    if isinstance(val, SurrealVersionedModel):
-                        conditions[name] = f"{prefix}:`{val.entity_id}`"
-                    elif isinstance(val, (str, UUID)):
-                        conditions[name] = f"{prefix}:`{val}`"
-                    else:
-                        raise NotImplementedError
+            conditions = self._adjust_conditions(conditions)
 
         raw = self._execute_within_context(
             self.adapter.get_many,
@@ -271,11 +260,66 @@ class SurrealDbRepository(BaseRepository):
         )
         if isinstance(raw, dict):
             raw = [raw]
-        # prep model context
-        self.model()
         proc = self._process_data_from_db(raw)
         # _process_data_from_db already converts to model instances
-        return proc if isinstance(proc, list) else [proc]
+        return self._identity_map_add(proc if isinstance(proc, list) else [proc], related)
+
+    _page_tiebreaker = ('id', 'ASC')
+
+    def get_page(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        after: str = None,
+        limit: int = 100
+    ) -> Page:
+        """Fetch one page of records with keyset pagination (see BaseRepository.get_page)"""
+        limit = self._validate_int(limit, "limit", 1, 100000)
+        if conditions:
+            conditions = self._adjust_conditions(conditions)
+        keys = self._page_keys(sort)
+        after_values = decode_page_token(after, keys)
+        if after_values:
+            # Tokens hold the UUID part of the record id
+            id_index = [column for column, _ in keys].index('id')
+            after_values[id_index] = RecordID(self.table_name, after_values[id_index])
+        raw = self._execute_within_context(
+            self.adapter.get_page, self.table_name, conditions, keys,
+            after=after_values, limit=limit + 1,
+            active=self._is_versioned_model()
+        )
+
+        records, next_token = self._page_records(raw, keys, limit)
+        # _process_data_from_db already converts to model instances
+        return Page(self._process_data_from_db(records), next_token)
+
+    def _page_values(self, record: Dict[str, Any], keys: List[tuple]) -> List[Any]:
+        """Returns the sort values of a raw record, with the record id reduced to its UUID."""
+        values = super()._page_values(record, keys)
+        for i, (column, _) in enumerate(keys):
+            if column == 'id' and isinstance(values[i], RecordID):
+                values[i] = values[i].id
+            elif column == 'id' and isinstance(values[i], str):
+                values[i] = self._extract_uuid_from_surreal_id(values[i], self.table_name)
+        return values
+
+    def iter_many(
+        self,
+        conditions: Dict[str, Any] = None,
+        sort: List[tuple] = None,
+        batch_size: int = 1000
+    ) -> Iterator[SurrealVersionedModel]:
+        """Lazily yield the matching records, read in keyset pages (see BaseRepository.iter_many)"""
+        batch_size = self._validate_int(batch_size, "batch_size", 1, 100000)
+        if conditions:
+            conditions = self._adjust_conditions(conditions)
+
+        with self.adapter:
+            for records in self.adapter.iter_many(
+                    self.table_name, conditions, sort, batch_size=batch_size,
+                    active=self._is_versioned_model()):
+                # _process_data_from_db already converts to model instances
+                yield from self._process_data_from_db(records)
 
     def relate(
         self,
@@ -0,0 +1,90 @@
+"""
+Identity map scoped to a unit of work.
+
+Inside `with unit_of_work():` repositories share one identity map: loading an
+entity twice gives the same instance, and `get_one({'entity_id': ...})` for
+an entity already loaded is answered without a query. Saving or deleting an
+entity drops it from the map, so the next read fetches it again.
+
+The unit of work also keeps one RelationLoader per repository type and
+adapter, so entities loaded through `fetch_related` are fetched once for all
+the reads of the unit of work.
+
+The current unit of work is held in a context variable, so concurrent
+threads, greenlets and asyncio tasks each see their own.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple, Type
+
+from rococo.models.versioned_model import BaseModel
+from rococo.repositories.relation_loader import FetchFunc, RelationLoader
+
+_current_identity_map: ContextVar[Optional['IdentityMap']] = ContextVar(
+    'rococo_identity_map', default=None)
+
+
+def _entity_key(entity_id: Any) -> str:
+    if isinstance(entity_id, BaseModel):
+        entity_id = entity_id.entity_id
+    return str(entity_id).replace('-', '').lower()
+
+
+class IdentityMap:
+    """Model instances by (model, entity_id)."""
+
+    def __init__(self):
+        self._instances: Dict[Tuple[Type[BaseModel], str], BaseModel] = {}
+        self._relation_loaders: Dict[Hashable, RelationLoader] = {}
+
+    def get(self, model: Type[BaseModel], entity_id: Any) -> Optional[BaseModel]:
+        """Returns the instance of `model` with `entity_id`, None if it is not in the map."""
+        return self._instances.get((model, _entity_key(entity_id)))
+
+    def add(self, instance: BaseModel) -> BaseModel:
+        """Adds `instance` and returns it, or returns the instance already in the map for its entity."""
+        return self._instances.setdefault((type(instance), _entity_key(instance.entity_id)), instance)
+
+    def discard(self, model: Type[BaseModel], entity_id: Any):
+        """Removes the instance of `model` with `entity_id`, if there is one."""
+        self._instances.pop((model, _entity_key(entity_id)), None)
+        for loader in self._relation_loaders.values():
+            loader.forget(model)
+
+    def relation_loader(self, key: Hashable, fetch: FetchFunc) -> RelationLoader:
+        """Returns the relation loader of `key`, created with `fetch` on first use."""
+        loader = self._relation_loaders.get(key)
+        if loader is None:
+            loader = self._relation_loaders[key] = RelationLoader(fetch)
+        return loader
+
+    def clear(self):
+        self._instances.clear()
+        self._relation_loaders.clear()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Returns the identity map of the current unit of work, None outside of one."""
+    return _current_identity_map.get()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[IdentityMap]:
+    """
+    Runs the block in a unit of work with its own identity map. Nested units of work
+    share the outer one's map.
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    identity_map = IdentityMap()
+    token = _current_identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current_identity_map.reset(token)
@@ -0,0 +1,210 @@
+"""
+Serializers for message payloads and JSON columns.
+
+A serializer turns a payload into bytes and back. UUIDs, datetimes, Enums,
+Decimals, sets and model instances are encoded directly, so payloads don't
+need converting beforehand.
+
+The default serializer uses orjson when it is installed and the standard
+library `json` module otherwise. msgpack is available on request:
+
+    from rococo.serialization import set_default_serializer
+    set_default_serializer('msgpack')
+
+Install the optional backends with `rococo[serialization]`.
+
+`tagged_json_dumps` and `tagged_json_loads` encode values that must come
+back as they were (cached query results, page tokens): datetimes, dates,
+Decimals and UUIDs are tagged and restored on decoding.
+"""
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _default(obj):
+    """Encodes the values JSON and msgpack have no type for."""
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'as_dict'):
+        return obj.as_dict(convert_datetime_to_iso_string=True)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class Serializer:
+    """Encodes payloads to bytes and decodes them back."""
+
+    name = None
+    content_type = None
+    # Binary serializers can't be used where text is expected (JSON columns, SQS bodies)
+    binary = False
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encodes `obj` to bytes."""
+        raise NotImplementedError
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decodes a payload produced by `dumps`."""
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """JSON with the standard library `json` module."""
+
+    name = 'json'
+    content_type = 'application/json'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    """JSON with orjson, which encodes UUIDs, datetimes and Enums natively."""
+
+    name = 'orjson'
+    content_type = 'application/json'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed; install rococo[serialization]")
+        # Models go through as_dict() so that aliases and extra fields are kept
+        self._option = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack, a compact binary format."""
+
+    name = 'msgpack'
+    content_type = 'application/msgpack'
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed; install rococo[serialization]")
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=_default, use_bin_type=True, datetime=False)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}
+
+_json_serializer = OrjsonSerializer() if orjson is not None else JsonSerializer()
+_default_serializer = _json_serializer
+
+
+def get_serializer(name: str = None) -> Serializer:
+    """
+    Returns the serializer called `name` ('json', 'orjson' or 'msgpack'),
+    or the default serializer if no name is given.
+    """
+    if name is None:
+        return _default_serializer
+    if name not in _SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}'; expected one of {sorted(_SERIALIZERS)}")
+    if name == _json_serializer.name:
+        return _json_serializer
+    return _SERIALIZERS[name]()
+
+
+def set_default_serializer(serializer: Union[Serializer, str]):
+    """Sets the serializer message adapters use unless they are given one."""
+    global _default_serializer
+    if isinstance(serializer, str):
+        serializer = get_serializer(serializer)
+    _default_serializer = serializer
+
+
+def json_dumps(obj: Any) -> str:
+    """Encodes `obj` as JSON text with the fastest JSON backend installed."""
+    if orjson is None:
+        return json.dumps(obj, default=_default)
+    return _json_serializer.dumps(obj).decode()
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Decodes JSON text with the fastest JSON backend installed."""
+    return _json_serializer.loads(data)
+
+
+def encode_tagged(obj):
+    """Encodes the values JSON would not round-trip, tagging their types (the `default` of tagged JSON)."""
+    if isinstance(obj, datetime):
+        return {'$datetime': obj.isoformat()}
+    if isinstance(obj, date):
+        return {'$date': obj.isoformat()}
+    if isinstance(obj, Decimal):
+        return {'$decimal': str(obj)}
+    if isinstance(obj, UUID):
+        return {'$uuid': obj.hex}
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Values of type {type(obj).__name__} can't be encoded as tagged JSON")
+
+
+def decode_tagged(obj: dict):
+    """Restores the values `encode_tagged` tagged (the `object_hook` of tagged JSON)."""
+    if len(obj) == 1:
+        tag, value = next(iter(obj.items()))
+        if tag == '$datetime':
+            return datetime.fromisoformat(value)
+        if tag == '$date':
+            return date.fromisoformat(value)
+        if tag == '$decimal':
+            return Decimal(value)
+        if tag == '$uuid':
+            return UUID(value)
+    return obj
+
+
+def tagged_json_dumps(obj: Any) -> bytes:
+    """
+    Encodes `obj` as compact JSON that `tagged_json_loads` decodes back to equal values.
+
+    :raises TypeError: if `obj` holds values that can't be restored (bytes, ...)
+    """
+    return json.dumps(obj, default=encode_tagged, separators=(',', ':')).encode()
+
+
+def tagged_json_loads(data: Union[bytes, str]) -> Any:
+    """Decodes JSON produced by `tagged_json_dumps`."""
+    return json.loads(data, object_hook=decode_tagged)
@@ -20,6 +20,15 @@ extras_require["faxing"] = [
     'requests>=2.31.0,<3.0'
 ]
 
+extras_require["serialization"] = [
+    'orjson>=3.8,<4.0',
+    'msgpack>=1.0,<2.0'
+]
+
+extras_require["cache"] = [
+    'redis>=5.0,<6.0'
+]
+
 extras_require["data-common"] = [
     'DBUtils>=3.1,<4.0'
 ]
@@ -40,6 +49,16 @@ extras_require["data-postgres"] = [
     'psycopg2-binary>=2.9.10,<3.0'
 ]
 
+extras_require["data-postgres-async"] = [
+    *extras_require["data-postgres"],
+    'psycopg[binary]>=3.1,<4.0'
+]
+
+extras_require["data-mysql-async"] = [
+    *extras_require["data-mysql"],
+    'aiomysql>=0.2,<0.3'
+]
+
 extras_require["data-dynamodb"] = [
     'pynamodb>=6.0.0,<7.0'
 ]
@@ -51,6 +70,8 @@ extras_require["data"] = [
     *extras_require["data-mongo"],
     *extras_require["data-postgres"],
     *extras_require["data-dynamodb"],
+    *extras_require["data-postgres-async"],
+    *extras_require["data-mysql-async"],
 ]
 
 extras_require["all"] = [
@@ -58,7 +79,9 @@ extras_require["all"] = [
     *extras_require["emailing"],
     *extras_require["messaging"],
     *extras_require["faxing"],
-    *extras_require["sms"]
+    *extras_require["sms"],
+    *extras_require["serialization"],
+    *extras_require["cache"]
 ]
 
 
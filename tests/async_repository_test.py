@@ -0,0 +1,208 @@
+"""
+Tests for the asyncio adapters and AsyncBaseRepository
+"""
+import asyncio
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from rococo.data.async_mysql import AsyncMySqlAdapter
+from rococo.data.async_postgresql import AsyncPostgreSQLAdapter
+from rococo.models import BaseModel, VersionedModel
+from rococo.repositories import AsyncBaseRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Project(VersionedModel):
+    name: str = None
+
+
+@dataclass(kw_only=True)
+class Label(BaseModel):
+    name: str = None
+
+
+A = "a" * 32
+
+
+class FakeCursor:
+    """An async DB-API cursor returning canned rows."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, query, values=()):
+        self.connection.executed.append((query, tuple(values)))
+        self.rows = self.connection.results.pop(0) if self.connection.results else []
+        self.description = [(name,) for name in self.rows[0]] if self.rows else None
+
+    async def fetchall(self):
+        return [tuple(row.values()) for row in self.rows]
+
+
+class FakeConnection:
+    def __init__(self, results=None):
+        self.results = list(results or [])
+        self.executed = []
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def close(self):
+        self.closed = True
+
+
+def _postgresql_adapter(connections):
+    async def connect(**kwargs):
+        return connections.pop(0)
+    return AsyncPostgreSQLAdapter('host', 5432, 'user', 'password', 'db', connection_resolver=connect)
+
+
+def test_postgresql_adapter_runs_the_sync_adapter_queries():
+    """The async adapter sends the SQL of the synchronous adapter and maps rows to dicts"""
+    connection = FakeConnection([[{'entity_id': A, 'name': "x"}]])
+    adapter = _postgresql_adapter([connection])
+
+    async def main():
+        async with adapter:
+            return await adapter.get_many('project', {'name': "x"}, limit=10)
+
+    assert asyncio.run(main()) == [{'entity_id': A, 'name': "x"}]
+    assert connection.executed == [(
+        "SELECT project.* FROM project WHERE project.name = %s AND project.active = %s LIMIT %s",
+        ("x", 'true', 10))]
+    assert connection.closed
+
+
+def test_concurrent_tasks_use_their_own_connections():
+    """Tasks sharing an adapter each query on the connection they opened"""
+    connections = [FakeConnection([[{'count': 1}]]), FakeConnection([[{'count': 2}]])]
+    adapter = _postgresql_adapter(list(connections))
+
+    async def count():
+        async with adapter:
+            await asyncio.sleep(0)
+            return await adapter.get_count('project', {})
+
+    async def main():
+        return await asyncio.gather(count(), count())
+
+    assert sorted(asyncio.run(main())) == [1, 2]
+    assert all(len(connection.executed) == 1 for connection in connections)
+
+
+def test_mysql_adapter_hard_delete_commits():
+    """MySQL deletes by entity_id and commits"""
+    connection = FakeConnection()
+    connection.close = MagicMock()
+
+    async def connect(**kwargs):
+        return connection
+    adapter = AsyncMySqlAdapter('host', 3306, 'user', 'password', 'db', connection_resolver=connect)
+
+    async def main():
+        async with adapter:
+            await adapter.hard_delete('label', "a-b")
+
+    asyncio.run(main())
+    assert connection.executed == [("DELETE FROM label WHERE entity_id = %s", ("ab",))]
+    assert connection.commits == 1
+    connection.close.assert_called_once()
+
+
+def _repository(model=Project, cls=AsyncBaseRepository):
+    adapter = AsyncMock()
+    adapter.supports_batch_save = False
+    adapter.get_one.return_value = {'entity_id': A, 'name': "x"}
+    adapter.get_many.return_value = [{'entity_id': A, 'name': "x"}]
+    adapter.get_count.return_value = 3
+    adapter.get_save_query.return_value = ("save", ())
+    adapter.get_move_entity_to_audit_table_query.return_value = ("audit", ())
+    return cls(adapter, model, MagicMock(), 'queue'), adapter
+
+
+def test_repository_reads():
+    """Reads await the adapter inside `async with` and return model instances"""
+    repository, adapter = _repository()
+
+    async def main():
+        return (await repository.get_one({'entity_id': A}),
+                await repository.get_many({'name': "x"}, limit=5),
+                await repository.get_count(query={'name': "x"}))
+
+    project, projects, count = asyncio.run(main())
+
+    assert isinstance(project, Project) and project.name == "x"
+    assert [item.entity_id for item in projects] == [A]
+    assert count == 3 and count.mode == 'exact'
+    adapter.get_one.assert_awaited_once_with('project', {'entity_id': A}, active=True)
+    adapter.get_count.assert_awaited_once_with(
+        'project', {'latest': True, 'active': True, 'name': "x"}, options=None)
+    assert adapter.__aenter__.await_count == 3
+
+
+def test_repository_save_and_delete():
+    """Versioned saves move the previous version to the audit table in one transaction"""
+    repository, adapter = _repository()
+    project = Project(name="y")
+
+    asyncio.run(repository.save(project))
+    adapter.run_transaction.assert_awaited_once_with([("audit", ()), ("save", ())])
+
+    asyncio.run(repository.delete(project))
+    assert project.active is False and adapter.run_transaction.await_count == 2
+
+    label_repository, label_adapter = _repository(Label)
+    asyncio.run(label_repository.delete(Label(entity_id=A)))
+    label_adapter.hard_delete.assert_awaited_once_with('label', A)
+
+
+def test_repository_save_many_batches_like_the_sync_repository():
+    """save_many builds the queries of the synchronous repositories, awaiting the adapter"""
+    repository, adapter = _repository()
+    adapter.supports_batch_save = True
+    adapter.get_move_entities_to_audit_table_query.return_value = ("audit", ())
+    adapter.get_save_many_queries.side_effect = lambda table, batch: [("save", len(batch))]
+    repository.save_batch_size = 2
+
+    with patch.object(Project, 'undefer') as undefer:
+        asyncio.run(repository.save_many([Project(name=str(i)) for i in range(3)]))
+
+    undefer.assert_called_once()
+    adapter.run_transaction.assert_awaited_once_with([("audit", ()), ("save", 2), ("audit", ()), ("save", 1)])
+
+
+def test_repository_save_loads_deferred_fields():
+    """save writes whole records, so deferred fields are loaded first"""
+    repository, _ = _repository()
+    project = Project(name="y")
+
+    with patch.object(Project, 'undefer') as undefer:
+        asyncio.run(repository.save(project))
+
+    undefer.assert_called_once_with([project])
+
+
+def test_combined_with_a_database_repository():
+    """Subclassing a synchronous repository brings its table name and conversions"""
+    class AsyncProjectRepository(AsyncBaseRepository, PostgreSQLRepository):
+        pass
+
+    repository, adapter = _repository(cls=AsyncProjectRepository)
+    asyncio.run(repository.save(Project(name="z")))
+
+    _, data = adapter.get_save_query.await_args.args
+    assert isinstance(data['entity_id'], str) and '-' not in data['entity_id']
@@ -0,0 +1,70 @@
+"""
+Tests for the VersionedModel attribute guards (partial instances, m2m fields)
+"""
+from dataclasses import dataclass, field
+
+import pytest
+
+from rococo.models import VersionedModel, compact_model
+from rococo.models.metadata import get_model_metadata
+
+
+@dataclass(kw_only=True)
+class Team(VersionedModel):
+    name: str = None
+    members: list = field(default=None, metadata={'field_type': 'm2m_list'})
+
+
+@dataclass(kw_only=True)
+class InactiveByDefault(Team):
+    active: bool = False
+
+
+@compact_model
+@dataclass(kw_only=True)
+class CompactTeam(VersionedModel):
+    name: str = None
+    members: list = field(default=None, metadata={'field_type': 'm2m_list'})
+
+
+def test_unguarded_reads_skip_python_hooks():
+    """VersionedModel does not override __getattribute__; only guarded names are checked"""
+    assert VersionedModel.__getattribute__ is object.__getattribute__
+    meta = get_model_metadata(Team)
+    assert meta.guarded_names == frozenset(
+        {'members', 'version', 'previous_version', 'active', 'changed_by_id', 'changed_on'})
+
+
+@pytest.mark.parametrize("model_cls", [Team, InactiveByDefault, CompactTeam])
+def test_partial_instance_guards(model_cls):
+    """Big 6 fields other than entity_id are not readable on partial instances"""
+    partial = model_cls(_is_partial=True)
+
+    assert partial.entity_id
+    assert partial.name is None
+    for name in ('version', 'previous_version', 'active', 'changed_by_id', 'changed_on'):
+        with pytest.raises(AttributeError, match="partial instance"):
+            getattr(partial, name)
+
+    partial._is_partial = False
+    assert partial.active is (model_cls is not InactiveByDefault)
+
+
+@pytest.mark.parametrize("model_cls", [Team, InactiveByDefault, CompactTeam])
+def test_m2m_guards(model_cls):
+    """Many-to-many fields are readable only once loaded"""
+    team = model_cls()
+    with pytest.raises(AttributeError, match="not loaded"):
+        _ = team.members
+
+    team.members = []
+    assert team.members == []
+    assert team.as_dict()['members'] == []
+
+
+def test_guarded_field_overridden_in_subclass_keeps_default():
+    """A subclass overriding a Big 6 default still stores and guards the field"""
+    instance = InactiveByDefault()
+    assert instance.active is False
+    assert InactiveByDefault.active is False
+    assert instance.as_dict()['active'] is False
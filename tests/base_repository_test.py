@@ -1,7 +1,6 @@
 """
 Tests for BaseRepository
 """
-import json
 import uuid
 import pytest
 from datetime import datetime, timezone
@@ -613,7 +612,7 @@ class TestBaseRepository:
         mock_message_adapter.send_message.assert_called_once_with(
             repository.queue_name,
             # Data from the second call to as_dict
-            json.dumps(data_for_message)
+            data_for_message
         )
         mock_db_adapter.__enter__.assert_called_once()
         mock_db_adapter.__exit__.assert_called_once()
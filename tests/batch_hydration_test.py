@@ -0,0 +1,126 @@
+"""
+Tests for batch model loading (Model.from_rows / Model.from_columns)
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from rococo.models import BaseModel, VersionedModel
+
+
+class Level(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+@dataclass
+class Point:
+    x: int = 0
+    y: int = 0
+
+
+@dataclass(kw_only=True)
+class Reading(VersionedModel):
+    label: str = field(default=None, metadata={'alias': 'name'})
+    level: Optional[Level] = None
+    taken_on: Optional[datetime] = None
+    point: Point = field(default=None, metadata={'model': Point})
+
+
+@dataclass(kw_only=True)
+class Note(BaseModel):
+    allow_extra = True
+    text: str = None
+
+
+@dataclass(kw_only=True)
+class CustomLoaded(VersionedModel):
+    text: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        instance = super().from_dict(data)
+        instance.text = (instance.text or "").upper()
+        return instance
+
+
+ROWS = [
+    {
+        'entity_id': str(UUID(int=1)),
+        'version': UUID(int=2).hex,
+        'changed_by_id': str(UUID(int=3)).upper(),
+        'previous_version': None,
+        'name': "first",
+        'level': "high",
+        'taken_on': "2024-01-02T03:04:05+00:00",
+        'point': {'x': 1, 'y': 2},
+        'ignored': True,
+    },
+    {
+        'entity_id': UUID(int=4),
+        'version': "not-a-uuid",
+        'changed_by_id': UUID(int=5).hex,
+        'previous_version': UUID(int=6).hex,
+        'name': "second",
+        'level': "unknown",
+        'taken_on': "2024-01-02T03:04:05+00:00",
+        'point': None,
+        'ignored': False,
+    },
+]
+
+
+def _fields(instance):
+    return {name: getattr(instance, name) for name in type(instance).fields() if name != 'changed_on'}
+
+
+def test_from_rows_matches_from_dict():
+    """Batch loading gives the same instances as from_dict row by row"""
+    batch = Reading.from_rows([dict(row) for row in ROWS])
+    single = [Reading.from_dict(dict(row)) for row in ROWS]
+
+    assert [_fields(i) for i in batch] == [_fields(i) for i in single]
+    assert batch[0].level is Level.HIGH
+    assert batch[0].point == Point(x=1, y=2)
+    assert batch[0].taken_on is batch[1].taken_on  # parsed once per column
+
+
+def test_from_rows_with_different_row_layouts():
+    """Rows with different keys keep their order and defaults"""
+    rows = [{'name': "a"}, {'level': "low"}, {'name': "c", 'level': "high"}]
+    batch = Reading.from_rows(rows)
+
+    assert [r.label for r in batch] == ["a", None, "c"]
+    assert [r.level for r in batch] == [None, Level.LOW, Level.HIGH]
+
+
+def test_from_columns_with_mapping():
+    """Columns are mapped onto fields with an explicit column -> field mapping"""
+    batch = Reading.from_columns(
+        {'reading_label': ["x", "y"], 'level': ["low", "high"]},
+        mapping={'reading_label': 'label'})
+
+    assert [(r.label, r.level) for r in batch] == [("x", Level.LOW), ("y", Level.HIGH)]
+    assert Reading.from_columns({}) == []
+
+
+def test_from_rows_extra_fields():
+    """Extra fields are collected per row as in from_dict"""
+    rows = [
+        {'text': "a", 'color': "red", 'extra': {'size': 1}},
+        {'text': "b", 'color': "blue", 'extra': None},
+    ]
+    batch = Note.from_rows([dict(r) for r in rows])
+    single = [Note.from_dict(dict(r)) for r in rows]
+
+    assert [n.extra for n in batch] == [n.extra for n in single] == [
+        {'color': "red", 'size': 1}, {'color': "blue"}]
+
+
+def test_from_rows_honours_overridden_from_dict():
+    """Models overriding from_dict are loaded through it"""
+    batch = CustomLoaded.from_rows([{'text': "a"}, {'text': "b"}])
+
+    assert [i.text for i in batch] == ["A", "B"]
@@ -0,0 +1,149 @@
+"""
+Tests for the cache backends and read-through repository caching
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from rococo.cache import MemoryCache, RedisCache
+from rococo.models import BaseModel, VersionedModel
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Invoice(VersionedModel):
+    total: Decimal = None
+    issued_at: datetime = None
+
+
+@dataclass(kw_only=True)
+class Tag(BaseModel):
+    name: str = None
+
+
+A, B = "a" * 32, "b" * 32
+
+
+class FakeRedis:
+    """The subset of the redis-py client RedisCache uses, with expiry."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        self.data[key] = (value, time.monotonic() + px / 1000 if px else None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+
+def test_memory_cache_evicts_least_recently_used_and_expired():
+    """Entries beyond max_entries evict the least recently used; expired entries are gone"""
+    cache = MemoryCache(max_entries=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+    assert cache.get_many(['a', 'b', 'c']) == [b'1', None, b'3']
+
+    cache.set('d', b'4', ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('d') is None
+    cache.delete('a', 'missing')
+    assert len(cache) == 1
+
+
+def test_redis_cache_prefixes_keys_and_sets_expiry():
+    """Keys are prefixed and ttls become millisecond expiries"""
+    client = FakeRedis()
+    cache = RedisCache(client, prefix='app:', default_ttl=30)
+    cache.set('a', b'1')
+    cache.set('b', b'2', ttl=0.01)
+
+    assert set(client.data) == {'app:a', 'app:b'}
+    time.sleep(0.02)
+    assert cache.get_many(['a', 'b']) == [b'1', None]
+    cache.delete('a')
+    assert cache.get('a') is None
+
+
+def _repository(cache):
+    adapter = MagicMock()
+    adapter.get_one.return_value = {
+        'entity_id': A, 'total': Decimal('9.50'), 'issued_at': datetime(2024, 1, 2, 3, 4, 5)}
+    adapter.get_many.return_value = [adapter.get_one.return_value]
+    adapter.get_count.return_value = 1
+    repository = PostgreSQLRepository(adapter, Invoice, MagicMock(), 'queue')
+    repository.cache = cache
+    return repository, adapter
+
+
+def test_reads_go_through_the_cache():
+    """Repeated reads are answered from the cache, with values restored as they were"""
+    for cache in (MemoryCache(), RedisCache(FakeRedis())):
+        repository, adapter = _repository(cache)
+
+        for _ in range(2):
+            invoice = repository.get_one({'entity_id': A})
+            invoices = repository.get_many({'total': 1}, sort=[('total', 'ASC')], limit=10)
+            count = repository.get_count(query={'total': 1}, mode='cached')
+
+        assert invoice.total == Decimal('9.50') and invoice.issued_at == datetime(2024, 1, 2, 3, 4, 5)
+        assert [item.entity_id for item in invoices] == [A] and count == 1
+        assert (adapter.get_one.call_count, adapter.get_many.call_count, adapter.get_count.call_count) == (1, 1, 1)
+
+        # Other parameters are other entries
+        repository.get_many({'total': 1}, sort=[('total', 'ASC')], limit=20)
+        assert adapter.get_many.call_count == 2
+
+
+def test_save_invalidates_the_entity_and_list_queries():
+    """Saving an entity drops its entries and the table's list queries, not other entities"""
+    repository, adapter = _repository(MemoryCache())
+    repository.get_one({'entity_id': A})
+    repository.get_one({'entity_id': B})
+    repository.get_many()
+
+    repository.save(Invoice(entity_id=A))
+    repository.get_one({'entity_id': A})
+    repository.get_one({'entity_id': B})
+    repository.get_many()
+
+    assert adapter.get_one.call_count == 3
+    assert adapter.get_many.call_count == 2
+
+
+def test_hard_delete_invalidates():
+    """Deleting a non-versioned entity drops its cached entries"""
+    adapter = MagicMock()
+    adapter.get_one.return_value = {'entity_id': A, 'name': "tag"}
+    repository = BaseRepository(adapter, Tag, MagicMock())
+    repository.cache = MemoryCache()
+
+    tag = repository.get_one({'entity_id': A})
+    repository.delete(tag)
+    repository.get_one({'entity_id': A})
+
+    assert adapter.get_one.call_count == 2
+
+
+def test_no_cache_by_default():
+    """Repositories without a cache query every time"""
+    repository, adapter = _repository(None)
+    repository.get_one({'entity_id': A})
+    repository.get_one({'entity_id': A})
+    assert adapter.get_one.call_count == 2
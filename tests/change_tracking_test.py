@@ -0,0 +1,151 @@
+"""
+Tests for dirty-field tracking (changed_fields) and partial-update saves
+"""
+from dataclasses import dataclass, field
+from unittest.mock import MagicMock, patch
+
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.models import BaseModel, VersionedModel, compact_model
+from rococo.repositories.base_repository import BaseRepository
+from rococo.serialization import json_dumps
+
+
+@dataclass(kw_only=True)
+class Setting(BaseModel):
+    track_changes = True
+    allow_extra = True
+
+    key: str = None
+    value: str = field(default=None, metadata={'alias': 'setting_value'})
+    tags: list = None
+
+
+@compact_model
+@dataclass(kw_only=True)
+class CompactSetting(BaseModel):
+    track_changes = True
+
+    key: str = None
+    value: str = None
+
+
+@dataclass(kw_only=True)
+class Document(VersionedModel):
+    track_changes = True
+
+    title: str = None
+
+
+def _repository(model, partial_updates=True):
+    adapter = MagicMock()
+    adapter.supports_partial_updates = True
+    repository = BaseRepository(adapter, model, MagicMock())
+    repository.partial_updates = partial_updates
+    return repository, adapter
+
+
+def test_changed_fields_after_load():
+    """Only fields changed since loading are reported, including in-place changes"""
+    setting = Setting.from_dict({'entity_id': "a" * 32, 'key': "theme",
+                                 'setting_value': "dark", 'tags': ["x"]})
+    assert setting.changed_fields() == []
+    assert setting.extra == {}  # aliased keys are fields, not extra fields
+
+    setting.value = "light"
+    setting.tags.append("y")
+    assert setting.changed_fields() == ['value', 'tags']
+
+    setting.value = "dark"
+    setting.color = "red"
+    assert setting.changed_fields() == ['tags', 'extra']
+
+    setting.clear_changed_fields()
+    assert setting.changed_fields() == []
+
+
+def test_changed_fields_of_new_and_untracked_instances():
+    """Instances that were never loaded or saved report every set field"""
+    assert Setting(key="theme").changed_fields() == ['entity_id', 'key', 'value', 'tags']
+
+    @dataclass(kw_only=True)
+    class Untracked(BaseModel):
+        key: str = None
+
+    assert Untracked.from_dict({'key': "a"}).changed_fields() == ['entity_id', 'key']
+
+
+def test_changed_fields_of_batch_loaded_compact_instances():
+    """from_rows records the loaded state, compact instances included"""
+    first, second = CompactSetting.from_rows([{'key': "a", 'value': "1"}, {'key': "b", 'value': "2"}])
+    second.value = "3"
+
+    assert first.changed_fields() == []
+    assert second.changed_fields() == ['value']
+
+
+def test_partial_update_writes_changed_columns():
+    """A loaded non-versioned instance only writes its changed fields"""
+    repository, adapter = _repository(Setting)
+    setting = Setting.from_dict({'entity_id': "a" * 32, 'key': "theme", 'setting_value': "dark"})
+    setting.value = "light"
+
+    repository.save(setting)
+
+    adapter.get_update_query.assert_called_once_with(
+        'setting', {'entity_id': "a" * 32, 'setting_value': "light"})
+    adapter.get_save_query.assert_not_called()
+    assert setting.changed_fields() == []
+
+    # Nothing changed since the last save: the adapter gets no columns to update
+    repository.save(setting)
+    adapter.get_update_query.assert_called_with('setting', {'entity_id': "a" * 32})
+
+
+def test_partial_update_writes_all_extra_fields_together():
+    """Changing one extra field writes all of them"""
+    repository, adapter = _repository(Setting)
+    setting = Setting.from_dict({'entity_id': "a" * 32, 'key': "theme", 'color': "red", 'size': 2})
+    setting.color = "blue"
+
+    repository.save(setting)
+
+    adapter.get_update_query.assert_called_once_with(
+        'setting', {'entity_id': "a" * 32, 'color': "blue", 'size': 2})
+
+
+def test_full_save_when_partial_update_does_not_apply():
+    """New instances, versioned models and the default mode save the whole record"""
+    repository, adapter = _repository(Setting)
+    repository.save(Setting(key="theme"))
+
+    disabled, disabled_adapter = _repository(Setting, partial_updates=False)
+    disabled.save(Setting.from_dict({'key': "theme"}))
+
+    versioned, versioned_adapter = _repository(Document)
+    versioned.save(Document.from_dict({'title': "a"}))
+
+    for db_adapter in (adapter, disabled_adapter, versioned_adapter):
+        db_adapter.get_update_query.assert_not_called()
+        db_adapter.get_save_query.assert_called_once()
+
+
+def test_postgresql_update_query():
+    """PostgreSQL updates the given columns and keeps extra fields in the extra column"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db')
+    with patch.object(adapter, '_get_table_columns', return_value={'entity_id', 'key', 'extra'}):
+        query, values = adapter.get_update_query('setting', {'entity_id': "abc", 'key': "k", 'color': "red"})
+        assert adapter.get_update_query('setting', {'entity_id': "abc"}) is None
+
+    assert query == "UPDATE setting SET key = %s, extra = %s WHERE entity_id = %s"
+    assert values == ("k", json_dumps({'color': "red"}), "abc")
+
+
+def test_mysql_update_query():
+    """MySQL updates only the given columns"""
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db')
+    query, values = adapter.get_update_query('setting', {'entity_id': "abc", 'key': "k"})
+
+    assert query == "UPDATE setting SET `key` = %s WHERE `entity_id` = %s"
+    assert values == ("k", "abc")
+    assert adapter.get_update_query('setting', {'entity_id': "abc"}) is None
@@ -0,0 +1,171 @@
+"""
+Tests for __slots__-backed (compact) models
+"""
+import copy
+import gc
+import pickle
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from unittest.mock import MagicMock
+
+import pytest
+
+from rococo.models import BaseModel, VersionedModel, compact_model
+from rococo.models.compact import is_compact
+
+
+@compact_model
+@dataclass(kw_only=True)
+class CompactRow(VersionedModel):
+    name: str = None
+    total: int = 0
+    tags: list = field(default=None, metadata={'field_type': 'm2m_list'})
+
+    def __post_init__(self, _is_partial):
+        super().__post_init__(_is_partial)
+
+
+@compact_model
+@dataclass(kw_only=True)
+class CompactSetting(BaseModel):
+    allow_extra = True
+    key: str = None
+
+
+@dataclass(kw_only=True)
+class RegularRow(VersionedModel):
+    name: str = None
+    total: int = 0
+
+
+def _has_dicts(instance):
+    """Whether `instance` holds any dictionary (its __dict__ or an extra dict)."""
+    return any(isinstance(referent, dict) for referent in gc.get_referents(instance))
+
+
+def test_compact_instances_have_no_dict():
+    """Compact instances store fields in slots and allocate no __dict__ or extra dict"""
+    row = CompactRow(name="a", total=2)
+
+    assert is_compact(CompactRow)
+    assert not _has_dicts(row)
+    with pytest.raises(AttributeError):
+        object.__getattribute__(row, 'extra')
+    assert row.name == "a"
+    assert row.total == 2
+
+
+def test_compact_as_dict_matches_regular_model():
+    """Compact and regular models serialize the same way"""
+    compact = CompactRow(name="a", total=2, tags=[])
+    regular = RegularRow(name="a", total=2)
+    regular.entity_id = compact.entity_id
+    regular.changed_on = compact.changed_on
+
+    assert compact.as_dict(True) == {**regular.as_dict(True), 'tags': []}
+
+
+def test_compact_extra_fields():
+    """Extra fields are kept in a lazily created extra dict"""
+    setting = CompactSetting.from_dict({'key': "theme", 'color': "dark"})
+    setting.size = 3
+
+    assert setting.color == "dark"
+    assert setting.extra == {'color': "dark", 'size': 3}
+    assert setting.as_dict() == {'entity_id': setting.entity_id, 'key': "theme", 'color': "dark", 'size': 3}
+
+
+def test_compact_partial_and_m2m_checks():
+    """Partial instance and unloaded many-to-many checks still apply"""
+    partial = CompactRow(_is_partial=True)
+    assert partial._is_partial
+    with pytest.raises(AttributeError):
+        _ = partial.version
+    assert partial.as_dict() == {'entity_id': partial.entity_id}
+
+    with pytest.raises(AttributeError, match="not loaded"):
+        _ = CompactRow().tags
+
+
+def test_compact_instances_accept_ad_hoc_attributes():
+    """Attributes without a slot are still settable on compact instances"""
+    row = CompactRow()
+    row.note = "kept"
+    row._cache = 1
+
+    assert row.note == "kept"
+    assert row._cache == 1
+    assert 'note' not in row.as_dict()
+
+
+def test_compact_instances_copy_and_pickle():
+    """Compact instances can be copied and pickled"""
+    row = CompactRow(name="a", tags=[])
+
+    assert copy.deepcopy(row) == row
+    assert pickle.loads(pickle.dumps(row)) == row
+
+
+def test_compact_models_are_opt_in():
+    """Base classes keep their __dict__ and extra dict; compact models still pass their isinstance checks"""
+    row = RegularRow()
+
+    assert not is_compact(VersionedModel) and not is_compact(RegularRow)
+    assert row.__dict__['extra'] == {} and row.extra == {}
+    assert isinstance(CompactRow(), VersionedModel) and issubclass(CompactSetting, BaseModel)
+    assert not isinstance(row, CompactRow)
+
+
+def test_compact_subclass_of_a_regular_model():
+    """Inherited fields of regular bases get slots too, and the bases are left unchanged"""
+    @compact_model
+    @dataclass(kw_only=True)
+    class CompactChild(RegularRow):
+        extra_value: int = 0
+
+    child = CompactChild(name="a", extra_value=1)
+
+    assert not _has_dicts(child)
+    assert isinstance(child, RegularRow)
+    assert child.as_dict()['name'] == "a" and child.extra_value == 1
+    assert RegularRow(name="b").name == "b"
+
+
+@compact_model
+@dataclass
+class Point:
+    x: int = 0
+    y: int = 0
+
+
+@dataclass(kw_only=True)
+class Shape(BaseModel):
+    origin: Point = field(default=None, metadata={'model': Point})
+
+
+def test_as_dict_of_compact_nested_dataclasses():
+    assert Shape(origin=Point(1, 2)).as_dict()['origin'] == {'x': 1, 'y': 2}
+
+
+def test_models_mixing_in_abc():
+    """Models can still mix in ABC; BaseModel has no metaclass of its own"""
+    @dataclass(kw_only=True)
+    class Shipment(VersionedModel, ABC):
+        weight: int = 0
+
+        @abstractmethod
+        def cost(self):
+            ...
+
+    @dataclass(kw_only=True)
+    class Parcel(Shipment):
+        def cost(self):
+            return self.weight * 2
+
+    assert type(BaseModel) is type
+    assert Parcel(weight=2).cost() == 4 and isinstance(Parcel(), VersionedModel)
+
+
+def test_spec_mocks_pass_isinstance_checks():
+    assert isinstance(MagicMock(spec=VersionedModel), VersionedModel)
+    assert isinstance(MagicMock(spec=VersionedModel), BaseModel)
@@ -0,0 +1,166 @@
+"""
+Tests for code-generated as_dict/from_dict converters (use_compiled_converters)
+"""
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+from rococo.models import BaseModel, VersionedModel
+from rococo.models.metadata import get_model_metadata
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    INACTIVE = "inactive"
+
+
+@dataclass
+class Address:
+    street: str = None
+    city: str = None
+
+
+@dataclass(kw_only=True)
+class Tag(VersionedModel):
+    label: str = None
+
+
+@dataclass(kw_only=True)
+class Account(VersionedModel):
+    full_name: str = field(default=None, metadata={'alias': 'name'})
+    status: Optional[Status] = None
+    plan: Status = Status.ACTIVE
+    last_login: Optional[datetime] = None
+    owner: str = field(default=None, metadata={'field_type': 'entity_id'})
+    member_ids: List[UUID] = field(default_factory=list)
+    address: Address = field(default=None, metadata={'model': Address})
+    tags: list = field(default=None, metadata={'field_type': 'm2m_list'})
+    score: float = 0.0
+
+    @property
+    def display_name(self):
+        return f"{self.full_name} ({self.plan.value})"
+
+    @property
+    def broken(self):
+        raise ValueError("not computable")
+
+
+@dataclass(kw_only=True)
+class CompiledAccount(Account):
+    use_compiled_converters = True
+
+
+@dataclass(kw_only=True)
+class Setting(BaseModel):
+    allow_extra = True
+    key: str = None
+    value: str = None
+    created: datetime = None
+
+
+@dataclass(kw_only=True)
+class CompiledSetting(Setting):
+    use_compiled_converters = True
+
+
+OPTION_COMBINATIONS = list(itertools.product([False, True], repeat=3))
+
+
+def _account_kwargs():
+    return dict(
+        full_name="Jane Doe",
+        status=Status.INACTIVE,
+        last_login=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        owner=Tag(_is_partial=True),
+        member_ids=[uuid4(), uuid4()],
+        address=Address(street="1 Main St", city="Springfield"),
+        tags=[Tag(label="a"), Tag(label="b")],
+        score=4.5,
+        changed_by_id=uuid4(),
+    )
+
+
+@pytest.mark.parametrize("options", OPTION_COMBINATIONS)
+def test_compiled_as_dict_matches_generic(options):
+    """Generated as_dict gives the same output as the generic implementation"""
+    kwargs = _account_kwargs()
+    generic = Account(**kwargs)
+    compiled = CompiledAccount(**kwargs)
+    compiled.entity_id = generic.entity_id
+    compiled.changed_on = generic.changed_on
+
+    assert compiled.as_dict(*options) == generic.as_dict(*options)
+    assert list(compiled.as_dict(*options)) == list(generic.as_dict(*options))
+
+
+@pytest.mark.parametrize("options", OPTION_COMBINATIONS)
+def test_compiled_as_dict_unloaded_m2m_and_references(options):
+    """Unloaded m2m fields are dropped and dict references are unwrapped"""
+    generic = Account(owner={'entity_id': UUID(int=7)})
+    compiled = CompiledAccount(owner={'entity_id': UUID(int=7)})
+    compiled.entity_id = generic.entity_id
+    compiled.changed_on = generic.changed_on
+
+    result = compiled.as_dict(*options)
+    assert 'tags' not in result
+    assert result == generic.as_dict(*options)
+
+
+def test_compiled_from_dict_matches_generic():
+    """Generated from_dict gives the same instance as the generic implementation"""
+    data = {
+        'entity_id': str(UUID(int=1)),
+        'version': str(UUID(int=2)),
+        'name': "John",
+        'status': "active",
+        'plan': "inactive",
+        'last_login': "2024-01-02T03:04:05+00:00",
+        'address': {'street': "2 Side St", 'city': "Shelbyville"},
+        'score': 1.5,
+        'ignored': "value",
+    }
+    generic = Account.from_dict(data)
+    compiled = CompiledAccount.from_dict(data)
+
+    assert compiled.entity_id == UUID(int=1).hex
+    assert compiled.status is Status.ACTIVE
+    assert compiled.plan is Status.INACTIVE
+    assert compiled.address == Address(street="2 Side St", city="Shelbyville")
+    for name in Account.fields():
+        if name in ('changed_on', 'tags'):
+            continue
+        assert getattr(compiled, name) == getattr(generic, name)
+
+
+def test_compiled_from_dict_with_extra_fields():
+    """Extra fields are collected the same way as the generic implementation"""
+    data = {
+        'key': "theme",
+        'value': "dark",
+        'created': "2024-01-02T03:04:05",
+        'note': "kept",
+        'extra': {'nested': 1},
+    }
+    generic = Setting.from_dict(data)
+    compiled = CompiledSetting.from_dict(data)
+
+    assert compiled.extra == generic.extra == {'note': "kept", 'nested': 1}
+    assert compiled.created == generic.created
+    assert compiled.as_dict(True) == {**generic.as_dict(True), 'entity_id': compiled.entity_id}
+
+
+def test_compiled_converters_are_cached_per_options():
+    """Each option combination is generated once per class"""
+    instance = CompiledAccount()
+    instance.as_dict(True, True, False)
+    meta = get_model_metadata(CompiledAccount)
+
+    assert meta.compiled_as_dict(True, True, False) is meta.compiled_as_dict(True, True, False)
+    assert meta.compiled_as_dict(True, True, False) is not meta.compiled_as_dict(False, True, False)
+    assert meta.compiled_from_dict() is meta.compiled_from_dict()
@@ -0,0 +1,118 @@
+"""
+Tests for the connection lifecycle of the adapters
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rococo.data.mongodb import MongoDBAdapter
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.surrealdb import SurrealDbAdapter
+
+
+def _sql_adapter(cls=PostgreSQLAdapter, **kwargs):
+    resolver = MagicMock(side_effect=lambda **_: MagicMock())
+    adapter = cls('host', 5432, 'user', 'password', 'db', connection_resolver=resolver, **kwargs)
+    return adapter, resolver
+
+
+@pytest.mark.parametrize('cls', [PostgreSQLAdapter, MySqlAdapter])
+def test_per_call_connects_per_outermost_block(cls):
+    """Nested blocks reuse the connection; the outermost block closes it"""
+    adapter, resolver = _sql_adapter(cls)
+
+    with adapter:
+        connection = adapter._connection
+        with adapter:
+            assert adapter._connection is connection
+        connection.close.assert_not_called()
+    connection.close.assert_called_once()
+    assert adapter._connection is None
+
+    with adapter:
+        pass
+    assert resolver.call_count == 2
+
+
+@pytest.mark.parametrize('cls', [PostgreSQLAdapter, MySqlAdapter])
+def test_persistent_keeps_the_connection(cls):
+    """Persistent adapters connect once and end the read transaction of each block"""
+    adapter, resolver = _sql_adapter(cls, connection_mode='persistent')
+
+    for _ in range(3):
+        with adapter:
+            connection = adapter._connection
+    assert resolver.call_count == 1
+    assert connection.rollback.call_count == 3
+    connection.close.assert_not_called()
+
+    adapter.close()
+    connection.close.assert_called_once()
+    assert adapter._connection is None
+
+
+def test_persistent_checks_idle_connections():
+    """Connections idle past health_check_interval are checked, and replaced when the check fails"""
+    adapter, resolver = _sql_adapter(connection_mode='persistent', health_check_interval=10)
+
+    with patch('rococo.data.base.time.monotonic', return_value=100):
+        with adapter:
+            first = adapter._connection
+    with patch('rococo.data.base.time.monotonic', return_value=105):
+        with adapter:
+            pass
+    adapter._cursor.execute.assert_not_called()
+
+    adapter._cursor.execute.side_effect = Exception("server closed the connection")
+    with patch('rococo.data.base.time.monotonic', return_value=120):
+        with adapter:
+            assert adapter._connection is not first
+    first.close.assert_called_once()
+    assert resolver.call_count == 2
+
+
+def test_failed_connect_does_not_leave_the_adapter_entered():
+    """A block that failed to connect does not count as open"""
+    adapter, resolver = _sql_adapter()
+    resolver.side_effect = [ConnectionError("refused"), MagicMock()]
+
+    with pytest.raises(ConnectionError):
+        with adapter:
+            pass
+    with adapter:
+        assert adapter._connection is not None
+    assert adapter._connection is None
+
+
+def test_invalid_connection_mode():
+    with pytest.raises(ValueError):
+        _sql_adapter(connection_mode='pooled')
+
+
+def test_surrealdb_persistent_signs_in_once():
+    """Persistent SurrealDB adapters keep the signed-in client"""
+    with patch('rococo.data.surrealdb.Surreal') as surreal:
+        adapter = SurrealDbAdapter('ws://db', 'user', 'password', 'ns', 'db', connection_mode='persistent')
+        with adapter:
+            with adapter:
+                pass
+        with adapter:
+            pass
+    surreal.return_value.signin.assert_called_once()
+    surreal.return_value.close.assert_not_called()
+
+
+def test_mongodb_persistent_pings_once():
+    """Persistent MongoDB adapters ping the server once and start a session per outermost block"""
+    with patch('rococo.data.mongodb.MongoClient') as mongo_client:
+        adapter = MongoDBAdapter('mongodb://db', 'db', connection_mode='persistent')
+        client = mongo_client.return_value
+        with adapter:
+            with adapter:
+                pass
+        with adapter:
+            pass
+    client.admin.command.assert_called_once_with('ping')
+    assert client.start_session.call_count == 2
+    assert client.start_session.return_value.end_session.call_count == 2
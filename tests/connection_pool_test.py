@@ -0,0 +1,141 @@
+"""
+Tests for ConnectionPool
+"""
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rococo.data import ConnectionPool, PoolTimeoutError
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.surrealdb import SurrealDbAdapter
+
+
+def _pool(**kwargs):
+    creator = MagicMock(side_effect=lambda **_: MagicMock())
+    return ConnectionPool(creator, **kwargs), creator
+
+
+def test_connections_are_reused():
+    pool, creator = _pool()
+    connection = pool.checkout()
+    pool.checkin(connection)
+
+    assert pool.checkout() is connection
+    assert creator.call_count == 1
+    connection.rollback.assert_called()
+    stats = pool.stats()
+    assert (stats.size, stats.idle, stats.checked_out, stats.created) == (1, 0, 1, 1)
+
+
+def test_full_pool_waits_then_times_out():
+    pool, _ = _pool(max_size=1, checkout_timeout=0.05)
+    connection = pool.checkout()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout()
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.checkout()))
+    pool.checkout_timeout = 5
+    waiter.start()
+    while pool.stats().waiting == 0:
+        pass
+    pool.checkin(connection)
+    waiter.join()
+    assert result == [connection]
+
+
+def test_failed_pre_ping_replaces_the_connection():
+    pool, creator = _pool()
+    broken = pool.checkout()
+    pool.checkin(broken)
+    broken.cursor.return_value.execute.side_effect = Exception("connection closed")
+
+    connection = pool.checkout()
+
+    assert connection is not broken
+    broken.close.assert_called_once()
+    assert pool.stats().recycled == 1 and creator.call_count == 2
+
+
+def test_idle_timeout_and_max_lifetime():
+    pool, _ = _pool(min_size=1, idle_timeout=10, max_lifetime=100)
+    with patch('rococo.data.pool.time.monotonic', return_value=0):
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+
+    with patch('rococo.data.pool.time.monotonic', return_value=20):
+        kept = pool.checkout()
+    # Idle connections are closed down to min_size
+    assert pool.stats().recycled == 1 and kept in (first, second)
+
+    with patch('rococo.data.pool.time.monotonic', return_value=200):
+        pool.checkin(kept)
+    kept.close.assert_called_once()
+    assert pool.stats().size == 0
+
+
+def test_warm_opens_min_size():
+    pool, creator = _pool(min_size=2)
+    pool.warm(host='db')
+
+    assert pool.stats().idle == 2
+    creator.assert_called_with(host='db')
+
+
+def test_checkin_of_unknown_connection():
+    pool, _ = _pool()
+    with pytest.raises(ValueError):
+        pool.checkin(MagicMock())
+
+
+def test_postgresql_adapter_hooks():
+    """Adapters check out a connection per block and return it on exit"""
+    pool, creator = _pool()
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db',
+                                connection_resolver=pool.connection_resolver,
+                                connection_closer=pool.connection_closer)
+    with adapter:
+        connection = adapter._connection
+    with adapter:
+        assert adapter._connection is connection
+
+    creator.assert_called_once_with(host='host', port=5432, user='user', password='password', database='db')
+    connection.close.assert_not_called()
+    assert adapter._connection is None and pool.stats().idle == 1
+
+
+def test_surrealdb_adapter_hooks():
+    pool, creator = _pool()
+    adapter = SurrealDbAdapter('ws://db', 'user', 'password', 'ns', 'db',
+                               connection_resolver=pool.connection_resolver,
+                               connection_closer=pool.connection_closer)
+    for _ in range(2):
+        with adapter:
+            pass
+
+    assert creator.call_count == 1
+    creator.assert_called_once_with(endpoint='ws://db', username='user', password='password',
+                                    namespace='ns', db_name='db')
+    assert pool.stats().idle == 1
+
+
+def test_pool_without_max_size_is_unlimited():
+    pool, creator = _pool(max_size=None, checkout_timeout=0.05)
+
+    connections = [pool.checkout() for _ in range(20)]
+
+    assert len(set(map(id, connections))) == 20 and creator.call_count == 20
+
+
+def test_flask_plugin_keeps_the_pool_unlimited_by_default():
+    """Without *_POOL_MAX_CONNECTIONS the plugin pool has no cap, as with PooledDB"""
+    from rococo.plugins.pooled_connection import PooledConnectionPlugin
+
+    app = MagicMock(config={'POSTGRES_HOST': "host"}, extensions={})
+    assert PooledConnectionPlugin(app, database_type="postgres").pool.max_size is None
+
+    app = MagicMock(config={'POSTGRES_POOL_MAX_CONNECTIONS': 5}, extensions={})
+    assert PooledConnectionPlugin(app, database_type="postgres").pool.max_size == 5
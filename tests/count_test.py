@@ -0,0 +1,141 @@
+"""
+Tests for get_count modes (exact, cached and estimate)
+"""
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+import pytest
+
+from rococo.cache import MemoryCache
+from rococo.data.mongodb import MongoDBAdapter
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.models import VersionedModel
+from rococo.repositories import Count
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.dynamodb.dynamodb_repository import DynamoDbRepository
+from rococo.repositories.mongodb.mongodb_repository import MongoDbRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Order(VersionedModel):
+    status: str = None
+
+
+def _repository():
+    adapter = MagicMock()
+    adapter.get_count.return_value = 42
+    adapter.get_count_estimate.return_value = 40
+    return PostgreSQLRepository(adapter, Order, MagicMock(), 'queue'), adapter
+
+
+def test_exact_count_queries_every_time():
+    """The default mode counts with a query on every call"""
+    repository, adapter = _repository()
+
+    counts = [repository.get_count(query={'status': "open"}) for _ in range(2)]
+
+    assert counts == [42, 42] and all(count.mode == 'exact' for count in counts)
+    assert adapter.get_count.call_count == 2
+    assert repr(counts[0]) == "Count(42, mode='exact')"
+
+
+def test_cached_count_until_expiry_or_save():
+    """Cached counts are read from the cache until the repository saves a record"""
+    repository, adapter = _repository()
+
+    first = repository.get_count(query={'status': "open"}, mode='cached')
+    second = repository.get_count(query={'status': "open"}, mode='cached')
+    assert (first.mode, second.mode) == ('exact', 'cached') and second == 42
+    assert adapter.get_count.call_count == 1
+
+    repository.save(Order(status="open"))
+    assert repository.get_count(query={'status': "open"}, mode='cached').mode == 'exact'
+    assert adapter.get_count.call_count == 2
+
+
+def test_repositories_with_a_cache_count_exactly_unless_asked():
+    """A cache doesn't change the default mode; counts go through it in 'cached' mode only"""
+    repository, adapter = _repository()
+    repository.cache = MemoryCache()
+
+    assert [repository.get_count().mode for _ in range(2)] == ['exact', 'exact']
+    assert adapter.get_count.call_count == 2
+
+    repository.count_mode = 'cached'
+    repository.get_count()
+    assert repository.get_count().mode == 'cached'
+    assert repository.get_count(mode='exact').mode == 'exact'
+    assert adapter.get_count.call_count == 4
+
+
+@pytest.mark.parametrize('write', ['save', 'save_many', 'delete'])
+def test_mongodb_and_dynamodb_writes_drop_cached_counts(write):
+    """Writes of the MongoDB and DynamoDB repositories drop the counts cached under their collection"""
+    for repository_cls, write_args in ((MongoDbRepository, ('orders',)), (DynamoDbRepository, ())):
+        adapter = MagicMock()
+        adapter.get_count.return_value = 42
+        adapter.save.return_value = None
+        repository = repository_cls(adapter, Order, MagicMock(), 'queue')
+        repository.table_name = 'orders'
+        repository.cache = MemoryCache()
+
+        repository.get_count('orders', None, {'active': True}, mode='cached')
+        assert repository.get_count('orders', None, {'active': True}, mode='cached').mode == 'cached'
+
+        order = Order(status="open")
+        getattr(repository, write)([order] if write == 'save_many' else order, *write_args)
+        assert repository.get_count('orders', None, {'active': True}, mode='cached').mode == 'exact'
+
+
+def test_estimate_falls_back_to_exact():
+    """Estimates come from the adapter; adapters that can't estimate count exactly"""
+    repository, adapter = _repository()
+    repository.count_mode = 'estimate'
+
+    estimate = repository.get_count()
+    assert estimate == 40 and estimate.is_estimate
+    adapter.get_count_estimate.assert_called_once_with('order', {'latest': True, 'active': True})
+
+    adapter.get_count_estimate.return_value = None
+    assert repository.get_count().mode == 'exact'
+
+    with pytest.raises(ValueError):
+        BaseRepository(adapter, Order, MagicMock()).get_count('order', None, {}, mode='approximate')
+
+
+def test_postgresql_estimates():
+    """PostgreSQL reads reltuples for whole tables and the EXPLAIN estimate otherwise"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db')
+    adapter._cursor = MagicMock()
+    adapter._cursor.description = [('estimate',)]
+    adapter._cursor.fetchall.return_value = [(1234,)]
+    assert adapter.get_count_estimate('order', {}) == 1234
+    assert "pg_class" in adapter._cursor.execute.call_args.args[0]
+
+    adapter._cursor.fetchall.return_value = [(-1,)]
+    assert adapter.get_count_estimate('order', {}) is None
+
+    adapter._cursor.fetchone.return_value = ('[{"Plan": {"Plan Rows": 17}}]',)
+    assert adapter.get_count_estimate('order', {'status': "open"}) == 17
+    query, values = adapter._cursor.execute.call_args.args
+    assert query.startswith('EXPLAIN (FORMAT JSON) SELECT 1 FROM "order" WHERE')
+    assert values == ("open",)
+
+
+def test_mysql_and_mongodb_estimates():
+    """MySQL reads table statistics and EXPLAIN estimates; MongoDB only estimates whole collections"""
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db')
+    adapter._cursor = MagicMock()
+    adapter._cursor.fetchall.return_value = [{'estimate': 900}]
+    assert adapter.get_count_estimate('order', {}) == 900
+    adapter._cursor.fetchall.return_value = [{'rows': 200, 'filtered': 25.0}]
+    assert adapter.get_count_estimate('order', {'status': "open"}) == 50
+
+    mongo = MongoDBAdapter('mongodb://localhost', 'db')
+    mongo._get_collection = MagicMock()
+    mongo._get_collection.return_value.estimated_document_count.return_value = 7
+    assert mongo.get_count_estimate('order', {}) == 7
+    assert mongo.get_count_estimate('order', {'latest': True}) is None
+    assert isinstance(Count(7, 'estimate'), int)
@@ -0,0 +1,150 @@
+"""
+Tests for deferred fields (left out of repository queries, loaded on first access)
+"""
+from dataclasses import dataclass, field
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.models import BaseModel, VersionedModel, compact_model
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.mongodb.mongodb_repository import MongoDbRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Article(VersionedModel):
+    title: str = None
+    body: str = field(default=None, metadata={'deferred': True})
+    notes: str = field(default=None, metadata={'deferred': True, 'alias': 'article_notes'})
+
+
+@compact_model
+@dataclass(kw_only=True)
+class Snippet(BaseModel):
+    track_changes = True
+
+    title: str = None
+    body: str = field(default=None, metadata={'deferred': True})
+
+
+ROWS = [{'entity_id': "a" * 32, 'title': "first"}, {'entity_id': "b" * 32, 'title': "second"}]
+
+
+def _loader(model_cls, calls):
+    def load(instances, names):
+        calls.append(([instance.entity_id for instance in instances], names))
+        return model_cls.from_rows([
+            {'entity_id': instance.entity_id, 'body': f"{instance.title} body", 'article_notes': "notes"}
+            for instance in instances])
+    return load
+
+
+@pytest.mark.parametrize("model_cls", [Article, Snippet])
+def test_deferred_field_loaded_on_first_access(model_cls):
+    """Unloaded deferred fields are fetched on first access, one field at a time"""
+    calls = []
+    first, second = model_cls.from_rows([dict(row) for row in ROWS])
+    model_cls.set_deferred_loader([first, second], _loader(model_cls, calls))
+
+    assert first.unloaded_fields()
+    assert 'body' not in first.as_dict()
+    assert calls == []
+
+    assert first.body == "first body"
+    assert first.body == "first body"
+    assert calls == [(["a" * 32], ['body'])]
+    assert second.unloaded_fields()
+
+
+def test_undefer_loads_instances_together():
+    """undefer() loads the deferred fields of all instances with one call per loader"""
+    calls = []
+    articles = Article.from_rows([dict(row) for row in ROWS])
+    Article.set_deferred_loader(articles, _loader(Article, calls))
+
+    Article.undefer(articles)
+
+    assert calls == [(["a" * 32, "b" * 32], ['body', 'notes'])]
+    assert [(a.body, a.notes) for a in articles] == [("first body", "notes"), ("second body", "notes")]
+    assert all(a.unloaded_fields() == [] and a._deferred_loader is None for a in articles)
+
+    Article.undefer(articles)
+    assert len(calls) == 1
+
+
+def test_deferred_fields_and_change_tracking():
+    """Unloaded fields are not changes, and loaded values become the unchanged state"""
+    snippet = Snippet.from_dict(dict(ROWS[0]))
+    Snippet.set_deferred_loader([snippet], _loader(Snippet, []))
+
+    assert snippet.changed_fields() == []
+    assert snippet.body == "first body"
+    assert snippet.changed_fields() == []
+
+    snippet.body = "edited"
+    assert snippet.changed_fields() == ['body']
+
+
+def test_postgresql_repository_defers_fields():
+    """get_many leaves deferred columns out and undefer fetches them by entity_id"""
+    adapter = MagicMock()
+    adapter.get_many.side_effect = [
+        [dict(row) for row in ROWS],
+        [{'entity_id': "a" * 32, 'body': "A", 'article_notes': "N"},
+         {'entity_id': "b" * 32, 'body': "B", 'article_notes': "M"}],
+    ]
+    repository = PostgreSQLRepository(adapter, Article, MagicMock(), 'queue')
+
+    articles = repository.get_many()
+    assert adapter.get_many.call_args.kwargs['exclude_columns'] == ['body', 'article_notes']
+
+    Article.undefer(articles)
+    args, kwargs = adapter.get_many.call_args
+    assert args[1] == {'entity_id': ["a" * 32, "b" * 32]}
+    assert kwargs['columns'] == ['entity_id', 'body', 'article_notes']
+    assert [(a.body, a.notes) for a in articles] == [("A", "N"), ("B", "M")]
+
+
+def test_mongodb_repository_projection():
+    """MongoDB queries leave deferred fields out with a projection"""
+    adapter = MagicMock()
+    adapter.get_many.return_value = [dict(row) for row in ROWS]
+    repository = MongoDbRepository(adapter, Article, MagicMock(), 'queue')
+
+    articles = repository.get_many('articles', 'entity_id_idx')
+    assert adapter.get_many.call_args.kwargs['projection'] == {'body': 0, 'article_notes': 0}
+
+    adapter.get_many.return_value = [{'entity_id': "a" * 32, 'body': "A"}]
+    assert articles[0].body == "A"
+    assert adapter.get_many.call_args.kwargs['projection'] == {'entity_id': 1, 'body': 1}
+    assert adapter.get_many.call_args.kwargs['conditions'] == {
+        'entity_id': {'$in': ["a" * 32]}, 'latest': True}
+
+
+def test_postgresql_adapter_selects_columns():
+    """The adapter selects every table column but the excluded ones"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db')
+    with patch.object(adapter, '_get_table_columns', return_value=['entity_id', 'title', 'body']), \
+            patch.object(adapter, 'execute_query', return_value=[]) as execute_query:
+        adapter.get_many('article', exclude_columns=['body'])
+        adapter.get_many('article', {'entity_id': ["a"]}, active=False, columns=['entity_id', 'body'])
+
+    assert execute_query.call_args_list[0].args[0].startswith(
+        "SELECT article.entity_id, article.title FROM article")
+    assert execute_query.call_args_list[1].args[0].startswith(
+        "SELECT article.entity_id, article.body FROM article")
+
+
+def test_full_save_loads_deferred_fields():
+    """Saving a whole record loads its deferred fields first"""
+    calls = []
+    repository = BaseRepository(MagicMock(), Snippet, MagicMock())
+    snippet = Snippet.from_dict(dict(ROWS[0]))
+    Snippet.set_deferred_loader([snippet], _loader(Snippet, calls))
+
+    repository.save(snippet)
+
+    assert calls == [(["a" * 32], ['body'])]
+    assert repository.adapter.get_save_query.call_args.args[1]['body'] == "first body"
@@ -0,0 +1,148 @@
+"""
+Tests for streaming reads (iter_many)
+"""
+from dataclasses import dataclass
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rococo.data.mongodb import MongoDBAdapter
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.surrealdb import SurrealDbAdapter
+from rococo.models import VersionedModel
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Item(VersionedModel):
+    name: str = None
+
+
+def _batches(rows, size):
+    return [rows[i:i + size] for i in range(0, len(rows), size)] + [[]]
+
+
+def test_postgresql_named_cursor_batches():
+    """Rows are fetched batch by batch from a named cursor, mapped with one column lookup"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db')
+    adapter._connection = MagicMock()
+    cursor = adapter._connection.cursor.return_value
+    cursor.description = [('entity_id',), ('name',)]
+    cursor.fetchmany.side_effect = _batches([("a", "x"), ("b", "y"), ("c", "z")], 2)
+
+    batches = list(adapter.iter_many('item', {'name': "x"}, batch_size=2))
+
+    assert batches == [[{'entity_id': "a", 'name': "x"}, {'entity_id': "b", 'name': "y"}],
+                       [{'entity_id': "c", 'name': "z"}]]
+    assert adapter._connection.cursor.call_args.kwargs['name'].startswith("rococo_")
+    assert cursor.itersize == 2
+    query, values = cursor.execute.call_args.args
+    assert query == "SELECT item.* FROM item WHERE item.name = %s AND item.active = %s"
+    assert values == ("x", 'true')
+    cursor.close.assert_called_once()
+
+
+def test_postgresql_stream_query_rows():
+    """stream_query yields single rows fetched itersize at a time, and closes the cursor when abandoned"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db')
+    adapter._connection = MagicMock()
+    cursor = adapter._connection.cursor.return_value
+    cursor.description = [('n',)]
+    cursor.fetchmany.side_effect = _batches([(1,), (2,), (3,)], 2)
+
+    rows = adapter.stream_query("SELECT n FROM numbers WHERE n > %s", (0,), itersize=2)
+    assert [next(rows), next(rows), next(rows)] == [{'n': 1}, {'n': 2}, {'n': 3}]
+    rows.close()
+
+    cursor.execute.assert_called_once_with("SELECT n FROM numbers WHERE n > %s", (0,))
+    cursor.fetchmany.assert_called_with(2)
+    cursor.close.assert_called_once()
+
+
+def test_postgresql_repository_iter_query():
+    """Raw queries are streamed into model instances, with extra fields merged"""
+    adapter = MagicMock()
+    adapter.stream_query.return_value = iter([[{'name': "x", 'extra': {'color': "red"}}]])
+    adapter._deserialize_extra_fields.side_effect = lambda row: {'name': row['name'], **row['extra']}
+    repository = PostgreSQLRepository(adapter, Item, MagicMock(), 'queue')
+
+    records = repository.iter_query("SELECT * FROM item WHERE name = %s", ("x",), batch_size=50)
+    adapter.stream_query.assert_not_called()
+
+    assert [record.name for record in records] == ["x"]
+    adapter.stream_query.assert_called_once_with(
+        "SELECT * FROM item WHERE name = %s", ("x",), itersize=50, batches=True)
+    adapter.__exit__.assert_called_once()
+
+
+def test_mysql_unbuffered_cursor_closed_when_abandoned():
+    """MySQL reads with an unbuffered cursor, closed when the iteration stops early"""
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db')
+    adapter._connection = MagicMock()
+    cursor = adapter._connection.cursor.return_value
+    cursor.fetchmany.side_effect = _batches([{'name': "x"}, {'name': "y"}], 1)
+
+    batches = adapter.iter_many('item', batch_size=1)
+    assert next(batches) == [{'name': "x"}]
+    batches.close()
+
+    assert adapter._connection.cursor.call_args.args[0].__name__ == 'SSDictCursor'
+    cursor.close.assert_called_once()
+
+
+def test_surrealdb_keyset_pages():
+    """Each SurrealDB page starts after the last record of the previous one"""
+    adapter = SurrealDbAdapter('ws://localhost', 'user', 'password', 'ns', 'db')
+    pages = [[{'id': "item:1", 'name': "a"}, {'id': "item:2", 'name': "b"}], [{'id': "item:3", 'name': "b"}]]
+    with patch.object(adapter, 'execute_query', side_effect=pages) as execute_query, \
+            patch.object(adapter, 'parse_db_response', side_effect=lambda rows: rows):
+        batches = list(adapter.iter_many('item', sort=[('name', 'DESC')], batch_size=2))
+
+    assert batches == pages
+    first, second = execute_query.call_args_list
+    assert first.args == ("SELECT * FROM item WHERE active=true ORDER BY name DESC, id ASC LIMIT 2", {})
+    assert second.args[0] == (
+        "SELECT * FROM item WHERE active=true AND ((name < $seek_0) OR (name = $seek_0 AND id > $seek_1)) "
+        "ORDER BY name DESC, id ASC LIMIT 2")
+    assert second.args[1] == {'seek_0': "b", 'seek_1': "item:2"}
+
+
+def test_mongodb_cursor_batches():
+    """Documents from one cursor are grouped into batches of batch_size"""
+    adapter = MongoDBAdapter('mongodb://localhost', 'db')
+    cursor = MagicMock()
+    cursor.__iter__.return_value = iter([{'name': "x"}, {'name': "y"}, {'name': "z"}])
+    with patch.object(adapter, '_get_collection') as get_collection:
+        get_collection.return_value.find.return_value = cursor
+        batches = list(adapter.iter_many('item', {'latest': True}, hint='idx', batch_size=2))
+
+    assert batches == [[{'name': "x"}, {'name': "y"}], [{'name': "z"}]]
+    get_collection.return_value.find.assert_called_once_with({'latest': True}, batch_size=2, hint='idx')
+    cursor.close.assert_called_once()
+
+
+def test_repository_holds_connection_only_while_iterating():
+    """The adapter is entered on the first record and exited when the iterator is closed"""
+    adapter = MagicMock()
+    adapter.iter_many.return_value = iter([[{'name': "x"}, {'name': "y"}], [{'name': "z"}]])
+    repository = BaseRepository(adapter, Item, MagicMock())
+
+    records = repository.iter_many({'name': "x"}, batch_size=2)
+    adapter.__enter__.assert_not_called()
+
+    assert next(records).name == "x"
+    adapter.__enter__.assert_called_once()
+    adapter.iter_many.assert_called_once_with('item', {'name': "x"}, None, batch_size=2)
+    adapter.__exit__.assert_not_called()
+
+    records.close()
+    adapter.__exit__.assert_called_once()
+
+
+def test_repository_iter_many_validates_batch_size():
+    """batch_size is checked before anything is read"""
+    repository = PostgreSQLRepository(MagicMock(), Item, MagicMock(), 'queue')
+    with pytest.raises(ValueError):
+        repository.iter_many(batch_size=0)
@@ -0,0 +1,119 @@
+"""
+Tests for keyset pagination (get_page and page tokens)
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rococo.data.mongodb import MongoDBAdapter
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.models import VersionedModel
+from rococo.repositories import Page
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.pagination import decode_page_token, encode_page_token
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+
+
+@dataclass(kw_only=True)
+class Person(VersionedModel):
+    name: str = None
+
+
+KEYS = [('changed_on', 'DESC'), ('entity_id', 'ASC')]
+
+
+def test_page_token_round_trip():
+    """Tokens are opaque URL-safe strings keeping the types of the sort values"""
+    values = [datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), Decimal("1.50"), "a" * 32]
+    token = encode_page_token(KEYS + [('price', 'ASC')], values)
+
+    assert token.replace('-', '').replace('_', '').isalnum()
+    assert decode_page_token(token, KEYS + [('price', 'ASC')]) == values
+    assert decode_page_token(None, KEYS) is None
+
+
+@pytest.mark.parametrize("token", ["not a token", encode_page_token([('name', 'ASC')], ["x"])])
+def test_invalid_page_tokens(token):
+    """Malformed tokens and tokens of another sort order are rejected"""
+    with pytest.raises(ValueError):
+        decode_page_token(token, KEYS)
+
+
+@pytest.mark.parametrize("adapter", [
+    PostgreSQLAdapter('host', 5432, 'user', 'password', 'db'),
+    MySqlAdapter('host', 3306, 'user', 'password', 'db'),
+])
+def test_sql_seek_conditions(adapter):
+    """Keys in one direction compare as a row value; mixed directions expand to OR terms"""
+    assert adapter._build_seek_condition('person', [('name', 'ASC'), ('entity_id', 'ASC')], ["x", "a"]) == (
+        "(person.name, person.entity_id) > (%s, %s)", ["x", "a"])
+    assert adapter._build_seek_condition('person', KEYS, ["t", "a"]) == (
+        "((person.changed_on < %s) OR (person.changed_on = %s AND person.entity_id > %s))", ["t", "t", "a"])
+
+
+@pytest.mark.parametrize("adapter, active", [
+    (PostgreSQLAdapter('host', 5432, 'user', 'password', 'db'), 'true'),
+    (MySqlAdapter('host', 3306, 'user', 'password', 'db'), 1),
+])
+def test_sql_get_page_query(adapter, active):
+    """The seek condition is added to the filters, with no OFFSET"""
+    with patch.object(adapter, 'execute_query', return_value=[]) as execute_query:
+        adapter.get_page('person', {'name': "x"}, [('entity_id', 'ASC')], after=["a"], limit=11)
+
+    query, values = execute_query.call_args.args
+    assert query == ("SELECT person.* FROM person WHERE person.name = %s AND person.active = %s "
+                     "AND person.entity_id > %s ORDER BY entity_id ASC LIMIT %s")
+    assert values == ("x", active, "a", 11)
+
+
+def test_mongodb_seek_filter():
+    """MongoDB seeks with an $or of range filters combined with the query"""
+    adapter = MongoDBAdapter('mongodb://localhost', 'db')
+    with patch.object(adapter, 'get_many', return_value=[]) as get_many:
+        adapter.get_page('person', {'latest': True}, sort=[('name', -1), ('entity_id', 1)], after=["x", "a"], limit=5)
+
+    assert get_many.call_args.args[1] == {'$and': [
+        {'latest': True},
+        {'$or': [{'name': {'$lt': "x"}}, {'name': "x", 'entity_id': {'$gt': "a"}}]},
+    ]}
+    assert get_many.call_args.kwargs['limit'] == 5
+
+
+def test_repository_pages_with_tokens():
+    """A page fetches one extra record to know whether a next page exists"""
+    adapter = MagicMock()
+    adapter.get_page.return_value = [{'entity_id': c * 32, 'name': c} for c in "abc"]
+    repository = BaseRepository(adapter, Person, MagicMock())
+
+    page = repository.get_page(sort=[('name', 'ASC')], limit=2)
+
+    assert isinstance(page, Page) and page.has_more
+    assert [person.name for person in page.items] == ["a", "b"]
+    args, kwargs = adapter.get_page.call_args
+    assert args == ('person', None, [('name', 'ASC'), ('entity_id', 'ASC')])
+    assert kwargs == {'after': None, 'limit': 3}
+
+    adapter.get_page.return_value = [{'entity_id': "c" * 32, 'name': "c"}]
+    last_page = repository.get_page(sort=[('name', 'ASC')], after=page.next_token, limit=2)
+
+    assert adapter.get_page.call_args.kwargs['after'] == ["b", "b" * 32]
+    assert [person.name for person in last_page.items] == ["c"]
+    assert last_page.next_token is None
+
+
+def test_postgresql_repository_get_page():
+    """PostgreSQL pages filter active records and leave deferred columns out as get_many does"""
+    adapter = MagicMock()
+    adapter.get_page.return_value = []
+    repository = PostgreSQLRepository(adapter, Person, MagicMock(), 'queue')
+
+    page = repository.get_page({'name': "x"})
+
+    assert page.items == [] and page.next_token is None
+    assert adapter.get_page.call_args.kwargs['active'] is True
+    with pytest.raises(ValueError):
+        repository.get_page(after="not a token")
@@ -0,0 +1,91 @@
+"""
+Tests for the per-class model metadata registry
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from rococo.models import BaseModel, VersionedModel
+from rococo.models.metadata import get_model_metadata, invalidate_model_metadata
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass(kw_only=True)
+class Widget(VersionedModel):
+    label: str = field(default=None, metadata={'alias': 'name'})
+    color: Optional[Color] = None
+    made_on: datetime = None
+    parts: list = field(default=None, metadata={'field_type': 'm2m_list'})
+
+    @property
+    def display(self):
+        return f"{self.label}"
+
+
+def test_metadata_is_cached_per_class():
+    """Metadata is built once and reused for the same class"""
+    assert get_model_metadata(Widget) is get_model_metadata(Widget)
+
+
+def test_metadata_not_shared_with_subclasses():
+    """Subclasses get their own metadata entry"""
+
+    @dataclass(kw_only=True)
+    class SpecialWidget(Widget):
+        serial: str = None
+
+    parent = get_model_metadata(Widget)
+    child = get_model_metadata(SpecialWidget)
+
+    assert child is not parent
+    assert 'serial' in child.field_name_set
+    assert 'serial' not in parent.field_name_set
+
+
+def test_metadata_field_maps():
+    """Field, alias, m2m and property maps are precomputed"""
+    meta = get_model_metadata(Widget)
+
+    assert meta.field_names == tuple(Widget.fields())
+    assert 'extra' in meta.field_map
+    assert 'extra' not in meta.field_name_set
+    assert meta.field_to_alias == {'label': 'name'}
+    assert meta.alias_to_field == {'name': 'label'}
+    assert meta.m2m_fields == frozenset({'parts'})
+    assert 'display' in meta.read_only_properties
+    assert meta.get_field('color').name == 'color'
+    assert meta.get_field('missing') is None
+
+
+def test_metadata_converters():
+    """Converters are compiled only for fields that need them"""
+    meta = get_model_metadata(Widget)
+    converters = meta.converters
+
+    assert 'label' not in converters
+    assert converters['color']("red") is Color.RED
+    assert converters['color']("purple") == "purple"
+    assert converters['made_on']("2024-01-02T03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+    assert converters['entity_id']("00000000-0000-4000-8000-000000000000") == \
+        "00000000000040008000000000000000"
+
+
+def test_metadata_rebuilt_after_invalidation():
+    """Invalidating a class drops its cached metadata"""
+
+    @dataclass(kw_only=True)
+    class Gadget(BaseModel):
+        name: str = None
+
+    before = get_model_metadata(Gadget)
+    Gadget.size = property(lambda self: 1)
+    invalidate_model_metadata(Gadget)
+    after = get_model_metadata(Gadget)
+
+    assert after is not before
+    assert 'size' in after.property_names
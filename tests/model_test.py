@@ -8,6 +8,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from rococo.models import VersionedModel
 from rococo.models.versioned_model import ModelValidationError, get_uuid_hex
+from rococo.models.metadata import get_model_metadata, invalidate_model_modules
 
 
 def test_prepare_for_save():
@@ -109,16 +110,57 @@ def test_post_init_model_resolution(mock_import_module, mock_import_models_modul
         mock_main_module, mock_rococo_module, mock_rococo_module]
     mock_import_models_module.return_value = mock_models_module
 
-    # Create instance
-    model = TestModelWithRelation()
+    invalidate_model_modules()
+    try:
+        # Create instance
+        model = TestModelWithRelation()
 
-    # Verify the model class was resolved (it should be a mock object, not the string)
-    field_metadata = next(f for f in fields(
-        model) if f.name == 'related_field').metadata
+        # Verify the model class was resolved (it should be a mock object, not the string)
+        field_metadata = next(f for f in fields(
+            model) if f.name == 'related_field').metadata
 
-    # The important thing is that it's no longer a string
-    assert field_metadata['relationship']['model'] is not 'SomeModel'
-    assert hasattr(field_metadata['relationship']['model'], '_mock_name')
+        # The important thing is that it's no longer a string
+        assert field_metadata['relationship']['model'] is not 'SomeModel'
+        assert hasattr(field_metadata['relationship']['model'], '_mock_name')
+
+        # Resolution happens once per class, not per instance
+        import_calls = mock_import_module.call_count
+        TestModelWithRelation()
+        assert mock_import_module.call_count == import_calls
+    finally:
+        invalidate_model_modules()
+
+
+def test_relationship_resolution_is_per_class():
+    """Relationships are resolved on first use of the class, without creating instances"""
+
+    @dataclass
+    class RelatedByName(VersionedModel):
+        owner: str = field(
+            default=None,
+            metadata={'relationship': {'model': 'VersionedModel'}, 'field_type': 'entity_id'}
+        )
+
+    meta = get_model_metadata(RelatedByName)
+    assert meta.relationships_resolved is False
+
+    assert meta.resolve_relationships() is meta
+    assert meta.relationships_resolved is True
+    assert meta.get_field('owner').metadata['relationship']['model'] is VersionedModel
+
+
+def test_unresolvable_relationship_raises_import_error():
+    """A relationship to an unknown model name raises ImportError"""
+
+    @dataclass
+    class RelatedToMissing(VersionedModel):
+        owner: str = field(
+            default=None,
+            metadata={'relationship': {'model': 'NoSuchModelAnywhere'}}
+        )
+
+    with pytest.raises(ImportError):
+        RelatedToMissing()
 
 
 def test_post_init_uuid_list_handling():
@@ -2,7 +2,6 @@
 Extended MongoDbRepository test cases
 """
 
-import json
 import uuid
 import unittest
 from datetime import datetime, timezone, timedelta
@@ -55,8 +54,7 @@ class MongoDbRepositoryTestCase(unittest.TestCase):
 
         self.message_adapter_mock.send_message.assert_called_once_with(
             self.queue_name,
-            json.dumps(self.model_instance.as_dict(
-                convert_datetime_to_iso_string=True))
+            self.model_instance.as_dict(convert_datetime_to_iso_string=True)
         )
         self.assertEqual(saved_instance.entity_id,
                          self.model_instance.entity_id)
@@ -5,7 +5,6 @@ Tests for MySqlRepository
 import pytest
 from unittest.mock import patch
 from uuid import UUID, uuid4
-import json
 import datetime
 from dataclasses import dataclass, fields, field as dc_field
 from typing import Union
@@ -456,5 +455,5 @@ def test_save_with_message(mock_model_as_dict, mock_model_prepare_for_save, repo
 
     mock_message_adapter.send_message.assert_called_once_with(
         repository.queue_name,
-        json.dumps(dict_for_message_payload)
+        dict_for_message_payload
     )
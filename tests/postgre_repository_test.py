@@ -3,9 +3,8 @@ Tests for PostgreSQLRepository
 """
 
 import pytest
-from unittest.mock import patch, ANY
+from unittest.mock import patch
 from uuid import UUID, uuid4
-import json
 import datetime
 from dataclasses import dataclass, fields, field as dc_field
 from typing import Union, List, Optional
@@ -14,6 +13,12 @@ from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepos
 from rococo.models.versioned_model import VersionedModel
 from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.base import MessageAdapter
+from rococo.repositories.unit_of_work import unit_of_work
+
+
+@dataclass(kw_only=True)
+class RelatedThing(VersionedModel):
+    name: str = None
 
 
 @dataclass(kw_only=True)
@@ -27,9 +32,11 @@ class TestVersionedModel(VersionedModel):
 
     name: str = None  # Example custom field
     related_item_id: Optional[UUID] = dc_field(
-        default=None)  # For fetch_related tests
+        default=None, metadata={'field_type': 'entity_id', 'relationship': {'model': RelatedThing}})  # For fetch_related tests
     related_items_ids: Optional[List[UUID]] = dc_field(
-        default_factory=list)  # For fetch_related (many)
+        default_factory=list, metadata={
+            'field_type': 'entity_id',
+            'relationship': {'model': RelatedThing, 'relation_type': 'many_to_many'}})  # For fetch_related (many)
 
     # active and changed_on are inherited
 
@@ -523,22 +530,23 @@ def test_save_with_message(mock_model_as_dict, mock_model_prepare_for_save, repo
 
     mock_message_adapter.send_message.assert_called_once_with(
         repository.queue_name,
-        json.dumps(dict_call_3_for_message)
+        dict_call_3_for_message
     )
 
 # Basic test for fetch_related (can be expanded)
 
 
-@patch.object(PostgreSQLRepository, 'fetch_related_entities_for_field')
+@patch.object(PostgreSQLRepository, '_fetch_related_records')
 def test_get_one_with_fetch_related(mock_fetch_related, repository, mock_adapter, model_instance):
+    related = RelatedThing(name="Related Thing")
+    model_instance.related_item_id = related.entity_id
     db_data_from_adapter = model_instance.as_dict(
         convert_uuids=True)  # Simpler dict for this
     # ensure datetime obj
     db_data_from_adapter['changed_on'] = model_instance.changed_on
     mock_adapter.get_one.return_value = db_data_from_adapter
 
-    related_data_mock = TestVersionedModel(name="Related Thing")
-    mock_fetch_related.return_value = related_data_mock
+    mock_fetch_related.return_value = [related.as_dict()]
 
     result = repository.get_one(
         conditions={'entity_id': str(model_instance.entity_id)},
@@ -546,21 +554,21 @@ def test_get_one_with_fetch_related(mock_fetch_related, repository, mock_adapter
     )
 
     assert result is not None
-    mock_fetch_related.assert_called_once_with(
-        ANY, 'related_item_id')  # ANY for the instance
-    assert hasattr(result, 'related_item_id')
-    assert result.related_item_id == related_data_mock
+    mock_fetch_related.assert_called_once_with(RelatedThing, 'entity_id', [related.entity_id])
+    assert isinstance(result.related_item_id, RelatedThing)
+    assert result.related_item_id.entity_id == related.entity_id
+    assert result.related_item_id.name == "Related Thing"
 
 
-@patch.object(PostgreSQLRepository, 'fetch_related_entities_for_field')
+@patch.object(PostgreSQLRepository, '_fetch_related_records')
 def test_get_many_with_fetch_related(mock_fetch_related, repository, mock_adapter, model_instance):
+    related_items = [RelatedThing(name="Related Item 1"), RelatedThing(name="Related Item 2")]
+    model_instance.related_items_ids = [UUID(item.entity_id) for item in related_items]
     instance_data_db = model_instance.as_dict(convert_uuids=True)
     instance_data_db['changed_on'] = model_instance.changed_on
     mock_adapter.get_many.return_value = [instance_data_db]
 
-    related_data_mock_list = [TestVersionedModel(name="Related Item 1")]
-    # Simulate fetch_related_entities_for_field being called for each instance and field
-    mock_fetch_related.return_value = related_data_mock_list
+    mock_fetch_related.return_value = [item.as_dict() for item in related_items]
 
     results = repository.get_many(
         conditions={'active': True},
@@ -570,7 +578,25 @@ def test_get_many_with_fetch_related(mock_fetch_related, repository, mock_adapte
 
     assert len(results) == 1
     result_instance = results[0]
-    mock_fetch_related.assert_called_once_with(
-        result_instance, 'related_items_ids')
-    assert hasattr(result_instance, 'related_items_ids')
-    assert result_instance.related_items_ids == related_data_mock_list
+    # The related entities of all instances are loaded with one query
+    mock_fetch_related.assert_called_once()
+    assert [item.name for item in result_instance.related_items_ids] == ["Related Item 1", "Related Item 2"]
+
+
+@patch.object(PostgreSQLRepository, '_fetch_related_records')
+def test_fetch_related_is_shared_within_a_unit_of_work(mock_fetch_related, repository, mock_adapter, model_instance):
+    related = RelatedThing(name="Related Thing")
+    model_instance.related_item_id = related.entity_id
+    instance_data_db = model_instance.as_dict(convert_uuids=True)
+    instance_data_db['changed_on'] = model_instance.changed_on
+    mock_adapter.get_one.return_value = instance_data_db
+    mock_adapter.get_many.return_value = [instance_data_db]
+    mock_fetch_related.return_value = [related.as_dict()]
+
+    with unit_of_work():
+        one = repository.get_one({'entity_id': str(model_instance.entity_id)}, fetch_related=['related_item_id'])
+        many = repository.get_many({'active': True}, fetch_related=['related_item_id'])
+
+    # The related entity loaded by get_one is reused by get_many
+    mock_fetch_related.assert_called_once()
+    assert one.related_item_id is many[0].related_item_id
@@ -0,0 +1,78 @@
+"""
+Tests for the COPY-based bulk loading of PostgreSQLAdapter
+"""
+from datetime import datetime
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema
+from rococo.serialization import json_dumps
+
+
+def _adapter(primary_key=('entity_id',)):
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter._store_table_schemas({'tag': TableSchema(
+        ('entity_id', 'label', 'active', 'changed_on', 'extra'), primary_key=primary_key)})
+    adapter._connection = MagicMock()
+    adapter._cursor = MagicMock()
+    copied = []
+    # Read the stream in small chunks, as psycopg2 does
+    adapter._cursor.copy_expert.side_effect = lambda sql, stream: copied.append(
+        (sql, b''.join(iter(lambda: stream.read(16), b'')).decode()))
+    return adapter, copied
+
+
+def test_bulk_insert_streams_csv():
+    """Rows are encoded as CSV, with unquoted empty fields for NULL and extra fields as JSON"""
+    adapter, copied = _adapter()
+    rows = ({'entity_id': UUID(int=i), 'label': 'say "hi"' if i else None, 'active': True,
+             'changed_on': datetime(2024, 1, 2, 3, 4, 5), 'color': "red"} for i in range(2))
+
+    assert adapter.bulk_insert('tag', rows) == 2
+
+    sql, data = copied[0]
+    extra = '"' + json_dumps({'color': "red"}).replace('"', '""') + '"'
+    assert sql == "COPY tag (entity_id, label, active, changed_on, extra) FROM STDIN WITH (FORMAT csv)"
+    assert data.splitlines() == [
+        f'"{UUID(int=0).hex}",,"true","2024-01-02T03:04:05",{extra}',
+        f'"{UUID(int=1).hex}","say ""hi""","true","2024-01-02T03:04:05",{extra}',
+    ]
+    adapter._connection.commit.assert_called_once()
+
+
+def test_bulk_insert_rejects_rows_with_other_columns():
+    adapter, _ = _adapter()
+    rows = [{'entity_id': "a", 'label': "x"}, {'entity_id': "b", 'active': True}]
+
+    with pytest.raises(ValueError):
+        adapter.bulk_insert('tag', rows)
+    adapter._connection.rollback.assert_called_once()
+
+
+def test_bulk_upsert_merges_through_a_staging_table():
+    """Rows are copied to a temporary table, audited and merged with one statement each"""
+    adapter, copied = _adapter()
+
+    assert adapter.bulk_upsert('tag', [{'entity_id': "a", 'label': "x"}], move_to_audit=True) == 1
+
+    statements = [call.args[0] for call in adapter._cursor.execute.call_args_list]
+    staging = statements[0].split()[3]
+    assert statements[0] == f"CREATE TEMPORARY TABLE {staging} (LIKE tag INCLUDING DEFAULTS) ON COMMIT DROP"
+    assert copied[0][0] == f"COPY {staging} (entity_id, label) FROM STDIN WITH (FORMAT csv)"
+    assert statements[2] == (f"INSERT INTO tag_audit SELECT * FROM tag "
+                             f"WHERE (entity_id) IN (SELECT entity_id FROM {staging})")
+    assert statements[3] == (f"INSERT INTO tag (entity_id, label) SELECT DISTINCT ON (entity_id) entity_id, label "
+                             f"FROM {staging} ORDER BY entity_id, rococo_row DESC "
+                             f"ON CONFLICT (entity_id) DO UPDATE SET label = EXCLUDED.label")
+    adapter._connection.commit.assert_called_once()
+
+
+def test_bulk_upsert_needs_a_key():
+    adapter, _ = _adapter(primary_key=())
+
+    with pytest.raises(ValueError):
+        adapter.bulk_upsert('tag', [{'entity_id': "a"}])
+    assert adapter.bulk_insert('tag', []) == 0
@@ -0,0 +1,83 @@
+"""
+Tests for the INSERT ... ON CONFLICT saves of PostgreSQLAdapter
+"""
+import json
+from unittest.mock import patch
+
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema
+
+
+def _adapter(conflict_target=('entity_id',)):
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter._store_table_schemas({'tag': TableSchema(
+        ('entity_id', 'label', 'color', 'extra'), primary_key=conflict_target or ())})
+    return adapter
+
+
+def test_save_query_upserts_on_the_conflict_target():
+    """Each value is bound once and the row is keyed by its constraint"""
+    query, values = _adapter().get_save_query('tag', {'entity_id': "a", 'label': "x", 'size': 3})
+
+    assert query == ("INSERT INTO tag (entity_id, label, extra) VALUES (%s, %s, %s) "
+                     "ON CONFLICT (entity_id) DO UPDATE SET label = EXCLUDED.label, extra = EXCLUDED.extra")
+    assert values[:2] == ("a", "x") and json.loads(values[2]) == {'size': 3}
+
+
+def test_save_query_without_constraint_keeps_the_update_then_insert_form():
+    query, values = _adapter(None).get_save_query('tag', {'entity_id': "a", 'label': "x"})
+
+    assert query.startswith("WITH updated AS (")
+    assert values == ("a", "x", "a", "a", "x")
+
+
+def test_save_query_with_only_key_columns_does_nothing_on_conflict():
+    query, _ = _adapter(('entity_id', 'label')).get_save_query('tag', {'entity_id': "a", 'label': "x"})
+
+    assert query.endswith("ON CONFLICT (entity_id, label) DO NOTHING")
+
+
+def test_save_many_queries_upsert_rows_in_one_statement():
+    """Rows with the same columns share a multi-row upsert; the last row of a key wins"""
+    rows = [{'entity_id': "a", 'label': "x"},
+            {'entity_id': "b", 'label': "y"},
+            {'entity_id': "a", 'label': "z"},
+            {'entity_id': "c", 'color': "red"}]
+
+    queries = _adapter().get_save_many_queries('tag', rows)
+
+    assert queries == [
+        ("INSERT INTO tag (entity_id, label) VALUES (%s, %s), (%s, %s) "
+         "ON CONFLICT (entity_id) DO UPDATE SET label = EXCLUDED.label", ("a", "z", "b", "y")),
+        ("INSERT INTO tag (entity_id, color) VALUES (%s, %s) "
+         "ON CONFLICT (entity_id) DO UPDATE SET color = EXCLUDED.color", ("c", "red")),
+    ]
+
+
+def test_save_many_queries_stay_within_the_parameter_limit():
+    adapter = _adapter()
+    rows = [{'entity_id': str(i), 'label': "x"} for i in range(5)]
+
+    with patch.object(PostgreSQLAdapter, 'MAX_QUERY_PARAMETERS', 4):
+        queries = adapter.get_save_many_queries('tag', rows)
+
+    assert [len(values) for _, values in queries] == [4, 4, 2]
+
+
+def test_conflict_target_is_read_once():
+    """The key constraint is read from the catalog once per table, preferring entity_id"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    columns = [{'table_name': "tag", 'column_name': "id", 'data_type': "integer"},
+               {'table_name': "tag", 'column_name': "entity_id", 'data_type': "character varying"}]
+    constraints = [
+        {'table_name': "tag", 'constraint_name': "tag_pkey", 'constraint_type': "PRIMARY KEY", 'column_name': "id"},
+        {'table_name': "tag", 'constraint_name': "tag_entity_id_key", 'constraint_type': "UNIQUE",
+         'column_name': "entity_id"},
+    ]
+    with patch.object(adapter, 'execute_query', side_effect=[columns, constraints]) as execute_query:
+        assert adapter._get_conflict_target('tag') == ('entity_id',)
+        assert adapter._get_conflict_target('tag') == ('entity_id',)
+    assert execute_query.call_count == 2
+
+    assert TableSchema(('id',), primary_key=('id',)).conflict_target == ('id',)
+    assert TableSchema(('id',)).conflict_target is None
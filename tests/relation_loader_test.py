@@ -0,0 +1,116 @@
+"""
+Tests for batched relationship loading (RelationLoader and fetch_related)
+"""
+from dataclasses import dataclass, field
+from typing import List
+from unittest.mock import MagicMock
+
+from rococo.models import VersionedModel
+from rococo.repositories.mongodb.mongodb_repository import MongoDbRepository
+from rococo.repositories.mysql.mysql_repository import MySqlRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+from rococo.repositories.relation_loader import RelationLoader
+
+
+@dataclass(kw_only=True)
+class Company(VersionedModel):
+    name: str = None
+
+
+@dataclass(kw_only=True)
+class Employee(VersionedModel):
+    name: str = None
+    employer: str = field(default=None, metadata={
+        'field_type': 'entity_id', 'relationship': {'model': Company}})
+    former_employer: str = field(default=None, metadata={
+        'field_type': 'entity_id', 'relationship': {'model': Company}})
+    clients: List[str] = field(default=None, metadata={
+        'field_type': 'entity_id', 'relationship': {'model': Company, 'relation_type': 'many_to_many'}})
+
+
+A, B, C = "a" * 32, "b" * 32, "c" * 32
+COMPANIES = {A: "Acme", B: "Bolt", C: "Core"}
+
+
+def _fetch(calls):
+    def fetch(relation_model, key_column, keys):
+        calls.append((relation_model, key_column, sorted(keys)))
+        return [{'entity_id': key, 'name': COMPANIES[key]} for key in keys if key in COMPANIES]
+    return fetch
+
+
+def test_one_query_per_related_model():
+    """Keys are collected across instances and fields and fetched with one query"""
+    calls = []
+    employees = [
+        Employee(name="x", employer=A, former_employer=B, clients=[B, C]),
+        Employee(name="y", employer=A, former_employer="d" * 32, clients=[]),
+    ]
+
+    RelationLoader(_fetch(calls)).load(employees, ['employer', 'former_employer', 'clients'])
+
+    assert calls == [(Company, 'entity_id', [A, B, C, "d" * 32])]
+    first, second = employees
+    assert first.employer.name == "Acme" and first.former_employer.name == "Bolt"
+    assert [company.name for company in first.clients] == ["Bolt", "Core"]
+    assert first.employer is second.employer  # one instance per entity
+    assert second.former_employer == "d" * 32  # not found: left as it was
+    assert second.clients == []
+
+
+def test_loader_deduplicates_across_calls():
+    """Keys fetched by an earlier load, found or not, are not fetched again"""
+    calls = []
+    loader = RelationLoader(_fetch(calls), batch_size=2)
+
+    loader.load([Employee(employer=A), Employee(employer="d" * 32)], ['employer'])
+    loader.load([Employee(employer=A), Employee(employer="d" * 32), Employee(employer=B)], ['employer'])
+
+    assert calls == [(Company, 'entity_id', [A, "d" * 32]), (Company, 'entity_id', [B])]
+
+
+def test_sql_repositories_fetch_related_in_one_query():
+    """PostgreSQL and MySQL get_many load the relations of all rows with one IN query"""
+    for repository_cls in (PostgreSQLRepository, MySqlRepository):
+        adapter = MagicMock()
+        adapter.get_many.side_effect = [
+            [{'entity_id': "e" * 32, 'employer': A}, {'entity_id': "f" * 32, 'employer': B}],
+            [{'entity_id': A, 'name': "Acme"}, {'entity_id': B, 'name': "Bolt"}],
+        ]
+        repository = repository_cls(adapter, Employee, MagicMock(), 'queue')
+
+        employees = repository.get_many(fetch_related=['employer'])
+
+        assert adapter.get_many.call_count == 2
+        args, kwargs = adapter.get_many.call_args
+        assert args == ('company', {'entity_id': [A, B]})
+        assert kwargs == {'active': True}
+        assert [employee.employer.name for employee in employees] == ["Acme", "Bolt"]
+
+
+def test_mongodb_repository_fetch_related():
+    """MongoDB reads related documents with $in from the related model's collection"""
+    adapter = MagicMock()
+    adapter.get_many.side_effect = [
+        [{'entity_id': "e" * 32, 'employer': A}],
+        [{'entity_id': A, 'name': "Acme"}],
+    ]
+    repository = MongoDbRepository(adapter, Employee, MagicMock(), 'queue')
+
+    employee, = repository.get_many('employee', 'entity_id_idx', fetch_related=['employer'])
+
+    assert adapter.get_many.call_args.kwargs == {
+        'table': 'company', 'conditions': {'entity_id': {'$in': [A]}, 'latest': True, 'active': True}}
+    assert employee.employer.name == "Acme"
+
+
+def test_forget_drops_loaded_entities():
+    """Entities of a forgotten model are fetched again by the next load"""
+    calls = []
+    loader = RelationLoader(_fetch(calls))
+
+    loader.load([Employee(employer=A)], ['employer'])
+    loader.forget(Company)
+    loader.load([Employee(employer=A)], ['employer'])
+
+    assert calls == [(Company, 'entity_id', [A]), (Company, 'entity_id', [A])]
@@ -0,0 +1,190 @@
+"""
+Tests for saving many instances at once (save_many)
+"""
+import json
+from dataclasses import dataclass
+from unittest.mock import MagicMock, PropertyMock
+
+import pytest
+
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema
+from rococo.messaging import SqsConnection, SqsSendError
+from rococo.models import BaseModel, VersionedModel
+from rococo.models.versioned_model import ModelValidationError
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.mongodb.mongodb_repository import MongoDbRepository
+
+
+@dataclass(kw_only=True)
+class Item(VersionedModel):
+    name: str = None
+
+    def validate_name(self):
+        if not self.name:
+            return "name is required"
+
+
+@dataclass(kw_only=True)
+class Tag(BaseModel):
+    allow_extra = True
+    label: str = None
+
+
+def _repository(model, supports_batch_save=True):
+    adapter = MagicMock()
+    adapter.supports_batch_save = supports_batch_save
+    adapter.get_save_many_queries.side_effect = lambda table, rows: [('save', len(rows))]
+    adapter.get_move_entities_to_audit_table_query.side_effect = lambda table, ids: ('audit', len(ids))
+    return BaseRepository(adapter, model, MagicMock()), adapter
+
+
+def test_save_many_uses_one_transaction():
+    """Audit moves and saves are batched into one transaction on one connection"""
+    repository, adapter = _repository(Item)
+    repository.save_batch_size = 2
+    items = [Item(name=str(i)) for i in range(5)]
+
+    assert repository.save_many(items, send_message=True) == items
+
+    adapter.__enter__.assert_called_once()
+    adapter.run_transaction.assert_called_once_with([
+        ('audit', 2), ('save', 2), ('audit', 2), ('save', 2), ('audit', 1), ('save', 1)])
+    assert all(item.version for item in items)
+    messages = repository.message_adapter.send_messages.call_args.args[1]
+    assert [message['name'] for message in messages] == ["0", "1", "2", "3", "4"]
+
+
+def test_save_many_without_batch_support():
+    """Adapters without multi-row queries still save everything in one transaction"""
+    repository, adapter = _repository(Tag, supports_batch_save=False)
+    adapter.get_save_query.side_effect = lambda table, data: ('save', data['label'])
+
+    repository.save_many([Tag(label="a"), Tag(label="b")])
+
+    adapter.run_transaction.assert_called_once_with([('save', "a"), ('save', "b")])
+
+
+def test_save_many_collects_validation_errors():
+    """Invalid instances raise one error and nothing is written"""
+    repository, adapter = _repository(Item)
+
+    with pytest.raises(ModelValidationError) as exc:
+        repository.save_many([Item(name="a"), Item(), Item(name="c"), Item()])
+
+    assert exc.value.errors_by_index == {1: ["name is required"], 3: ["name is required"]}
+    adapter.run_transaction.assert_not_called()
+
+
+def test_save_many_reads_a_cold_schema_catalog_within_the_adapter_context():
+    """The first save_many of a process reads the table schema on the adapter's connection"""
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    type(cursor).description = PropertyMock(side_effect=[
+        [('table_name',), ('column_name',), ('data_type',)],
+        [('table_name',), ('constraint_name',), ('constraint_type',), ('column_name',)],
+    ])
+    cursor.fetchall.side_effect = [
+        [("tag", "entity_id", "character varying"), ("tag", "label", "character varying")],
+        [("tag", "tag_pkey", "PRIMARY KEY", "entity_id")],
+    ]
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog(),
+                                connection_resolver=lambda **kwargs: connection)
+    repository = BaseRepository(adapter, Tag, MagicMock())
+
+    repository.save_many([Tag(label="x"), Tag(label="y")])
+
+    executed = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "information_schema" in executed[0] and "information_schema" in executed[1]
+    assert "ON CONFLICT (entity_id)" in executed[2]
+    connection.commit.assert_called()
+
+
+def test_postgresql_save_many_queries():
+    """Without a key constraint, rows are sent as one JSON parameter per set of columns, extra fields as objects"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    rows = [{'entity_id': "a", 'label': "x", 'color': "red"},
+            {'entity_id': "b", 'label': "y"},
+            {'entity_id': "c", 'label': "z"}]
+    adapter._store_table_schemas({'tag': TableSchema(('entity_id', 'label', 'extra'))})
+    queries = adapter.get_save_many_queries('tag', rows)
+
+    assert len(queries) == 2
+    query, (param,) = queries[1]
+    assert "json_populate_recordset(NULL::tag, %s::json)" in query
+    assert "UPDATE tag SET label = data.label" in query
+    assert "INSERT INTO tag (entity_id, label) SELECT entity_id, label FROM data" in query
+    assert json.loads(param) == [{'entity_id': "b", 'label': "y"}, {'entity_id': "c", 'label': "z"}]
+    assert json.loads(queries[0][1][0]) == [{'entity_id': "a", 'label': "x", 'extra': {'color': "red"}}]
+
+    query, values = adapter.get_move_entities_to_audit_table_query('tag', ["a-1", "b"])
+    assert query == "INSERT INTO tag_audit (SELECT * FROM tag WHERE entity_id IN (%s, %s))"
+    assert values == ("a1", "b")
+
+
+def test_mysql_save_many_queries():
+    """MySQL writes each set of columns with one multi-row REPLACE"""
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db')
+    queries = adapter.get_save_many_queries('tag', [{'entity_id': "a", 'label': "x"},
+                                                    {'entity_id': "b", 'label': "y"}])
+
+    assert queries == [("REPLACE INTO tag (`entity_id`, `label`) VALUES (%s, %s), (%s, %s)",
+                        ("a", "x", "b", "y"))]
+
+
+def test_mongodb_save_many():
+    """MongoDB saves versioned instances with bulk operations"""
+    adapter = MagicMock()
+    repository = MongoDbRepository(adapter, Item, MagicMock(), 'queue')
+
+    repository.save_many([Item(name="a"), Item(name="b")], 'items')
+
+    collection, payloads = adapter.save_many.call_args.args
+    assert collection == 'items' and [p['name'] for p in payloads] == ["a", "b"]
+    assert adapter.save_many.call_args.kwargs == {'move_to_audit': True}
+
+
+def test_sqs_send_messages_in_batches():
+    """SQS sends up to ten messages per request"""
+    connection = SqsConnection(region_name='us-east-1')
+    connection._sqs = MagicMock()
+    queue = connection._sqs.create_queue.return_value
+    queue.send_messages.return_value = {'Successful': []}
+
+    connection.send_messages('queue', [{'n': i} for i in range(12)])
+
+    batches = [call.kwargs['Entries'] for call in queue.send_messages.call_args_list]
+    assert [len(batch) for batch in batches] == [10, 2]
+    assert batches[1][1] == {'Id': "11", 'MessageBody': connection.serializer.dumps({'n': 11}).decode()}
+
+
+def test_sqs_send_messages_retries_failed_entries():
+    """Entries SQS fails on its side are resent; rejected entries raise"""
+    connection = SqsConnection(region_name='us-east-1')
+    connection._sqs = MagicMock()
+    queue = connection._sqs.create_queue.return_value
+    queue.send_messages.side_effect = [
+        {'Failed': [{'Id': "1", 'Code': "InternalError", 'SenderFault': False}]},
+        {'Successful': [{'Id': "1"}]},
+        {'Failed': [{'Id': "0", 'Code': "InvalidMessageContents", 'SenderFault': True}]},
+    ]
+
+    connection.send_messages('queue', [{'n': 0}, {'n': 1}])
+    assert [entry['Id'] for entry in queue.send_messages.call_args.kwargs['Entries']] == ["1"]
+
+    with pytest.raises(SqsSendError) as exc:
+        connection.send_messages('queue', [{'n': 0}])
+    assert exc.value.failed[0]['Id'] == "0" and queue.send_messages.call_count == 3
+
+
+def test_postgresql_save_many_queries_of_key_only_rows():
+    """Rows with entity_id alone are inserted when missing, with no UPDATE"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter._store_table_schemas({'tag': TableSchema(('entity_id', 'label'))})
+
+    (query, _), = adapter.get_save_many_queries('tag', [{'entity_id': "a"}])
+
+    assert "UPDATE" not in query
+    assert query.endswith("INSERT INTO tag (entity_id) SELECT entity_id FROM data "
+                          "WHERE NOT EXISTS (SELECT 1 FROM tag WHERE tag.entity_id = data.entity_id)")
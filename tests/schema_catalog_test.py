@@ -0,0 +1,127 @@
+"""
+Tests for the schema catalog of the SQL adapters
+"""
+import asyncio
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from rococo.data.async_postgresql import AsyncPostgreSQLAdapter
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import SchemaCatalog, TableSchema
+from rococo.models import VersionedModel
+
+
+@dataclass(kw_only=True)
+class Tag(VersionedModel):
+    label: str = None
+
+
+@dataclass(kw_only=True)
+class PersonOrganizationRole(VersionedModel):
+    role: str = None
+
+
+COLUMNS = [
+    {'table_name': "tag", 'column_name': "entity_id", 'data_type': "character varying"},
+    {'table_name': "tag", 'column_name': "label", 'data_type': "character varying"},
+    {'table_name': "tag", 'column_name': "extra", 'data_type': "jsonb"},
+    {'table_name': "tag_audit", 'column_name': "entity_id", 'data_type': "character varying"},
+]
+CONSTRAINTS = [
+    {'table_name': "tag", 'constraint_name': "tag_pkey", 'constraint_type': "PRIMARY KEY",
+     'column_name': "entity_id"},
+    {'table_name': "tag", 'constraint_name': "tag_label_key", 'constraint_type': "UNIQUE", 'column_name': "label"},
+]
+
+
+def test_adapters_of_a_database_share_the_schemas():
+    """A new adapter reuses what another adapter of the same DSN and schema read"""
+    catalog = SchemaCatalog()
+    first = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=catalog)
+    with patch.object(first, 'execute_query', side_effect=[COLUMNS[:3], CONSTRAINTS]) as execute_query:
+        assert first._get_table_columns('tag') == ['entity_id', 'label', 'extra']
+    assert execute_query.call_args_list[0].args[1] == (None, ['tag'])
+
+    second = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=catalog)
+    with patch.object(second, 'execute_query') as execute_query:
+        assert second._get_conflict_target('tag') == ('entity_id',)
+    execute_query.assert_not_called()
+
+    other_schema = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema='billing', schema_catalog=catalog)
+    assert other_schema._cached_table_schema('tag') is None
+
+
+def test_load_table_schemas_of_models():
+    """Tables of models are loaded with one query for columns and one for keys; missing tables are not cataloged"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    with patch.object(adapter, 'execute_query', side_effect=[COLUMNS, CONSTRAINTS]) as execute_query:
+        schemas = adapter.load_table_schemas([Tag, 'tag_audit', 'missing'])
+
+    assert execute_query.call_count == 2
+    assert schemas['tag'] == TableSchema(
+        ('entity_id', 'label', 'extra'),
+        {'entity_id': "character varying", 'label': "character varying", 'extra': "jsonb"},
+        primary_key=('entity_id',), unique_constraints=(('label',),))
+    assert schemas['tag'].has_extra and not schemas['tag_audit'].has_extra
+    assert schemas['missing'].columns == () and adapter._cached_table_schema('missing') is None
+
+    # Looked up again on use, e.g. after a migration created it
+    with patch.object(adapter, 'execute_query', side_effect=[[], []]) as execute_query:
+        with pytest.raises(ValueError, match="'missing' was not found"):
+            adapter._get_table_columns('missing')
+    assert execute_query.call_count == 2
+
+
+def test_models_are_named_like_their_repository_tables():
+    """Multi-word models load and invalidate the snake_case tables their repositories use"""
+    rows = [{'table_name': "person_organization_role", 'column_name': "entity_id", 'data_type': "character varying"}]
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    with patch.object(adapter, 'execute_query', side_effect=[rows, []]) as execute_query:
+        schemas = adapter.load_table_schemas([PersonOrganizationRole])
+    assert execute_query.call_args_list[0].args[1] == (None, ['person_organization_role'])
+    assert schemas['person_organization_role'].columns == ('entity_id',)
+
+    adapter.invalidate_table_schemas([PersonOrganizationRole])
+    assert adapter._cached_table_schema('person_organization_role') is None
+
+    async_adapter = AsyncPostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    async_adapter.execute_query = AsyncMock(side_effect=[rows, []])
+    asyncio.run(async_adapter.load_table_schemas([PersonOrganizationRole]))
+    assert async_adapter._queries._cached_table_schema('person_organization_role') is not None
+
+
+def test_invalidation_after_migrations():
+    """Invalidated tables are read again, and statements built from their columns are dropped"""
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter._store_table_schemas({'tag': TableSchema(('entity_id', 'label')), 'note': TableSchema(('entity_id',))})
+    adapter._build_select_query('tag', {}, exclude_columns=['label'])
+
+    adapter.invalidate_table_schemas(['tag'])
+
+    assert adapter._cached_table_schema('tag') is None and adapter._cached_table_schema('note') is not None
+    assert adapter.statement_cache.stats().size == 0
+    (columns_query, values), _ = adapter._table_schema_queries(['tag', 'note'])
+    assert "table_name IN (%s, %s)" in columns_query and values == ('tag', 'note')
+
+
+def test_async_adapter_loads_into_the_catalog():
+    adapter = AsyncPostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter.execute_query = AsyncMock(side_effect=[COLUMNS[:3], CONSTRAINTS])
+
+    query, _ = asyncio.run(adapter.get_save_query('tag', {'entity_id': "a", 'label': "x"}))
+    asyncio.run(adapter.get_save_query('tag', {'entity_id': "b", 'label': "y"}))
+
+    assert adapter.execute_query.await_count == 2
+    assert "ON CONFLICT (entity_id)" in query
+
+
+def test_async_adapter_raises_for_missing_tables():
+    adapter = AsyncPostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    adapter.execute_query = AsyncMock(return_value=[])
+
+    with pytest.raises(ValueError, match="'missing' was not found"):
+        asyncio.run(adapter.get_save_query('missing', {'entity_id': "a"}))
+    assert adapter._queries._cached_table_schema('missing') is None
@@ -0,0 +1,116 @@
+"""
+Tests for the serializers of message payloads and JSON columns
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from rococo.messaging import RabbitMqConnection, SqsConnection
+from rococo.models import BaseModel
+from rococo.serialization import (JsonSerializer, MsgpackSerializer, OrjsonSerializer, Serializer,
+                                  get_serializer, json_dumps, json_loads, set_default_serializer,
+                                  tagged_json_dumps, tagged_json_loads)
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@dataclass(kw_only=True)
+class Pen(BaseModel):
+    color: Color = None
+    label: str = field(default=None, metadata={'alias': 'pen_label'})
+
+
+PAYLOAD = {
+    'id': UUID(int=1),
+    'when': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'color': Color.RED,
+    'tags': ["a"],
+}
+EXPECTED = {
+    'id': str(UUID(int=1)),
+    'when': "2024-01-02T03:04:05+00:00",
+    'color': "red",
+    'tags': ["a"],
+}
+
+
+def _serializers():
+    serializers = [JsonSerializer()]
+    for serializer_cls in (OrjsonSerializer, MsgpackSerializer):
+        try:
+            serializers.append(serializer_cls())
+        except ImportError:
+            pass
+    return serializers
+
+
+@pytest.mark.parametrize("serializer", _serializers(), ids=lambda s: s.name)
+def test_serializers_encode_rich_types(serializer):
+    """UUIDs, datetimes, Enums and models are encoded without converting the payload first"""
+    assert serializer.loads(serializer.dumps(PAYLOAD)) == EXPECTED
+
+    pen = Pen(entity_id=UUID(int=2).hex, color=Color.RED, label="x")
+    decoded = serializer.loads(serializer.dumps({'pen': pen}))['pen']
+    assert decoded['pen_label'] == "x" and decoded['color'] == "red"
+
+
+def test_json_column_helpers():
+    """json_dumps gives JSON text for JSON columns and json_loads reads it back"""
+    text = json_dumps(PAYLOAD)
+    assert isinstance(text, str)
+    assert json.loads(text) == json_loads(text) == EXPECTED
+
+
+def test_tagged_json_restores_values():
+    """Tagged JSON decodes datetimes, dates, Decimals and UUIDs back to equal values"""
+    values = [PAYLOAD['when'], date(2024, 1, 2), Decimal('9.50'), UUID(int=1), {'nested': [Decimal('1')]}, "x"]
+    assert tagged_json_loads(tagged_json_dumps(values)) == values
+    assert tagged_json_loads(tagged_json_dumps(Color.RED)) == "red"
+
+    with pytest.raises(TypeError):
+        tagged_json_dumps(b"bytes")
+
+
+def test_get_and_set_default_serializer():
+    """The default serializer can be replaced by name or instance"""
+    default = get_serializer()
+    assert default.content_type == 'application/json'
+    with pytest.raises(ValueError, match="Unknown serializer"):
+        get_serializer('yaml')
+
+    try:
+        set_default_serializer('json')
+        assert isinstance(get_serializer(), JsonSerializer)
+    finally:
+        set_default_serializer(default)
+
+
+def test_rabbitmq_serializes_once():
+    """Message bodies are serialized once, with the serializer's content type"""
+    serializer = MagicMock(spec=Serializer, content_type='application/test')
+    serializer.dumps.return_value = b"body"
+    connection = RabbitMqConnection('host', 5672, 'user', 'password', serializer=serializer)
+    connection._channel = MagicMock()
+
+    connection.send_message('queue', {'a': 1})
+
+    serializer.dumps.assert_called_once_with({'a': 1})
+    kwargs = connection._channel.basic_publish.call_args.kwargs
+    assert kwargs['body'] == b"body"
+    assert kwargs['properties'].content_type == 'application/test'
+
+
+def test_sqs_rejects_binary_serializers():
+    """SQS message bodies are text"""
+    serializer = MagicMock(spec=Serializer, binary=True)
+    serializer.name = 'binary'
+    with pytest.raises(ValueError, match="binary"):
+        SqsConnection(region_name='us-east-1', serializer=serializer)
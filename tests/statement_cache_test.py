@@ -0,0 +1,106 @@
+"""
+Tests for the statement cache of the SQL adapters
+"""
+from unittest.mock import MagicMock, patch
+
+from rococo.data.mysql import MySqlAdapter
+from rococo.data.postgresql import PostgreSQLAdapter
+from rococo.data.schema_catalog import SchemaCatalog
+from rococo.data.statement_cache import StatementCache, statement_key
+
+
+def test_queries_of_the_same_shape_share_their_sql():
+    """Values don't change the key; condition keys and IN sizes do"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+
+    first = adapter._build_select_query('item', {'name': "x", 'tag': ["a", "b"]}, limit=10)
+    second = adapter._build_select_query('item', {'name': "y", 'tag': ["c", "d"]}, limit=20)
+    third = adapter._build_select_query('item', {'name': "y", 'tag': ["c"]}, limit=20)
+
+    assert first[0] is second[0]
+    assert second[1] == ("y", "c", "d", 'true', 20)
+    assert third[0] == "SELECT item.* FROM item WHERE item.name = %s AND item.tag IN (%s) AND item.active = %s LIMIT %s"
+    stats = adapter.statement_cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+
+
+def test_counts_and_saves_are_cached():
+    adapter = MySqlAdapter('host', 3306, 'user', 'password', 'db', schema_catalog=SchemaCatalog())
+    with patch.object(adapter, 'execute_query', return_value=[{'count': 2}]) as execute_query:
+        adapter.get_count('item', {'active': True, 'owner_id': None})
+        adapter.get_count('item', {'active': False, 'owner_id': None})
+
+    assert execute_query.call_args.args == (
+        "SELECT COUNT(*) AS `count` FROM `item` WHERE item.active = %s AND item.owner_id IS NULL", (0,))
+    assert adapter.get_save_query('item', {'entity_id': "a"})[0] is adapter.get_save_query('item', {'entity_id': "b"})[0]
+    assert adapter.statement_cache.stats().hits == 2
+
+
+def test_unsupported_values_are_not_cached():
+    assert statement_key('select', 'item', {'created': object()}) is None
+    assert statement_key('select', 'item', {'tag': ["a"]}, [('name', 'ASC')]) == \
+        ('select', 'item', (('tag', 1),), ((('name', 'ASC'),),))
+
+
+def test_least_recently_used_statements_are_evicted():
+    cache = StatementCache(max_size=2)
+    cache.put('a', "A")
+    cache.put('b', "B")
+    cache.get('a')
+    cache.put('c', "C")
+
+    assert cache.get('b') is None and cache.get('a') == "A"
+
+
+def test_disabled_cache():
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', statement_cache_size=0)
+    assert adapter.statement_cache is None
+    assert adapter._build_select_query('item', {'name': "x"})[1] == ("x", 'true')
+
+
+def test_postgresql_prepares_reads_once_per_connection():
+    """Reads are prepared on first use on a connection and executed by name afterwards"""
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', prepare_statements=True,
+                                schema_catalog=SchemaCatalog())
+    adapter._connection = MagicMock()
+    adapter._cursor = MagicMock()
+    adapter._cursor.description = [('entity_id',)]
+    adapter._cursor.fetchall.side_effect = [[], [("a",)], [("b",)]]
+
+    assert adapter.get_many('item', {'name': "x"}, limit=5) == [{'entity_id': "a"}]
+    assert adapter.get_many('item', {'name': "y"}, limit=5) == [{'entity_id': "b"}]
+
+    statements = [call.args for call in adapter._cursor.execute.call_args_list]
+    name = statements[1][0].split()[1]
+    assert statements[0][0] == "SELECT 1 FROM pg_prepared_statements WHERE name = %s"
+    assert statements[1] == (f"PREPARE {name} AS SELECT item.* FROM item "
+                             f"WHERE item.name = $1 AND item.active = $2 LIMIT $3",)
+    assert statements[2] == (f"EXECUTE {name} (%s, %s, %s)", ("x", 'true', 5))
+    assert statements[3] == (f"EXECUTE {name} (%s, %s, %s)", ("y", 'true', 5))
+    assert adapter.statement_cache.stats().prepared == 1
+
+
+def test_adapters_of_a_database_share_the_cache():
+    """Adapters created per request reuse the statements of earlier adapters of the same database"""
+    catalog = SchemaCatalog()
+    first = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=catalog)
+    second = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', schema_catalog=catalog,
+                               statement_cache_size=1024)
+    other = PostgreSQLAdapter('host', 5432, 'user', 'password', 'other', schema_catalog=catalog)
+
+    query, _ = first._build_select_query('item', {'name': "x"})
+
+    assert second.statement_cache is first.statement_cache and first.statement_cache.max_size == 1024
+    assert second._build_select_query('item', {'name': "y"})[0] is query
+    assert other.statement_cache is not first.statement_cache
+
+
+def test_postgresql_pages_are_prepared():
+    adapter = PostgreSQLAdapter('host', 5432, 'user', 'password', 'db', prepare_statements=True,
+                                schema_catalog=SchemaCatalog())
+    with patch.object(adapter, '_execute_select', return_value=[{'entity_id': "a"}]) as execute_select, \
+            patch.object(adapter, 'execute_query') as execute_query:
+        assert adapter.get_page('item', {}, [('entity_id', 'ASC')], after=["a"], limit=5) == [{'entity_id': "a"}]
+
+    execute_select.assert_called_once()
+    execute_query.assert_not_called()
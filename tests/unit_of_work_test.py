@@ -0,0 +1,139 @@
+"""
+Tests for the unit-of-work identity map
+"""
+import asyncio
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+from rococo.models import BaseModel, VersionedModel
+from rococo.repositories.base_repository import BaseRepository
+from rococo.repositories.mongodb.mongodb_repository import MongoDbRepository
+from rococo.repositories.postgresql.postgresql_repository import PostgreSQLRepository
+from rococo.repositories.unit_of_work import current_identity_map, unit_of_work
+
+
+@dataclass(kw_only=True)
+class Account(VersionedModel):
+    name: str = None
+
+
+@dataclass(kw_only=True)
+class Tag(BaseModel):
+    name: str = None
+
+
+ENTITY_ID = "a" * 32
+
+
+def _postgresql_repository():
+    adapter = MagicMock()
+    adapter.get_one.return_value = {'entity_id': ENTITY_ID, 'name': "first"}
+    adapter.get_many.return_value = [{'entity_id': ENTITY_ID, 'name': "first"}]
+    return PostgreSQLRepository(adapter, Account, MagicMock(), 'queue'), adapter
+
+
+def test_repeated_get_one_is_answered_from_the_identity_map():
+    """Within a unit of work an entity is fetched once and is always the same instance"""
+    repository, adapter = _postgresql_repository()
+
+    with unit_of_work():
+        first = repository.get_one({'entity_id': ENTITY_ID})
+        again = repository.get_one({'entity_id': f"{'a' * 8}-{'a' * 4}-{'a' * 4}-{'a' * 4}-{'a' * 12}"})
+        listed = repository.get_many()
+
+    assert first is again and listed == [first] and listed[0] is first
+    assert adapter.get_one.call_count == 1
+
+    # Outside of a unit of work every call queries
+    repository.get_one({'entity_id': ENTITY_ID})
+    assert adapter.get_one.call_count == 2
+
+
+def test_other_conditions_and_fetch_related_still_query():
+    """Only get_one by entity_id alone is answered from the map"""
+    repository, adapter = _postgresql_repository()
+
+    with unit_of_work():
+        first = repository.get_one({'entity_id': ENTITY_ID})
+        by_name = repository.get_one({'name': "first"})
+        repository.get_one({'entity_id': ENTITY_ID}, fetch_related=['name'])
+
+    assert by_name is first
+    assert adapter.get_one.call_count == 3
+
+
+def test_entity_id_with_other_conditions_queries():
+    """get_one by entity_id and anything else is not answered from the map"""
+    repository, adapter = _postgresql_repository()
+
+    with unit_of_work():
+        first = repository.get_one({'entity_id': ENTITY_ID})
+        adapter.get_one.return_value = None
+        assert repository.get_one({'entity_id': ENTITY_ID, 'name': "other"}) is None
+        assert repository.get_one({'name': "other", 'entity_id': ENTITY_ID}) is None
+        assert repository.get_one({'entity_id': ENTITY_ID}) is first
+
+    assert adapter.get_one.call_count == 3
+
+
+def test_inactive_instances_are_not_returned_by_get_one():
+    """An inactive instance loaded by another read is not what get_one by entity_id finds"""
+    repository, adapter = _postgresql_repository()
+    adapter.get_many.return_value = [{'entity_id': ENTITY_ID, 'name': "first", 'active': False}]
+
+    with unit_of_work():
+        repository.get_many({'active': False})
+        adapter.get_one.return_value = None
+        assert repository.get_one({'entity_id': ENTITY_ID}) is None
+
+    assert adapter.get_one.call_count == 1
+
+
+def test_save_and_delete_invalidate():
+    """Saved and deleted entities are dropped, so the next get_one queries again"""
+    adapter = MagicMock()
+    adapter.get_one.return_value = {'entity_id': ENTITY_ID, 'name': "tag"}
+    repository = BaseRepository(adapter, Tag, MagicMock())
+
+    with unit_of_work() as identity_map:
+        tag = repository.get_one({'entity_id': ENTITY_ID})
+        repository.save(tag)
+        assert len(identity_map) == 0
+
+        tag = repository.get_one({'entity_id': ENTITY_ID})
+        repository.delete(tag)
+        repository.get_one({'entity_id': ENTITY_ID})
+
+    assert adapter.get_one.call_count == 3
+
+
+def test_mongodb_repository_uses_the_identity_map():
+    """MongoDB get_one by entity_id is answered from the map as well"""
+    adapter = MagicMock()
+    adapter.get_one.return_value = {'entity_id': ENTITY_ID, 'name': "first"}
+    repository = MongoDbRepository(adapter, Account, MagicMock(), 'queue')
+
+    with unit_of_work():
+        first = repository.get_one('accounts', 'entity_id_idx', {'entity_id': ENTITY_ID})
+        assert repository.get_one('accounts', 'entity_id_idx', {'entity_id': ENTITY_ID}) is first
+
+    assert adapter.get_one.call_count == 1
+
+
+def test_units_of_work_are_per_context():
+    """Nested units of work share the outer map; concurrent tasks each have their own"""
+    with unit_of_work() as outer:
+        with unit_of_work() as inner:
+            assert inner is outer
+        assert current_identity_map() is outer
+    assert current_identity_map() is None
+
+    async def task():
+        with unit_of_work() as identity_map:
+            await asyncio.sleep(0)
+            return identity_map is current_identity_map()
+
+    async def main():
+        return await asyncio.gather(task(), task())
+
+    assert asyncio.run(main()) == [True, True]
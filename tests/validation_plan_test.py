@@ -0,0 +1,110 @@
+"""
+Tests for compiled validation plans and BaseModel.validate_many
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Union
+
+import pytest
+
+from rococo.models import BaseModel
+from rococo.models.metadata import get_model_metadata
+from rococo.models.versioned_model import ModelValidationError
+
+
+class Tier(Enum):
+    A = "a"
+    B = "b"
+
+
+@dataclass(kw_only=True)
+class Customer(BaseModel):
+    use_type_checking = True
+
+    name: str = None
+    age: int = None
+    nickname: Optional[str] = None
+    tier: Tier = None
+    code: Union[dict, int] = None
+
+    def validate_name(self):
+        if not self.name:
+            return "name is required"
+
+    @staticmethod
+    def validate_age():
+        return None
+
+
+@dataclass(kw_only=True)
+class Untyped(BaseModel):
+    name: str = None
+
+    def validate_name(self):
+        if self.name == "bad":
+            return "bad name"
+
+
+@dataclass(kw_only=True)
+class SelfValidated(BaseModel):
+    name: str = None
+
+    def validate(self):
+        if self.name is None:
+            raise ModelValidationError("missing name")
+
+
+def test_validation_plan_is_compiled_once():
+    """The plan is built once per class and covers every field"""
+    meta = get_model_metadata(Customer)
+    assert meta.validation_plan is meta.validation_plan
+    assert [name for name, _, _ in meta.validation_plan] == list(Customer.fields())
+
+    validators = {name: validator for name, validator, _ in meta.validation_plan}
+    assert validators['name'] is not None and validators['age'] is not None
+    assert validators['nickname'] is None
+
+
+def test_validate_casts_and_reports_in_field_order():
+    """Castable values are converted in place and errors keep the field order"""
+    customer = Customer(name="x", age="3", tier="b", code="7")
+    customer.validate()
+    assert (customer.age, customer.tier, customer.code) == (3, Tier.B, 7)
+
+    with pytest.raises(ModelValidationError) as exc:
+        Customer(name="", age="x", tier="z", code=7).validate()
+    assert exc.value.errors == [
+        "name is required",
+        "Invalid type for 'age': expected int, got str",
+        "Invalid type for 'tier': expected Tier, got str",
+    ]
+
+
+def test_validate_without_type_checking():
+    """Only custom validators run when type checking is off"""
+    Untyped(name=5).validate()
+    with pytest.raises(ModelValidationError, match="bad name"):
+        Untyped(name="bad").validate()
+
+
+def test_validate_many_collects_errors_by_index():
+    """validate_many raises one error listing every invalid instance"""
+    customers = [Customer(name="a", age=1, tier=Tier.A, code=1),
+                 Customer(name="", age=2, tier=Tier.A, code=1),
+                 Customer(name="c", age="x", tier=Tier.A, code=1)]
+
+    with pytest.raises(ModelValidationError) as exc:
+        Customer.validate_many(customers)
+
+    assert exc.value.errors_by_index == {
+        1: ["name is required"], 2: ["Invalid type for 'age': expected int, got str"]}
+    assert exc.value.errors == [
+        "[1] name is required", "[2] Invalid type for 'age': expected int, got str"]
+    Customer.validate_many(customers[:1])
+
+
+def test_validate_many_runs_overridden_validate():
+    """Models overriding validate() are validated through it"""
+    with pytest.raises(ModelValidationError) as exc:
+        SelfValidated.validate_many([SelfValidated(name="a"), SelfValidated()])
+    assert exc.value.errors_by_index == {1: ["missing name"]}